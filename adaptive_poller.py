@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Adaptive Poller - per-window poll intervals on a timing wheel
+A window that just showed activity (output scrolled, cursor moved, prompt
+found) is polled again after min_interval; every idle poll multiplies its
+interval by backoff up to max_interval. A cheap change signal (title, frame
+hash, console cursor position) wakes the window at once instead of waiting
+out its interval.
+
+Deadlines live in a hashed timing wheel: scheduling and cancelling are O(1),
+and popping due windows only visits the slots for the ticks that passed,
+however many windows are waiting. The monitor thread sleeps on an Event until
+the next deadline, so a wakeup from another thread (window event hook) ends
+the sleep early.
+
+Usage:
+    python adaptive_poller.py    # simulated latency / CPU against fixed sleeps
+"""
+import collections
+import math
+import random
+import sys
+import threading
+import time
+
+
+class TimingWheel:
+    """Deadlines by key in a ring of tick-sized slots (rounds for far deadlines)"""
+
+    def __init__(self, tick=0.05, slots=256, start=None):
+        """
+        Args:
+            tick: Slot width in seconds (deadline resolution)
+            slots: Ring size - deadlines more than tick * slots ahead wait out
+                full revolutions in their slot
+            start: Time of the first tick (default: time.monotonic())
+        """
+        self.tick = tick
+        self._slots = [set() for _ in range(slots)]
+        self._deadlines = {}  # {key: (deadline, absolute tick of its slot)}
+        self._current = math.floor((time.monotonic() if start is None else start) / tick)
+
+    def schedule(self, key, deadline):
+        """(Re)schedule key - a deadline already past is due on the next pop"""
+        self.cancel(key)
+        tick = max(math.floor(deadline / self.tick), self._current)
+        self._slots[tick % len(self._slots)].add(key)
+        self._deadlines[key] = (deadline, tick)
+
+    def cancel(self, key):
+        entry = self._deadlines.pop(key, None)
+        if entry is not None:
+            self._slots[entry[1] % len(self._slots)].discard(key)
+
+    def pop_due(self, now):
+        """Keys whose deadline is at or before now, earliest first"""
+        target = math.floor(now / self.tick)
+        due = []
+        steps = min(target - self._current + 1, len(self._slots))
+        for offset in range(max(steps, 0)):
+            slot = self._slots[(self._current + offset) % len(self._slots)]
+            for key in [key for key in slot if self._deadlines[key][0] <= now]:
+                slot.discard(key)
+                due.append((self._deadlines.pop(key)[0], key))
+        self._current = max(self._current, target)
+        due.sort(key=lambda item: item[0])
+        return [key for _, key in due]
+
+    def deadline(self, key):
+        entry = self._deadlines.get(key)
+        return None if entry is None else entry[0]
+
+    def next_deadline(self):
+        """Earliest pending deadline (None when empty)"""
+        return min((entry[0] for entry in self._deadlines.values()), default=None)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def __len__(self):
+        return len(self._deadlines)
+
+
+class LatencyStats:
+    """Last detection latencies (seconds) with percentiles"""
+
+    def __init__(self, maxlen=1000):
+        self.samples = collections.deque(maxlen=maxlen)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, fraction):
+        """Nearest-rank percentile (None without samples)"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class AdaptivePoller:
+    """Which windows to poll when: exponential backoff, wake on change"""
+
+    def __init__(self, min_interval=0.5, max_interval=10.0, backoff=2.0, tick=0.05, start=None):
+        """
+        Args:
+            min_interval: Seconds until the next poll after activity
+            max_interval: Longest interval an idle window backs off to
+            backoff: Interval factor per idle poll
+            tick: Timing wheel resolution in seconds
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.wheel = TimingWheel(tick, start=start)
+        self.intervals = {}  # {key: seconds until the poll after next}
+        self.last_poll = {}  # {key: time of the last poll}
+        self._signals = {}  # {(key, kind): last observed value}
+        self.wakeup = threading.Event()  # Set to end wait() early (safe from any thread)
+        self.latency = LatencyStats()
+
+        # Counters
+        self.polls = 0
+        self.wakes = 0
+
+    def sync(self, keys, now=None):
+        """Track exactly these keys (new ones are due at once)"""
+        now = time.monotonic() if now is None else now
+        live = set(keys)
+        for key in [key for key in self.intervals if key not in live]:
+            self.forget(key)
+        for key in live:
+            if key not in self.intervals:
+                self.intervals[key] = self.min_interval
+                self.wheel.schedule(key, now)
+            elif key not in self.wheel:
+                self.wheel.schedule(key, now)  # Returned by due() but never passed to done()
+
+    def forget(self, key):
+        self.wheel.cancel(key)
+        self.intervals.pop(key, None)
+        self.last_poll.pop(key, None)
+        for kind in [kind for k, kind in self._signals if k == key]:
+            del self._signals[(key, kind)]
+
+    def due(self, now=None):
+        """Keys to poll now (each must be passed to done() afterwards)"""
+        return self.wheel.pop_due(time.monotonic() if now is None else now)
+
+    def changed(self, key, value, kind='frame'):
+        """Record a change signal - True if it differs from the last one seen
+        (or is the first one)"""
+        previous = self._signals.get((key, kind), _UNSEEN)
+        self._signals[(key, kind)] = value
+        return previous is _UNSEEN or previous != value
+
+    def wake(self, key, now=None):
+        """Poll key now - or min_interval after its last poll, so a window whose
+        output keeps changing is not polled on every change"""
+        if key not in self.intervals:
+            return
+        now = time.monotonic() if now is None else now
+        when = max(now, self.last_poll.get(key, now) + self.min_interval)
+        current = self.wheel.deadline(key)
+        if current is not None and current <= when:
+            return  # Already due sooner
+        self.intervals[key] = self.min_interval
+        self.wheel.schedule(key, when)
+        self.wakes += 1
+        self.wakeup.set()
+
+    def detected(self, key, now=None):
+        """A prompt was found in key - latency bound: time since its previous poll"""
+        now = time.monotonic() if now is None else now
+        previous = self.last_poll.get(key)
+        if previous is not None:
+            self.latency.add(now - previous)
+
+    def done(self, key, active, now=None):
+        """Schedule key's next poll - shrinks after activity, backs off while idle"""
+        if key not in self.intervals:
+            return
+        now = time.monotonic() if now is None else now
+        if active:
+            interval = self.min_interval
+        else:
+            interval = min(self.max_interval, self.intervals[key] * self.backoff)
+        self.intervals[key] = interval
+        self.last_poll[key] = now
+        self.wheel.schedule(key, now + interval)
+        self.polls += 1
+
+    def wait(self, timeout=None, now=None):
+        """Sleep until the next deadline, a wakeup or timeout"""
+        deadline = self.wheel.next_deadline()
+        delay = timeout
+        if deadline is not None:
+            delay = max(0.0, deadline - (time.monotonic() if now is None else now))
+            if timeout is not None:
+                delay = min(delay, timeout)
+        self.wakeup.wait(delay)
+        self.wakeup.clear()
+
+    def get_stats(self):
+        return {
+            'windows': len(self.intervals),
+            'polls': self.polls,
+            'wakes': self.wakes,
+            'latency_p50': self.latency.percentile(0.5),
+            'latency_p99': self.latency.percentile(0.99),
+        }
+
+
+_UNSEEN = object()
+
+
+def simulate(poller=None, fixed_interval=None, windows=6, duration=1800.0, prompts=40,
+             poll_cost=0.1, probe_cost=0.002, probe_every=5, seed=3):
+    """Detection latency and CPU for polling terminals
+
+    Each terminal is busy (output changing) in bursts; a prompt appears at the
+    end of a burst. For AdaptivePoller the cheap change signal (frame hash /
+    cursor) is probed every probe_every ticks; the expensive poll (OCR /
+    buffer read) runs only when the window is due.
+
+    Returns:
+        {'latencies': [seconds], 'cpu': CPU-seconds per second, 'polls': count}
+    """
+    rng = random.Random(seed)
+    step = 0.05
+    keys = list(range(windows))
+    # (start, end) of output bursts per window; a prompt appears at each end
+    bursts = {key: [] for key in keys}
+    for _ in range(prompts):
+        start = rng.uniform(30, duration - 60)
+        bursts[rng.choice(keys)].append((start, start + rng.uniform(2, 20)))
+    pending = {key: sorted(end for _, end in spans) for key, spans in bursts.items()}
+    latencies = []
+    polls = 0
+    probes = 0
+    last_poll = {key: -math.inf for key in keys}
+    now = 0.0
+    ticks = 0
+
+    def frame(key):
+        # Changes every step during a burst, and once more when the prompt is drawn
+        for start, end in bursts[key]:
+            if start <= now < end:
+                return int(now / step)
+        return -sum(1 for _, end in bursts[key] if end <= now)
+
+    if poller is not None:
+        poller.sync(keys, now=now)
+    while now < duration:
+        if poller is not None:
+            if ticks % probe_every == 0:
+                for key in keys:
+                    probes += 1
+                    if poller.changed(key, frame(key)):
+                        poller.wake(key, now=now)
+            due = poller.due(now)
+        else:
+            due = [key for key in keys if now - last_poll[key] >= fixed_interval]
+        for key in due:
+            polls += 1
+            last_poll[key] = now
+            found = False
+            while pending[key] and pending[key][0] <= now:
+                latencies.append(now - pending[key].pop(0))
+                found = True
+            if poller is not None:
+                busy = any(start <= now < end for start, end in bursts[key])
+                poller.done(key, active=found or busy, now=now)
+        now += step
+        ticks += 1
+    cpu = (polls * poll_cost + probes * probe_cost) / duration
+    return {'latencies': latencies, 'cpu': cpu, 'polls': polls}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else float('nan')
+
+
+def main():
+    runs = [
+        ('fixed 1 s sleep', simulate(fixed_interval=1.0)),
+        ('fixed 2 s sleep', simulate(fixed_interval=2.0)),
+        ('AdaptivePoller', simulate(poller=AdaptivePoller(min_interval=0.5, max_interval=8.0, start=0.0))),
+    ]
+    print("Simulated 30 min, 6 terminals, 40 prompts, 0.1 s per poll, 2 ms per change probe every 0.25 s")
+    for name, result in runs:
+        latencies = result['latencies']
+        print(f"  {name:<16} latency p50 {_percentile(latencies, 0.5):5.2f} s  "
+              f"p99 {_percentile(latencies, 0.99):5.2f} s  "
+              f"CPU {result['cpu']:.3f} cores ({result['polls']} polls)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
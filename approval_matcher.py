@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Approval Matcher - layout-aware prompt detection on OCR lines
+Works on ocr_engine.OCRLine lists (word boxes + confidences) instead of flat
+text: the prompt is recognized at the bottom-most confident "1." option line
+whose siblings ("2.", "3.") are left-aligned below it, and the options are
+read by position. Numbered lists above it (plans, notes) are context only.
+"""
+import functools
+import re
+
+from keyword_matcher import KeywordMatcher
+
+# Option line: optional box border (OCR reads it as |, l or I - lower-cased
+# here) and selection marker, digit, "." or ")", option text, optional border
+OPTION_RE = re.compile(r'^[|│il>›❯»*\-\s]*([1-9])[.)]\s*(.*?)(?:\s*[|│]|\s+[il])?\s*$')
+
+# Option marker anywhere in a line of flat text ("1.", "1)", "› 1." - not "11.")
+_TEXT_MARKER_RE = {num: re.compile(rf'(?:^|[^\d]){num}[.)]') for num in ('1', '2')}
+_TEXT_OPTION_RE = {num: re.compile(rf'(?:^|[^\d]){num}[.)]\s*(.+)') for num in ('1', '2', '3')}
+
+# Lines below this confidence are not trusted for early exit
+MIN_CONF = 60
+
+# Default prompt wording (OCRAutoApprover copies these into its pattern lists)
+# Question patterns (asking for permission)
+QUESTION_PATTERNS = (
+    'do you want',
+    'would you like',
+    'would you',
+)
+
+# Action patterns (what's being asked)
+ACTION_PATTERNS = (
+    'to proceed',
+    'proceed',
+    'to approve',
+    'approve',
+    'to create',
+    'create',
+    'to allow',
+    'allow',
+    'select',
+    'choose',
+)
+
+# Additional specific patterns (exact matches)
+SPECIFIC_PATTERNS = (
+    'select an option',
+    'choose an option',
+    'yes, and don\'t ask again',
+    'yes, and remember',
+    'yes, allow all edits',
+    'approve this action',
+    'allow this action',
+    'grant permission',
+    'proceed with',
+    'continue with',
+    'select one of the following',
+    'choose one of the following',
+    'no, and tell claude',
+    'tell claude what to do differently',
+    'quick safety check',
+    'trust this folder',
+    'i trust this folder',
+    'is this a project you',
+    'project you created or one you trust',
+)
+
+
+def parse_option(line):
+    """(number, text) of an option line (text lower-cased), else None"""
+    match = OPTION_RE.match(line.text.strip().lower())
+    if match is None:
+        return None
+    return match.group(1), match.group(2).strip()
+
+
+def _marker_left(line):
+    """Left edge of the word holding the option number"""
+    for word in line.words:
+        if any(ch.isdigit() for ch in word.text):
+            return word.box[0]
+    return line.box[0]
+
+
+def find_option_block(lines, start=0, min_conf=MIN_CONF, max_gap_lines=2):
+    """Numbered options starting at the last confident "1." line at or after start
+
+    Options must count up from 1 and be left-aligned with option 1 (within one
+    line height); up to max_gap_lines wrapped/description lines may sit between
+    them.
+
+    Returns:
+        (index of the "1." line, {number: option text}) or (None, {})
+    """
+    index, options, _ = _scan_option_block(lines, start, min_conf, max_gap_lines)
+    return index, options
+
+
+def _scan_option_block(lines, start, min_conf, max_gap_lines):
+    """find_option_block plus the index of the last option line"""
+    # From the bottom: a prompt is drawn below any numbered list it refers to
+    for i in range(len(lines) - 1, start - 1, -1):
+        line = lines[i]
+        option = parse_option(line)
+        if option is None or option[0] != '1' or line.conf < min_conf:
+            continue
+
+        left = _marker_left(line)
+        tolerance = max(1, line.box[3] - line.box[1])
+        options = {'1': option[1]}
+        last = i
+        for j in range(i + 1, len(lines)):
+            below = lines[j]
+            option = parse_option(below)
+            if option is not None and option[0] == str(len(options) + 1) \
+                    and abs(_marker_left(below) - left) <= tolerance:
+                options[option[0]] = option[1]
+                last = j
+            elif j - last > max_gap_lines:
+                break
+        return i, options, last
+    return None, {}, None
+
+
+def option_block_box(lines, min_conf=MIN_CONF, context_lines=2):
+    """Bounding box (left, top, right, bottom) of the option block plus the
+    context_lines above it (the question), or None without a block"""
+    index, _, last = _scan_option_block(lines, 0, min_conf, 2)
+    if index is None:
+        return None
+    boxes = [line.box for line in lines[max(0, index - context_lines):last + 1]]
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+def layout_rules_out_prompt(lines, min_conf=MIN_CONF):
+    """True when every line was read confidently and none is an option line
+    or holds an option marker anywhere (what the text fallback looks for)
+
+    A second OCR pass over part of the same image cannot find options then.
+    No lines at all (nothing recognized) does not rule anything out.
+    """
+    if not lines:
+        return False
+    return all(
+        line.conf >= min_conf and parse_option(line) is None
+        and not any(pattern.search(line.text) for pattern in _TEXT_MARKER_RE.values())
+        for line in lines
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def prompt_matcher(question_patterns=QUESTION_PATTERNS, action_patterns=ACTION_PATTERNS,
+                   specific_patterns=SPECIFIC_PATTERNS):
+    """KeywordMatcher with groups 'specific', 'question' and 'action' (tuples, cached)"""
+    return KeywordMatcher({
+        'specific': specific_patterns,
+        'question': question_patterns,
+        'action': action_patterns,
+    })
+
+
+def match_prompt(lines, question_patterns=QUESTION_PATTERNS, action_patterns=ACTION_PATTERNS,
+                 specific_patterns=SPECIFIC_PATTERNS, min_conf=MIN_CONF, matcher=None):
+    """Decide from layout whether lines show an approval prompt
+
+    matcher: prompt_matcher() of the pattern lists, built by the caller once
+    (default: looked up from the lists on each call)
+
+    Returns:
+        (verdict, options) - verdict True (prompt; options by number), False
+        (layout rules a prompt out) or None (undecided - fall back to text;
+        options are empty then, as for False)
+    """
+    index, options = find_option_block(lines, min_conf=min_conf)
+    if index is None:
+        return (False if layout_rules_out_prompt(lines, min_conf) else None), {}
+
+    # Context: everything above the block plus the option texts themselves
+    context = ' '.join(line.text for line in lines[:index]).lower()
+    context = ' '.join(context.split() + list(options.values()))
+    if matcher is None:
+        matcher = prompt_matcher(tuple(question_patterns), tuple(action_patterns), tuple(specific_patterns))
+    if matcher.match_ids(context):
+        return True, options
+    return None, {}
+
+
+def parse_text_options(text, last=False):
+    """Options in flat text (OCR, console, terminal screen): {number: option text}
+    for '1' to '3', lower-cased - the first line with each marker wins
+
+    last: Read the last option block instead (lines from the bottom up to the
+    last "1." line) - for scrollback where older numbered lists sit above
+    """
+    options = {}
+    lines = text.split('\n')
+    for line in (reversed(lines) if last else lines):
+        line = line.strip().lower()
+        for num, pattern in _TEXT_OPTION_RE.items():
+            if num not in options:
+                match = pattern.search(line)
+                if match:
+                    options[num] = match.group(1).strip()
+        if last and '1' in options:
+            break
+    return options
+
+
+def text_prompt_key(text):
+    """Identity of the prompt in flat text: the question line above the last
+    "1." option plus the option texts (selection marker and other rows
+    ignored, so moving the marker or redrawing a status line keeps the key)"""
+    lines = [line.strip().lower() for line in text.split('\n')]
+    question = ''
+    for i in range(len(lines) - 1, -1, -1):
+        if _TEXT_MARKER_RE['1'].search(lines[i]):
+            question = next((line for line in reversed(lines[:i]) if line), '')
+            break
+    return question, tuple(sorted(parse_text_options(text, last=True).items()))
+
+
+def text_shows_prompt(text, matcher=None):
+    """Whether flat text shows an approval prompt
+
+    A "1." or "2." option plus a specific pattern, a question or an action
+    pattern (matcher: prompt_matcher() groups, default lists).
+    """
+    if not text:
+        return False
+    lower = text.lower()
+    if not any(pattern.search(line) for line in lower.split('\n') for pattern in _TEXT_MARKER_RE.values()):
+        return False
+    return bool((matcher or prompt_matcher()).match_ids(' '.join(lower.split())))
+
+
+def option_score(option):
+    """How much an option text looks like approval (negative: never choose it)"""
+    score = 0
+    # Positive signals (want to select)
+    if 'yes' in option:
+        score += 10
+    if "don't ask" in option or "dont ask" in option:
+        score += 5  # Permanent approval bonus
+    if 'approve' in option:
+        score += 10
+    if 'allow' in option:
+        score += 8
+    if 'proceed' in option:
+        score += 8
+    if 'trust' in option:
+        score += 10  # "Yes, I trust this folder"
+
+    # Negative signals (never select)
+    if 'type' in option and 'here' in option:
+        score -= 100  # "Type here to tell Claude..."
+    if 'tell claude' in option:
+        score -= 100
+    if 'differently' in option:
+        score -= 100
+    if option.startswith('no') and 'yes' not in option:
+        score -= 100  # Starts with "No"
+    if 'exit' in option:
+        score -= 100  # "No, exit" - never select exit option
+    return score
+
+
+def choose_option(options):
+    """(option number, score) with the highest score - '1' when nothing scores,
+    and never '3' (the "No, tell Claude" slot)"""
+    best_option, best_score = '1', -999
+    for num, option in options.items():
+        score = option_score(option)
+        if score > best_score:
+            best_option, best_score = num, score
+    if best_option == '3':
+        best_option = '1'
+    return best_option, best_score
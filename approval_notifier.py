@@ -14,6 +14,9 @@ import winsound
 import ctypes
 import io
 from winotify import Notification, audio
+from window_registry import WindowRegistry, WinEventSource
+from keyword_matcher import KeywordMatcher
+from console_reader import ConsoleReaderPool, ConsoleScreen, read_console_region
 
 # UTF-8 설정 (이미 설정되어 있지 않은 경우에만)
 if sys.platform == 'win32':
@@ -62,6 +65,31 @@ class ApprovalNotifier:
         self.last_detected_text = ""
         self.last_detected_time = 0
 
+        # 제외할 창 (일반 에디터, README 등)
+        self.exclude_keywords = ['readme', '.md', '.txt', '.py', 'editor']
+
+        # 승인 대화상자 키워드
+        self.approval_keywords = ['question', 'approval', 'proceed?', 'permission', 'authorize']
+
+        # 패턴 목록은 한 번만 컴파일 - 창 제목은 세 목록을 한 번에 확인
+        self.approval_matcher = KeywordMatcher(self.approval_patterns)
+        self.title_matcher = KeywordMatcher({
+            'exclude': self.exclude_keywords,
+            'terminal': self.terminal_patterns,
+            'approval': self.approval_keywords,
+        })
+
+        # 현재 콘솔 화면 (읽기 버퍼 재사용, 바뀌었을 때만 패턴 검사)
+        self.console_screen = ConsoleScreen()
+
+        # 다른 터미널의 콘솔 버퍼 읽기 (콘솔마다 도우미 프로세스 하나)
+        self.console_readers = ConsoleReaderPool(lines=20)
+
+        # 창 목록 - 이벤트로 갱신, 대상 여부는 창 제목이 바뀔 때만 다시 판정
+        self.window_registry = WindowRegistry(
+            WinEventSource(), self.classify_window, min_size=(0, 0), skip_parked=False
+        )
+
         print("✅ Approval Notifier 초기화 완료")
 
     def find_terminal_windows(self):
@@ -85,46 +113,35 @@ class ApprovalNotifier:
         return windows
 
     def read_console_screen_buffer(self):
-        """현재 콘솔 화면 버퍼 읽기"""
+        """현재 콘솔 화면 버퍼 읽기 (커서까지 최근 20줄, 한 번의 호출로)
+
+        지난번과 같은 화면이면 self.console_screen.changed가 False
+        """
         try:
             console_handle = win32console.GetStdHandle(win32console.STD_OUTPUT_HANDLE)
-            csbi = console_handle.GetConsoleScreenBufferInfo()
-            cursor_pos = csbi['CursorPosition']
-
-            # 최근 20줄 읽기
-            lines_to_read = min(20, cursor_pos.Y + 1)
-            start_y = max(0, cursor_pos.Y - lines_to_read + 1)
-
-            buffer_text = []
-            for y in range(start_y, cursor_pos.Y + 1):
-                try:
-                    coord = win32console.PyCOORDType(0, y)
-                    size = csbi['Size'].X
-                    text = console_handle.ReadConsoleOutputCharacter(size, coord)
-                    buffer_text.append(text.strip())
-                except:
-                    pass
-
-            return '\n'.join(buffer_text)
+            read_console_region(console_handle, self.console_screen, lines=20, to_cursor=True)
+            return self.console_screen.text()
         except Exception:
+            self.console_screen.changed = False
             return ""
 
     def read_other_console_buffer(self, pid):
-        """다른 프로세스의 콘솔 버퍼 읽기 - 현재는 비활성화 (stdout 문제)"""
-        # FreeConsole()이 현재 프로그램의 stdout을 닫아버리는 문제로 비활성화
-        # GUI 창 감지로 대체
-        return None
+        """다른 프로세스의 콘솔 버퍼 읽기 - 콘솔이 없거나 실패하면 None
+
+        대상 콘솔에 한 번 연결해 두는 도우미 프로세스가 읽으므로 이 프로그램의
+        stdout은 그대로 유지됨 (FreeConsole 없음)
+        """
+        try:
+            return self.console_readers.read(pid)
+        except Exception:
+            return None
 
     def check_approval_pattern(self, text):
         """승인 패턴 확인"""
         if not text:
             return False
 
-        text_lower = text.lower()
-        for pattern in self.approval_patterns:
-            if pattern.lower() in text_lower:
-                return True
-        return False
+        return bool(self.approval_matcher.match_ids(text))
 
     def should_notify(self, window_id, text=""):
         """알림을 보내야 하는지 확인 (중복 방지)"""
@@ -203,36 +220,30 @@ class ApprovalNotifier:
             except:
                 pass
 
-    def check_window_for_approval(self):
-        """모든 창에서 승인 프롬프트 확인 - 터미널 및 콘솔 창 포함"""
-        def callback(hwnd, result):
-            if win32gui.IsWindowVisible(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                title_lower = title.lower()
-
-                # 제외할 창 (일반 에디터, README 등)
-                exclude_keywords = ['readme', '.md', '.txt', '.py', 'editor']
-                if any(exc in title_lower for exc in exclude_keywords):
-                    return True
+    def classify_window(self, info):
+        """승인 확인 대상이 아니면 이유, 대상이면 None (창 제목이 바뀔 때만 호출)"""
+        matched = self.title_matcher.matches(info.title)
 
-                # 터미널 패턴에 해당하는 창 찾기
-                is_terminal = any(pattern.lower() in title_lower for pattern in self.terminal_patterns)
+        # 제외할 창 (일반 에디터, README 등)
+        if 'exclude' in matched:
+            return '제외 키워드'
 
-                # 승인 대화상자 키워드
-                approval_keywords = ['question', 'approval', 'proceed?', 'permission', 'authorize']
-                has_approval_keyword = any(keyword in title_lower for keyword in approval_keywords)
+        # 터미널 패턴에 해당하는 창이거나 승인 키워드가 있는 창
+        if 'terminal' in matched or 'approval' in matched:
+            return None
+        return '터미널/승인 창 아님'
 
-                # 터미널 창이거나 승인 키워드가 있는 창
-                if is_terminal or has_approval_keyword:
-                    result.append({'hwnd': hwnd, 'title': title})
-            return True
+    def check_window_for_approval(self):
+        """모든 창에서 승인 프롬프트 확인 - 터미널 및 콘솔 창 포함
 
-        windows = []
+        Returns:
+            [WindowInfo] (레지스트리와 공유 - 수정 금지)
+        """
         try:
-            win32gui.EnumWindows(callback, windows)
-        except:
+            self.window_registry.refresh()
+        except Exception:
             pass
-        return windows
+        return self.window_registry.targets()
 
     def monitor_loop(self):
         """메인 모니터링 루프"""
@@ -249,24 +260,33 @@ class ApprovalNotifier:
 
                 # 1. 현재 콘솔 화면 읽기
                 screen_text = self.read_console_screen_buffer()
-                if screen_text and self.check_approval_pattern(screen_text):
+                if screen_text and self.console_screen.changed and self.check_approval_pattern(screen_text):
                     print(f"\n📋 [현재 콘솔] 승인 요청 패턴 감지!")
                     self.show_notification("현재 콘솔", "console", window_id="current_console", text=screen_text)
                     detected = True
 
-                # 2. 활성 창(foreground) 확인
+                # 2. 다른 터미널의 콘솔 버퍼 확인
+                if not detected:
+                    targets = self.check_window_for_approval()
+                    self.console_readers.sync(window.pid for window in targets)
+                    for window in targets:
+                        console_text = self.read_other_console_buffer(window.pid)
+                        if console_text and self.check_approval_pattern(console_text):
+                            print(f"\n📋 [콘솔] 승인 요청 패턴 감지! ({window.title})")
+                            self.show_notification(window.title, "console", window_id=window.hwnd, text=console_text)
+                            detected = True
+                            break
+
+                # 3. 활성 창(foreground) 확인
                 if not detected:
                     try:
                         fg_hwnd = win32gui.GetForegroundWindow()
                         fg_title = win32gui.GetWindowText(fg_hwnd)
-                        fg_title_lower = fg_title.lower()
-
-                        # 활성 창이 터미널인지 확인
-                        is_terminal = any(pattern.lower() in fg_title_lower for pattern in self.terminal_patterns)
+                        matched = self.title_matcher.matches(fg_title)
 
-                        # 제외 키워드 확인
-                        exclude_keywords = ['readme', '.md', '.txt', '.py', 'editor']
-                        is_excluded = any(exc in fg_title_lower for exc in exclude_keywords)
+                        # 활성 창이 터미널인지, 제외 키워드가 있는지 확인
+                        is_terminal = 'terminal' in matched
+                        is_excluded = 'exclude' in matched
 
                         # 터미널이고 제외 대상이 아니면 감지
                         if is_terminal and not is_excluded and fg_title:
@@ -276,19 +296,16 @@ class ApprovalNotifier:
                     except:
                         pass
 
-                # 3. 모든 터미널/콘솔 창 확인 (백업)
+                # 4. 모든 터미널/콘솔 창 확인 (백업)
                 if not detected:
                     approval_windows = self.check_window_for_approval()
                     if approval_windows:
-                        hwnd = approval_windows[0]['hwnd']
-                        window_title = approval_windows[0]['title']
-
-                        # 제외 키워드 다시 확인
-                        exclude_keywords = ['readme', '.md', '.txt', '.py', 'editor']
-                        if not any(exc in window_title.lower() for exc in exclude_keywords):
-                            print(f"\n📋 [터미널] 승인 가능 창 감지! ({window_title})")
-                            self.show_notification(window_title, "terminal", window_id=hwnd, text=window_title)
-                            detected = True
+                        # 제외 키워드는 레지스트리 분류에서 이미 걸러짐
+                        hwnd = approval_windows[0].hwnd
+                        window_title = approval_windows[0].title
+                        print(f"\n📋 [터미널] 승인 가능 창 감지! ({window_title})")
+                        self.show_notification(window_title, "terminal", window_id=hwnd, text=window_title)
+                        detected = True
 
                 time.sleep(1)
 
@@ -316,6 +333,8 @@ class ApprovalNotifier:
         self.running = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
+        self.window_registry.close()
+        self.console_readers.close()
         print("⏹️ 모니터링 중지됨")
 
 
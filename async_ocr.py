@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Async OCR - asyncio front end for per-window OCR jobs
+Each window has at most one job in flight. A job is dropped when its window
+disappears from enumeration or when a new capture with a different frame
+fingerprint arrives, and it times out after a fixed budget. The scan cycle
+then waits only for live windows' current frames, never for OCR of windows
+that are gone.
+
+Jobs run on a thread pool (Tesseract releases the GIL) driven by an event
+loop on its own thread. A thread cannot be interrupted mid-Tesseract call, so
+cancellation is cooperative: the job's cancel_event is set and the job stops
+at its next check_cancelled() call. A replacement job for the same window
+only starts once the dropped one has returned, so per-window state (dirty
+regions, frame cache) is never touched by two jobs at once.
+"""
+import asyncio
+import concurrent.futures
+import os
+import threading
+
+
+class OCRCancelled(Exception):
+    """The job's window closed or its frame changed while it ran"""
+
+
+class OCRTimeout(TimeoutError):
+    """The job did not finish within the dispatcher's timeout"""
+
+
+def check_cancelled(cancel_event):
+    """Raise OCRCancelled if a job's cancel_event is set (None = never cancelled)"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise OCRCancelled()
+
+
+class _Job:
+    """One submitted OCR call"""
+
+    __slots__ = ('key', 'fingerprint', 'previous', 'cancel_event', 'finished', 'work', 'future')
+
+    def __init__(self, key, fingerprint, previous):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.previous = previous  # Earlier job of the same window (must return first)
+        self.cancel_event = threading.Event()
+        # Resolved once the pool thread is done with (or never started) this job
+        self.finished = concurrent.futures.Future()
+        self.work = None  # Pool future once fn was handed to a thread
+        self.future = None  # Result future handed to the caller
+
+    def mark_finished(self, *_):
+        try:
+            self.finished.set_result(None)
+        except concurrent.futures.InvalidStateError:
+            pass
+
+    def settle(self, _future):
+        """Result future done - a job that never reached the pool is finished too"""
+        if self.work is None:
+            self.mark_finished()
+
+
+class AsyncOCRDispatcher:
+    """Per-window OCR jobs with timeouts and cancellation"""
+
+    def __init__(self, workers=None, timeout=10.0):
+        """
+        Args:
+            workers: OCR threads (default: CPU count - 1)
+            timeout: Seconds a job may take, including time queued for a thread
+        """
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.timeout = timeout
+        self._jobs = {}  # {window key: latest _Job}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._executor = None
+
+        # Counters
+        self.submitted = 0
+        self.reused = 0
+        self.completed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+
+    def start(self):
+        """Start the event loop thread and the OCR pool"""
+        if self._loop is not None:
+            return
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='ocr'
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='ocr-dispatch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Cancel every job and stop the loop (running OCR calls are not waited for)"""
+        if self._loop is None:
+            return
+        with self._lock:
+            for job in self._jobs.values():
+                self._cancel(job)
+            self._jobs.clear()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loop = self._thread = self._executor = None
+
+    def submit(self, key, fingerprint, fn, *args):
+        """Run fn(*args, cancel_event=threading.Event) for a window
+
+        A job still in flight for the same window and fingerprint is reused;
+        one for an older fingerprint is cancelled.
+
+        Returns:
+            concurrent.futures.Future - result of fn, OCRTimeout, OCRCancelled
+            or concurrent.futures.CancelledError
+        """
+        if self._loop is None:
+            raise RuntimeError("AsyncOCRDispatcher is not started")
+        with self._lock:
+            current = self._jobs.get(key)
+            if current is not None and not current.future.done():
+                if current.fingerprint == fingerprint:
+                    self.reused += 1
+                    return current.future
+                self._cancel(current)
+
+            job = _Job(key, fingerprint, current)
+            job.future = asyncio.run_coroutine_threadsafe(self._run(job, fn, args), self._loop)
+            job.future.add_done_callback(job.settle)
+            self._jobs[key] = job
+            self.submitted += 1
+            return job.future
+
+    def cancel(self, key):
+        """Cancel the window's job (True if one was in flight)"""
+        with self._lock:
+            job = self._jobs.pop(key, None)
+            if job is None or job.future.done():
+                return False
+            self._cancel(job)
+            return True
+
+    def cancel_missing(self, live_keys):
+        """Cancel jobs of windows that no longer exist - returns how many were in flight"""
+        live = set(live_keys)
+        with self._lock:
+            gone = [key for key in self._jobs if key not in live]
+            cancelled = 0
+            for key in gone:
+                job = self._jobs.pop(key)
+                if not job.future.done():
+                    self._cancel(job)
+                    cancelled += 1
+            return cancelled
+
+    def in_flight(self):
+        """{window key: fingerprint} of jobs that have not finished"""
+        with self._lock:
+            return {key: job.fingerprint for key, job in self._jobs.items() if not job.future.done()}
+
+    def _cancel(self, job):
+        # Caller holds _lock
+        job.cancel_event.set()
+        if job.future.cancel():
+            self.cancelled += 1
+
+    async def _run(self, job, fn, args):
+        try:
+            result = await asyncio.wait_for(self._execute(job, fn, args), self.timeout)
+        except asyncio.TimeoutError:
+            job.cancel_event.set()
+            self.timed_out += 1
+            raise OCRTimeout(f"OCR of {job.key!r} took longer than {self.timeout:.1f}s") from None
+        self.completed += 1
+        return result
+
+    async def _execute(self, job, fn, args):
+        # The window's previous job may still be running on a pool thread
+        if job.previous is not None:
+            await asyncio.shield(asyncio.wrap_future(job.previous.finished))
+            job.previous = None  # Do not keep a chain of old jobs alive
+
+        # Under the lock so a concurrent _cancel either sees job.work or stops it here
+        with self._lock:
+            check_cancelled(job.cancel_event)
+            job.work = self._executor.submit(fn, *args, cancel_event=job.cancel_event)
+            job.work.add_done_callback(job.mark_finished)
+        # Cancelling this await drops work that has not started yet
+        return await asyncio.wrap_future(job.work)
+
+    def get_stats(self):
+        return {
+            'submitted': self.submitted,
+            'reused': self.reused,
+            'completed': self.completed,
+            'timed_out': self.timed_out,
+            'cancelled': self.cancelled,
+            'in_flight': len(self.in_flight()),
+        }
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Desktop Capture Benchmark - per-window BitBlt vs one desktop grab per monitor
+Measures capture cycle time for 5, 20 and 50 windows.
+
+Off Windows (or with --backend replay) windows are laid out on two simulated
+1920x1080 monitors and every GDI round trip costs --latency-ms. A share of the
+windows (--overlap) is moved on top of another one so the per-window fallback is
+exercised too. With --backend gdi the first N visible top-level windows are used.
+
+Usage:
+    python bench_desktop_capture.py
+    python bench_desktop_capture.py --backend gdi --counts 5 20
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from PIL import Image
+
+from window_capture import ReplayCaptureBackend, WindowCapture, WIN32_AVAILABLE
+
+REGION = (0.0, 0.4, 1.0, 1.0)
+MONITORS = [(0, 0, 1920, 1080), (1920, 0, 3840, 1080)]
+
+
+def replay_layout(count, overlap, latency):
+    """Replay backend with count windows tiled over two monitors"""
+    backend = ReplayCaptureBackend(latency=latency)
+    backend.set_desktop(MONITORS)
+
+    # Grid that fits count windows per monitor pair
+    per_monitor = (count + 1) // 2
+    cols = 1
+    while cols * cols < per_monitor:
+        cols += 1
+    width, height = 1920 // cols, 1080 // cols
+
+    origins = []
+    for i in range(count):
+        monitor = MONITORS[i % 2]
+        slot = i // 2
+        origins.append((monitor[0] + (slot % cols) * width, monitor[1] + (slot // cols) * height))
+
+    # The last windows are moved on top of the first ones (offset by a third)
+    overlapped = int(count * overlap)
+    for n, i in enumerate(range(count - overlapped, count)):
+        monitor = MONITORS[n % 2]
+        left, top = origins[n]
+        origins[i] = (min(left + width // 3, monitor[2] - width), min(top + height // 3, monitor[3] - height))
+
+    for i, origin in enumerate(origins):
+        img = Image.new('RGB', (width, height), (12 + i * 4 % 200, 12, 12))
+        backend.add_window(1000 + i, [img], origin=origin)
+    return backend, [1000 + i for i in range(count)]
+
+
+def gdi_layout(count):
+    """GDI backend with the first count visible top-level windows"""
+    import win32gui
+
+    capture = WindowCapture()
+    hwnds = []
+
+    def callback(hwnd, _):
+        if win32gui.IsWindowVisible(hwnd) and not win32gui.IsIconic(hwnd) and win32gui.GetWindowText(hwnd):
+            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+            if right - left >= 100 and bottom - top >= 100:
+                hwnds.append(hwnd)
+        return True
+
+    win32gui.EnumWindows(callback, None)
+    return capture.backend, hwnds[:count]
+
+
+def cycle_ms(capture, regions, desktop, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = capture.capture_frames(regions, desktop=desktop)
+        for frame in frames.values():
+            if frame is not None:
+                frame.to_image()  # what the OCR path consumes
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Desktop grab vs per-window capture benchmark')
+    parser.add_argument('--backend', choices=['gdi', 'replay'],
+                        default='gdi' if WIN32_AVAILABLE else 'replay')
+    parser.add_argument('--counts', type=int, nargs='+', default=[5, 20, 50])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=2.0,
+                        help='Simulated GDI round trip for the replay backend (default: 2.0)')
+    parser.add_argument('--overlap', type=float, default=0.2,
+                        help='Share of replay windows overlapping a neighbour (default: 0.2)')
+    args = parser.parse_args()
+
+    print(f"Backend: {args.backend}")
+    print(f"{'windows':>8} {'per-window ms':>14} {'desktop ms':>11} {'speedup':>8} {'sliced':>7} {'fallback':>9}")
+
+    for count in args.counts:
+        if args.backend == 'gdi':
+            backend, hwnds = gdi_layout(count)
+        else:
+            backend, hwnds = replay_layout(count, args.overlap, args.latency_ms / 1000)
+
+        capture = WindowCapture(backend)
+        regions = {hwnd: REGION for hwnd in hwnds}
+
+        per_window = cycle_ms(capture, regions, False, args.repeat)
+        capture.stats = {'desktop_grabs': 0, 'sliced': 0, 'per_window': 0}
+        desktop = cycle_ms(capture, regions, True, args.repeat)
+
+        sliced = capture.stats['sliced'] // args.repeat
+        fallback = capture.stats['per_window'] // args.repeat
+        speedup = per_window / desktop if desktop else 0.0
+        print(f"{len(hwnds):>8} {per_window:>14.1f} {desktop:>11.1f} {speedup:>7.2f}x {sliced:>7} {fallback:>9}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Preprocess Benchmark - PIL ImageEnhance chain vs NumPy PreprocessEngine
+Times both paths on the fixture corpus, checks the outputs are pixel-identical
+(LANCZOS) and, when tesseract is installed, that OCR text is unchanged for
+every resampling choice.
+
+Usage:
+    python bench_preprocess.py
+    python bench_preprocess.py --fixtures captures/ --repeat 50
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from ocr_fixtures import load_fixture_corpus
+from ocr_preprocess import PreprocessEngine, RESAMPLE_FILTERS, pil_preprocess
+from window_capture import frame_from_image
+
+OCR_CONFIG = r'--psm 6 --oem 3'
+
+
+def time_ms(func, repeat):
+    """Median wall time of func() in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def get_ocr():
+    """pytesseract.image_to_string if tesseract is usable, else None"""
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return lambda img: pytesseract.image_to_string(img, lang='eng', config=OCR_CONFIG)
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR preprocessing benchmark')
+    parser.add_argument('--fixtures', default=None,
+                        help='Directory of captured PNGs + expected.json (default: synthetic)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Timing repetitions per frame (default: 20)')
+    args = parser.parse_args()
+
+    corpus = load_fixture_corpus(args.fixtures)
+    engines = {name: PreprocessEngine(resample=name) for name in RESAMPLE_FILTERS}
+    ocr = get_ocr()
+
+    print(f"{'fixture':<28} {'size':>10} {'PIL ms':>8} " +
+          ' '.join(f"{name + ' ms':>12}" for name in engines) + '  identical')
+
+    mismatches = []
+    ocr_diffs = []
+    totals = {'pil': 0.0, **{name: 0.0 for name in engines}}
+    for name, img, _ in corpus:
+        frame = frame_from_image(img)
+
+        # PIL path starts from the decoded image, as the monitors used to
+        pil_ms = time_ms(lambda: pil_preprocess(frame.to_image()), args.repeat)
+        engine_ms = {
+            resample: time_ms(lambda: engine.process(frame), args.repeat)
+            for resample, engine in engines.items()
+        }
+
+        reference = pil_preprocess(frame.to_image())
+        identical = np.array_equal(np.asarray(engines['lanczos'].process(frame)), np.asarray(reference))
+        if not identical:
+            mismatches.append(name)
+
+        if ocr is not None:
+            expected_text = ocr(reference)
+            for resample, engine in engines.items():
+                if ocr(engine.process(frame)) != expected_text:
+                    ocr_diffs.append((name, resample))
+
+        totals['pil'] += pil_ms
+        for resample, ms in engine_ms.items():
+            totals[resample] += ms
+
+        print(f"{name:<28} {f'{img.width}x{img.height}':>10} {pil_ms:>8.2f} " +
+              ' '.join(f"{engine_ms[r]:>12.2f}" for r in engines) +
+              f"  {'yes' if identical else 'NO'}")
+
+    print()
+    print(f"Total PIL: {totals['pil']:.1f} ms")
+    for resample in engines:
+        speedup = totals['pil'] / totals[resample] if totals[resample] else 0.0
+        print(f"Total {resample:<8}: {totals[resample]:.1f} ms ({speedup:.2f}x)")
+
+    if ocr is None:
+        print("\n[SKIP] OCR comparison - tesseract not available")
+    elif ocr_diffs:
+        print(f"\n[WARN] OCR text differs for: {', '.join(f'{n} ({r})' for n, r in ocr_diffs)}")
+    else:
+        print("\n[OK] OCR text identical for every fixture and resampling choice")
+
+    if mismatches:
+        print(f"[FAIL] Pixel mismatch vs PIL chain: {', '.join(mismatches)}")
+        return 1
+    print("[OK] LANCZOS output pixel-identical to the PIL chain")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,9 @@ import win32console
 import ctypes
 from ctypes import wintypes
 import io
+from keyword_matcher import KeywordMatcher
+from adaptive_poller import AdaptivePoller
+from console_reader import ConsoleReaderPool
 
 # UTF-8 설정
 if sys.platform == 'win32':
@@ -44,10 +47,23 @@ class ConsoleBufferMonitor:
         # 터미널 패턴
         self.terminal_patterns = ['MINGW', 'bash', 'Claude', 'Terminal', 'cmd']
 
+        # 패턴 목록은 한 번만 컴파일 (터미널 패턴은 대소문자 구분)
+        self.approval_matcher = KeywordMatcher(self.approval_patterns)
+        self.terminal_matcher = KeywordMatcher(self.terminal_patterns, ignore_case=False)
+
         # 중복 방지
         self.last_input_time = 0
         self.min_input_interval = 2
 
+        # 터미널별 읽기 간격 - 커서가 움직이거나 내용이 바뀌면 0.5초, 변화가 없으면
+        # 8초까지 두 배씩 늘림 (창 제목이 바뀌면 바로 읽기)
+        self.poller = AdaptivePoller(min_interval=0.5, max_interval=8.0)
+        self.last_cursor = None  # read_console_buffer가 읽은 커서 위치
+
+        # 대상 콘솔마다 한 번 연결해 두는 도우미 프로세스 - 이 프로세스는 콘솔을
+        # 분리하지 않으므로 출력이 끊기지 않음
+        self.console_readers = ConsoleReaderPool(lines=20)
+
         # 현재 창
         try:
             self.current_hwnd = win32console.GetConsoleWindow()
@@ -60,7 +76,7 @@ class ConsoleBufferMonitor:
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
                 if title and hwnd != self.current_hwnd:
-                    if any(p in title for p in self.terminal_patterns):
+                    if self.terminal_matcher.match_ids(title):
                         # 프로세스 ID 가져오기
                         _, pid = win32process.GetWindowThreadProcessId(hwnd)
                         windows.append({
@@ -77,79 +93,23 @@ class ConsoleBufferMonitor:
             pass
         return windows
 
-    def attach_console(self, pid):
-        """다른 프로세스의 콘솔에 연결"""
+    def read_console_buffer(self, pid):
+        """pid의 콘솔 버퍼 마지막 20줄 읽기 (도우미 프로세스 경유) - 실패하면 빈 문자열"""
         try:
-            # 현재 콘솔에서 분리
-            kernel32 = ctypes.windll.kernel32
-            kernel32.FreeConsole()
-            time.sleep(0.1)
-
-            # 대상 프로세스 콘솔에 연결
-            if kernel32.AttachConsole(pid):
-                return True
-
-            return False
-        except Exception as e:
-            print(f"   ⚠️ 콘솔 연결 실패: {e}")
-            return False
-
-    def detach_and_restore_console(self):
-        """콘솔 분리 및 원래 콘솔로 복귀"""
-        try:
-            kernel32 = ctypes.windll.kernel32
-            kernel32.FreeConsole()
-            time.sleep(0.1)
-
-            # 원래 콘솔에 재연결 (없으면 새로 할당)
-            kernel32.AllocConsole()
-        except:
-            pass
-
-    def read_console_buffer(self):
-        """현재 연결된 콘솔 버퍼 읽기"""
-        try:
-            # 표준 출력 핸들 가져오기
-            console_handle = win32console.GetStdHandle(win32console.STD_OUTPUT_HANDLE)
-
-            # 콘솔 화면 버퍼 정보
-            csbi = console_handle.GetConsoleScreenBufferInfo()
-
-            # 현재 화면 크기
-            window = csbi['Window']
-            width = window.Right - window.Left + 1
-            height = window.Bottom - window.Top + 1
-
-            # 마지막 20줄만 읽기
-            lines_to_read = min(20, height)
-            start_y = max(0, window.Bottom - lines_to_read + 1)
-
-            buffer_text = []
-            for y in range(start_y, window.Bottom + 1):
-                try:
-                    coord = win32console.PyCOORDType(window.Left, y)
-                    text = console_handle.ReadConsoleOutputCharacter(width, coord)
-                    buffer_text.append(text.strip())
-                except:
-                    pass
-
-            return '\n'.join(buffer_text)
-
-        except Exception as e:
-            return ""
+            text = self.console_readers.read(pid)
+        except Exception:
+            text = None
+        reader = self.console_readers.readers.get(pid)
+        # 커서 위치 (출력이 있으면 움직임)
+        self.last_cursor = reader.cursor if reader is not None else None
+        return text or ""
 
     def check_approval_pattern(self, text):
         """텍스트에서 승인 패턴 확인"""
         if not text:
             return False
 
-        text_lower = text.lower()
-
-        for pattern in self.approval_patterns:
-            if pattern.lower() in text_lower:
-                return True
-
-        return False
+        return bool(self.approval_matcher.match_ids(text))
 
     def send_input_to_terminal(self, terminal):
         """터미널에 '1' 입력"""
@@ -195,53 +155,63 @@ class ConsoleBufferMonitor:
         """메인 모니터링 루프"""
         print("\n🔍 콘솔 버퍼 모니터링 시작...")
 
+        started, started_cpu = time.time(), time.process_time()
+
         while self.running:
             try:
                 # 중복 방지
-                if time.time() - self.last_input_time < self.min_input_interval:
-                    time.sleep(0.5)
+                remaining = self.min_input_interval - (time.time() - self.last_input_time)
+                if remaining > 0:
+                    time.sleep(remaining)
                     continue
 
                 # 대상 터미널 찾기
-                terminals = self.find_target_terminals()
-
+                terminals = {terminal['hwnd']: terminal for terminal in self.find_target_terminals()}
+                self.poller.sync(terminals)
+                self.console_readers.sync(terminal['pid'] for terminal in terminals.values())
                 if not terminals:
                     time.sleep(1)
                     continue
 
-                # 각 터미널 확인
-                for terminal in terminals:
-                    pid = terminal['pid']
+                # 제목이 바뀐 창은 바로 읽기
+                for hwnd, terminal in terminals.items():
+                    if self.poller.changed(hwnd, terminal['title'], 'title'):
+                        self.poller.wake(hwnd)
 
-                    # 콘솔에 연결 시도
-                    if self.attach_console(pid):
-                        # 콘솔 버퍼 읽기
-                        text = self.read_console_buffer()
+                # 읽을 때가 된 터미널만 확인
+                for hwnd in self.poller.due():
+                    terminal = terminals[hwnd]
 
-                        # 콘솔 분리 및 복원
-                        self.detach_and_restore_console()
+                    # 콘솔 버퍼 읽기 (연결할 수 없는 창이면 빈 문자열)
+                    text = self.read_console_buffer(terminal['pid'])
 
-                        # 승인 패턴 확인
-                        if text and self.check_approval_pattern(text):
-                            print(f"\n📋 승인 요청 감지! (창: {terminal['title']})")
-                            print(f"   텍스트: {text[:150]}...")
-                            self.send_input_to_terminal(terminal)
-                            break
-                    else:
-                        # 연결 실패 시 콘솔 복원
-                        self.detach_and_restore_console()
+                    # 커서가 움직였거나 내용이 바뀌었으면 활동 중
+                    moved = self.poller.changed(hwnd, self.last_cursor, 'cursor')
+                    active = self.poller.changed(hwnd, text, 'text') or moved
 
-                time.sleep(1)
+                    # 승인 패턴 확인
+                    if text and self.check_approval_pattern(text):
+                        self.poller.detected(hwnd)
+                        self.poller.done(hwnd, active=True)
+                        print(f"\n📋 승인 요청 감지! (창: {terminal['title']})")
+                        print(f"   텍스트: {text[:150]}...")
+                        self.send_input_to_terminal(terminal)
+                        break
+                    self.poller.done(hwnd, active=active)
+
+                # 다음 터미널을 읽을 때까지 (최대 1초) 대기
+                self.poller.wait(timeout=1)
 
             except Exception as e:
                 print(f"❌ 모니터링 오류: {e}")
-                # 오류 시 콘솔 복원 시도
-                try:
-                    self.detach_and_restore_console()
-                except:
-                    pass
                 time.sleep(1)
 
+        # 감지 지연 (직전 검사 이후 경과 시간 = 상한)과 CPU 사용률
+        stats = self.poller.get_stats()
+        if stats['latency_p50'] is not None:
+            cpu_load = (time.process_time() - started_cpu) / max(1e-6, time.time() - started)
+            print(f"\n📊 감지 지연 p50 {stats['latency_p50']:.2f}초, p99 {stats['latency_p99']:.2f}초 | "
+                  f"검사 {stats['polls']}회 | CPU {cpu_load:.0%}")
         print("\n🛑 모니터링 종료")
 
     def start(self):
@@ -261,6 +231,7 @@ class ConsoleBufferMonitor:
         self.running = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
+        self.console_readers.close()
 
 
 def main():
@@ -270,13 +241,12 @@ def main():
     print()
     print("작동 방식:")
     print("  1. 다른 터미널 창의 프로세스를 찾습니다")
-    print("  2. Windows API로 콘솔 버퍼에 직접 연결합니다")
+    print("  2. 콘솔마다 도우미 프로세스가 한 번 연결해 둡니다")
     print("  3. 콘솔 화면 내용을 직접 읽습니다")
     print("  4. '1. Yes' 등의 승인 패턴 감지 시 '1'을 입력합니다")
     print()
     print("⚠️ 주의:")
     print("  - 다른 프로세스의 콘솔에 연결하므로 권한이 필요할 수 있습니다")
-    print("  - 모니터링 중 이 창의 출력이 일시적으로 중단될 수 있습니다")
     print()
     print("종료: Ctrl+C")
     print("=" * 70)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Console Reader - read another process's console through a helper process
+A process has at most one console, so reading a terminal's screen buffer
+in-process means FreeConsole -> AttachConsole(pid) -> read -> FreeConsole ->
+AllocConsole on every poll, with sleeps in between, and our own stdout is
+broken while detached.
+
+Instead one long-lived helper process per target console (started without a
+console of its own) attaches once and answers read requests over its
+stdin/stdout pipes. Each reply carries the cursor and only the rows that
+changed since the previous reply (the first reply is the full snapshot), so
+an idle console costs one short JSON line per poll.
+
+The helper reads the bottom rows of the visible window with one
+ReadConsoleOutputW call into a buffer it keeps between reads (ConsoleScreen),
+hashes the cells and only decodes rows into strings when the hash or the
+cursor moved. In-process readers of our own console use the same
+ConsoleScreen to skip pattern checks while the screen is unchanged.
+
+Protocol (one JSON object per line):
+    request  {"lines": 20}
+    reply    {"cursor": [x, y], "height": 20, "rows": [[index, text], ...]}
+             {"error": "...", "fatal": true}    (fatal: the helper exits)
+
+Usage:
+    python console_reader.py PID    # helper process (started by ConsoleReader)
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import zlib
+import ctypes
+
+try:
+    import win32console
+    import win32file
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    WIN32_AVAILABLE = True
+except (ImportError, AttributeError):
+    WIN32_AVAILABLE = False
+
+# Helper processes get no console (and no window): the only console they ever
+# have is the one they attach to
+_DETACHED_PROCESS = 0x00000008
+
+# CHAR_INFO cell: UTF-16 code unit + attribute word
+CELL_SIZE = 4
+# Second cell of a double-width character repeats the character (attribute high byte)
+_TRAILING_BYTE = 0x02
+_TRAILING_FLAGS = bytes(1 if value & _TRAILING_BYTE else 0 for value in range(256))
+
+
+class _COORD(ctypes.Structure):
+    _fields_ = [('X', ctypes.c_short), ('Y', ctypes.c_short)]
+
+
+class _SMALL_RECT(ctypes.Structure):
+    _fields_ = [('Left', ctypes.c_short), ('Top', ctypes.c_short),
+                ('Right', ctypes.c_short), ('Bottom', ctypes.c_short)]
+
+
+class ConsoleScreen:
+    """Cells of a console region, reused between reads
+
+    Rows are decoded to strings only when asked for, and at most once per
+    change of the cells.
+    """
+
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self.cells = bytearray()
+        self.cursor = None
+        self.changed = False  # Whether the last update() saw new cells or cursor
+        self._view = None  # ctypes array over cells (ReadConsoleOutputW target)
+        self._state = None  # (crc, cursor, width, height) of the last update
+        self._lines = {}  # {row: decoded text} since the last change
+
+    def reserve(self, width, height):
+        """Buffer for width x height cells - reallocated only on resize"""
+        if (width, height) != (self.width, self.height) or self._view is None:
+            self.width, self.height = width, height
+            self.cells = bytearray(width * height * CELL_SIZE)
+            self._view = (ctypes.c_char * len(self.cells)).from_buffer(self.cells)
+        return self._view
+
+    def update(self, cursor):
+        """Cells were (re)filled - True if they or the cursor changed"""
+        state = (zlib.crc32(self.cells), cursor, self.width, self.height)
+        self.changed = state != self._state
+        if self.changed:
+            self._state = state
+            self.cursor = cursor
+            self._lines.clear()
+        return self.changed
+
+    def fill(self, rows, cursor=(0, 0), width=None):
+        """Load rows of text (replays, tests) - same as a read of that screen"""
+        width = width or max((len(row) for row in rows), default=0)
+        self.reserve(width, len(rows))
+        for y, row in enumerate(rows):
+            for x, char in enumerate(row[:width].ljust(width)):
+                offset = (y * width + x) * CELL_SIZE
+                self.cells[offset:offset + CELL_SIZE] = char.encode('utf-16-le') + b'\x07\x00'
+        return self.update(cursor)
+
+    def line(self, row):
+        """Text of one row (trailing blanks stripped)"""
+        text = self._lines.get(row)
+        if text is None:
+            start = row * self.width * CELL_SIZE
+            cells = self.cells[start:start + self.width * CELL_SIZE]
+            units = bytearray(len(cells) // 2)
+            units[0::2] = cells[0::CELL_SIZE]
+            units[1::2] = cells[1::CELL_SIZE]
+            trailing = cells[3::CELL_SIZE].translate(_TRAILING_FLAGS)
+            if 1 in trailing:
+                # Drop the repeated half of double-width (CJK) characters
+                units = b''.join(units[2 * i:2 * i + 2] for i, flag in enumerate(trailing) if not flag)
+            text = self._lines[row] = bytes(units).decode('utf-16-le', 'replace').rstrip()
+        return text
+
+    def rows(self, count=None):
+        """Bottom count rows (default: all)"""
+        start = 0 if count is None else max(0, self.height - count)
+        return [self.line(row) for row in range(start, self.height)]
+
+    def text(self, count=None):
+        """Bottom count rows, stripped and newline-joined"""
+        return '\n'.join(row.strip() for row in self.rows(count))
+
+
+def read_console_region(console, screen, lines=None, to_cursor=False):
+    """Read the bottom rows of a console into screen with one ReadConsoleOutputW call
+
+    Args:
+        console: win32console screen buffer
+        screen: ConsoleScreen to fill (its buffer is reused)
+        lines: Rows to read (default: the whole region)
+        to_cursor: Region ends at the cursor row and spans the buffer width
+            (our own console, where the cursor follows the output) instead of
+            the visible window
+    Returns:
+        True if the cells or the cursor changed since the last read into screen
+    """
+    csbi = console.GetConsoleScreenBufferInfo()
+    cursor = csbi['CursorPosition']
+    if to_cursor:
+        left, top, right, bottom = 0, 0, csbi['Size'].X - 1, cursor.Y
+    else:
+        window = csbi['Window']
+        left, top, right, bottom = window.Left, window.Top, window.Right, window.Bottom
+    if lines is not None:
+        top = max(top, bottom - lines + 1)
+    width, height = right - left + 1, bottom - top + 1
+    cells = screen.reserve(width, height)
+    region = _SMALL_RECT(left, top, right, bottom)
+    if not _kernel32.ReadConsoleOutputW(ctypes.c_void_p(int(console)), cells, _COORD(width, height),
+                                        _COORD(0, 0), ctypes.byref(region)):
+        raise ctypes.WinError(ctypes.get_last_error())
+    return screen.update((cursor.X, cursor.Y))
+
+
+def diff_rows(previous, rows):
+    """[[index, text]] for rows that differ from previous"""
+    return [[index, text] for index, text in enumerate(rows)
+            if index >= len(previous) or previous[index] != text]
+
+
+def apply_diff(rows, reply):
+    """Rows after applying one reply to the previous rows"""
+    updated = rows[:reply['height']]
+    updated.extend([''] * (reply['height'] - len(updated)))
+    for index, text in reply['rows']:
+        updated[index] = text
+    return updated
+
+
+def serve(read_screen, stdin=None, stdout=None):
+    """Answer read requests until stdin closes
+
+    Args:
+        read_screen: read_screen(lines) -> ((x, y) cursor, [row text]) for the
+            bottom `lines` rows of the visible window
+    """
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    previous = []
+    for line in stdin:
+        request = json.loads(line)
+        try:
+            cursor, rows = read_screen(request.get('lines', 20))
+        except Exception as e:
+            reply = {'error': str(e)}
+        else:
+            rows = [row.rstrip() for row in rows]
+            reply = {'cursor': list(cursor), 'height': len(rows), 'rows': diff_rows(previous, rows)}
+            previous = rows
+        stdout.write(json.dumps(reply).encode('utf-8') + b'\n')
+        stdout.flush()
+
+
+def attach_console(pid):
+    """Attach this (helper) process to pid's console
+
+    Returns:
+        read_screen function for serve()
+    """
+    kernel32 = ctypes.windll.kernel32
+    kernel32.FreeConsole()  # No-op when started detached
+    if not kernel32.AttachConsole(pid):
+        raise OSError(f"AttachConsole({pid}) failed: {ctypes.GetLastError()}")
+
+    screen = ConsoleScreen()
+    rows = []
+
+    def read_screen(lines):
+        nonlocal rows
+        # stdout is the pipe, so open the console's active screen buffer by name -
+        # again on every read, since full-screen apps switch to an alternate buffer
+        handle = win32file.CreateFile(
+            'CONOUT$', win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+            win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE, None, win32file.OPEN_EXISTING, 0, None
+        )
+        try:
+            if read_console_region(win32console.PyConsoleScreenBufferType(handle), screen, lines):
+                rows = screen.rows()  # Unchanged: same row objects, nothing to diff
+            return screen.cursor, rows
+        finally:
+            handle.Close()
+
+    return read_screen
+
+
+class ConsoleReader:
+    """Client end of one helper process attached to a console"""
+
+    def __init__(self, pid, lines=20, timeout=1.0, command=None):
+        """
+        Args:
+            pid: Process whose console to read
+            lines: Rows to read from the bottom of the visible window
+            timeout: Seconds to wait for a reply before giving up on the helper
+            command: Helper command line (default: this module with pid)
+        """
+        self.pid = pid
+        self.lines = lines
+        self.timeout = timeout
+        self.rows = []
+        self.cursor = None
+        self.changed = False  # Whether the last read() saw any row change
+        self.error = None
+        self._replies = queue.Queue()
+        self.process = subprocess.Popen(
+            command or [sys.executable, os.path.abspath(__file__), str(pid)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            creationflags=_DETACHED_PROCESS if sys.platform == 'win32' else 0,
+        )
+        # Replies are read on a thread so a hung helper costs timeout, not the monitor
+        threading.Thread(target=self._pump, args=(self.process.stdout,), daemon=True).start()
+
+    def _pump(self, stdout):
+        for line in stdout:
+            self._replies.put(line)
+        self._replies.put(None)
+
+    @property
+    def closed(self):
+        return self.process.poll() is not None or self.process.stdin.closed
+
+    def read(self):
+        """Text of the bottom rows (stripped, newline-joined), or None on failure"""
+        if self.closed:
+            return None
+        try:
+            self.process.stdin.write(json.dumps({'lines': self.lines}).encode('utf-8') + b'\n')
+            self.process.stdin.flush()
+            line = self._replies.get(timeout=self.timeout)
+        except (OSError, ValueError, queue.Empty):
+            line = None
+        if line is None:
+            self.close()  # Exited, or hung - a late reply would answer the next request
+            return None
+
+        reply = json.loads(line)
+        if 'error' in reply:
+            self.error = reply['error']
+            if reply.get('fatal'):
+                self.close()
+            return None
+        self.changed = bool(reply['rows']) or len(self.rows) != reply['height']
+        self.rows = apply_diff(self.rows, reply)
+        self.cursor = tuple(reply['cursor'])
+        return '\n'.join(row.strip() for row in self.rows)
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=0.5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class ConsoleReaderPool:
+    """One ConsoleReader per console pid - started on first read, stopped when
+    the pid is no longer polled"""
+
+    def __init__(self, retry_after=30.0, **kwargs):
+        """
+        Args:
+            retry_after: Seconds before starting another helper for a pid whose
+                helper failed (GUI processes have no console to attach to)
+            kwargs: ConsoleReader arguments
+        """
+        self.retry_after = retry_after
+        self.kwargs = kwargs
+        self.readers = {}  # {pid: ConsoleReader}
+        self._failed = {}  # {pid: time of the last failure}
+
+    def get(self, pid, now=None):
+        """Live reader for pid (None while a failure is recent)"""
+        reader = self.readers.get(pid)
+        if reader is not None and not reader.closed:
+            return reader
+        now = time.monotonic() if now is None else now
+        if pid is None or now - self._failed.get(pid, -self.retry_after) < self.retry_after:
+            return None
+        try:
+            reader = self.readers[pid] = ConsoleReader(pid, **self.kwargs)
+        except OSError:
+            self._failed[pid] = now
+            return None
+        return reader
+
+    def read(self, pid, now=None):
+        """pid's console text, or None (no console, helper failed)"""
+        reader = self.get(pid, now)
+        if reader is None:
+            return None
+        text = reader.read()
+        if text is None and reader.closed:
+            del self.readers[pid]
+            self._failed[pid] = time.monotonic() if now is None else now
+        return text
+
+    def sync(self, pids):
+        """Stop helpers for pids not in pids"""
+        live = set(pids)
+        for pid in [pid for pid in self.readers if pid not in live]:
+            self.readers.pop(pid).close()
+        for pid in [pid for pid in self._failed if pid not in live]:
+            del self._failed[pid]
+
+    def close(self):
+        self.sync(())
+
+
+def main():
+    if len(sys.argv) != 2 or not sys.argv[1].isdigit():
+        print(__doc__)
+        return 2
+    try:
+        read_screen = attach_console(int(sys.argv[1]))
+    except OSError as e:
+        sys.stdout.buffer.write(json.dumps({'error': str(e), 'fatal': True}).encode('utf-8') + b'\n')
+        sys.stdout.buffer.flush()
+        return 1
+    serve(read_screen)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
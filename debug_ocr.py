@@ -6,9 +6,7 @@ import win32gui
 import win32ui
 import win32con
 from PIL import Image
-import pytesseract
-
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+import ocr_engine
 
 def find_question_window():
     """Find Question window"""
@@ -77,9 +75,9 @@ else:
 
     if img:
         print(f"Screenshot captured: {img.size}")
-        print(f"\nRunning OCR...")
+        print(f"\nRunning OCR ({ocr_engine.get_engine().name})...")
 
-        text = pytesseract.image_to_string(img, lang='eng')
+        text = ocr_engine.image_to_string(img, lang='eng')
 
         print(f"\n{'='*70}")
         print("OCR RESULT:")
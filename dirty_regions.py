@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Dirty Regions - tile-level change detection so only changed text lines are OCR'd
+Compares each frame to the window's previous frame per tile (vectorized NumPy),
+expands changed tiles to full text lines, and merges fresh OCR text for those
+lines with cached text for the unchanged ones. When the OCR callable returns
+layout (ocr_engine.OCRResult) the line boxes are kept per strip too.
+"""
+import threading
+
+import numpy as np
+
+
+def dirty_tile_mask(prev, cur, tile=16, threshold=24):
+    """Boolean (rows, cols) mask of tiles whose max pixel difference exceeds threshold
+
+    Args:
+        prev, cur: 2D uint8 grayscale arrays of the same shape
+        tile: Tile edge in pixels
+        threshold: Minimum absolute pixel difference that counts as a change
+    """
+    # uint8 absolute difference without widening to int16
+    diff = np.maximum(prev, cur)
+    diff -= np.minimum(prev, cur)
+
+    height, width = diff.shape
+    pad_h, pad_w = -height % tile, -width % tile
+    if pad_h or pad_w:
+        diff = np.pad(diff, ((0, pad_h), (0, pad_w)))
+
+    rows, cols = diff.shape[0] // tile, diff.shape[1] // tile
+    return diff.reshape(rows, tile, cols, tile).max(axis=(1, 3)) > threshold
+
+
+def changed_boxes(mask, tile, shape):
+    """Bounding boxes (x0, y0, x1, y1) of dirty tiles, merged along each tile row"""
+    height, width = shape
+    boxes = []
+    for row, col_flags in enumerate(mask):
+        cols = np.flatnonzero(col_flags)
+        if cols.size == 0:
+            continue
+
+        # Split into runs of adjacent dirty tiles
+        breaks = np.flatnonzero(np.diff(cols) > 1)
+        starts = np.concatenate(([cols[0]], cols[breaks + 1]))
+        ends = np.concatenate((cols[breaks], [cols[-1]]))
+        y0 = row * tile
+        y1 = min(height, y0 + tile)
+        for start, end in zip(starts, ends):
+            boxes.append((int(start * tile), y0, int(min(width, (end + 1) * tile)), y1))
+    return boxes
+
+
+def blank_rows(gray, tolerance=16):
+    """Rows with (almost) uniform background - safe places to cut between text lines"""
+    return (gray.max(axis=1).astype(np.int16) - gray.min(axis=1)) <= tolerance
+
+
+def _text_and_lines(result, y0):
+    """(text, lines shifted to image coordinates) of an OCR callable's return value"""
+    if isinstance(result, str):
+        return result, []
+    return result.text, [line.shifted(y0) for line in result.lines]
+
+
+def expand_to_text_lines(boxes, gray, tolerance=16):
+    """Turn dirty boxes into full-width bands that do not cut through a text line
+
+    Returns sorted, non-overlapping (y0, y1) bands.
+    """
+    if not boxes:
+        return []
+
+    height = gray.shape[0]
+    blank = blank_rows(gray, tolerance)
+
+    bands = []
+    for _, y0, _, y1 in sorted(boxes, key=lambda b: b[1]):
+        # Grow up/down until we reach a blank separator row
+        while y0 > 0 and not blank[y0 - 1]:
+            y0 -= 1
+        while y1 < height and not blank[y1]:
+            y1 += 1
+
+        if bands and y0 <= bands[-1][1]:
+            bands[-1] = (bands[-1][0], max(bands[-1][1], y1))
+        else:
+            bands.append((y0, y1))
+    return bands
+
+
+class WindowTextRegions:
+    """Previous frame and per-strip OCR text of one window
+
+    Strips partition the image height into (y0, y1, text, lines). Clean strips
+    keep their cached text; strips touched by a dirty band are split at the
+    band edges and only the pieces are re-OCR'd.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.prev = None
+        self.strips = []
+
+    def extract(self, img, ocr):
+        """OCR only the changed text lines of img
+
+        Args:
+            img: Grayscale PIL Image (already preprocessed/cropped for OCR)
+            ocr: Callable(PIL Image) -> text or OCRResult (keeps line layout)
+        """
+        gray = np.asarray(img)
+        height = gray.shape[0]
+        tracker = self.tracker
+
+        if self.prev is None or self.prev.shape != gray.shape:
+            return self._full(img, gray, ocr)
+
+        mask = dirty_tile_mask(self.prev, gray, tracker.tile, tracker.threshold)
+        if not mask.any():
+            tracker.count('unchanged', 0, height)
+            self.prev = gray
+            return self.text
+
+        bands = expand_to_text_lines(changed_boxes(mask, tracker.tile, gray.shape), gray, tracker.blank_tolerance)
+        dirty_rows = sum(y1 - y0 for y0, y1 in bands)
+        if dirty_rows > height * tracker.max_dirty_fraction:
+            return self._full(img, gray, ocr)
+
+        # Keep clean strip edges, cut at band edges, then re-OCR pieces that are
+        # dirty or lost their text
+        cuts = {0, height}
+        cuts.update(y for band in bands for y in band)
+        cuts.update(
+            y for s0, s1, _, _ in self.strips for y in (s0, s1)
+            if not any(b0 < y < b1 for b0, b1 in bands)
+        )
+        cuts = sorted(cuts)
+        new_strips = []
+        ocr_rows = 0
+        for y0, y1 in zip(cuts, cuts[1:]):
+            cached = self._cached_strip(y0, y1)
+            dirty = any(b0 < y1 and y0 < b1 for b0, b1 in bands)
+            if dirty or cached is None:
+                if blank_rows(gray[y0:y1], tracker.blank_tolerance).all():
+                    text, lines = '', []  # nothing but background
+                else:
+                    text, lines = _text_and_lines(ocr(img.crop((0, y0, img.width, y1))), y0)
+                    ocr_rows += y1 - y0
+            else:
+                text, lines = cached
+            new_strips.append((y0, y1, text, lines))
+
+        tracker.count('partial', ocr_rows, height)
+        self.strips = new_strips
+        self.prev = gray
+        return self.text
+
+    def _full(self, img, gray, ocr):
+        text, lines = _text_and_lines(ocr(img), 0)
+        self.tracker.count('full', gray.shape[0], gray.shape[0])
+        self.strips = [(0, gray.shape[0], text, lines)]
+        self.prev = gray
+        return self.text
+
+    def _cached_strip(self, y0, y1):
+        """(text, lines) of the cached strip that exactly covers y0..y1, else None"""
+        for s0, s1, text, lines in self.strips:
+            if s0 == y0 and s1 == y1:
+                return text, lines
+            if s0 <= y0 and y1 <= s1 and not text.strip():
+                return text, []  # blank strip - any piece is blank too
+        return None
+
+    @property
+    def text(self):
+        """Merged text of all strips, top to bottom"""
+        return '\n'.join(text.rstrip('\n') for _, _, text, _ in self.strips if text.strip())
+
+    @property
+    def lines(self):
+        """Merged OCR lines of all strips in image coordinates (empty for text-only OCR)"""
+        return [line for _, _, _, lines in self.strips for line in lines]
+
+
+class DirtyRegionTracker:
+    """Per-window dirty-region state plus counters"""
+
+    def __init__(self, tile=16, threshold=24, blank_tolerance=16, max_dirty_fraction=0.6):
+        self.tile = tile
+        self.threshold = threshold
+        self.blank_tolerance = blank_tolerance
+        self.max_dirty_fraction = max_dirty_fraction
+        self._windows = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.passes = {'full': 0, 'partial': 0, 'unchanged': 0}
+        self.ocr_rows = 0
+        self.total_rows = 0
+
+    def for_window(self, hwnd):
+        """Dirty-region state for a window (created on first use)"""
+        with self._lock:
+            state = self._windows.get(hwnd)
+            if state is None:
+                state = self._windows[hwnd] = WindowTextRegions(self)
+            return state
+
+    def evict_missing(self, live_hwnds):
+        """Drop state for windows that no longer exist"""
+        live = set(live_hwnds)
+        with self._lock:
+            for hwnd in [h for h in self._windows if h not in live]:
+                del self._windows[hwnd]
+
+    def count(self, kind, ocr_rows, total_rows):
+        with self._lock:
+            self.passes[kind] += 1
+            self.ocr_rows += ocr_rows
+            self.total_rows += total_rows
+
+    def get_stats(self):
+        """Counters - ocr_fraction is the share of rows actually sent to OCR"""
+        return {
+            'windows': len(self._windows),
+            'full': self.passes['full'],
+            'partial': self.passes['partial'],
+            'unchanged': self.passes['unchanged'],
+            'ocr_fraction': self.ocr_rows / self.total_rows if self.total_rows else 0.0,
+        }
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Frame Fingerprint Cache - skip OCR for windows whose prompt region is unchanged
+Keeps a cheap downsampled hash of each window's prompt region together with
+the last OCR text and approval verdict
+"""
+import hashlib
+import threading
+
+from PIL import Image
+
+
+def frame_fingerprint(img, region=(0.0, 0.4, 1.0, 1.0), hash_size=(48, 24), levels_shift=3):
+    """Cheap perceptual hash of the prompt region of a window capture
+
+    Args:
+        img: PIL Image or raw BGRX Frame of the window
+        region: Relative (left, top, right, bottom) of the prompt region
+        hash_size: Size the region is downsampled to before hashing
+        levels_shift: Drop this many low bits per pixel to ignore AA noise
+    """
+    if hasattr(img, 'to_image'):
+        # Raw BGRX frame: map the buffer without decoding. Channels come out
+        # swapped, which only changes the hash value, not its stability
+        img = Image.frombuffer('RGBX', img.size, img.data, 'raw', 'RGBX', img.stride, 1)
+
+    width, height = img.size
+    left, top, right, bottom = region
+    box = (int(width * left), int(height * top), int(width * right), int(height * bottom))
+
+    # Downsample in RGB first - converting the full frame to L would cost more
+    small = img.crop(box).resize(hash_size, Image.BOX).convert('L')
+    small = small.point(lambda value: value >> levels_shift)
+    return hashlib.blake2b(small.tobytes(), digest_size=16).hexdigest()
+
+
+class FrameCacheEntry:
+    """Last OCR result for one window"""
+
+    __slots__ = ('fingerprint', 'text', 'verdict')
+
+    def __init__(self, fingerprint, text, verdict):
+        self.fingerprint = fingerprint
+        self.text = text
+        self.verdict = verdict
+
+
+class FrameFingerprintCache:
+    """Per-window cache of {hwnd: fingerprint + last OCR text + verdict}"""
+
+    def __init__(self, region=(0.0, 0.4, 1.0, 1.0), hash_size=(48, 24)):
+        self.region = region
+        self.hash_size = hash_size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def fingerprint(self, img):
+        """Fingerprint of the prompt region of img"""
+        return frame_fingerprint(img, self.region, self.hash_size)
+
+    def get(self, hwnd, fingerprint):
+        """Return cached entry if the window's frame is unchanged, else None"""
+        with self._lock:
+            entry = self._entries.get(hwnd)
+            if entry is not None and entry.fingerprint == fingerprint:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def store(self, hwnd, fingerprint, text, verdict):
+        """Remember the OCR result for this frame"""
+        with self._lock:
+            self._entries[hwnd] = FrameCacheEntry(fingerprint, text, verdict)
+
+    def invalidate(self, hwnd):
+        """Forget a window (e.g. after sending a key to it)"""
+        with self._lock:
+            self._entries.pop(hwnd, None)
+
+    def evict_missing(self, live_hwnds):
+        """Drop entries for windows that no longer exist"""
+        live = set(live_hwnds)
+        with self._lock:
+            gone = [hwnd for hwnd in self._entries if hwnd not in live]
+            for hwnd in gone:
+                del self._entries[hwnd]
+            self.evictions += len(gone)
+        return len(gone)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self):
+        """Cache counters"""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
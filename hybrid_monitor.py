@@ -7,27 +7,32 @@ import sys
 import time
 import threading
 import win32gui
-import win32ui
 import win32con
 import win32api
 import win32process
 import win32console
 import ctypes
-from PIL import Image
+import os
 import io
+from window_capture import get_window_capture
+from roi_cache import ROICache, window_key
+from window_registry import WindowRegistry, WinEventSource
+from keyword_matcher import KeywordMatcher
+from adaptive_poller import AdaptivePoller
+from frame_cache import frame_fingerprint
+from console_reader import ConsoleReaderPool
 
 # UTF-8 설정
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-# OCR 시도 (없어도 작동)
+# OCR 시도 (없어도 작동) - 엔진은 HybridMonitor 생성 시 고름 (ocr_engine 참고)
 try:
-    import pytesseract
+    import ocr_engine
     OCR_AVAILABLE = True
-except:
+except ImportError:
     OCR_AVAILABLE = False
-    print("⚠️ pytesseract 없음 - OCR 기능 비활성화 (콘솔 전용 모드)")
 
 
 class HybridMonitor:
@@ -37,6 +42,19 @@ class HybridMonitor:
         self.running = False
         self.monitor_thread = None
         self.approval_count = 0
+
+        # OCR 엔진 - import 시점이 아니라 여기서 로드 (Tesseract 라이브러리/워커 프로세스)
+        self.ocr_engine = None
+        if OCR_AVAILABLE:
+            try:
+                self.ocr_engine = ocr_engine.get_engine()
+            except Exception:
+                pass
+        if self.ocr_engine is None:
+            print("⚠️ OCR 엔진 없음 - OCR 기능 비활성화 (콘솔 전용 모드)")
+
+        # ocr_auto_approver가 학습한 프롬프트 ROI (없으면 하단 40%)
+        self.roi_cache = ROICache(path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'roi_cache.json'))
         self.current_hwnd = None
 
         # 승인 패턴
@@ -58,6 +76,10 @@ class HybridMonitor:
             'Python', 'CataPro'
         ]
 
+        # 패턴 목록은 한 번만 컴파일 (대상 창 패턴은 대소문자 구분)
+        self.approval_matcher = KeywordMatcher(self.approval_patterns)
+        self.target_matcher = KeywordMatcher(self.target_patterns, ignore_case=False)
+
         # 중복 방지
         self.last_input_time = 0
         self.min_input_interval = 2
@@ -68,131 +90,55 @@ class HybridMonitor:
         except:
             self.current_hwnd = None
 
-    def find_all_target_windows(self):
-        """모든 대상 창 찾기"""
-        def callback(hwnd, windows):
-            if win32gui.IsWindowVisible(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                if title and hwnd != self.current_hwnd:
-                    if any(p in title for p in self.target_patterns):
-                        _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                        windows.append({
-                            'hwnd': hwnd,
-                            'title': title,
-                            'pid': pid
-                        })
-            return True
+        # 창별 검사 간격 - 내용이 바뀌면 0.5초, 변화가 없으면 8초까지 두 배씩 늘림
+        # (창이 생기거나 제목이 바뀌면 바로 검사)
+        self.poller = AdaptivePoller(min_interval=0.5, max_interval=8.0)
+
+        # 콘솔 버퍼는 대상 콘솔마다 한 번 연결해 두는 도우미 프로세스로 읽음
+        # (FreeConsole/AttachConsole 반복 없음 - 이 창의 출력이 끊기지 않음)
+        self.console_readers = ConsoleReaderPool(lines=15)
+
+        # 창 목록 - 이벤트로 갱신, 대상 여부는 창 제목이 바뀔 때만 다시 판정
+        self.window_registry = WindowRegistry(
+            WinEventSource(wakeup=self.poller.wakeup), self.classify_window, min_size=(0, 0), skip_parked=False
+        )
 
-        windows = []
+    def classify_window(self, info):
+        """대상 창이 아니면 이유, 대상이면 None"""
+        if info.hwnd == self.current_hwnd:
+            return '현재 콘솔'
+        if not self.target_matcher.match_ids(info.title):
+            return '대상 패턴 없음'
+        return None
+
+    def find_all_target_windows(self):
+        """모든 대상 창 찾기 ([WindowInfo], 레지스트리와 공유 - 수정 금지)"""
         try:
-            win32gui.EnumWindows(callback, windows)
-        except:
+            self.window_registry.refresh()
+        except Exception:
             pass
-        return windows
+        return self.window_registry.targets()
 
     def try_read_console_buffer(self, pid):
-        """콘솔 버퍼 읽기 시도 (콘솔 앱만)"""
+        """콘솔 버퍼 읽기 시도 (콘솔 앱만) - 콘솔이 없거나 실패하면 None"""
         try:
-            kernel32 = ctypes.windll.kernel32
-
-            # 현재 콘솔 분리
-            kernel32.FreeConsole()
-            time.sleep(0.05)
-
-            # 대상 콘솔 연결
-            if not kernel32.AttachConsole(pid):
-                # 연결 실패 - 콘솔 복원
-                kernel32.AllocConsole()
-                return None
-
-            # 콘솔 버퍼 읽기
-            try:
-                console_handle = win32console.GetStdHandle(win32console.STD_OUTPUT_HANDLE)
-                csbi = console_handle.GetConsoleScreenBufferInfo()
-
-                window = csbi['Window']
-                width = window.Right - window.Left + 1
-
-                # 마지막 15줄만
-                lines_to_read = min(15, window.Bottom - window.Top + 1)
-                start_y = max(0, window.Bottom - lines_to_read + 1)
-
-                buffer_text = []
-                for y in range(start_y, window.Bottom + 1):
-                    try:
-                        coord = win32console.PyCOORDType(window.Left, y)
-                        text = console_handle.ReadConsoleOutputCharacter(width, coord)
-                        buffer_text.append(text.strip())
-                    except:
-                        pass
-
-                result = '\n'.join(buffer_text)
-
-                # 콘솔 복원
-                kernel32.FreeConsole()
-                time.sleep(0.05)
-                kernel32.AllocConsole()
-
-                return result
-
-            except Exception as e:
-                # 실패 시 콘솔 복원
-                kernel32.FreeConsole()
-                kernel32.AllocConsole()
-                return None
-
-        except:
+            return self.console_readers.read(pid)
+        except Exception:
             return None
 
     def capture_window_screenshot(self, hwnd):
-        """창 스크린샷 캡처"""
-        try:
-            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
-            width = right - left
-            height = bottom - top
-
-            if width <= 0 or height <= 0:
-                return None
-
-            hwndDC = win32gui.GetWindowDC(hwnd)
-            mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-            saveDC = mfcDC.CreateCompatibleDC()
-
-            saveBitMap = win32ui.CreateBitmap()
-            saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-            saveDC.SelectObject(saveBitMap)
-
-            saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
-
-            bmpinfo = saveBitMap.GetInfo()
-            bmpstr = saveBitMap.GetBitmapBits(True)
-            img = Image.frombuffer(
-                'RGB',
-                (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                bmpstr, 'raw', 'BGRX', 0, 1
-            )
-
-            win32gui.DeleteObject(saveBitMap.GetHandle())
-            saveDC.DeleteDC()
-            mfcDC.DeleteDC()
-            win32gui.ReleaseDC(hwnd, hwndDC)
-
-            return img
-
-        except Exception as e:
-            return None
+        """창 스크린샷 캡처 (공유 캡처 풀 사용) - 학습된 ROI 또는 하단 40% 영역만 (최근 출력)"""
+        region = self.roi_cache.capture_region(window_key(hwnd), (0.0, 0.6, 1.0, 1.0), window=hwnd)
+        return get_window_capture().capture(hwnd, region=region)
 
     def extract_text_from_image(self, img):
         """OCR로 텍스트 추출"""
-        if not OCR_AVAILABLE:
+        if self.ocr_engine is None:
             return ""
 
         try:
-            width, height = img.size
-            # 하단 40% 영역만 (최근 출력)
-            bottom_region = img.crop((0, int(height * 0.6), width, height))
-
-            text = pytesseract.image_to_string(bottom_region, lang='eng')
+            # 캡처 단계에서 이미 하단 40% 영역만 가져옴
+            text = self.ocr_engine.image_to_string(img, lang='eng')
             return text
 
         except Exception as e:
@@ -202,20 +148,13 @@ class HybridMonitor:
         """승인 패턴 확인"""
         if not text:
             return False
-
-        text_lower = text.lower()
-
-        for pattern in self.approval_patterns:
-            if pattern.lower() in text_lower:
-                return True
-
-        return False
+        return bool(self.approval_matcher.match_ids(text))
 
     def send_input_to_window(self, window):
         """창에 '1' 입력"""
         try:
-            hwnd = window['hwnd']
-            title = window['title']
+            hwnd = window.hwnd
+            title = window.title
 
             print(f"\n📤 '{title}'에 '1' 입력 중...")
 
@@ -254,55 +193,72 @@ class HybridMonitor:
         """메인 모니터링 루프"""
         print("\n🔍 하이브리드 모니터링 시작...")
         print("   - 콘솔: 버퍼 직접 읽기")
-        if OCR_AVAILABLE:
+        if self.ocr_engine is not None:
             print("   - GUI: 화면 캡처 + OCR")
         else:
-            print("   - GUI: 비활성화 (pytesseract 없음)")
+            print("   - GUI: 비활성화 (OCR 엔진 없음)")
+
+        started, started_cpu = time.time(), time.process_time()
 
         while self.running:
             try:
                 # 중복 방지
-                if time.time() - self.last_input_time < self.min_input_interval:
-                    time.sleep(0.5)
+                remaining = self.min_input_interval - (time.time() - self.last_input_time)
+                if remaining > 0:
+                    time.sleep(remaining)
                     continue
 
                 # 모든 대상 창 찾기
-                windows = self.find_all_target_windows()
-
+                windows = {window.hwnd: window for window in self.find_all_target_windows()}
+                self.poller.sync(windows)
+                self.console_readers.sync(window.pid for window in windows.values())
                 if not windows:
-                    time.sleep(1)
+                    self.poller.wait(timeout=1)
                     continue
 
-                # 각 창 확인
-                for window in windows:
-                    text = None
+                # 제목이 바뀐 창은 바로 검사
+                for hwnd, window in windows.items():
+                    if self.poller.changed(hwnd, window.title, 'title'):
+                        self.poller.wake(hwnd)
+
+                # 검사할 때가 된 창만 확인
+                for hwnd in self.poller.due():
+                    window = windows[hwnd]
 
                     # 1. 먼저 콘솔 버퍼 읽기 시도 (빠름)
-                    text = self.try_read_console_buffer(window['pid'])
-
-                    if text:
-                        # 콘솔 버퍼 읽기 성공
-                        if self.check_approval_pattern(text):
-                            print(f"\n📋 [콘솔] 승인 요청 감지! ({window['title']})")
-                            self.send_input_to_window(window)
-                            break
-
-                    # 2. 콘솔 버퍼 실패 시 화면 캡처 + OCR (느림)
-                    elif OCR_AVAILABLE:
-                        img = self.capture_window_screenshot(window['hwnd'])
-                        if img:
+                    text = self.try_read_console_buffer(window.pid)
+                    source = '콘솔'
+                    active = bool(text) and self.poller.changed(hwnd, text, 'console')
+
+                    # 2. 콘솔 버퍼 실패 시 화면 캡처 + OCR (느림) - 같은 화면이면 OCR 생략
+                    if not text and self.ocr_engine is not None:
+                        img = self.capture_window_screenshot(hwnd)
+                        source = 'OCR'
+                        active = bool(img) and self.poller.changed(hwnd, frame_fingerprint(img, region=(0.0, 0.0, 1.0, 1.0)))
+                        if active:
                             text = self.extract_text_from_image(img)
-                            if self.check_approval_pattern(text):
-                                print(f"\n📋 [OCR] 승인 요청 감지! ({window['title']})")
-                                self.send_input_to_window(window)
-                                break
 
-                time.sleep(1)
+                    if text and self.check_approval_pattern(text):
+                        self.poller.detected(hwnd)
+                        self.poller.done(hwnd, active=True)
+                        print(f"\n📋 [{source}] 승인 요청 감지! ({window.title})")
+                        self.send_input_to_window(window)
+                        break
+                    self.poller.done(hwnd, active=active)
+
+                # 다음 창을 검사할 때까지 (최대 1초) 대기 - 창 이벤트가 오면 바로 깨어남
+                self.poller.wait(timeout=1)
 
             except Exception as e:
                 print(f"❌ 모니터링 오류: {e}")
                 time.sleep(1)
 
+        # 감지 지연 (직전 검사 이후 경과 시간 = 상한)과 CPU 사용률
+        stats = self.poller.get_stats()
+        if stats['latency_p50'] is not None:
+            cpu_load = (time.process_time() - started_cpu) / max(1e-6, time.time() - started)
+            print(f"\n📊 감지 지연 p50 {stats['latency_p50']:.2f}초, p99 {stats['latency_p99']:.2f}초 | "
+                  f"검사 {stats['polls']}회 | CPU {cpu_load:.0%}")
         print("\n🛑 모니터링 종료")
 
     def start(self):
@@ -322,6 +278,8 @@ class HybridMonitor:
         self.running = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
+        self.window_registry.close()
+        self.console_readers.close()
 
 
 def main():
@@ -350,7 +308,7 @@ def main():
         if windows:
             print(f"\n📋 발견된 창 ({len(windows)}개):")
             for i, win in enumerate(windows, 1):
-                print(f"   {i}. {win['title']} (PID: {win['pid']})")
+                print(f"   {i}. {win.title} (PID: {win.pid})")
         else:
             print("\n⚠️ 대상 창을 찾을 수 없습니다")
 
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher - keyword lists compiled once into a pruned scan plan
+Title filters and prompt checks used to run one substring scan per keyword
+(`any(p in text for p in patterns)`) and then scan again to report which
+keyword hit. A KeywordMatcher is built once from the keyword lists and
+returns the IDs of every contained keyword from one walk over its plan.
+
+The plan orders the distinct keywords shortest first. A keyword is only
+looked for when the longest other keyword it contains was found: "to
+proceed" and "proceed with" are skipped when "proceed" is absent, and
+"would you like" when "would you" is. On non-prompt text (the common case)
+about half the scans never run. Each remaining scan is CPython's C substring
+search: a single alternation regex and a pure-Python Aho-Corasick automaton
+both measured slower than that on OCR-sized texts.
+
+Usage:
+    python keyword_matcher.py [--cache ocr_cache.json]    # microbenchmark
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+class KeywordMatcher:
+    """Compiled substring search for a set of keywords, optionally grouped"""
+
+    def __init__(self, keywords, ignore_case=True):
+        """
+        Args:
+            keywords: Iterable of strings, or {group: iterable of strings}
+            ignore_case: Match case-insensitively (keywords and text lower-cased)
+        """
+        if not isinstance(keywords, dict):
+            keywords = {None: keywords}
+        self.ignore_case = ignore_case
+
+        # Pattern IDs are positions in these lists (definition order)
+        self.keywords = []
+        self.groups = []
+        ids_by_text = {}
+        for group, items in keywords.items():
+            for keyword in items:
+                text = keyword.lower() if ignore_case else keyword
+                if not text:
+                    continue
+                ids_by_text.setdefault(text, []).append(len(self.keywords))
+                self.keywords.append(keyword)
+                self.groups.append(group)
+
+        # Plan: (keyword text, plan index of the longest keyword it contains or -1, IDs)
+        texts = sorted(ids_by_text, key=len)
+        self._plan = []
+        for i, text in enumerate(texts):
+            contained = [j for j in range(i) if texts[j] in text]
+            required = max(contained, key=lambda j: len(texts[j])) if contained else -1
+            self._plan.append((text, required, ids_by_text[text]))
+
+    def match_ids(self, text):
+        """IDs of every keyword contained in text (sorted)"""
+        if not text:
+            return []
+        if self.ignore_case:
+            text = text.lower()
+        found = [False] * len(self._plan)
+        ids = []
+        for i, (keyword, required, keyword_ids) in enumerate(self._plan):
+            if (required < 0 or found[required]) and keyword in text:
+                found[i] = True
+                ids.extend(keyword_ids)
+        ids.sort()
+        return ids
+
+    def matches(self, text):
+        """{group: [keywords contained in text, in definition order]}"""
+        result = {}
+        for i in self.match_ids(text):
+            result.setdefault(self.groups[i], []).append(self.keywords[i])
+        return result
+
+    def search(self, text):
+        """First keyword (definition order) contained in text, or None"""
+        ids = self.match_ids(text)
+        return self.keywords[ids[0]] if ids else None
+
+    def __len__(self):
+        return len(self.keywords)
+
+
+def contains_all(matcher, text, keyword_sets):
+    """Does text contain every keyword of at least one of keyword_sets?
+
+    For compound patterns like ['do you want', '1. yes']; matcher must contain
+    all of their keywords.
+    """
+    fold = str.lower if matcher.ignore_case else str
+    found = {fold(matcher.keywords[i]) for i in matcher.match_ids(text)}
+    return any(all(fold(k) in found for k in keywords) for keywords in keyword_sets)
+
+
+def load_text_corpus(cache_path=None):
+    """OCR texts to benchmark on: the fixtures plus a persisted OCR result cache"""
+    from ocr_fixtures import FIXTURES
+    texts = ['\n'.join(fixture['lines']) for fixture in FIXTURES]
+    if cache_path and os.path.exists(cache_path):
+        from ocr_engine import OCRResult
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f).get('entries', [])
+        for _, text in entries:
+            # Layout entries are Tesseract TSV
+            texts.append(OCRResult.from_tsv(text).text if text.startswith('level\t') else text)
+    return texts
+
+
+def main():
+    from approval_matcher import ACTION_PATTERNS, QUESTION_PATTERNS, SPECIFIC_PATTERNS
+
+    default_cache = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ocr_cache.json')
+    parser = argparse.ArgumentParser(description='Keyword matcher microbenchmark')
+    parser.add_argument('--cache', default=default_cache, help='Recorded OCR results (ocr_cache.json)')
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = [' '.join(t.lower().split()) for t in load_text_corpus(args.cache)]
+    groups = {'specific': SPECIFIC_PATTERNS, 'question': QUESTION_PATTERNS, 'action': ACTION_PATTERNS}
+    matcher = KeywordMatcher(groups)
+
+    def loops(text):
+        # Old check_approval_pattern: one scan per keyword, then rescans for the debug output
+        found = {}
+        for group, patterns in groups.items():
+            if any(p in text for p in patterns):
+                found[group] = [p for p in patterns if p in text]
+        return found
+
+    for text in texts:
+        assert loops(text) == matcher.matches(text), text
+
+    results = {}
+    for name, fn in (('substring loops', loops), ('KeywordMatcher', matcher.matches)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for text in texts:
+                fn(text)
+        results[name] = (time.perf_counter() - start) / (args.repeat * len(texts)) * 1e6
+
+    chars = sum(len(t) for t in texts) / len(texts)
+    print(f"{len(texts)} OCR texts (mean {chars:.0f} chars), {len(matcher)} keywords")
+    for name, us in results.items():
+        print(f"  {name:<16} {us:7.2f} us/text")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+OCR Anchors - cheap detect pass before the full OCR pipeline
+Stage 1 OCRs the capture at native (or reduced) resolution with a tight
+whitelist and only looks for anchor tokens every approval prompt has
+("1.", "2.", "proceed", "Yes"). Frames without anchors - almost all of them -
+never reach stage 2 (sharpen + 1200px upscale + full OCR).
+"""
+import re
+import threading
+
+from PIL import Image
+
+from ocr_preprocess import PreprocessEngine
+
+# Option markers are required by check_approval_pattern; the words catch
+# prompts whose digits were lost at low resolution
+ANCHOR_RE = re.compile(r'(?:^|[^\d])[12][.)]|\bproceed\b|\byes\b', re.IGNORECASE | re.MULTILINE)
+
+# Letters of the anchor words plus digits and option punctuation
+DETECT_WHITELIST = '0123456789.)>' + ''.join(sorted(set('proceedyesPROCEEDYES')))
+DETECT_CONFIG = f'--psm 6 --oem 3 -c tessedit_char_whitelist={DETECT_WHITELIST}'
+
+
+def find_anchors(text):
+    """Anchor tokens found in OCR text (lower-cased, in order)"""
+    return [m.group(0).strip().lower() for m in ANCHOR_RE.finditer(text or '')]
+
+
+class AnchorDetector:
+    """Stage 1 of the two-stage pipeline"""
+
+    def __init__(self, scale=1.0, config=DETECT_CONFIG):
+        """
+        Args:
+            scale: Resize factor for the detect pass (1.0 = native, 0.5 = half)
+            config: Tesseract config for the detect pass
+        """
+        self.scale = scale
+        self.config = config
+        # Grayscale + contrast only: no sharpen, no upscale
+        self.preprocessor = PreprocessEngine(sharpen=False, target_width=0)
+        self._lock = threading.Lock()
+
+        # Counters
+        self.detect_passes = 0
+        self.confirm_passes = 0
+
+    def prepare(self, img):
+        """Detect-pass image (PIL Image or Frame in, small grayscale PIL Image out)"""
+        gray = self.preprocessor.process(img)
+        if self.scale != 1.0:
+            width, height = gray.size
+            gray = gray.resize((max(1, int(width * self.scale)), max(1, int(height * self.scale))), Image.BOX)
+        return gray
+
+    def detect(self, img, ocr):
+        """Run the detect pass
+
+        Args:
+            img: Capture (PIL Image or Frame)
+            ocr: Callable(img, config=...) -> text
+
+        Returns:
+            (anchors, text) - an empty anchors list means stage 2 can be skipped
+        """
+        text = ocr(self.prepare(img), config=self.config)
+        anchors = find_anchors(text)
+        with self._lock:
+            self.detect_passes += 1
+            if anchors:
+                self.confirm_passes += 1
+        return anchors, text
+
+    def get_stats(self):
+        """Counters - confirm_rate is the share of frames sent to stage 2"""
+        return {
+            'detect_passes': self.detect_passes,
+            'confirm_passes': self.confirm_passes,
+            'confirm_rate': self.confirm_passes / self.detect_passes if self.detect_passes else 0.0,
+        }
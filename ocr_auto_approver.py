@@ -8,16 +8,34 @@ import time
 import threading
 import re
 import win32gui
-import win32ui
 import win32con
 import win32api
 import win32console
 import winsound
 from PIL import Image
-import pytesseract
 import io
 import subprocess
 import os
+from concurrent.futures import CancelledError
+from window_capture import get_window_capture
+from frame_cache import FrameFingerprintCache
+from dirty_regions import DirtyRegionTracker
+from ocr_preprocess import PreprocessEngine
+import ocr_engine
+from ocr_cache import OCRResultCache
+from ocr_anchors import AnchorDetector
+from approval_matcher import (
+    match_prompt, layout_rules_out_prompt, option_block_box, prompt_matcher,
+    text_shows_prompt, parse_text_options, option_score, choose_option,
+    QUESTION_PATTERNS, ACTION_PATTERNS, SPECIFIC_PATTERNS,
+)
+from prompt_prefilter import PromptPrefilter
+from roi_cache import ROICache, map_box, window_key
+from ocr_profiles import ProfileTable
+from keyword_matcher import KeywordMatcher
+from async_ocr import AsyncOCRDispatcher, OCRCancelled, OCRTimeout, check_cancelled
+from window_registry import WindowRegistry, WinEventSource
+from scan_scheduler import ScanScheduler
 
 # System tray icon support
 try:
@@ -30,9 +48,6 @@ except ImportError:
 
 # No UTF-8 configuration - use ASCII only for output to avoid encoding issues
 
-# Tesseract path
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-
 
 def show_notification_popup(title, message, window_info=None, duration=3):
     """
@@ -143,7 +158,9 @@ def show_notification_popup(title, message, window_info=None, duration=3):
 class OCRAutoApprover:
     """OCR-based approval detection and auto-input"""
 
-    def __init__(self, use_tray=True):
+    def __init__(self, use_tray=True, capture_region=None, desktop_capture=True, ocr_workers=None,
+                 ocr_cache_path=None, engine=None, prompt_templates=None, roi_cache_path=None,
+                 ocr_profiles_path=None, ocr_timeout=10.0, ocr_cpu_budget=0.5):
         self.running = False
         self.paused = False  # Pause state for tray menu
         self.monitor_thread = None
@@ -163,48 +180,13 @@ class OCRAutoApprover:
 
         # Approval patterns - split into question and action parts for flexible matching
         # Question patterns (asking for permission)
-        self.question_patterns = [
-            'do you want',
-            'would you like',
-            'would you',
-        ]
+        self.question_patterns = list(QUESTION_PATTERNS)
 
         # Action patterns (what's being asked)
-        self.action_patterns = [
-            'to proceed',
-            'proceed',
-            'to approve',
-            'approve',
-            'to create',
-            'create',
-            'to allow',
-            'allow',
-            'select',
-            'choose',
-        ]
+        self.action_patterns = list(ACTION_PATTERNS)
 
         # Additional specific patterns (exact matches)
-        self.specific_patterns = [
-            'select an option',
-            'choose an option',
-            'yes, and don\'t ask again',
-            'yes, and remember',
-            'yes, allow all edits',
-            'approve this action',
-            'allow this action',
-            'grant permission',
-            'proceed with',
-            'continue with',
-            'select one of the following',
-            'choose one of the following',
-            'no, and tell claude',
-            'tell claude what to do differently',
-            'quick safety check',
-            'trust this folder',
-            'i trust this folder',
-            'is this a project you',
-            'project you created or one you trust',
-        ]
+        self.specific_patterns = list(SPECIFIC_PATTERNS)
 
         # Exclude keywords (removed 'editor' to allow Claude Code windows)
         self.exclude_keywords = [
@@ -245,10 +227,104 @@ class OCRAutoApprover:
             'Dwm',  # Desktop Window Manager (notification windows)
         ]
 
+        # Class name substrings of notification / modern UI windows
+        self.system_class_keywords = [
+            'notification',
+            'toast',
+            'windows.ui',
+            'xaml',  # Windows modern UI
+            'dwm',  # Desktop Window Manager
+        ]
+
+        # Keyword lists compiled once - each title / OCR text is matched in one pass
+        self.prompt_matcher = prompt_matcher(
+            tuple(self.question_patterns), tuple(self.action_patterns), tuple(self.specific_patterns)
+        )
+        self.exclude_matcher = KeywordMatcher(self.exclude_keywords)
+        self.system_class_matcher = KeywordMatcher(self.system_class_keywords)
+
+        # Per-window scan intervals - likely Claude windows (process/title, recent
+        # prompts, changing frames, foreground) are scanned sub-second, idle ones
+        # back off to ~30 s; OCR stays under ocr_cpu_budget CPU-seconds per second
+        self.scheduler = ScanScheduler(cpu_budget=ocr_cpu_budget)
+
+        # Live top-level window list - classified once per window, updated from
+        # create/destroy/name/location events instead of EnumWindows every cycle
+        # (new/renamed windows also end the monitor loop's sleep)
+        self.window_registry = WindowRegistry(WinEventSource(wakeup=self.scheduler.wakeup), self.classify_window)
+
         # Duplicate prevention - track per window with timestamp for time-based re-approval
         self.approved_windows = {}  # Track {hwnd: last_approval_timestamp}
         self.re_approval_cooldown = 20  # Seconds before same window can be approved again
 
+        # Shared capture with pooled DCs/bitmaps (reused across scan cycles)
+        self.window_capture = get_window_capture()
+
+        # Region of interest - only this part of each window is captured for OCR
+        # Relative (left, top, right, bottom) floats or absolute pixel ints
+        # Default: bottom 60% where approval dialogs usually are
+        self.capture_region = capture_region or (0.0, 0.4, 1.0, 1.0)
+        self.window_regions = {}  # Per-window ROI overrides {hwnd: region}
+
+        # Learned prompt ROIs keyed by process name + window class (persisted next
+        # to this script); windows without one use capture_region
+        self.roi_cache = ROICache(
+            path=roi_cache_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'roi_cache.json')
+        )
+        self.window_keys = {}  # {hwnd: ROI table key}
+        self.scan_regions = {}  # {hwnd: region captured by the window's last scan}
+        self.roi_candidates = {}  # {hwnd: option block box (window-relative) from the last OCR}
+
+        # Grab each monitor once per cycle and slice out unobstructed windows
+        # (occluded/minimized windows are still captured one by one)
+        self.desktop_capture = desktop_capture
+
+        # Per-window frame fingerprints - OCR only runs when the prompt region changes
+        # (captures are already limited to the prompt region, so hash all of it)
+        self.frame_cache = FrameFingerprintCache(region=(0.0, 0.0, 1.0, 1.0))
+
+        # Per-window tile diff - when a frame did change, only changed text lines are re-OCR'd
+        self.dirty_tracker = DirtyRegionTracker()
+
+        # OCR preprocessing (grayscale/contrast/sharpen/upscale) on reused NumPy buffers
+        self.preprocessor = PreprocessEngine()
+
+        # Per-window-class OCR settings (psm, whitelist, glyph height, binarization);
+        # tuned entries come from "python ocr_profiles.py autotune"
+        self.ocr_profiles = ProfileTable(
+            ocr_profiles_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ocr_profiles.json')
+        )
+
+        # OCR engine (see ocr_engine.OCREngine) - None = shared engine picked by ocr_engine
+        self.engine = engine
+
+        # Content-addressed OCR results - identical preprocessed images are OCR'd once.
+        # Memory only unless a path is given (argument or OCR_CACHE_PATH): the file
+        # holds the OCR text of every scanned window in plain text
+        self.ocr_cache = OCRResultCache(path=ocr_cache_path or os.environ.get('OCR_CACHE_PATH') or None)
+
+        # Two-stage OCR - a native-resolution anchor pass decides whether the
+        # full pipeline (sharpen + upscale + full OCR) runs at all
+        self.anchor_detector = AnchorDetector()
+
+        # Template-matching prefilter before any Tesseract call - needs reference
+        # captures of the option marker (prompt_templates/ next to this script)
+        templates_dir = prompt_templates or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'prompt_templates'
+        )
+        self.prefilter = None
+        if os.path.exists(os.path.join(templates_dir, 'templates.json')):
+            # Captures are already the prompt region - search its left half
+            self.prefilter = PromptPrefilter.from_directory(templates_dir, region=(0.0, 0.0, 0.5, 1.0))
+            print(f"[INFO] Prompt prefilter: {len(self.prefilter.templates)} templates from {templates_dir}")
+
+        # OCR pool - windows are OCR'd in parallel (Tesseract releases the GIL),
+        # decisions and key injection stay serial on the monitor thread. Jobs time
+        # out after ocr_timeout seconds and are cancelled when their window closes
+        # or its frame changes, so one slow window cannot stall the scan cycle
+        self.ocr_workers = ocr_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.ocr_dispatcher = AsyncOCRDispatcher(workers=self.ocr_workers, timeout=ocr_timeout)
+
         # Current window
         try:
             self.current_hwnd = win32console.GetConsoleWindow()
@@ -258,33 +334,27 @@ class OCRAutoApprover:
         print("[OK] OCR Auto Approver initialized")
         print(f"[INFO] Mode: Active OCR monitoring (scans all windows)")
 
-    def is_system_window(self, hwnd):
-        """Check if window is a system window (notification center, taskbar, etc.)"""
-        try:
-            # Get window class name
-            class_name = win32gui.GetClassName(hwnd)
+    def is_system_class(self, class_name, exstyle):
+        """Check if a window class / extended style belongs to a system window"""
+        # Check if it's a system window class
+        if class_name in self.system_classes:
+            return True
 
-            # Check if it's a system window class
-            if class_name in self.system_classes:
-                return True
+        # Additional checks for notification-related windows
+        if self.system_class_matcher.match_ids(class_name):
+            return True
 
-            # Additional checks for notification-related windows
-            if 'notification' in class_name.lower():
-                return True
-            if 'toast' in class_name.lower():
-                return True
-            if 'windows.ui' in class_name.lower():
-                return True
-            if 'xaml' in class_name.lower():  # Windows modern UI
-                return True
-            if 'dwm' in class_name.lower():  # Desktop Window Manager
-                return True
+        # Check window style - exclude toolwindows and other non-standard windows
+        if exstyle & win32con.WS_EX_TOOLWINDOW:  # Tool windows
+            return True
+        if exstyle & win32con.WS_EX_NOACTIVATE:  # Non-activatable windows
+            return True
+        return False
 
-            # Check window style - exclude toolwindows and other non-standard windows
-            style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-            if style & win32con.WS_EX_TOOLWINDOW:  # Tool windows
-                return True
-            if style & win32con.WS_EX_NOACTIVATE:  # Non-activatable windows
+    def is_system_window(self, hwnd):
+        """Check if window is a system window (notification center, taskbar, etc.)"""
+        try:
+            if self.is_system_class(win32gui.GetClassName(hwnd), win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)):
                 return True
 
             # Exclude windows at -32000,-32000 (hidden system windows)
@@ -300,73 +370,45 @@ class OCRAutoApprover:
         except Exception:
             return False
 
+    def classify_window(self, info):
+        """Why a window is never scanned, or None - computed once per window
+        title by the window registry (position/size are checked every cycle)"""
+        if self.is_system_class(info.class_name, info.exstyle):
+            return 'System window'
+        exc = self.exclude_matcher.search(info.title)
+        if exc is not None:
+            return f"Excluded keyword '{exc}'"
+        return None
+
     def find_target_windows(self, verbose=False):
         """Find all visible windows (including current) - with strict filtering
 
-        Works across multiple monitors.
+        Works across multiple monitors. The window list is kept up to date by
+        window events (see window_registry) instead of enumerating every call.
 
         Args:
             verbose: If True, print detailed debug information
-        """
-        def callback(hwnd, windows):
-            # Check if window is visible OR minimized (we can restore minimized windows)
-            if win32gui.IsWindowVisible(hwnd) or win32gui.IsIconic(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                if title:
-                    # Exclude system windows first
-                    if self.is_system_window(hwnd):
-                        if verbose:
-                            safe_title = title.encode('ascii', 'ignore').decode('ascii')[:40]
-                            print(f"[FILTER] System window: {safe_title}")
-                        return True
-
-                    # Exclude keywords
-                    title_lower = title.lower()
-                    is_excluded = any(exc in title_lower for exc in self.exclude_keywords)
-
-                    if not is_excluded:
-                        # Check window size - must be reasonable (not invisible)
-                        try:
-                            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
-                            width = right - left
-                            height = bottom - top
-
-                            # Minimum size: 100x20 (only exclude invisible windows)
-                            # Windows on any monitor will have valid coordinates
-                            if width >= 100 and height >= 20:
-                                # Get window class to help identify the window type
-                                try:
-                                    class_name = win32gui.GetClassName(hwnd)
-                                except:
-                                    class_name = "Unknown"
-
-                                windows.append({
-                                    'hwnd': hwnd,
-                                    'title': title,
-                                    'class': class_name,
-                                    'pos': (left, top, right, bottom)
-                                })
-
-                                if verbose:
-                                    safe_title = title.encode('ascii', 'ignore').decode('ascii')[:40]
-                                    print(f"[TARGET] {safe_title} ({width}x{height})")
-                            elif verbose:
-                                safe_title = title.encode('ascii', 'ignore').decode('ascii')[:40]
-                                print(f"[FILTER] Too small ({width}x{height}): {safe_title}")
-                        except:
-                            pass
-                    elif verbose:
-                        safe_title = title.encode('ascii', 'ignore').decode('ascii')[:40]
-                        matching_kw = [k for k in self.exclude_keywords if k in title_lower][0]
-                        print(f"[FILTER] Excluded keyword '{matching_kw}': {safe_title}")
-            return True
 
-        windows = []
+        Returns:
+            [window_registry.WindowInfo] - shared with the registry, do not modify
+        """
+        registry = self.window_registry
         try:
-            win32gui.EnumWindows(callback, windows)
-        except:
+            registry.refresh()
+        except Exception:
             pass
-        return windows
+
+        if not verbose:
+            return registry.targets()
+
+        for info in registry.windows.values():
+            safe_title = info.title.encode('ascii', 'ignore').decode('ascii')[:40]
+            if registry.is_target(info):
+                print(f"[TARGET] {safe_title} ({info.width}x{info.height})")
+            elif info.visible or info.minimized:
+                reason = info.reason or f"Too small/off-screen ({info.width}x{info.height})"
+                print(f"[FILTER] {reason}: {safe_title}")
+        return registry.targets()
 
     def activate_window(self, hwnd):
         """Activate a window (works across multiple monitors)"""
@@ -405,173 +447,224 @@ class OCRAutoApprover:
             print(f"[DEBUG] Failed to activate window: {e}")
             return False
 
-    def capture_window(self, hwnd):
-        """Capture window screenshot"""
-        try:
-            # Get window size
-            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
-            width = right - left
-            height = bottom - top
-
-            # Minimum size check
-            if width < 100 or height < 100:
-                return None
-
-            # Device context
-            hwndDC = win32gui.GetWindowDC(hwnd)
-            mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-            saveDC = mfcDC.CreateCompatibleDC()
-
-            # Bitmap
-            saveBitMap = win32ui.CreateBitmap()
-            saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-            saveDC.SelectObject(saveBitMap)
-
-            # Copy screen
-            saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
-
-            # Convert to PIL Image
-            bmpinfo = saveBitMap.GetInfo()
-            bmpstr = saveBitMap.GetBitmapBits(True)
-            img = Image.frombuffer(
-                'RGB',
-                (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                bmpstr, 'raw', 'BGRX', 0, 1
-            )
-
-            # Cleanup
-            win32gui.DeleteObject(saveBitMap.GetHandle())
-            saveDC.DeleteDC()
-            mfcDC.DeleteDC()
-            win32gui.ReleaseDC(hwnd, hwndDC)
-
-            return img
+    def get_window_key(self, hwnd):
+        """ROI table key of a window (process name + class, looked up once per window)"""
+        key = self.window_keys.get(hwnd)
+        if key is None:
+            key = self.window_keys[hwnd] = window_key(hwnd)
+        return key
 
-        except Exception:
-            return None
+    def get_capture_region(self, hwnd):
+        """Region of interest to capture for a window
 
-    def extract_text_from_image(self, img, fast_mode=False):
-        """Extract text from image (OCR)
+        Per-window override, else the learned prompt ROI of the window's process
+        and class (default region on the periodic full-frame check), else default
+        """
+        region = self.window_regions.get(hwnd)
+        if region is not None:
+            return region
+        return self.roi_cache.capture_region(self.get_window_key(hwnd), self.capture_region, window=hwnd)
+
+    def learn_prompt_roi(self, hwnd):
+        """Remember where the prompt just detected in hwnd was drawn"""
+        box = self.roi_candidates.pop(hwnd, None)
+        if box is not None:
+            self.roi_cache.learn(self.get_window_key(hwnd), box)
+
+    def capture_frame(self, hwnd, region=None):
+        """Capture window as a raw BGRX Frame - skips the PIL conversion for OCR"""
+        return self.window_capture.capture_frame(hwnd, min_width=100, min_height=100, region=region)
+
+    def capture_frames(self, hwnds, probe_hwnds=()):
+        """Capture the ROI of several windows at once (see WindowCapture.capture_frames)
+
+        probe_hwnds: Backed-off windows captured only to fingerprint (see
+        ScanScheduler.probe) - with the region of their last scan, so the
+        fingerprint compares with the one recorded then
+        """
+        regions = {hwnd: self.get_capture_region(hwnd) for hwnd in hwnds}
+        self.scan_regions.update(regions)
+        for hwnd in probe_hwnds:
+            if hwnd in self.scan_regions and hwnd not in regions:
+                regions[hwnd] = self.scan_regions[hwnd]
+        return self.window_capture.capture_frames(
+            regions, min_width=100, min_height=100, desktop=self.desktop_capture
+        )
+
+    def capture_window(self, hwnd, region=None):
+        """Capture window screenshot (pooled GDI surfaces, see window_capture)
 
         Args:
-            img: PIL Image object
-            fast_mode: If True, use faster OCR settings with less accuracy
+            hwnd: Window handle
+            region: Optional region of interest - only this part is BitBlt'd
         """
-        try:
-            from PIL import ImageEnhance, ImageFilter
+        return self.window_capture.capture(hwnd, min_width=100, min_height=100, region=region)
 
-            # Pre-processing for better OCR
-            # Convert to grayscale
-            img = img.convert('L')
+    def ocr(self, img, lang='eng', config=''):
+        """OCR a preprocessed image through the result cache"""
+        engine = self.engine or ocr_engine.get_engine()
+        return self.ocr_cache.image_to_string(img, engine.image_to_string, lang=lang, config=config)
 
-            # Increase contrast
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(2.0)
+    def ocr_data(self, img, lang='eng', config=''):
+        """Layout-aware OCR (lines, word boxes, confidences) through the result cache"""
+        engine = self.engine or ocr_engine.get_engine()
+        result = self.ocr_cache.image_to_data(img, engine.image_to_tsv, lang=lang, config=config)
+        result.size = img.size
+        return result
 
-            # Sharpen
-            img = img.filter(ImageFilter.SHARPEN)
+    def extract_text_from_image(self, img, fast_mode=False, dirty_regions=None, prompt_region_only=False):
+        """Extract text from image (OCR) - see extract_result_from_image"""
+        return self.extract_result_from_image(img, fast_mode, dirty_regions, prompt_region_only).text
 
-            # Increase size for better OCR (larger text = better recognition)
-            width, height = img.size
-            if width < 1200:
-                scale_factor = 1200 / width
-                new_size = (int(width * scale_factor), int(height * scale_factor))
-                img = img.resize(new_size, Image.LANCZOS)
+    def extract_result_from_image(self, img, fast_mode=False, dirty_regions=None, prompt_region_only=False,
+                                  profile=None):
+        """Extract text and line layout from image (OCR)
+
+        Args:
+            img: PIL Image or raw Frame (window_capture.Frame - read without copying)
+            fast_mode: If True, use faster OCR settings with less accuracy
+            dirty_regions: Window's dirty-region state (DirtyRegionTracker.for_window).
+                In fast mode only text lines that changed since the window's previous
+                frame are OCR'd; cached text is used for the rest
+            prompt_region_only: img is already the prompt region (ROI capture),
+                so fast mode does not crop it again
+            profile: ocr_profiles.OCRProfile of the window class - its scaling,
+                binarization and fast-mode config replace the defaults
+
+        Returns:
+            ocr_engine.OCRResult (line boxes relative to the OCR'd image)
+        """
+        try:
+            # Pre-processing for better OCR: grayscale, contrast, sharpen and
+            # upscale narrow captures (larger text = better recognition)
+            if profile is not None:
+                img = profile.prepare(img)
+                lang = profile.lang
+            else:
+                img = self.preprocessor.process(img)
+                lang = 'eng'
 
             if fast_mode:
                 # Fast mode: use PSM 6 (single block) with better settings
-                custom_config = r'--psm 6 --oem 3 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,?!():-\' '
+                if profile is not None:
+                    custom_config = profile.config
+                else:
+                    custom_config = r'--psm 6 --oem 3 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,?!():-\' '
 
                 # Only check bottom 60% where approval dialogs usually are
-                width, height = img.size
-                bottom_region = img.crop((0, int(height * 0.4), width, height))
-                text = pytesseract.image_to_string(bottom_region, lang='eng', config=custom_config)
+                if prompt_region_only:
+                    bottom_region = img
+                else:
+                    width, height = img.size
+                    bottom_region = img.crop((0, int(height * 0.4), width, height))
+                if dirty_regions is not None:
+                    text = dirty_regions.extract(
+                        bottom_region,
+                        lambda region: self.ocr_data(region, lang=lang, config=custom_config)
+                    )
+                    result = ocr_engine.OCRResult(text, lines=dirty_regions.lines, size=bottom_region.size)
+                else:
+                    result = self.ocr_data(bottom_region, lang=lang, config=custom_config)
             else:
                 # Normal mode: more thorough with better config
                 custom_config = r'--psm 6 --oem 3'
-                text = pytesseract.image_to_string(img, lang='eng', config=custom_config)
+                result = self.ocr_data(img, lang=lang, config=custom_config)
 
-                # If too little text, try bottom half
-                if len(text) < 50:
+                # If too little text, try bottom half - unless every line was read
+                # confidently and none of them is an option line
+                if len(result.text) < 50 and not layout_rules_out_prompt(result.lines):
                     width, height = img.size
                     bottom_region = img.crop((0, int(height * 0.5), width, height))
-                    text = pytesseract.image_to_string(bottom_region, lang='eng', config=custom_config)
+                    result = self.ocr_data(bottom_region, lang=lang, config=custom_config)
 
-            return text
+            return result
 
         except Exception as e:
-            return ""
+            return ocr_engine.OCRResult("")
 
-    def check_approval_pattern(self, text):
-        """Check if text contains approval pattern - RELAXED detection for better recognition
+    def ocr_window(self, hwnd, img, region=None, fingerprint=None, cancel_event=None):
+        """OCR one window's capture (runs on the OCR pool)
+
+        Args:
+            hwnd: Window handle
+            img: Capture of region (Frame or PIL Image)
+            region: Relative region of the window img shows - the option block
+                found in it is kept in roi_candidates for learn_prompt_roi
+            fingerprint: Frame fingerprint of img, if already computed
+            cancel_event: Set by the OCR dispatcher when the window closed, its
+                frame changed or the job timed out - checked between stages
+                (raises async_ocr.OCRCancelled)
 
         Returns:
-            bool: True if approval pattern detected, False otherwise
+            (fingerprint, text, verdict, options) - verdict is None when the
+            layout was inconclusive and the text still has to go through
+            check_approval_pattern; options are the positionally parsed
+            {number: option text} (empty when unknown)
         """
-        if not text:
-            return False
-
-        text_lower = text.lower()
-
-        # Remove extra whitespace and normalize text
-        text_normalized = ' '.join(text_lower.split())
-
-        # RELAXED: Check for option numbers (more flexible)
-        # Look for "1" followed by dot/paren and "2" followed by dot/paren anywhere in text
-        has_option_1 = False
-        has_option_2 = False
-        has_numbered_options = False
-
-        for line in text.split('\n'):
-            line_stripped = line.strip().lower()
-
-            # More flexible option detection - check if line contains option markers
-            # Match: "1.", "1)", or bullet + "1."
-            if '1.' in line_stripped or '1)' in line_stripped:
-                # Make sure it's not part of a larger number like "11." or "21."
-                if re.search(r'(?:^|[^\d])1[.)]', line_stripped):
-                    has_option_1 = True
-
-            if '2.' in line_stripped or '2)' in line_stripped:
-                if re.search(r'(?:^|[^\d])2[.)]', line_stripped):
-                    has_option_2 = True
+        # Skip OCR when the prompt region is unchanged since last pass
+        if fingerprint is None:
+            fingerprint = self.frame_cache.fingerprint(img)
+        cached = self.frame_cache.get(hwnd, fingerprint)
+        if cached is not None:
+            return fingerprint, cached.text, cached.verdict, {}
+
+        # Stage 0: option marker glyphs not found by template matching - no OCR at all
+        if self.prefilter is not None and not self.prefilter.check(img).maybe_prompt:
+            self.frame_cache.store(hwnd, fingerprint, '', False)
+            return fingerprint, '', False, {}
+
+        # Stage 1: no anchor tokens ("1.", "2.", "proceed", "yes") - cannot be a prompt
+        check_cancelled(cancel_event)
+        try:
+            anchors, detect_text = self.anchor_detector.detect(img, self.ocr)
+        except Exception:
+            anchors = None  # Anchor pass failed: decide with the full pass
+        if anchors is not None and not anchors:
+            self.frame_cache.store(hwnd, fingerprint, detect_text, False)
+            return fingerprint, detect_text, False, {}
+
+        # Stage 2: full preprocessing + layout-aware OCR
+        check_cancelled(cancel_event)
+        result = self.extract_result_from_image(
+            img, fast_mode=True,  # Use fast mode to reduce CPU usage
+            dirty_regions=self.dirty_tracker.for_window(hwnd),
+            prompt_region_only=True,
+            profile=self.ocr_profiles.lookup(self.get_window_key(hwnd))
+        )
+
+        # The bottom-most confident, aligned "1." block
+        verdict, options = match_prompt(result.lines, matcher=self.prompt_matcher)
+
+        # Where the block sits in the window (learned once the prompt is confirmed)
+        block = option_block_box(result.lines) if verdict is not False and result.size else None
+        if block is not None and region is not None and all(isinstance(v, float) for v in region):
+            width, height = result.size
+            relative = (block[0] / width, block[1] / height, block[2] / width, block[3] / height)
+            self.roi_candidates[hwnd] = map_box(relative, region)
+        else:
+            self.roi_candidates.pop(hwnd, None)
+        if verdict is not None:
+            self.frame_cache.store(hwnd, fingerprint, result.text, verdict)
+        return fingerprint, result.text, verdict, options
 
-        # Check if we have at least one option (relaxed from requiring both)
-        has_numbered_options = has_option_1 or has_option_2
+    def scan_window(self, hwnd, img, region=None, fingerprint=None, cancel_event=None):
+        """ocr_window plus the seconds it took (OCR is CPU-bound: cost for the scheduler budget)"""
+        start = time.perf_counter()
+        result = self.ocr_window(hwnd, img, region, fingerprint, cancel_event=cancel_event)
+        return result + (time.perf_counter() - start,)
 
-        # Debug: Show detection status (reduced verbosity)
-        if has_numbered_options:
-            print(f"[DEBUG] Option detection: has_option_1={has_option_1}, has_option_2={has_option_2}")
+    def check_approval_pattern(self, text):
+        """Check if text contains approval pattern - RELAXED detection for better recognition
 
-        # Check for specific patterns (exact matches)
-        for pattern in self.specific_patterns:
-            if pattern in text_normalized:
-                print(f"[DEBUG] Matched specific pattern: '{pattern}'")
-                # If we found a specific pattern AND have numbered options, approve
-                if has_numbered_options:
-                    return True
+        A "1." or "2." option plus any specific, question or action pattern
+        (approval_matcher.text_shows_prompt with this approver's lists)
 
-        # Check for question + action combination
-        has_question = any(q in text_normalized for q in self.question_patterns)
-        has_action = any(a in text_normalized for a in self.action_patterns)
-
-        # RELAXED: Accept if we have (question OR action) AND numbered options
-        if (has_question or has_action) and has_numbered_options:
-            if has_question and has_action:
-                matched_q = [q for q in self.question_patterns if q in text_normalized]
-                matched_a = [a for a in self.action_patterns if a in text_normalized]
-                print(f"[DEBUG] Matched question+action: {matched_q[0]} + {matched_a[0]}")
-            elif has_question:
-                matched_q = [q for q in self.question_patterns if q in text_normalized]
-                print(f"[DEBUG] Matched question: {matched_q[0]}")
-            else:
-                matched_a = [a for a in self.action_patterns if a in text_normalized]
-                print(f"[DEBUG] Matched action: {matched_a[0]}")
-            return True
-
-        return False
+        Returns:
+            bool: True if approval pattern detected, False otherwise
+        """
+        return text_shows_prompt(text, self.prompt_matcher)
 
-    def determine_response_key(self, text):
+    def determine_response_key(self, text, options=None):
         """Smart option selection based on actual option text content
 
         Logic:
@@ -583,71 +676,38 @@ class OCRAutoApprover:
           - "no/type/tell claude" = -100 points (never select)
         - Select highest scoring option
 
+        Args:
+            text: OCR text of the prompt
+            options: {option_number: option text} already parsed from line
+                layout (approval_matcher) - text is only parsed when missing
+
         Returns:
             str: '1', '2', or '3' based on best match
         """
-        if not text:
+        if options:
+            options = {num: opt for num, opt in options.items() if num in ('1', '2', '3')}
+        elif not text:
             return '1'
-
-        # Parse options: {option_number: full_option_text}
-        options = {}
-
-        for line in text.split('\n'):
-            line_stripped = line.strip().lower()
-
-            # Match "1. text", "1) text", "› 1. text" etc.
-            for opt_num in ['1', '2', '3']:
-                pattern = rf'(?:^|[^\d]){opt_num}[.)]\s*(.+)'
-                match = re.search(pattern, line_stripped)
-                if match and opt_num not in options:
-                    options[opt_num] = match.group(1).strip()
+        else:
+            options = self.parse_options(text)
 
         print(f"[DEBUG] Parsed options: {options}")
+        return self.score_options(options)
 
-        # Score each option
-        best_option = '1'  # Default fallback
-        best_score = -999
+    def parse_options(self, text):
+        """Options parsed from flat OCR text: {option_number: full_option_text}
+        (the last option block - numbered lists above the prompt are skipped)"""
+        return parse_text_options(text, last=True)
 
-        for opt_num, opt_text in options.items():
-            score = 0
-
-            # Positive signals (want to select)
-            if 'yes' in opt_text:
-                score += 10
-            if "don't ask" in opt_text or "dont ask" in opt_text or "don't ask" in opt_text:
-                score += 5  # Permanent approval bonus
-            if 'approve' in opt_text:
-                score += 10
-            if 'allow' in opt_text:
-                score += 8
-            if 'proceed' in opt_text:
-                score += 8
-            if 'trust' in opt_text:
-                score += 10  # "Yes, I trust this folder"
-
-            # Negative signals (never select)
-            if 'type' in opt_text and 'here' in opt_text:
-                score -= 100  # "Type here to tell Claude..."
-            if 'tell claude' in opt_text:
-                score -= 100
-            if 'differently' in opt_text:
-                score -= 100
-            if opt_text.startswith('no') and 'yes' not in opt_text:
-                score -= 100  # Starts with "No"
-            if 'exit' in opt_text:
-                score -= 100  # "No, exit" - never select exit option
-
-            print(f"[DEBUG] Option {opt_num}: '{opt_text[:50]}' -> score={score}")
-
-            if score > best_score:
-                best_score = score
-                best_option = opt_num
-
-        # Safety: Never return '3' - only '1' or '2' are valid approval options
-        if best_option == '3':
-            print(f"[DEBUG] Option 3 selected but overriding to '1' for safety")
-            best_option = '1'
+    def score_options(self, options):
+        """Highest scoring option number ('1' when nothing scores, never '3')
 
+        Scores (approval_matcher.option_score): "yes" +10, "don't ask again" +5,
+        "approve"/"trust" +10, "allow"/"proceed" +8, "no"/"tell claude"/"exit" -100
+        """
+        for opt_num, opt_text in options.items():
+            print(f"[DEBUG] Option {opt_num}: '{opt_text[:50]}' -> score={option_score(opt_text)}")
+        best_option, best_score = choose_option(options)
         print(f"[DEBUG] Selected option {best_option} (score={best_score})")
         return best_option
 
@@ -807,7 +867,7 @@ class OCRAutoApprover:
         print("OCR Auto Approver")
         print("="*60)
         print("\n=== ACTIVE OCR MONITORING ===")
-        print("\nMode: Active OCR (All Windows)")
+        print(f"\nMode: Active OCR (All Windows, {self.ocr_workers} OCR workers)")
         print("  - Scans ALL visible windows with OCR")
         print("  - Detects approval dialogs automatically")
         print("  - Auto-responds when pattern detected")
@@ -819,16 +879,15 @@ class OCRAutoApprover:
         initial_windows = self.find_target_windows(verbose=False)
         print(f"[OK] Found {len(initial_windows)} target windows:")
         for i, win in enumerate(initial_windows[:10], 1):  # Show first 10
-            safe_title = win['title'].encode('ascii', 'ignore').decode('ascii')[:50]
-            width = win['pos'][2] - win['pos'][0]
-            height = win['pos'][3] - win['pos'][1]
-            print(f"  {i}. {safe_title} ({width}x{height})")
+            safe_title = win.title.encode('ascii', 'ignore').decode('ascii')[:50]
+            print(f"  {i}. {safe_title} ({win.width}x{win.height})")
         if len(initial_windows) > 10:
             print(f"  ... and {len(initial_windows) - 10} more")
         print()
 
         active_check_count = 0
         last_status_time = time.time()
+        last_status_cpu = time.process_time()
 
         while self.running:
             try:
@@ -841,86 +900,187 @@ class OCRAutoApprover:
                 # Show periodic status update (every 30 seconds)
                 current_time = time.time()
                 if current_time - last_status_time >= 30:
-                    print(f"[STATUS] Active monitoring | Approvals: {self.approval_count} | Checks: {active_check_count}")
+                    cache_stats = self.frame_cache.get_stats()
+                    print(f"[STATUS] Active monitoring | Approvals: {self.approval_count} | Checks: {active_check_count} | "
+                          f"OCR skipped: {cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']} "
+                          f"({cache_stats['hit_rate']:.0%}) | "
+                          f"Rows OCR'd: {self.dirty_tracker.get_stats()['ocr_fraction']:.0%} | "
+                          f"OCR cache: {self.ocr_cache.hit_rate:.0%} hits, {len(self.ocr_cache)} entries, "
+                          f"{self.ocr_cache.evictions} evicted | "
+                          f"Full OCR: {self.anchor_detector.get_stats()['confirm_rate']:.0%} of frames")
+                    if self.prefilter is not None:
+                        prefilter_stats = self.prefilter.get_stats()
+                        print(f"[STATUS] Prompt prefilter: {prefilter_stats['pass_rate']:.0%} of frames passed, "
+                              f"{prefilter_stats['mean_us']:.0f} us/frame")
+                    dispatch_stats = self.ocr_dispatcher.get_stats()
+                    if dispatch_stats['timed_out'] or dispatch_stats['cancelled']:
+                        print(f"[STATUS] OCR jobs: {dispatch_stats['timed_out']} timed out, "
+                              f"{dispatch_stats['cancelled']} cancelled, {dispatch_stats['in_flight']} in flight")
+                    schedule_stats = self.scheduler.get_stats()
+                    cpu_time = time.process_time()
+                    cpu_load = (cpu_time - last_status_cpu) / (current_time - last_status_time)
+                    last_status_cpu = cpu_time
+                    print(f"[STATUS] Scheduler: {schedule_stats['hot']}/{schedule_stats['windows']} windows hot | "
+                          f"OCR {schedule_stats['ocr_seconds']:.0f} s over {schedule_stats['scans']} scans | "
+                          f"budget stretch x{schedule_stats['stretch']:.1f} | {schedule_stats['probes']} frame probes | "
+                          f"CPU {cpu_load:.0%}")
+                    if schedule_stats['latency_p50'] is not None:
+                        print(f"[STATUS] Detection latency (since previous scan): "
+                              f"p50 {schedule_stats['latency_p50']:.2f} s, p99 {schedule_stats['latency_p99']:.2f} s")
+                    roi_stats = self.roi_cache.get_stats()
+                    if roi_stats['rois']:
+                        print(f"[STATUS] Learned ROIs: {roi_stats['rois']} | "
+                              f"ROI-only scans: {roi_stats['roi_fraction']:.0%}")
+                    self.save_ocr_cache()
                     last_status_time = current_time
                     # Update tray tooltip
                     self.update_tray_title()
 
                 # Get all target windows
                 target_windows = self.find_target_windows(verbose=False)
-
-                # Scan each window
-                for win in target_windows:
-                    hwnd = win['hwnd']
-                    title = win['title']
+                try:
+                    foreground = win32gui.GetForegroundWindow()
+                except Exception:
+                    foreground = None
+                self.scheduler.sync(
+                    ((win.hwnd, self.get_window_key(win.hwnd).split('|', 1)[0], win.title) for win in target_windows),
+                    foreground=foreground,
+                )
+
+                # Windows to check this cycle: due by their scan interval (highest
+                # priority first) and not in cooldown (system windows and excluded
+                # keywords were filtered once per window by the registry)
+                windows_by_hwnd = {win.hwnd: win for win in target_windows}
+                scan_windows = []
+                for hwnd in self.scheduler.due():
+                    if self.should_approve(hwnd):
+                        scan_windows.append(windows_by_hwnd[hwnd])
+                    else:
+                        cooldown_left = self.re_approval_cooldown - (time.time() - self.approved_windows[hwnd])
+                        self.scheduler.postpone(hwnd, max(0.0, cooldown_left))
+
+                # Capture all of them up front (one desktop grab per monitor where possible),
+                # plus backed-off windows to probe: a changed frame wakes them (no OCR)
+                probe_hwnds = [hwnd for hwnd in self.scheduler.probe_due() if hwnd in windows_by_hwnd]
+                frames = self.capture_frames([win.hwnd for win in scan_windows], probe_hwnds)
+                for hwnd in probe_hwnds:
+                    img = frames.pop(hwnd, None)
+                    self.scheduler.probe(hwnd, self.frame_cache.fingerprint(img) if img else None)
+
+                # Drop OCR still running for windows that closed since the last cycle
+                live_hwnds = [win.hwnd for win in target_windows]
+                self.ocr_dispatcher.cancel_missing(live_hwnds)
+
+                # OCR all captured windows in parallel (a job still running on an
+                # older frame of the same window is cancelled and replaced)
+                futures = {}
+                for win in scan_windows:
+                    hwnd = win.hwnd
+                    img = frames.get(hwnd)
+                    if img:
+                        fingerprint = self.frame_cache.fingerprint(img)
+                        futures[hwnd] = self.ocr_dispatcher.submit(
+                            hwnd, fingerprint, self.scan_window, hwnd, img, self.scan_regions.get(hwnd), fingerprint
+                        )
+                    else:
+                        self.scheduler.record(hwnd)  # Not capturable now (too small, minimized...)
+                active_check_count += len(futures)
+
+                # Decide and send keys one window at a time (in scan order)
+                for win in scan_windows:
+                    hwnd = win.hwnd
+                    title = win.title
 
                     try:
-                        # Check if should approve (cooldown check)
-                        if hwnd and self.should_approve(hwnd):
-                            # Skip system windows and excluded keywords
-                            if title and not self.is_system_window(hwnd):
-                                title_lower = title.lower()
-                                if not any(exc in title_lower for exc in self.exclude_keywords):
-                                    # Capture and OCR check
-                                    active_check_count += 1
-                                    img = self.capture_window(hwnd)
-                                    if img:
-                                        text = self.extract_text_from_image(img, fast_mode=True)  # Use fast mode to reduce CPU usage
-
-                                        # Debug: Print raw OCR text when approval keywords detected
-                                        if text and ('do you want' in text.lower() or 'would you' in text.lower() or 'proceed' in text.lower()):
-                                            print(f"\n[DEBUG] Potential approval dialog detected!")
-                                            print(f"[DEBUG] OCR Text Length: {len(text)}")
-                                            print(f"[DEBUG] OCR Text (first 10 non-empty lines):")
-                                            line_count = 0
-                                            for line in text.split('\n'):
-                                                if line.strip():
-                                                    print(f"  {line.strip()[:80]}")
-                                                    line_count += 1
-                                                    if line_count >= 10:
-                                                        break
-
-                                        if self.check_approval_pattern(text):
-                                            # Determine response key
-                                            response_key = self.determine_response_key(text)
-
-                                            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-
-                                            # Safe title for console output
-                                            try:
-                                                safe_title = title[:60].encode('ascii', 'ignore').decode('ascii')
-                                            except:
-                                                safe_title = "Window with special characters"
-
-                                            # Safe text preview
-                                            try:
-                                                safe_text = text[:200].encode('ascii', 'ignore').decode('ascii')
-                                            except:
-                                                safe_text = "[text contains special characters]"
-
-                                            print(f"\n{'='*70}")
-                                            print(f"[{timestamp}] APPROVAL REQUEST DETECTED (Active Scan)")
-                                            print(f"{'='*70}")
-                                            print(f"Window Title: {safe_title}")
-                                            print(f"Action: Sending '{response_key}'")
-                                            print(f"\n=== Full Detected Text (first 15 lines) ===")
-                                            line_count = 0
-                                            for line in text.split('\n'):
-                                                if line.strip():
-                                                    safe_line = line.strip()[:100]
-                                                    try:
-                                                        safe_line = safe_line.encode('ascii', 'ignore').decode('ascii')
-                                                    except:
-                                                        pass
-                                                    print(f"  {safe_line}")
-                                                    line_count += 1
-                                                    if line_count >= 15:
-                                                        break
-                                            print(f"{'='*70}\n")
-                                            self.send_approval(hwnd, title, response_key, detected_text=text)
+                        # Cooldown may have started while handling an earlier window
+                        if hwnd in futures and self.should_approve(hwnd):
+                            try:
+                                fingerprint, text, is_approval, options, cost = futures[hwnd].result()
+                            except OCRTimeout:
+                                # Charge the timeout and back off like an unchanged scan,
+                                # so a window that always times out is not rescanned at once
+                                self.scheduler.record(hwnd, cost=self.ocr_dispatcher.timeout)
+                                continue
+                            except (OCRCancelled, CancelledError):
+                                self.scheduler.record(hwnd)  # Window closed or frame replaced
+                                continue
+                            except Exception:
+                                self.scheduler.record(hwnd)  # Broken engine: back off too
+                                continue
+
+                            # Debug: Print raw OCR text when approval keywords detected
+                            if is_approval is None and text and ('do you want' in text.lower() or 'would you' in text.lower() or 'proceed' in text.lower()):
+                                print(f"\n[DEBUG] Potential approval dialog detected!")
+                                print(f"[DEBUG] OCR Text Length: {len(text)}")
+                                print(f"[DEBUG] OCR Text (first 10 non-empty lines):")
+                                line_count = 0
+                                for line in text.split('\n'):
+                                    if line.strip():
+                                        print(f"  {line.strip()[:80]}")
+                                        line_count += 1
+                                        if line_count >= 10:
+                                            break
+
+                            if is_approval is None:
+                                is_approval = self.check_approval_pattern(text)
+                                self.frame_cache.store(hwnd, fingerprint, text, is_approval)
+                            self.scheduler.record(hwnd, fingerprint=fingerprint, cost=cost, detected=is_approval)
+
+                            if is_approval:
+                                self.learn_prompt_roi(hwnd)
+
+                                # Determine response key
+                                response_key = self.determine_response_key(text, options)
+
+                                timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+
+                                # Safe title for console output
+                                try:
+                                    safe_title = title[:60].encode('ascii', 'ignore').decode('ascii')
+                                except:
+                                    safe_title = "Window with special characters"
+
+                                # Safe text preview
+                                try:
+                                    safe_text = text[:200].encode('ascii', 'ignore').decode('ascii')
+                                except:
+                                    safe_text = "[text contains special characters]"
+
+                                print(f"\n{'='*70}")
+                                print(f"[{timestamp}] APPROVAL REQUEST DETECTED (Active Scan)")
+                                print(f"{'='*70}")
+                                print(f"Window Title: {safe_title}")
+                                print(f"Action: Sending '{response_key}'")
+                                print(f"\n=== Full Detected Text (first 15 lines) ===")
+                                line_count = 0
+                                for line in text.split('\n'):
+                                    if line.strip():
+                                        safe_line = line.strip()[:100]
+                                        try:
+                                            safe_line = safe_line.encode('ascii', 'ignore').decode('ascii')
+                                        except:
+                                            pass
+                                        print(f"  {safe_line}")
+                                        line_count += 1
+                                        if line_count >= 15:
+                                            break
+                                print(f"{'='*70}\n")
+                                self.send_approval(hwnd, title, response_key, detected_text=text)
                     except Exception as e:
                         pass  # Silent fail for individual window
 
+                # Forget fingerprints and dirty-region state of windows that disappeared
+                # (jobs of skipped windows keep running; the dispatcher never starts a
+                # window's next job before its previous one has returned)
+                self.frame_cache.evict_missing(live_hwnds)
+                self.dirty_tracker.evict_missing(live_hwnds)
+                for gone_hwnd in [h for h in self.window_regions if h not in live_hwnds]:
+                    del self.window_regions[gone_hwnd]
+                for table in (self.window_keys, self.roi_candidates, self.scan_regions):
+                    for gone_hwnd in [h for h in table if h not in live_hwnds]:
+                        del table[gone_hwnd]
+                self.roi_cache.evict_missing(live_hwnds)
+
                 # SHOW NOTIFICATIONS during rest period (after all window scans complete)
                 if self.pending_notifications:
                     print(f"\n[INFO] Window scan complete. Showing {len(self.pending_notifications)} queued notification(s)...")
@@ -942,8 +1102,9 @@ class OCRAutoApprover:
                     self.pending_notifications.clear()
                     print(f"[INFO] All notifications shown. Check Windows Action Center!\n")
 
-                # Check every 10 seconds (slower to reduce CPU usage)
-                time.sleep(10)
+                # Sleep until the next window is due or a window event wakes us
+                # (at most 1 s so tray pause/resume is picked up quickly)
+                self.scheduler.wait(timeout=1.0)
 
             except Exception as e:
                 print(f"[ERROR] Monitoring error: {e}")
@@ -951,6 +1112,14 @@ class OCRAutoApprover:
 
         print("\n[INFO] Monitoring stopped")
 
+    def save_ocr_cache(self):
+        """Persist the OCR result cache (if a path is set) and learned ROIs (no-op when unchanged)"""
+        try:
+            self.ocr_cache.save()
+            self.roi_cache.save()
+        except OSError as e:
+            print(f"[WARNING] Failed to save OCR/ROI cache: {e}")
+
     def start(self):
         """Start monitoring"""
         if self.running:
@@ -958,6 +1127,7 @@ class OCRAutoApprover:
             return
 
         self.running = True
+        self.ocr_dispatcher.start()
         self.monitor_thread = threading.Thread(target=self.monitor_loop)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
@@ -969,6 +1139,11 @@ class OCRAutoApprover:
         self.running = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=3)
+        self.ocr_dispatcher.stop()
+        # End the Tesseract models loaded on the OCR pool threads
+        (self.engine or ocr_engine.get_engine()).close()
+        self.window_registry.close()
+        self.save_ocr_cache()
         # Stop tray icon
         if self.tray_icon:
             try:
@@ -1107,6 +1282,12 @@ def main():
     else:
         print("[WARNING] System tray not available (install pystray: pip install pystray)")
 
+    # OCR engine - 'capi' keeps the Tesseract model loaded between calls
+    try:
+        print(f"[OK] OCR engine: {ocr_engine.get_engine().name}")
+    except Exception as e:
+        print(f"[WARNING] OCR engine not available: {e}")
+
     approver = OCRAutoApprover(use_tray=True)
 
     try:
@@ -1115,8 +1296,8 @@ def main():
         if windows:
             print(f"\nFound {len(windows)} windows to monitor:")
             for i, win in enumerate(windows, 1):
-                title = win['title']
-                hwnd = win['hwnd']
+                title = win.title
+                hwnd = win.hwnd
                 # Convert to ASCII-safe string for console output
                 try:
                     safe_title = title.encode('ascii', 'ignore').decode('ascii')
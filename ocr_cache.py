@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+OCR Result Cache - content-addressed cache in front of the OCR engine
+Keyed by a hash of the preprocessed image bytes plus language and config, so
+a prompt region that was OCR'd before (same layout, window flipping between
+two states) is never OCR'd again. LRU eviction within a byte budget, optional
+JSON persistence across restarts.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Rough per-entry bookkeeping cost (dict slot, key string, str object headers)
+_ENTRY_OVERHEAD = 128
+
+
+def result_key(img, lang='eng', config='', kind='text'):
+    """Content hash of an OCR request (image pixels, size, mode, lang, config, output kind)"""
+    h = hashlib.blake2b(digest_size=16)
+    suffix = '' if kind == 'text' else f":{kind}"
+    h.update(f"{img.mode}:{img.width}x{img.height}:{lang}:{config}{suffix}\0".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+class OCRResultCache:
+    """LRU {content hash: OCR text} with a byte budget"""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, path=None):
+        """
+        Args:
+            max_bytes: Budget for cached text + keys (approximate)
+            path: JSON file to load from and save() to (None = memory only)
+        """
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries = OrderedDict()  # {key: text}, least recently used first
+        self._bytes = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            self.load()
+
+    @staticmethod
+    def _cost(key, text):
+        return len(key) + len(text.encode('utf-8')) + _ENTRY_OVERHEAD
+
+    def get(self, key):
+        """Cached text for key (marks it recently used), else None"""
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        """Store text for key, evicting least recently used entries over budget"""
+        cost = self._cost(key, text)
+        if cost > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._cost(key, old)
+            self._entries[key] = text
+            self._bytes += cost
+            self._dirty = True
+
+            while self._bytes > self.max_bytes:
+                old_key, old_text = self._entries.popitem(last=False)
+                self._bytes -= self._cost(old_key, old_text)
+                self.evictions += 1
+
+    def image_to_string(self, img, ocr, lang='eng', config=''):
+        """OCR through the cache
+
+        Args:
+            img: Preprocessed PIL Image exactly as it would be sent to OCR
+            ocr: Callable(img, lang=..., config=...) -> text, called on a miss
+        """
+        key = result_key(img, lang, config)
+        text = self.get(key)
+        if text is None:
+            text = ocr(img, lang=lang, config=config)
+            self.put(key, text)
+        return text
+
+    def image_to_data(self, img, ocr_tsv, lang='eng', config=''):
+        """Layout-aware OCR through the cache - the TSV is cached, an OCRResult returned
+
+        Args:
+            img: Preprocessed PIL Image exactly as it would be sent to OCR
+            ocr_tsv: Callable(img, lang=..., config=...) -> Tesseract TSV, called on a miss
+        """
+        from ocr_engine import OCRResult
+
+        key = result_key(img, lang, config, kind='tsv')
+        tsv = self.get(key)
+        if tsv is None:
+            tsv = ocr_tsv(img, lang=lang, config=config)
+            self.put(key, tsv)
+        return OCRResult.from_tsv(tsv)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._dirty = True
+
+    def load(self):
+        """Load entries from path (missing or unreadable file = empty cache)"""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('version') != self.FORMAT_VERSION:
+            return 0
+
+        # Entries are stored least recently used first
+        for key, text in data.get('entries', []):
+            self.put(key, text)
+        with self._lock:
+            self._dirty = False
+            return len(self._entries)
+
+    def save(self, force=False):
+        """Write entries to path (atomic replace); skipped when nothing changed"""
+        if not self.path:
+            return False
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+            data = {'version': self.FORMAT_VERSION, 'entries': list(self._entries.items())}
+            self._dirty = False
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        return True
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self):
+        """Cache counters"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
@@ -0,0 +1,743 @@
+#!/usr/bin/env python3
+"""
+OCR Engine - one OCR interface for all monitors
+Every engine implements OCREngine: batch recognize(images) -> [OCRResult]
+plus image_to_string() for single images and image_to_data() for lines and
+words with confidences and boxes (Tesseract TSV). Tesseract engines, best
+available first:
+    capi        - TessBaseAPI in this process via ctypes (model loaded once
+                  per thread and config)
+    worker      - long-lived helper process hosting TessBaseAPI, images over a pipe
+    pytesseract - spawns tesseract.exe per call (the old behaviour)
+and for tests/benchmarks:
+    fake        - canned text keyed by image hash, no OCR cost
+
+Select with the OCR_ENGINE environment variable or set_engine(); the module
+level image_to_string() is a drop-in replacement for pytesseract's.
+
+Usage:
+    python ocr_engine.py [image]     # show selected engine (and OCR an image)
+    python ocr_engine.py --bench     # per-call latency of each engine
+"""
+import collections
+import ctypes
+import ctypes.util
+import glob
+import os
+import shlex
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+from ocr_cache import result_key
+
+# Tesseract install (UB Mannheim build on Windows)
+TESSERACT_CMD = os.environ.get('TESSERACT_CMD', r'C:\Program Files\Tesseract-OCR\tesseract.exe')
+
+# Tesseract CLI assumes 70 dpi for images without resolution - match it
+DEFAULT_DPI = 70
+
+
+class OCRWord:
+    """One recognized word with its confidence (0-100) and box in image pixels"""
+
+    __slots__ = ('text', 'conf', 'box')
+
+    def __init__(self, text, conf, box):
+        self.text = text
+        self.conf = conf
+        self.box = box  # (left, top, right, bottom)
+
+    def __repr__(self):
+        return f"OCRWord({self.text!r}, conf={self.conf:.0f}, box={self.box})"
+
+
+class OCRLine:
+    """Words of one text line, left to right"""
+
+    __slots__ = ('words',)
+
+    def __init__(self, words):
+        self.words = words
+
+    @property
+    def text(self):
+        return ' '.join(word.text for word in self.words)
+
+    @property
+    def conf(self):
+        """Lowest word confidence - one garbled word makes the line uncertain"""
+        return min((word.conf for word in self.words), default=0.0)
+
+    @property
+    def box(self):
+        return (
+            min(w.box[0] for w in self.words), min(w.box[1] for w in self.words),
+            max(w.box[2] for w in self.words), max(w.box[3] for w in self.words),
+        )
+
+    def shifted(self, dy):
+        """Copy moved down by dy pixels (strip coordinates -> image coordinates)"""
+        return OCRLine([
+            OCRWord(w.text, w.conf, (w.box[0], w.box[1] + dy, w.box[2], w.box[3] + dy))
+            for w in self.words
+        ])
+
+    def __repr__(self):
+        return f"OCRLine({self.text!r}, conf={self.conf:.0f})"
+
+
+class OCRResult:
+    """Recognized text of one image, plus line/word layout when the engine ran in data mode"""
+
+    __slots__ = ('text', 'engine', 'lines', 'size')
+
+    def __init__(self, text, engine=None, lines=None, size=None):
+        self.text = text
+        self.engine = engine
+        self.lines = lines or []
+        self.size = size  # (width, height) of the image the line boxes refer to
+
+    @classmethod
+    def from_tsv(cls, tsv, engine=None):
+        lines = parse_tesseract_tsv(tsv)
+        return cls('\n'.join(line.text for line in lines), engine, lines)
+
+    @property
+    def words(self):
+        return [word for line in self.lines for word in line.words]
+
+    def __repr__(self):
+        return f"OCRResult({self.text!r}, engine={self.engine!r}, lines={len(self.lines)})"
+
+
+def parse_tesseract_tsv(tsv):
+    """Word rows of Tesseract TSV output grouped into lines (reading order)
+
+    Accepts image_to_data output (with header) and TessBaseAPIGetTsvText
+    output (without). Rows without text or with conf -1 are layout-only.
+    """
+    lines = {}
+    for row in tsv.splitlines():
+        fields = row.split('\t')
+        if len(fields) < 12 or not fields[0].isdigit() or fields[0] != '5':
+            continue
+        text = fields[11].strip()
+        conf = float(fields[10])
+        if not text or conf < 0:
+            continue
+        left, top, width, height = (int(v) for v in fields[6:10])
+        key = (int(fields[1]), int(fields[2]), int(fields[3]), int(fields[4]))  # page, block, par, line
+        lines.setdefault(key, []).append(OCRWord(text, conf, (left, top, left + width, top + height)))
+    return [OCRLine(words) for _, words in sorted(lines.items())]
+
+
+class OCREngine:
+    """Interface for OCR engines
+
+    Implement image_to_string(); override recognize() when the engine can
+    batch (results must come back in input order).
+    """
+
+    name = 'base'
+
+    def image_to_string(self, img, lang='eng', config=''):
+        """OCR one PIL Image - returns text"""
+        raise NotImplementedError
+
+    def image_to_tsv(self, img, lang='eng', config=''):
+        """OCR one PIL Image - returns Tesseract TSV (word boxes + confidences)"""
+        raise NotImplementedError
+
+    def image_to_data(self, img, lang='eng', config=''):
+        """OCR one PIL Image - returns OCRResult with lines and words"""
+        return OCRResult.from_tsv(self.image_to_tsv(img, lang=lang, config=config), self.name)
+
+    def recognize(self, images, lang='eng', config=''):
+        """OCR several images - returns [OCRResult] in input order"""
+        return [OCRResult(self.image_to_string(img, lang=lang, config=config), self.name) for img in images]
+
+    def close(self):
+        """Release engine resources"""
+        pass
+
+
+def parse_config(config):
+    """Split a pytesseract config string into (psm, oem, dpi, {variable: value})
+
+    Uses shlex like pytesseract, so quoting/escaping behaves the same.
+    """
+    psm, oem, dpi = 3, 3, DEFAULT_DPI
+    variables = {}
+    tokens = shlex.split(config or '')
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        value = tokens[i + 1] if i + 1 < len(tokens) else None
+        if token == '--psm' and value is not None:
+            psm = int(value)
+            i += 1
+        elif token == '--oem' and value is not None:
+            oem = int(value)
+            i += 1
+        elif token == '--dpi' and value is not None:
+            dpi = int(value)
+            i += 1
+        elif token == '-c' and value is not None and '=' in value:
+            name, _, var_value = value.partition('=')
+            variables[name] = var_value
+            i += 1
+        i += 1
+    return psm, oem, dpi, variables
+
+
+def find_library():
+    """Path of the libtesseract shared library, or None"""
+    path = os.environ.get('TESSERACT_LIBRARY')
+    if path:
+        return path
+
+    if sys.platform == 'win32':
+        install_dir = os.path.dirname(TESSERACT_CMD)
+        matches = sorted(glob.glob(os.path.join(install_dir, 'libtesseract*.dll')), reverse=True)
+        if matches:
+            return matches[0]
+        return ctypes.util.find_library('libtesseract-5') or ctypes.util.find_library('libtesseract-4')
+
+    return ctypes.util.find_library('tesseract')
+
+
+def find_tessdata():
+    """tessdata directory next to the Tesseract install (None = library default)"""
+    if os.environ.get('TESSDATA_PREFIX'):
+        return None  # libtesseract reads it itself
+    tessdata = os.path.join(os.path.dirname(TESSERACT_CMD), 'tessdata')
+    return tessdata if os.path.isdir(tessdata) else None
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def load_library():
+    """Load libtesseract and declare the C API signatures we use (cached)"""
+    global _library
+    with _library_lock:
+        if _library is not None:
+            return _library
+
+        path = find_library()
+        if not path:
+            raise OSError("libtesseract not found (set TESSERACT_LIBRARY)")
+        if sys.platform == 'win32' and os.path.isabs(path):
+            os.add_dll_directory(os.path.dirname(path))  # leptonica and friends
+        lib = ctypes.CDLL(path)
+
+        handle = ctypes.c_void_p
+        lib.TessBaseAPICreate.restype = handle
+        lib.TessBaseAPICreate.argtypes = []
+        lib.TessBaseAPIInit2.restype = ctypes.c_int
+        lib.TessBaseAPIInit2.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+        lib.TessBaseAPISetPageSegMode.restype = None
+        lib.TessBaseAPISetPageSegMode.argtypes = [handle, ctypes.c_int]
+        lib.TessBaseAPISetVariable.restype = ctypes.c_int
+        lib.TessBaseAPISetVariable.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+        lib.TessBaseAPISetImage.restype = None
+        lib.TessBaseAPISetImage.argtypes = [handle, ctypes.c_char_p, ctypes.c_int, ctypes.c_int,
+                                            ctypes.c_int, ctypes.c_int]
+        lib.TessBaseAPISetSourceResolution.restype = None
+        lib.TessBaseAPISetSourceResolution.argtypes = [handle, ctypes.c_int]
+        lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+        lib.TessBaseAPIGetUTF8Text.argtypes = [handle]
+        lib.TessBaseAPIGetTsvText.restype = ctypes.c_void_p
+        lib.TessBaseAPIGetTsvText.argtypes = [handle, ctypes.c_int]
+        lib.TessDeleteText.restype = None
+        lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIClear.restype = None
+        lib.TessBaseAPIClear.argtypes = [handle]
+        lib.TessBaseAPIEnd.restype = None
+        lib.TessBaseAPIEnd.argtypes = [handle]
+        lib.TessBaseAPIDelete.restype = None
+        lib.TessBaseAPIDelete.argtypes = [handle]
+
+        _library = lib
+        return lib
+
+
+def _image_bytes(img):
+    """(bytes, width, height, bytes_per_pixel) for TessBaseAPISetImage"""
+    if img.mode not in ('L', 'RGB'):
+        img = img.convert('RGB')
+    bpp = 1 if img.mode == 'L' else 3
+    return img.tobytes(), img.width, img.height, bpp
+
+
+class TessBaseAPI:
+    """One initialised Tesseract model (not thread-safe - use one per thread)"""
+
+    def __init__(self, lang='eng', config='', datapath=None):
+        self._lib = load_library()
+        self.psm, oem, self.dpi, variables = parse_config(config)
+
+        self._handle = self._lib.TessBaseAPICreate()
+        datapath = datapath or find_tessdata()
+        rc = self._lib.TessBaseAPIInit2(
+            self._handle, datapath.encode() if datapath else None, lang.encode(), oem
+        )
+        if rc != 0:
+            self._lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+            raise RuntimeError(f"Tesseract init failed for language '{lang}'")
+
+        self._lib.TessBaseAPISetPageSegMode(self._handle, self.psm)
+        for name, value in variables.items():
+            self._lib.TessBaseAPISetVariable(self._handle, name.encode(), value.encode())
+
+    def recognize(self, img, tsv=False):
+        """OCR a PIL Image - returns UTF-8 text (or TSV with tsv=True)"""
+        return self.recognize_raw(*_image_bytes(img), tsv=tsv)
+
+    def recognize_raw(self, data, width, height, bpp, tsv=False):
+        """OCR raw 8-bit gray (bpp=1) or RGB (bpp=3) pixels"""
+        if not self._handle:
+            raise RuntimeError("Tesseract model already ended")
+        lib = self._lib
+        lib.TessBaseAPISetImage(self._handle, data, width, height, bpp, width * bpp)
+        lib.TessBaseAPISetSourceResolution(self._handle, self.dpi)
+        if tsv:
+            text_ptr = lib.TessBaseAPIGetTsvText(self._handle, 0)
+        else:
+            text_ptr = lib.TessBaseAPIGetUTF8Text(self._handle)
+        try:
+            text = ctypes.string_at(text_ptr).decode('utf-8', errors='replace') if text_ptr else ''
+        finally:
+            if text_ptr:
+                lib.TessDeleteText(text_ptr)
+            lib.TessBaseAPIClear(self._handle)
+        return text
+
+    def end(self):
+        if self._handle:
+            self._lib.TessBaseAPIEnd(self._handle)
+            self._lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+
+    def __del__(self):
+        try:
+            self.end()
+        except Exception:
+            pass
+
+
+class CAPIEngine(OCREngine):
+    """In-process engine - one TessBaseAPI per (thread, lang, config)
+
+    Every instance is also kept in a registry so close() can end the ones
+    loaded on dispatcher and pool threads (a model in the middle of a call is
+    ended when the call returns); a thread keeps at most max_configs models
+    (least recently used ones are ended), and models of threads that have
+    exited are ended when the next one is loaded.
+    """
+
+    name = 'capi'
+
+    def __init__(self, max_configs=4, api_class=TessBaseAPI):
+        """
+        Args:
+            max_configs: (lang, config) models kept per thread
+            api_class: TessBaseAPI or a stand-in with the same (lang, config) / end() interface
+        """
+        if api_class is TessBaseAPI:
+            load_library()  # fail early if the library is missing
+        self.max_configs = max_configs
+        self.api_class = api_class
+        self._local = threading.local()
+        self._apis = {}  # {(thread id, lang, config): api} - every live model
+        self._generation = 0  # Bumped by close(): thread-local caches from before are stale
+        self._busy = set()  # Models inside a recognize call
+        self._closing = set()  # Busy models close() left to end after their call
+        self._lock = threading.Lock()
+
+    def _thread_apis(self):
+        """This thread's {(lang, config): api}, reset after close() (call under _lock)"""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            local.apis = collections.OrderedDict()
+            local.generation = self._generation
+        return local.apis
+
+    def _acquire(self, lang, config):
+        """This thread's model for (lang, config), marked busy - close() leaves
+        busy models to _release, so lookup and marking happen under one lock"""
+        key = (lang, config)
+        with self._lock:
+            apis = self._thread_apis()
+            api = apis.get(key)
+            if api is not None:
+                apis.move_to_end(key)
+                self._busy.add(api)
+                return api
+
+        api = self.api_class(lang, config)  # Model load: outside the lock
+        thread = threading.get_ident()
+        retired = []
+        with self._lock:
+            apis = self._thread_apis()  # Fresh if close() ran while loading
+            apis[key] = api
+            if len(apis) > self.max_configs:
+                old_key, old_api = apis.popitem(last=False)  # Least recently used model of this thread
+                self._apis.pop((thread,) + old_key, None)
+                retired.append(old_api)
+            # Same key already registered: a model of an exited thread whose id was reused
+            previous = self._apis.pop((thread,) + key, None)
+            if previous is not None:
+                retired.append(previous)
+            self._apis[(thread,) + key] = api
+            alive = {t.ident for t in threading.enumerate()}
+            for gone in [k for k in self._apis if k[0] not in alive]:
+                retired.append(self._apis.pop(gone))
+            self._busy.add(api)
+        for old_api in retired:
+            old_api.end()
+        return api
+
+    def _release(self, api):
+        """End of a call - ends the model if close() ran meanwhile"""
+        with self._lock:
+            self._busy.discard(api)
+            closed = api in self._closing
+            self._closing.discard(api)
+        if closed:
+            api.end()
+
+    def _recognize(self, img, lang, config, tsv):
+        api = self._acquire(lang, config)
+        try:
+            return api.recognize(img, tsv=tsv)
+        finally:
+            self._release(api)
+
+    def image_to_string(self, img, lang='eng', config=''):
+        return self._recognize(img, lang, config, tsv=False)
+
+    def image_to_tsv(self, img, lang='eng', config=''):
+        return self._recognize(img, lang, config, tsv=True)
+
+    def resident(self):
+        """Number of loaded models over all threads"""
+        with self._lock:
+            return len(self._apis)
+
+    def close(self):
+        """End the models of every thread"""
+        with self._lock:
+            apis = [api for api in self._apis.values() if api not in self._busy]
+            self._closing.update(api for api in self._apis.values() if api in self._busy)
+            self._apis.clear()
+            self._generation += 1
+        for api in apis:
+            api.end()
+
+
+# Worker pipe protocol (little endian):
+#   request:  width, height, bpp, tsv flag, lang length, config length (6 x uint32),
+#             lang, config (UTF-8), pixels
+#   response: status (uint8, 0 = ok), length (uint32), UTF-8 text or error
+_REQUEST_HEADER = struct.Struct('<6I')
+_RESPONSE_HEADER = struct.Struct('<BI')
+
+
+def _read_exact(stream, size):
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise EOFError("OCR worker pipe closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def write_request(stream, data, width, height, bpp, lang, config, tsv=False):
+    lang_bytes, config_bytes = lang.encode(), config.encode()
+    stream.write(_REQUEST_HEADER.pack(width, height, bpp, int(tsv), len(lang_bytes), len(config_bytes)))
+    stream.write(lang_bytes)
+    stream.write(config_bytes)
+    stream.write(data)
+    stream.flush()
+
+
+def read_request(stream):
+    width, height, bpp, tsv, lang_len, config_len = _REQUEST_HEADER.unpack(
+        _read_exact(stream, _REQUEST_HEADER.size)
+    )
+    lang = _read_exact(stream, lang_len).decode()
+    config = _read_exact(stream, config_len).decode()
+    data = _read_exact(stream, width * height * bpp)
+    return data, width, height, bpp, lang, config, bool(tsv)
+
+
+def write_response(stream, text, ok=True):
+    payload = text.encode('utf-8')
+    stream.write(_RESPONSE_HEADER.pack(0 if ok else 1, len(payload)))
+    stream.write(payload)
+    stream.flush()
+
+
+def read_response(stream):
+    """Text from the worker - raises RuntimeError if the worker reported an error"""
+    status, length = _RESPONSE_HEADER.unpack(_read_exact(stream, _RESPONSE_HEADER.size))
+    text = _read_exact(stream, length).decode('utf-8')
+    if status != 0:
+        raise RuntimeError(f"OCR worker error: {text}")
+    return text
+
+
+def worker_main(stdin=None, stdout=None):
+    """Serve OCR requests until stdin closes (runs inside the helper process)"""
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    apis = {}
+    try:
+        while True:
+            try:
+                data, width, height, bpp, lang, config, tsv = read_request(stdin)
+            except EOFError:
+                break
+            try:
+                api = apis.get((lang, config))
+                if api is None:
+                    api = apis[(lang, config)] = TessBaseAPI(lang, config)
+                write_response(stdout, api.recognize_raw(data, width, height, bpp, tsv=tsv))
+            except Exception as e:
+                write_response(stdout, str(e), ok=False)
+    finally:
+        for api in apis.values():
+            api.end()
+
+
+class TesseractWorker(OCREngine):
+    """Client for one long-lived OCR helper process (started on first use)"""
+
+    name = 'worker'
+
+    def __init__(self):
+        self._process = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--worker'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            creationflags=creationflags
+        )
+
+    def image_to_string(self, img, lang='eng', config=''):
+        return self._request(img, lang, config, tsv=False)
+
+    def image_to_tsv(self, img, lang='eng', config=''):
+        return self._request(img, lang, config, tsv=True)
+
+    def _request(self, img, lang, config, tsv):
+        data, width, height, bpp = _image_bytes(img)
+        with self._lock:
+            for attempt in range(2):
+                if self._process is None or self._process.poll() is not None:
+                    self._start()
+                try:
+                    write_request(self._process.stdin, data, width, height, bpp, lang, config, tsv)
+                    return read_response(self._process.stdout)
+                except (EOFError, OSError):
+                    # Worker died - restart once
+                    self._kill()
+                    if attempt:
+                        raise
+
+    def _kill(self):
+        if self._process is not None:
+            try:
+                self._process.kill()
+                self._process.wait(timeout=2)
+            except Exception:
+                pass
+            self._process = None
+
+    def close(self):
+        with self._lock:
+            if self._process is not None:
+                try:
+                    self._process.stdin.close()
+                    self._process.wait(timeout=2)
+                except Exception:
+                    pass
+                self._kill()
+
+
+class PytesseractEngine(OCREngine):
+    """pytesseract - one tesseract process per call"""
+
+    name = 'pytesseract'
+
+    def __init__(self):
+        import pytesseract
+        if os.path.exists(TESSERACT_CMD):
+            pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+        self._pytesseract = pytesseract
+
+    def image_to_string(self, img, lang='eng', config=''):
+        return self._pytesseract.image_to_string(img, lang=lang, config=config)
+
+    def image_to_tsv(self, img, lang='eng', config=''):
+        return self._pytesseract.image_to_data(img, lang=lang, config=config)
+
+
+class FakeOCREngine(OCREngine):
+    """Deterministic engine - canned text keyed by image hash
+
+    Register the images exactly as the engine will receive them (i.e. after
+    preprocessing). Unknown images return default.
+    """
+
+    name = 'fake'
+
+    def __init__(self, responses=None, default='', latency=0.0):
+        """
+        Args:
+            responses: {image hash (see key()): text}
+            default: Text for images that were not registered
+            latency: Simulated seconds per image
+        """
+        self.responses = dict(responses or {})
+        self.default = default
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(img):
+        return result_key(img)
+
+    def add(self, img, text):
+        """Return text whenever this exact image is recognized"""
+        self.responses[self.key(img)] = text
+
+    def image_to_string(self, img, lang='eng', config=''):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.responses.get(self.key(img), self.default)
+
+    def image_to_tsv(self, img, lang='eng', config=''):
+        """Canned text laid out as TSV: one 20px row per line, 10px per character, conf 95"""
+        text = self.image_to_string(img, lang=lang, config=config)
+        rows = []
+        for line_num, line in enumerate(text.split('\n'), 1):
+            x = 0
+            for word_num, word in enumerate(line.split(' '), 1):
+                if word:
+                    top = (line_num - 1) * 20
+                    rows.append(f"5\t1\t1\t1\t{line_num}\t{word_num}\t{x}\t{top}\t{len(word) * 10}\t16\t95\t{word}")
+                x += (len(word) + 1) * 10
+        return '\n'.join(rows)
+
+
+ENGINES = {
+    'capi': CAPIEngine,
+    'worker': TesseractWorker,
+    'pytesseract': PytesseractEngine,
+    'fake': FakeOCREngine,
+}
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def create_engine(name=None):
+    """Create an OCR engine by name, or the best available one
+
+    Args:
+        name: Key of ENGINES (default: OCR_ENGINE env var, else capi if
+            libtesseract loads, otherwise pytesseract)
+    """
+    name = name or os.environ.get('OCR_ENGINE')
+    if name:
+        if name not in ENGINES:
+            raise ValueError(f"Unknown OCR engine '{name}' (choose from {', '.join(ENGINES)})")
+        return ENGINES[name]()
+
+    try:
+        return CAPIEngine()
+    except OSError:
+        return PytesseractEngine()
+
+
+def get_engine():
+    """Shared OCR engine (created on first use)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine()
+        return _engine
+
+
+def set_engine(engine):
+    """Replace the shared OCR engine"""
+    global _engine
+    with _engine_lock:
+        _engine = engine
+
+
+def image_to_string(img, lang='eng', config=''):
+    """Drop-in replacement for pytesseract.image_to_string using the shared engine"""
+    return get_engine().image_to_string(img, lang=lang, config=config)
+
+
+def image_to_data(img, lang='eng', config=''):
+    """OCRResult with line/word layout using the shared engine"""
+    return get_engine().image_to_data(img, lang=lang, config=config)
+
+
+def recognize(images, lang='eng', config=''):
+    """Batch OCR with the shared engine - [OCRResult] in input order"""
+    return get_engine().recognize(images, lang=lang, config=config)
+
+
+def benchmark(repeat=10):
+    """Per-call latency of each available engine on a rendered approval prompt"""
+    from ocr_fixtures import FIXTURES, render_terminal
+
+    img = render_terminal(FIXTURES[0]['lines'], size=(1200, 300)).convert('L')
+    config = r'--psm 6 --oem 3'
+    for name, factory in ENGINES.items():
+        if name == 'fake':
+            continue
+        try:
+            engine = factory()
+            engine.image_to_string(img, config=config)  # model load / worker start
+        except Exception as e:
+            print(f"{name:<8} unavailable ({e})")
+            continue
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            engine.image_to_string(img, config=config)
+        elapsed = (time.perf_counter() - start) * 1000 / repeat
+        engine.close()
+        print(f"{name:<8} {elapsed:8.1f} ms/call")
+
+
+if __name__ == "__main__":
+    if '--worker' in sys.argv:
+        worker_main()
+    elif '--bench' in sys.argv:
+        benchmark()
+    else:
+        engine = get_engine()
+        print(f"OCR engine: {engine.name}")
+        if len(sys.argv) > 1:
+            from PIL import Image
+            print(image_to_string(Image.open(sys.argv[1])))
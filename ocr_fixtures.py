@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+OCR Fixtures - detection fixture corpus for tests and benchmarks
+Synthetic terminal frames rendered with PIL (deterministic), or real captures
+loaded from a directory of PNGs with an expected.json next to them
+"""
+import json
+import os
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Each fixture: lines drawn at the bottom of a terminal, whether it is an
+# approval prompt, and the option key the approver should send
+FIXTURES = [
+    {
+        'name': 'claude_proceed',
+        'lines': [
+            '> Bash(npm test)',
+            '',
+            'Do you want to proceed?',
+            '> 1. Yes',
+            "  2. Yes, and don't ask again for npm commands in this project",
+            '  3. No, and tell Claude what to do differently (esc)',
+        ],
+        'approval': True,
+        'key': '2',
+    },
+    {
+        'name': 'claude_edit',
+        'lines': [
+            'Edit file src/main.py',
+            '',
+            'Do you want to make this edit to main.py?',
+            '> 1. Yes',
+            '  2. Yes, allow all edits during this session (shift+tab)',
+            '  3. No, and tell Claude what to do differently (esc)',
+        ],
+        'approval': True,
+        'key': '2',
+    },
+    {
+        'name': 'trust_folder',
+        'lines': [
+            'Do you trust the files in this folder?',
+            'Is this a project you created or one you trust?',
+            '> 1. Yes, proceed',
+            '  2. No, exit',
+        ],
+        'approval': True,
+        'key': '1',
+    },
+    {
+        'name': 'shell_idle',
+        'lines': [
+            'user@host MINGW64 ~/project (main)',
+            '$ git status',
+            'On branch main',
+            'nothing to commit, working tree clean',
+            '$',
+        ],
+        'approval': False,
+        'key': None,
+    },
+    {
+        'name': 'numbered_notes',
+        'lines': [
+            'TODO',
+            '1. refactor capture',
+            '2. write docs',
+            'Build finished in 2.1s',
+        ],
+        'approval': False,
+        'key': None,
+    },
+    {
+        'name': 'plan_then_proceed',
+        'lines': [
+            'Plan:',
+            '1. Create the config',
+            '2. Run tests',
+            '',
+            'Do you want to proceed?',
+            '> 1. Yes',
+            '  2. No',
+        ],
+        'approval': True,
+        'key': '1',
+    },
+    {
+        'name': 'boxed_proceed',
+        'lines': [
+            '+----------------------------------------------+',
+            '| Bash command                                 |',
+            '|   rm -rf build                               |',
+            '| Do you want to proceed?                      |',
+            '| > 1. Yes                                     |',
+            "|   2. Yes, and don't ask again for rm         |",
+            '|   3. No, and tell Claude what to do          |',
+            '+----------------------------------------------+',
+        ],
+        'approval': True,
+        'key': '2',
+    },
+]
+
+
+def render_terminal(lines, size=(1000, 600), background=(12, 12, 12), foreground=(220, 220, 220),
+                    line_height=18, margin=12, box=False, font_size=None):
+    """Render lines at the bottom of a dark terminal-like frame
+
+    font_size picks a scalable default font (Pillow >= 10.1) instead of the
+    small built-in one; line_height should grow with it.
+    """
+    img = Image.new('RGB', size, background)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(font_size) if font_size else ImageFont.load_default()
+
+    top = size[1] - margin - line_height * len(lines)
+    for i, line in enumerate(lines):
+        draw.text((margin, top + i * line_height), line, fill=foreground, font=font)
+
+    if box:
+        draw.rectangle(
+            (margin // 2, top - line_height // 2, size[0] - margin // 2, size[1] - margin // 2),
+            outline=foreground
+        )
+    return img
+
+
+def synthetic_corpus(sizes=((1000, 600), (1600, 900)), font_size=None):
+    """Rendered fixtures at a few window sizes"""
+    line_height = round(font_size * 1.4) if font_size else 18
+    corpus = []
+    for width, height in sizes:
+        for fixture in FIXTURES:
+            img = render_terminal(fixture['lines'], size=(width, height), box=fixture['approval'],
+                                  line_height=line_height, font_size=font_size)
+            corpus.append((f"{fixture['name']}_{width}x{height}", img, fixture))
+    return corpus
+
+
+def load_fixture_corpus(directory=None):
+    """Fixture corpus as [(name, PIL Image, expected)]
+
+    Args:
+        directory: Folder of real captures (*.png) with expected.json mapping
+            name -> {"approval": bool, "key": "1"/"2"/null}. Synthetic
+            fixtures are used when no directory is given.
+    """
+    if not directory:
+        return synthetic_corpus()
+
+    expected_path = os.path.join(directory, 'expected.json')
+    expected = {}
+    if os.path.exists(expected_path):
+        with open(expected_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+
+    corpus = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.lower().endswith('.png'):
+            continue
+        name = os.path.splitext(filename)[0]
+        img = Image.open(os.path.join(directory, filename)).convert('RGB')
+        info = dict(expected.get(name, {}))
+        info.setdefault('name', name)
+        corpus.append((name, img, info))
+    return corpus
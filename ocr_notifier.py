@@ -7,19 +7,18 @@ import sys
 import time
 import threading
 import win32gui
-import win32ui
 import win32con
 import win32console
 import winsound
-from PIL import Image
-import pytesseract
 import io
 from winotify import Notification, audio
+from window_capture import get_window_capture
+import ocr_engine
+from keyword_matcher import KeywordMatcher
 
 # No UTF-8 configuration - use ASCII only for output to avoid encoding issues
 
-# Tesseract 경로 설정
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Tesseract 경로/엔진 설정: ocr_engine (TESSERACT_CMD, OCR_ENGINE 환경 변수)
 
 
 class OCRNotifier:
@@ -48,6 +47,10 @@ class OCRNotifier:
         # Exclude keywords
         self.exclude_keywords = ['readme', '.md', '.txt', '.py', 'editor']
 
+        # Keyword lists compiled once
+        self.approval_matcher = KeywordMatcher(self.approval_patterns)
+        self.exclude_matcher = KeywordMatcher(self.exclude_keywords)
+
         # Duplicate prevention - track per window
         self.last_notification_per_window = {}
         self.min_notification_interval = 15  # Notify once per 15 seconds per window
@@ -67,8 +70,7 @@ class OCRNotifier:
                 title = win32gui.GetWindowText(hwnd)
                 if title:  # 현재 창도 포함
                     # 제외 키워드 확인
-                    title_lower = title.lower()
-                    is_excluded = any(exc in title_lower for exc in self.exclude_keywords)
+                    is_excluded = bool(self.exclude_matcher.match_ids(title))
 
                     if not is_excluded:
                         windows.append({'hwnd': hwnd, 'title': title})
@@ -82,60 +84,15 @@ class OCRNotifier:
         return windows
 
     def capture_window(self, hwnd):
-        """창 스크린샷 캡처"""
-        try:
-            # 창 크기 가져오기
-            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
-            width = right - left
-            height = bottom - top
-
-            # 최소 크기 확인
-            if width < 100 or height < 100:
-                return None
-
-            # 디바이스 컨텍스트
-            hwndDC = win32gui.GetWindowDC(hwnd)
-            mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-            saveDC = mfcDC.CreateCompatibleDC()
-
-            # 비트맵 생성
-            saveBitMap = win32ui.CreateBitmap()
-            saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-            saveDC.SelectObject(saveBitMap)
-
-            # 화면 복사
-            saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
-
-            # PIL Image로 변환
-            bmpinfo = saveBitMap.GetInfo()
-            bmpstr = saveBitMap.GetBitmapBits(True)
-            img = Image.frombuffer(
-                'RGB',
-                (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                bmpstr, 'raw', 'BGRX', 0, 1
-            )
-
-            # 정리
-            win32gui.DeleteObject(saveBitMap.GetHandle())
-            saveDC.DeleteDC()
-            mfcDC.DeleteDC()
-            win32gui.ReleaseDC(hwnd, hwndDC)
-
-            return img
-
-        except Exception:
-            return None
+        """창 스크린샷 캡처 (공유 캡처 풀 사용)"""
+        # 하단 30% 영역만 캡처 (최근 출력 부분)
+        return get_window_capture().capture(hwnd, min_width=100, min_height=100, region=(0.0, 0.7, 1.0, 1.0))
 
     def extract_text_from_image(self, img):
         """이미지에서 텍스트 추출 (OCR)"""
         try:
-            # 이미지 하단 일부만 (최근 출력 부분)
-            width, height = img.size
-            # 하단 30% 영역만 크롭
-            bottom_region = img.crop((0, int(height * 0.7), width, height))
-
-            # OCR 수행
-            text = pytesseract.image_to_string(bottom_region, lang='eng')
+            # 캡처 단계에서 이미 하단 30% 영역만 가져옴
+            text = ocr_engine.image_to_string(img, lang='eng')
             return text
 
         except Exception:
@@ -146,12 +103,7 @@ class OCRNotifier:
         if not text:
             return False
 
-        text_lower = text.lower()
-        for pattern in self.approval_patterns:
-            if pattern.lower() in text_lower:
-                return True
-
-        return False
+        return bool(self.approval_matcher.match_ids(text))
 
     def should_notify(self, hwnd):
         """알림을 보내야 하는지 확인 (중복 방지)"""
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+OCR Preprocess - NumPy preprocessing engine for OCR frames
+Replaces the PIL chain (convert('L') -> Contrast(2.0) -> SHARPEN -> LANCZOS upscale)
+with a lookup-table contrast and a separable NumPy sharpen on reusable per-thread
+buffers. Output is pixel-identical to the PIL chain for the default LANCZOS
+resampling (see bench_preprocess.py).
+"""
+import threading
+
+import numpy as np
+from PIL import Image
+
+# Cheaper resampling choices for the final upscale (LANCZOS matches the old chain)
+RESAMPLE_FILTERS = {
+    'lanczos': Image.LANCZOS,
+    'bicubic': Image.BICUBIC,
+    'bilinear': Image.BILINEAR,
+    'box': Image.BOX,
+    'nearest': Image.NEAREST,
+}
+
+
+class PreprocessEngine:
+    """Grayscale + contrast + sharpen + upscale with per-thread scratch buffers"""
+
+    def __init__(self, contrast=2.0, sharpen=True, target_width=1200, resample='lanczos'):
+        if resample not in RESAMPLE_FILTERS and resample != 'none':
+            raise ValueError(f"Unknown resample '{resample}' (choose from {', '.join(RESAMPLE_FILTERS)}, none)")
+
+        self.contrast = contrast
+        self.sharpen = sharpen
+        self.target_width = target_width
+        self.resample = resample
+        self._local = threading.local()
+
+    def _scratch(self, name, shape, dtype):
+        """Reusable buffer - reallocated only when the frame size changes"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        buf = buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = buffers[name] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def to_gray(self, src):
+        """Grayscale PIL Image from a Frame (BGRX), PIL Image or ndarray
+
+        Pillow's C unpacker decodes BGRX straight from the capture buffer and
+        converts to L faster than strided NumPy channel math.
+        """
+        if hasattr(src, 'data') and hasattr(src, 'to_image'):
+            src = src.to_image()
+        elif isinstance(src, np.ndarray):
+            src = Image.fromarray(src)
+        return src if src.mode == 'L' else src.convert('L')
+
+    def apply_contrast(self, gray):
+        """ImageEnhance.Contrast as a single 256-entry lookup table
+
+        Same mean and truncation as Contrast + Image.blend, without building the
+        flat mean image and blending it.
+        """
+        if self.contrast == 1.0:
+            return gray
+
+        # Exact integer sum (ImageStat's mean, cheaper than a histogram)
+        total = int(np.asarray(gray).sum(dtype=np.uint64))
+        mean = int(total / (gray.width * gray.height) + 0.5)
+        lut = [min(255, max(0, int(mean + self.contrast * (i - mean)))) for i in range(256)]
+        return gray.point(lut)
+
+    def apply_sharpen(self, gray):
+        """PIL SHARPEN kernel as a separable 3x3 box sum on int16 scratch buffers
+
+        SHARPEN = (32*c - 2*sum(8 neighbours)) / 16 = (17*c - box3x3 + 4) >> 3,
+        border pixels unchanged. Returns a scratch buffer.
+        """
+        pixels = np.asarray(gray)
+        height, width = pixels.shape
+        out = self._scratch('sharpened', (height, width), np.uint8)
+        np.copyto(out, pixels)
+        if height < 3 or width < 3:
+            return out
+
+        rows = self._scratch('rows', (height, width - 2), np.int16)
+        np.add(pixels[:, :-2], pixels[:, 1:-1], out=rows, dtype=np.int16)
+        rows += pixels[:, 2:]
+
+        box = self._scratch('box', (height - 2, width - 2), np.int16)
+        np.add(rows[:-2], rows[1:-1], out=box)
+        box += rows[2:]
+
+        center = self._scratch('center', box.shape, np.int16)
+        np.multiply(pixels[1:-1, 1:-1], 17, out=center, dtype=np.int16)
+        center -= box
+        center += 4
+        center >>= 3
+        np.clip(center, 0, 255, out=center)
+        np.copyto(out[1:-1, 1:-1], center, casting='unsafe')
+        return out
+
+    def enhance(self, gray):
+        """Contrast then sharpen - returns a uint8 array (scratch buffer when sharpening)"""
+        gray = self.apply_contrast(gray)
+        if not self.sharpen:
+            return np.asarray(gray)
+        return self.apply_sharpen(gray)
+
+    def upscale(self, gray):
+        """Upscale narrow frames to target_width (larger text = better recognition)"""
+        height, width = gray.shape
+        if self.resample == 'none' or not self.target_width or width >= self.target_width:
+            return Image.fromarray(gray.copy())  # detach from scratch buffer
+
+        scale_factor = self.target_width / width
+        new_size = (int(width * scale_factor), int(height * scale_factor))
+        return Image.fromarray(gray).resize(new_size, RESAMPLE_FILTERS[self.resample])
+
+    def process(self, src):
+        """Full preprocessing - returns a grayscale PIL Image ready for OCR"""
+        return self.upscale(self.enhance(self.to_gray(src)))
+
+
+def pil_preprocess(img, target_width=1200):
+    """The original PIL chain from extract_text_from_image (reference for benchmarks)"""
+    from PIL import ImageEnhance, ImageFilter
+
+    img = img.convert('L')
+    img = ImageEnhance.Contrast(img).enhance(2.0)
+    img = img.filter(ImageFilter.SHARPEN)
+
+    width, height = img.size
+    if width < target_width:
+        scale_factor = target_width / width
+        new_size = (int(width * scale_factor), int(height * scale_factor))
+        img = img.resize(new_size, Image.LANCZOS)
+    return img
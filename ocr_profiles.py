@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+OCR Profiles - per-window-class OCR settings
+A profile sets the Tesseract page segmentation mode, character whitelist and
+language, the target glyph height the capture is scaled to (instead of a fixed
+1200px width - wide terminals with big fonts are scaled down, not OCR'd at
+several times the resolution they need) and an optional binarization
+threshold. Profiles are looked up by the same process|class key as learned
+ROIs (roi_cache.roi_key), falling back to class-only, process-only and the
+default profile, which reproduces the old fixed settings.
+
+The autotune command OCRs a fixture corpus with every candidate profile and
+stores the cheapest one that still detects every fixture correctly.
+
+Usage:
+    python ocr_profiles.py show
+    python ocr_profiles.py autotune --key "windowsterminal.exe|CASCADIA_HOSTING_WINDOW_CLASS" --fixtures captures/wt
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from approval_matcher import match_prompt
+from ocr_preprocess import PreprocessEngine
+
+# Characters the fast-mode OCR pass has always been restricted to
+FAST_WHITELIST = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,?!():-'"
+
+# Scale factors outside this range are clamped (bad glyph estimates)
+_MIN_SCALE, _MAX_SCALE = 0.4, 4.0
+
+
+def measure_glyph_height(pixels, tolerance=48, min_height=4):
+    """Median height in pixels of the text lines in a grayscale array, or None
+
+    Text lines are runs of rows with ink (pixels far from the background
+    level) across more than 1% of the width - box borders and other thin
+    vertical rules do not count.
+    """
+    background = np.median(pixels[::4, ::4])
+    ink = np.abs(pixels.astype(np.int16) - int(background)) > tolerance
+    rows = ink.sum(axis=1) >= max(4, pixels.shape[1] // 100)
+    if not rows.any():
+        return None
+    # Run lengths of consecutive text rows
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.view(np.int8), [0]))))
+    heights = edges[1::2] - edges[::2]
+    heights = heights[heights >= min_height]
+    return float(np.median(heights)) if heights.size else None
+
+
+def _escape(value):
+    """Backslash-escape quotes and spaces for Tesseract's shlex-split config"""
+    return ''.join('\\' + ch if ch in '\'" \\' else ch for ch in value)
+
+
+class OCRProfile:
+    """OCR settings for one window class"""
+
+    __slots__ = ('name', 'psm', 'oem', 'whitelist', 'lang', 'glyph_height', 'target_width',
+                 'binarize', '_preprocessor')
+
+    def __init__(self, name, psm=6, oem=3, whitelist=FAST_WHITELIST, lang='eng',
+                 glyph_height=None, target_width=1200, binarize=None):
+        """
+        Args:
+            psm: Tesseract page segmentation mode
+            whitelist: Allowed characters (None = all)
+            glyph_height: Scale captures so text lines are this many pixels
+                tall; None = upscale narrow captures to target_width instead
+            binarize: Gray level threshold applied after scaling (None = off)
+        """
+        self.name = name
+        self.psm = psm
+        self.oem = oem
+        self.whitelist = whitelist
+        self.lang = lang
+        self.glyph_height = glyph_height
+        self.target_width = target_width
+        self.binarize = binarize
+        self._preprocessor = PreprocessEngine(target_width=0 if glyph_height else target_width)
+
+    @property
+    def config(self):
+        """Tesseract config string"""
+        config = f"--psm {self.psm} --oem {self.oem}"
+        if self.whitelist:
+            config += f" -c tessedit_char_whitelist={_escape(self.whitelist)}"
+        return config
+
+    def scale_for(self, pixels):
+        """Resize factor that brings the text in pixels to glyph_height"""
+        measured = measure_glyph_height(pixels)
+        if not measured:
+            return 1.0
+        return min(_MAX_SCALE, max(_MIN_SCALE, self.glyph_height / measured))
+
+    def prepare(self, src):
+        """Preprocessed grayscale PIL Image for OCR (Frame, PIL Image or ndarray in)"""
+        pre = self._preprocessor
+        pixels = pre.enhance(pre.to_gray(src))
+
+        if self.glyph_height:
+            scale = self.scale_for(pixels)
+            height, width = pixels.shape
+            if abs(scale - 1.0) < 0.05:
+                img = Image.fromarray(pixels.copy())  # detach from scratch buffer
+            else:
+                size = (max(1, int(width * scale)), max(1, int(height * scale)))
+                img = Image.fromarray(pixels).resize(size, Image.LANCZOS)
+        else:
+            img = pre.upscale(pixels)
+
+        if self.binarize is not None:
+            img = img.point([255 if i > self.binarize else 0 for i in range(256)])
+        return img
+
+    def to_dict(self):
+        return {
+            'name': self.name, 'psm': self.psm, 'oem': self.oem, 'whitelist': self.whitelist,
+            'lang': self.lang, 'glyph_height': self.glyph_height, 'target_width': self.target_width,
+            'binarize': self.binarize,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __repr__(self):
+        scale = f"glyph={self.glyph_height}px" if self.glyph_height else f"width={self.target_width}px"
+        return (f"OCRProfile({self.name!r}, psm={self.psm}, {scale}, binarize={self.binarize}, "
+                f"whitelist={'yes' if self.whitelist else 'no'})")
+
+
+DEFAULT_PROFILE = OCRProfile('default')
+
+# Every window class starts on the default profile (the old fixed settings);
+# per-class profiles come from autotune runs on real captures (ocr_profiles.json)
+BUILTIN_PROFILES = {
+    '*': DEFAULT_PROFILE,
+}
+
+
+class ProfileTable:
+    """{process|class key: OCRProfile} with fallbacks and JSON persistence"""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: JSON file with tuned profiles (None = builtin profiles only)
+        """
+        self.path = path
+        self._profiles = dict(BUILTIN_PROFILES)
+        self._tuned = {}  # Entries that came from load()/set() - the ones save() writes
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def lookup(self, key):
+        """Profile for a window key: exact, then class only, then process only, then default"""
+        process, _, class_name = key.partition('|')
+        for candidate in (key, f"*|{class_name}", f"{process}|*", '*'):
+            profile = self._profiles.get(candidate)
+            if profile is not None:
+                return profile
+        return DEFAULT_PROFILE
+
+    def set(self, key, profile):
+        with self._lock:
+            self._profiles[key] = profile
+            self._tuned[key] = profile
+
+    def items(self):
+        return sorted(self._profiles.items())
+
+    def load(self):
+        """Load tuned profiles from path (missing or unreadable file = builtins only)"""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.FORMAT_VERSION:
+                return 0
+            profiles = {key: OCRProfile.from_dict(entry) for key, entry in data.get('profiles', {}).items()}
+        except (OSError, ValueError, TypeError):
+            return 0
+        with self._lock:
+            self._profiles.update(profiles)
+            self._tuned.update(profiles)
+        return len(profiles)
+
+    def save(self):
+        """Write tuned profiles to path (atomic replace)"""
+        if not self.path:
+            return False
+        with self._lock:
+            data = {
+                'version': self.FORMAT_VERSION,
+                'profiles': {key: profile.to_dict() for key, profile in sorted(self._tuned.items())},
+            }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
+        return True
+
+
+def candidate_profiles():
+    """Autotune search space, roughly cheapest first"""
+    candidates = []
+    for glyph_height in (14, 18, 22, 28, None):
+        for psm in (6, 4):
+            for binarize in (None, 110):
+                for whitelist in (FAST_WHITELIST, None):
+                    name = (f"psm{psm}-{f'g{glyph_height}' if glyph_height else 'w1200'}"
+                            f"{'-bin' if binarize is not None else ''}{'' if whitelist else '-nowl'}")
+                    candidates.append(OCRProfile(name, psm=psm, whitelist=whitelist,
+                                                 glyph_height=glyph_height, binarize=binarize))
+    return candidates
+
+
+def fixture_passes(result, expected):
+    """Does an OCRResult support the fixture's expected detection?
+
+    Approval fixtures need a layout match and the expected option read;
+    other fixtures must not match.
+    """
+    verdict, options = match_prompt(result.lines)
+    if not expected.get('approval'):
+        return verdict is not True
+    key = expected.get('key')
+    return verdict is True and (key is None or bool(options.get(key)))
+
+
+class TuneResult:
+    """Outcome of one candidate profile over a fixture corpus"""
+
+    __slots__ = ('profile', 'failed', 'ocr_ms', 'pixels')
+
+    def __init__(self, profile, failed, ocr_ms, pixels):
+        self.profile = profile
+        self.failed = failed
+        self.ocr_ms = ocr_ms
+        self.pixels = pixels
+
+    @property
+    def passed(self):
+        return not self.failed
+
+
+def autotune(corpus, ocr_data, candidates=None, cost='time'):
+    """Cheapest candidate profile that passes every fixture
+
+    Args:
+        corpus: [(name, PIL Image, expected)] (see ocr_fixtures.load_fixture_corpus)
+        ocr_data: Callable(img, lang=..., config=...) -> OCRResult with lines
+        candidates: Profiles to try (default: candidate_profiles())
+        cost: 'time' (measured OCR ms, then pixels) or 'pixels' (OCR'd pixel count)
+
+    Returns:
+        (best profile or None, [TuneResult] for every candidate)
+    """
+    results = []
+    for profile in candidates or candidate_profiles():
+        failed = []
+        ocr_ms = 0.0
+        pixels = 0
+        for name, img, expected in corpus:
+            prepared = profile.prepare(img)
+            pixels += prepared.width * prepared.height
+            start = time.perf_counter()
+            result = ocr_data(prepared, lang=profile.lang, config=profile.config)
+            ocr_ms += (time.perf_counter() - start) * 1000
+            if not fixture_passes(result, expected):
+                failed.append(name)
+        results.append(TuneResult(profile, failed, ocr_ms, pixels))
+
+    passing = [r for r in results if r.passed]
+    if not passing:
+        return None, results
+    rank = (lambda r: (r.pixels, r.ocr_ms)) if cost == 'pixels' else (lambda r: (r.ocr_ms, r.pixels))
+    return min(passing, key=rank).profile, results
+
+
+def main():
+    import ocr_engine
+    from ocr_fixtures import load_fixture_corpus
+    from roi_cache import roi_key
+
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ocr_profiles.json')
+    parser = argparse.ArgumentParser(description='Per-window-class OCR profiles')
+    parser.add_argument('--table', default=default_path, help='Tuned profile table (JSON)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('show', help='List profiles')
+    tune = commands.add_parser('autotune', help='Pick the cheapest profile that passes the fixtures')
+    tune.add_argument('--key', help='Window key "process.exe|WindowClass" (see roi_cache.window_key)')
+    tune.add_argument('--window-class', help='Window class (key "*|class")')
+    tune.add_argument('--process', help='Process name, with --window-class')
+    tune.add_argument('--fixtures', help='Captures of this window class + expected.json (default: synthetic)')
+    tune.add_argument('--cost', choices=['time', 'pixels'], default='time')
+    tune.add_argument('--dry-run', action='store_true', help='Do not write the table')
+    args = parser.parse_args()
+
+    table = ProfileTable(args.table)
+    if args.command == 'show':
+        for key, profile in table.items():
+            print(f"{key:<48} {profile!r}  config: {profile.config}")
+        return 0
+
+    if args.key:
+        key = args.key
+    elif args.window_class:
+        key = roi_key(args.window_class, args.process) if args.process else f"*|{args.window_class}"
+    else:
+        parser.error('autotune needs --key or --window-class')
+
+    engine = ocr_engine.get_engine()
+    corpus = load_fixture_corpus(args.fixtures)
+    print(f"Tuning '{key}' on {len(corpus)} fixtures with the {engine.name} engine...")
+    best, results = autotune(corpus, engine.image_to_data, cost=args.cost)
+
+    print(f"{'profile':<28} {'pass':>5} {'OCR ms':>9} {'Mpixels':>8}")
+    for r in sorted(results, key=lambda r: (not r.passed, r.ocr_ms)):
+        print(f"{r.profile.name:<28} {'yes' if r.passed else 'no':>5} {r.ocr_ms:>9.1f} {r.pixels / 1e6:>8.2f}"
+              + (f"  failed: {', '.join(r.failed[:3])}" if r.failed else ''))
+
+    if best is None:
+        print(f"\n[FAIL] No candidate passes every fixture - keeping {table.lookup(key).name!r}")
+        return 1
+    print(f"\n[OK] {key}: {best!r}")
+    if not args.dry_run:
+        table.set(key, best)
+        table.save()
+        print(f"[OK] Saved to {args.table}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Prompt Prefilter - template matching before any Tesseract call
+Claude's permission prompt draws a recognizable shape: a "> 1." / "❯ 1." marker
+in front of numbered option lines in a fixed terminal font. Small grayscale
+templates of that marker, cut from a few reference captures and kept at a few
+scales, are matched against the downsampled prompt region with normalized
+cross-correlation (NumPy FFT). Frames without a match cannot be a prompt and
+skip OCR entirely.
+
+Reference captures live in a directory of PNGs with a templates.json next to
+them mapping file name -> list of [left, top, right, bottom] marker boxes.
+
+Usage:
+    python prompt_prefilter.py                     # synthetic templates vs fixture corpus
+    python prompt_prefilter.py --templates DIR     # reference captures from DIR
+    python prompt_prefilter.py --templates DIR --fixtures CAPTURES
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+# Template scales relative to the reference captures (font size / DPI drift)
+DEFAULT_SCALES = (0.8, 1.0, 1.25)
+
+# Patches darker/flatter than this (std dev in gray levels) never match
+_MIN_STD = 4.0
+
+
+def _integral(a):
+    """Summed-area table with a zero first row and column"""
+    out = np.zeros((a.shape[0] + 1, a.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(a, axis=0), axis=1, out=out[1:, 1:])
+    return out
+
+
+def _window_sums(integral, h, w):
+    """Sum over every h x w window (valid positions only)"""
+    return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+
+class PromptTemplate:
+    """Zero-mean, unit-norm grayscale template"""
+
+    __slots__ = ('name', 'scale', 'pixels')
+
+    def __init__(self, name, pixels, scale=1.0):
+        pixels = np.asarray(pixels, dtype=np.float64)
+        pixels = pixels - pixels.mean()
+        norm = np.sqrt((pixels * pixels).sum())
+        if norm == 0:
+            raise ValueError(f"Template '{name}' is flat")
+        self.name = name
+        self.scale = scale
+        self.pixels = pixels / norm
+
+    @property
+    def shape(self):
+        return self.pixels.shape
+
+    def __repr__(self):
+        h, w = self.shape
+        return f"PromptTemplate({self.name!r}, {w}x{h}, scale={self.scale})"
+
+
+def ncc_map(image, template, image_fft=None, template_fft=None, integrals=None):
+    """Normalized cross-correlation of template at every valid position of image
+
+    Args:
+        image: 2D float array
+        template: PromptTemplate (or zero-mean unit-norm 2D array)
+        image_fft, template_fft: rfft2 of image / template at image.shape, when
+            already computed
+        integrals: (summed-area table of image, of image squared), when
+            already computed
+
+    Returns:
+        (H - h + 1, W - w + 1) array of scores in [-1, 1]
+    """
+    pixels = getattr(template, 'pixels', template)
+    h, w = pixels.shape
+    height, width = image.shape
+    if h > height or w > width:
+        return np.zeros((0, 0))
+
+    if image_fft is None:
+        image_fft = np.fft.rfft2(image)
+    if template_fft is None:
+        template_fft = np.fft.rfft2(pixels, s=image.shape)
+
+    # Circular correlation at image size never wraps for valid positions
+    corr = np.fft.irfft2(image_fft * np.conj(template_fft), s=image.shape)[:height - h + 1, :width - w + 1]
+
+    if integrals is None:
+        integrals = (_integral(image), _integral(image * image))
+    return corr * _inverse_energy(integrals, h, w)
+
+
+def _inverse_energy(integrals, h, w):
+    """1 / sqrt(sum of squared deviations) of every h x w window, 0 for flat windows"""
+    n = h * w
+    sums = _window_sums(integrals[0], h, w)
+    energy = _window_sums(integrals[1], h, w) - sums * sums / n
+    inverse = np.zeros_like(energy)
+    textured = energy > n * _MIN_STD * _MIN_STD
+    inverse[textured] = 1.0 / np.sqrt(energy[textured])
+    return inverse
+
+
+class PrefilterResult:
+    """Outcome of one prefilter check"""
+
+    __slots__ = ('maybe_prompt', 'score', 'template', 'box', 'cost_us')
+
+    def __init__(self, maybe_prompt, score, template, box, cost_us):
+        self.maybe_prompt = maybe_prompt
+        self.score = score
+        self.template = template
+        self.box = box  # best match (left, top, right, bottom) in source image pixels
+        self.cost_us = cost_us
+
+    def __repr__(self):
+        return (f"PrefilterResult(maybe_prompt={self.maybe_prompt}, score={self.score:.2f}, "
+                f"template={self.template!r}, cost_us={self.cost_us:.0f})")
+
+
+class PromptPrefilter:
+    """Multi-scale NCC template matcher on the downsampled prompt region"""
+
+    def __init__(self, templates, threshold=0.7, region=(0.0, 0.4, 0.5, 1.0), downsample=2):
+        """
+        Args:
+            templates: [PromptTemplate] at source resolution
+            threshold: Minimum NCC score that counts as a match
+            region: Relative (left, top, right, bottom) searched - option markers
+                sit at the left margin of the bottom of the window
+            downsample: Integer reduction applied to the region and templates
+        """
+        if not templates:
+            raise ValueError("PromptPrefilter needs at least one template")
+        self.threshold = threshold
+        self.region = region
+        self.downsample = downsample
+        self.templates = [reduced for t in templates for reduced in self._reduce(t)]
+        if not self.templates:
+            raise ValueError(f"All templates are smaller than {2 * downsample}px after downsampling")
+        self._template_ffts = {}  # {image shape: (conj rfft2 stack, template indices)}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.frames = 0
+        self.passed = 0
+        self.total_us = 0.0
+
+    def _reduce(self, template):
+        """Template at the downsampled resolution, one copy per sampling phase
+
+        The marker can sit at any pixel offset modulo the reduction factor, and
+        each offset averages different pixels together.
+        """
+        d = self.downsample
+        if d == 1:
+            return [template]
+        lo, hi = template.pixels.min(), template.pixels.max()
+        img = Image.fromarray(((template.pixels - lo) * (255 / (hi - lo))).astype(np.uint8))
+        reduced = []
+        for dy in range(d):
+            for dx in range(d):
+                phase = img.crop((dx, dy, img.width, img.height))
+                if phase.width < 2 * d or phase.height < 2 * d:
+                    continue  # nothing left to match at this resolution
+                try:
+                    reduced.append(PromptTemplate(template.name, np.asarray(phase.reduce(d)), template.scale))
+                except ValueError:
+                    pass
+        return reduced
+
+    @classmethod
+    def from_captures(cls, captures, scales=DEFAULT_SCALES, **kwargs):
+        """Prefilter with templates cut from reference captures
+
+        Args:
+            captures: [(PIL Image, (left, top, right, bottom))] marker boxes
+            scales: Extra template scales per box
+        """
+        return cls(templates_from_captures(captures, scales), **kwargs)
+
+    @classmethod
+    def from_directory(cls, directory, scales=DEFAULT_SCALES, **kwargs):
+        """Prefilter from a directory of reference captures (see module docstring)"""
+        return cls(templates_from_captures(load_reference_captures(directory), scales), **kwargs)
+
+    def _prepare(self, img):
+        """Downsampled grayscale prompt region as float array, plus its offset"""
+        if hasattr(img, 'to_image'):
+            img = img.to_image()
+        width, height = img.size
+        left, top, right, bottom = self.region
+        box = (int(width * left), int(height * top), int(width * right), int(height * bottom))
+        region = img.crop(box)
+        if region.mode != 'L':
+            region = region.convert('L')
+        if self.downsample != 1:
+            region = region.reduce(self.downsample)
+        return np.asarray(region, dtype=np.float64), box[:2]
+
+    def _ffts(self, shape):
+        """Conjugated template spectra at an image shape, stacked for one batched irfft2"""
+        ffts = self._template_ffts.get(shape)
+        if ffts is None:
+            indices = [i for i, t in enumerate(self.templates) if t.shape[0] <= shape[0] and t.shape[1] <= shape[1]]
+            stack = np.conj(np.stack([np.fft.rfft2(self.templates[i].pixels, s=shape) for i in indices])) \
+                if indices else None
+            ffts = (stack, indices)
+            with self._lock:
+                if len(self._template_ffts) >= 16:
+                    self._template_ffts.clear()
+                self._template_ffts[shape] = ffts
+        return ffts
+
+    def check(self, img):
+        """Could img (window capture: PIL Image or Frame) contain a prompt?"""
+        start = time.perf_counter_ns()
+        image, (offset_x, offset_y) = self._prepare(img)
+
+        best_score, best_template, best_box = -1.0, None, None
+        stack, indices = self._ffts(image.shape) if image.size else (None, [])
+        if indices:
+            # All templates in one batched inverse FFT; window energy once per template size
+            corr = np.fft.irfft2(np.fft.rfft2(image)[None] * stack, s=image.shape)
+            integrals = (_integral(image), _integral(image * image))
+            height, width = image.shape
+            inverse_energy = {}
+            for k, i in enumerate(indices):
+                template = self.templates[i]
+                h, w = template.shape
+                if (h, w) not in inverse_energy:
+                    inverse_energy[(h, w)] = _inverse_energy(integrals, h, w)
+                scores = corr[k, :height - h + 1, :width - w + 1] * inverse_energy[(h, w)]
+                index = int(scores.argmax())
+                score = float(scores.flat[index])
+                if score > best_score:
+                    y, x = divmod(index, scores.shape[1])
+                    d = self.downsample
+                    best_score, best_template = score, template.name
+                    best_box = (offset_x + x * d, offset_y + y * d, offset_x + (x + w) * d, offset_y + (y + h) * d)
+
+        maybe_prompt = best_score >= self.threshold
+        cost_us = (time.perf_counter_ns() - start) / 1000
+        with self._lock:
+            self.frames += 1
+            self.passed += maybe_prompt
+            self.total_us += cost_us
+        return PrefilterResult(maybe_prompt, best_score, best_template, best_box, cost_us)
+
+    def get_stats(self):
+        """Counters - pass_rate is the share of frames sent on to OCR"""
+        return {
+            'frames': self.frames,
+            'passed': self.passed,
+            'pass_rate': self.passed / self.frames if self.frames else 0.0,
+            'mean_us': self.total_us / self.frames if self.frames else 0.0,
+        }
+
+
+def templates_from_captures(captures, scales=DEFAULT_SCALES):
+    """[PromptTemplate] for every marker box of every capture, at every scale"""
+    templates = []
+    for i, (img, box) in enumerate(captures):
+        if hasattr(img, 'to_image'):
+            img = img.to_image()
+        patch = img.crop(tuple(box)).convert('L')
+        for scale in scales:
+            size = (max(1, round(patch.width * scale)), max(1, round(patch.height * scale)))
+            scaled = patch if scale == 1.0 else patch.resize(size, Image.BILINEAR)
+            try:
+                templates.append(PromptTemplate(f"capture{i}@{scale}", np.asarray(scaled), scale))
+            except ValueError:
+                pass  # flat patch - nothing to match
+    return templates
+
+
+def load_reference_captures(directory):
+    """[(PIL Image, box)] from a directory of PNGs and templates.json"""
+    with open(os.path.join(directory, 'templates.json'), 'r', encoding='utf-8') as f:
+        boxes = json.load(f)
+    captures = []
+    for filename, file_boxes in sorted(boxes.items()):
+        img = Image.open(os.path.join(directory, filename)).convert('L')
+        captures.extend((img, tuple(box)) for box in file_boxes)
+    return captures
+
+
+def synthetic_captures(markers=('> 1.',), font_size=16, padding=2):
+    """Reference captures rendered like ocr_fixtures' terminals, boxes around the marker"""
+    from ocr_fixtures import render_terminal
+
+    size, line_height = (320, font_size * 3), round(font_size * 1.4)
+    captures = []
+    for marker in markers:
+        marker_only = render_terminal([marker], size=size, line_height=line_height, font_size=font_size)
+        left, top, right, bottom = marker_only.convert('L').point(lambda v: 255 if v > 60 else 0).getbbox()
+        img = render_terminal([marker + ' Yes'], size=size, line_height=line_height, font_size=font_size)
+        captures.append((img, (left - padding, top - padding, right + padding, bottom + padding)))
+    return captures
+
+
+def main():
+    import argparse
+
+    from ocr_fixtures import load_fixture_corpus, synthetic_corpus
+
+    parser = argparse.ArgumentParser(description='Template-matching prompt prefilter benchmark')
+    parser.add_argument('--templates', help='Directory of reference captures with templates.json')
+    parser.add_argument('--fixtures', help='Directory of captures with expected.json (default: synthetic)')
+    parser.add_argument('--downsample', type=int, default=2)
+    parser.add_argument('--threshold', type=float, default=0.7)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    captures = load_reference_captures(args.templates) if args.templates else synthetic_captures()
+    prefilter = PromptPrefilter.from_captures(captures, downsample=args.downsample, threshold=args.threshold)
+    print(f"Templates: {len(prefilter.templates)} (downsample {args.downsample}, threshold {args.threshold})")
+    print(f"{'fixture':<32} {'expected':>8} {'pass':>5} {'score':>6} {'us/frame':>9}")
+
+    missed = 0
+    corpus = load_fixture_corpus(args.fixtures) if args.fixtures else synthetic_corpus(font_size=16)
+    for name, img, info in corpus:
+        costs = []
+        for _ in range(args.repeat):
+            result = prefilter.check(img)
+            costs.append(result.cost_us)
+        costs.sort()
+        if info.get('approval') and not result.maybe_prompt:
+            missed += 1
+        print(f"{name:<32} {str(info.get('approval')):>8} {str(result.maybe_prompt):>5} "
+              f"{result.score:>6.2f} {costs[len(costs) // 2]:>9.0f}")
+
+    stats = prefilter.get_stats()
+    print(f"\nPass rate {stats['pass_rate']:.0%}, mean {stats['mean_us']:.0f} us/frame, missed prompts: {missed}")
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+PTY Approver - run the CLI under a pseudo-terminal and answer prompts from its output
+The other approvers only see pixels (OCR) or scrape console buffers. Here the
+CLI is our child: it runs on a pseudo-terminal (pty module on Linux/macOS,
+ConPTY through pywinpty on Windows), its output is passed through to this
+terminal unchanged, and the same bytes update a VT screen model (vt_screen)
+whose bottom rows go through the approval matcher whenever they are redrawn.
+When a prompt is on screen and the output has been quiet for `settle`
+seconds, the chosen option key is written to the PTY master - no OCR, no
+focus stealing, no keybd_event.
+
+A keystroke from the user while a prompt is pending cancels the automatic
+answer (the user is answering it).
+
+Usage:
+    python pty_approver.py                       # run `claude`
+    python pty_approver.py -- claude --resume    # any command line
+    python pty_approver.py --dry-run -- claude   # log prompts, never answer
+"""
+import argparse
+import os
+import queue
+import shutil
+import struct
+import sys
+import threading
+import time
+
+from adaptive_poller import LatencyStats
+from approval_matcher import choose_option, parse_text_options, prompt_matcher, text_prompt_key, text_shows_prompt
+from vt_screen import VTScreen
+
+# Second character of msvcrt.getwch() after a '\x00' / '\xe0' prefix ->
+# the VT sequence the child expects (ConPTY takes VT input)
+WINDOWS_KEYS = {
+    'H': '\x1b[A', 'P': '\x1b[B', 'M': '\x1b[C', 'K': '\x1b[D',  # Arrows
+    'G': '\x1b[H', 'O': '\x1b[F', 'I': '\x1b[5~', 'Q': '\x1b[6~',  # Home, End, PgUp, PgDn
+    'R': '\x1b[2~', 'S': '\x1b[3~',  # Insert, Delete
+    ';': '\x1bOP', '<': '\x1bOQ', '=': '\x1bOR', '>': '\x1bOS',  # F1-F4
+    '\x0f': '\x1b[Z',  # Shift+Tab
+}
+
+
+def translate_key(char, read_next):
+    """VT input for a msvcrt.getwch() character - read_next() fetches the
+    second half of a special key ('' for keys without a VT sequence)"""
+    if char in ('\x00', '\xe0'):
+        return WINDOWS_KEYS.get(read_next(), '')
+    return char
+
+
+try:
+    import fcntl
+    import pty
+    import select
+    import signal
+    import termios
+    import tty
+    PTY_AVAILABLE = True
+except ImportError:
+    PTY_AVAILABLE = False
+
+class StreamApprover:
+    """Prompt detection on a terminal output stream
+
+    Output is applied to a VTScreen; after a chunk redraws any rows, the
+    bottom of the screen is checked for a prompt. A pending prompt that is
+    redrawn away before the answer (answered by the user, cancelled) is
+    dropped. A prompt is identified by its question and option texts
+    (text_prompt_key): once answered - by us or by the user typing - it is
+    left alone until it leaves the screen, however its selection marker or
+    the rows around it are redrawn.
+    """
+
+    def __init__(self, matcher=None, settle=0.05, cooldown=2.0, rows=24, cols=80, prompt_rows=20,
+                 dry_run=False, log=None):
+        """
+        Args:
+            matcher: prompt_matcher() groups (default pattern lists)
+            settle: Seconds without output before a detected prompt is answered
+                (the TUI draws a prompt in several writes)
+            cooldown: Minimum seconds between two answers
+            rows, cols: Terminal size (see resize)
+            prompt_rows: Rows at the bottom of the screen searched for a prompt
+            dry_run: Detect and log, never answer
+            log: log(message) callback (default: none)
+        """
+        self.matcher = matcher or prompt_matcher()
+        self.settle = settle
+        self.cooldown = cooldown
+        self.prompt_rows = prompt_rows
+        self.dry_run = dry_run
+        self.log = log or (lambda message: None)
+        self.screen = VTScreen(rows, cols)
+        self.prompt_text = None  # Bottom of the screen while a prompt shows
+        self.prompt_key = None  # text_prompt_key(prompt_text)
+        self._handled = None  # prompt_key already answered (by us or the user)
+        self.pending_since = None  # When the unanswered prompt was detected
+        self.last_output = float('-inf')
+        self.last_answer = float('-inf')
+        self.latency = LatencyStats()  # Prompt detected -> key written
+
+        # Counters
+        self.prompts = 0
+        self.answers = 0
+        self.checks = 0
+
+    @property
+    def bytes(self):
+        return self.screen.bytes
+
+    def check_approval_pattern(self, text):
+        """Whether text (bottom of the screen) shows an approval prompt"""
+        return text_shows_prompt(text, self.matcher)
+
+    def determine_response_key(self, text):
+        """Option key for the prompt in text (its last option block)"""
+        return choose_option(parse_text_options(text, last=True))
+
+    def feed(self, data, now=None):
+        """Output chunk (bytes from a pty, str from ConPTY)"""
+        now = time.monotonic() if now is None else now
+        self.last_output = now
+        self.screen.feed(data)
+        if not self.screen.take_dirty():
+            return  # Cursor moves / colours only: the screen text is the same
+        self.checks += 1
+        text = self.screen.bottom_text(self.prompt_rows)
+        if not self.check_approval_pattern(text):
+            if self.pending_since is not None:
+                self.log("prompt left the screen before it was answered")
+            self.prompt_text = self.prompt_key = self.pending_since = self._handled = None
+            return
+        key = text_prompt_key(text)
+        self.prompt_text = text
+        if key == self._handled:
+            return  # Answered prompt redrawn (marker moved, status line, ...)
+        if self.pending_since is None:
+            self.pending_since = now
+            self.prompts += 1
+        self.prompt_key = key
+
+    def resize(self, rows, cols):
+        self.screen.resize(rows, cols)
+
+    def user_input(self, now=None):
+        """The user typed something - a pending prompt is theirs to answer"""
+        if self.pending_since is not None:
+            self.log("prompt answered by the user")
+            self._handled = self.prompt_key
+            self.pending_since = None
+
+    def poll(self, now=None):
+        """Key to write to the PTY now, or None"""
+        if self.pending_since is None:
+            return None
+        now = time.monotonic() if now is None else now
+        if now - self.last_output < self.settle or now - self.last_answer < self.cooldown:
+            return None
+        key, score = self.determine_response_key(self.prompt_text)
+        self.log(f"prompt {parse_text_options(self.prompt_text, last=True)} -> option {key} (score {score})"
+                 + (" [dry run]" if self.dry_run else ""))
+        self.latency.add(now - self.pending_since)
+        self.last_answer = now
+        self._handled = self.prompt_key
+        self.pending_since = None
+        if self.dry_run:
+            return None
+        self.answers += 1
+        return key
+
+    def time_until_poll(self, now=None):
+        """Seconds until poll() may answer (None: nothing pending)"""
+        if self.pending_since is None:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.last_output + self.settle - now, self.last_answer + self.cooldown - now)
+
+
+def _copy_window_size(source_fd, target_fd):
+    """Give target the terminal size of source - (rows, cols), None if unknown"""
+    try:
+        size = fcntl.ioctl(source_fd, termios.TIOCGWINSZ, b'\0' * 8)
+        fcntl.ioctl(target_fd, termios.TIOCSWINSZ, size)
+    except OSError:
+        return None
+    rows, cols = struct.unpack('HHHH', size)[:2]
+    return (rows, cols) if rows and cols else None
+
+
+def _write_all(fd, data):
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def run_pty(argv, approver, stdin_fd=0, stdout_fd=1):
+    """Run argv on a pseudo-terminal, passing I/O through (POSIX)
+
+    Returns:
+        Child exit code
+    """
+    pid, master = pty.fork()
+    if pid == 0:
+        try:
+            os.execvp(argv[0], argv)
+        finally:
+            os._exit(127)
+
+    interactive = os.isatty(stdin_fd)
+    saved = termios.tcgetattr(stdin_fd) if interactive else None
+    resized = []  # Sizes from SIGWINCH, applied to the screen model between chunks
+    if interactive:
+        size = _copy_window_size(stdin_fd, master)
+        if size:
+            approver.resize(*size)
+        signal.signal(signal.SIGWINCH, lambda *_: resized.append(_copy_window_size(stdin_fd, master)))
+        tty.setraw(stdin_fd)
+    inputs = [master, stdin_fd]
+    try:
+        while True:
+            wait = approver.time_until_poll()
+            ready, _, _ = select.select(inputs, [], [], wait)
+            while resized:
+                size = resized.pop(0)
+                if size:
+                    approver.resize(*size)
+            if master in ready:
+                try:
+                    data = os.read(master, 65536)
+                except OSError:  # EIO: the child closed the terminal
+                    data = b''
+                if not data:
+                    break
+                _write_all(stdout_fd, data)
+                approver.feed(data)
+            if stdin_fd in ready:
+                data = os.read(stdin_fd, 1024)
+                if data:
+                    approver.user_input()
+                    _write_all(master, data)
+                else:
+                    inputs.remove(stdin_fd)  # Input closed: keep serving output
+            key = approver.poll()
+            if key is not None:
+                _write_all(master, key.encode())
+    finally:
+        if saved is not None:
+            termios.tcsetattr(stdin_fd, termios.TCSAFLUSH, saved)
+            signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+        os.close(master)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def run_conpty(argv, approver):
+    """Run argv on a ConPTY (Windows, needs pywinpty), passing I/O through
+
+    Returns:
+        Child exit code
+    """
+    import msvcrt
+    import signal
+    from winpty import PtyProcess
+
+    size = shutil.get_terminal_size()
+    approver.resize(size.lines, size.columns)
+    process = PtyProcess.spawn(argv, dimensions=(size.lines, size.columns))
+    chunks = queue.Queue()
+
+    def interrupt(*_):
+        # Ctrl+C belongs to the child, as on a real terminal
+        approver.user_input()
+        process.write('\x03')
+
+    def pump():
+        # PtyProcess.read blocks - read on a thread, hand chunks to the main loop
+        while True:
+            try:
+                chunks.put(process.read(65536))
+            except EOFError:
+                chunks.put(None)
+                return
+
+    threading.Thread(target=pump, daemon=True).start()
+    saved = signal.signal(signal.SIGINT, interrupt)
+    try:
+        while True:
+            while msvcrt.kbhit():
+                approver.user_input()
+                key = translate_key(msvcrt.getwch(), msvcrt.getwch)
+                if key:
+                    process.write(key)
+            try:
+                data = chunks.get(timeout=0.01)
+            except queue.Empty:
+                data = ''
+            if data is None:
+                break
+            if data:
+                sys.stdout.write(data)
+                sys.stdout.flush()
+                approver.feed(data)
+            # No SIGWINCH on Windows: compare the console size every pass
+            current = shutil.get_terminal_size()
+            if current != size:
+                size = current
+                process.setwinsize(size.lines, size.columns)
+                approver.resize(size.lines, size.columns)
+            key = approver.poll()
+            if key is not None:
+                process.write(key)
+    finally:
+        signal.signal(signal.SIGINT, saved)
+    process.wait()
+    return process.exitstatus or 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a CLI under a pseudo-terminal and answer its approval prompts')
+    parser.add_argument('command', nargs='*', default=['claude'], help='Command line (default: claude)')
+    parser.add_argument('--dry-run', action='store_true', help='Log prompts, never answer')
+    parser.add_argument('--settle', type=float, default=0.05, help='Quiet seconds before answering')
+    parser.add_argument('--cooldown', type=float, default=2.0, help='Minimum seconds between answers')
+    parser.add_argument('--log', default='pty_approver.log', help='Log file (the terminal belongs to the child)')
+    args = parser.parse_args()
+
+    with open(args.log, 'a', encoding='utf-8') as log_file:
+        def log(message):
+            log_file.write(f"{time.strftime('%H:%M:%S')} {message}\n")
+            log_file.flush()
+
+        approver = StreamApprover(settle=args.settle, cooldown=args.cooldown, dry_run=args.dry_run, log=log)
+        log(f"start {' '.join(args.command)}")
+        if sys.platform == 'win32':
+            code = run_conpty(args.command, approver)
+        elif PTY_AVAILABLE:
+            code = run_pty(args.command, approver)
+        else:
+            print("pty not available on this platform", file=sys.stderr)
+            return 2
+
+        p50, p99 = approver.latency.percentile(0.5), approver.latency.percentile(0.99)
+        summary = f"exit {code} | {approver.prompts} prompts, {approver.answers} answered | {approver.bytes} bytes"
+        if p50 is not None:
+            summary += f" | prompt -> key p50 {p50 * 1000:.0f} ms, p99 {p99 * 1000:.0f} ms"
+        log(summary)
+    print(f"[PTY Approver] {summary}", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+ROI Cache - learned per-window prompt regions instead of a fixed bottom crop
+When a prompt is detected the bounding box of its option block (relative to
+the window) is recorded under the window's process name and class, so PyCharm
+tool windows and split terminals get their own region. Later scans capture
+only that region plus a slack margin; every full_check_interval seconds a
+window's default region is captured instead so a moved prompt is re-learned
+(by time, not scan count: a backed-off idle window is scanned rarely). The
+table persists as JSON so it survives restarts.
+"""
+import json
+import os
+import threading
+import time
+
+try:
+    import ctypes
+    import win32gui
+    import win32process
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+
+def process_name(pid):
+    """Executable name of a process ('' when it cannot be queried)"""
+    if not WIN32_AVAILABLE:
+        return ''
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return ''
+    try:
+        size = ctypes.c_ulong(260)
+        buf = ctypes.create_unicode_buffer(size.value)
+        if not kernel32.QueryFullProcessImageNameW(handle, 0, buf, ctypes.byref(size)):
+            return ''
+        return os.path.basename(buf.value)
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def roi_key(class_name, process):
+    """Table key for a window class + process name"""
+    return f"{(process or '').lower()}|{class_name or ''}"
+
+
+def window_key(hwnd):
+    """Table key of a window (process name + window class)"""
+    try:
+        class_name = win32gui.GetClassName(hwnd)
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return roi_key(class_name, process_name(pid))
+    except Exception:
+        return roi_key('', '')
+
+
+def map_box(box, region):
+    """Box relative to a capture region -> box relative to the whole window
+
+    Args:
+        box: (left, top, right, bottom) in 0.0-1.0 of the captured region
+        region: Relative (left, top, right, bottom) of the region in the window
+    """
+    left, top, right, bottom = region
+    width, height = right - left, bottom - top
+    return (left + box[0] * width, top + box[1] * height, left + box[2] * width, top + box[3] * height)
+
+
+class ROICache:
+    """{window key: learned prompt box} with slack, periodic full-frame checks and JSON persistence"""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path=None, slack=0.03, full_check_interval=10.0, max_entries=256):
+        """
+        Args:
+            path: JSON file to load from and save() to (None = memory only)
+            slack: Margin added around a learned box (fraction of the window);
+                vertically at least half the box height, so a prompt with an
+                extra option or a longer question still fits
+            full_check_interval: Capture the default region of a window when
+                its last full-frame check is this many seconds old
+            max_entries: Oldest learned boxes are dropped beyond this
+        """
+        self.path = path
+        self.slack = slack
+        self.full_check_interval = full_check_interval
+        self.max_entries = max_entries
+        self._boxes = {}  # {key: {'box': [l, t, r, b], 'learned': timestamp, 'hits': n}}
+        self._full_checks = {}  # {window id: time of the last full-frame check}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        # Counters
+        self.learned = 0
+        self.roi_scans = 0
+        self.full_scans = 0
+
+        if path:
+            self.load()
+
+    def learn(self, key, box):
+        """Record the prompt box (relative to the window) for a window key"""
+        box = [round(min(1.0, max(0.0, v)), 4) for v in box]
+        if box[2] <= box[0] or box[3] <= box[1]:
+            return
+        with self._lock:
+            entry = self._boxes.pop(key, None)
+            self._boxes[key] = {'box': box, 'learned': time.time(), 'hits': entry['hits'] if entry else 0}
+            self._dirty = True
+            self.learned += 1
+            while len(self._boxes) > self.max_entries:
+                del self._boxes[next(iter(self._boxes))]
+
+    def forget(self, key):
+        with self._lock:
+            if self._boxes.pop(key, None) is not None:
+                self._dirty = True
+
+    def lookup(self, key):
+        """Learned region with slack for key, or None"""
+        entry = self._boxes.get(key)
+        if entry is None:
+            return None
+        left, top, right, bottom = entry['box']
+        dy = max(self.slack, (bottom - top) / 2)
+        return (
+            max(0.0, left - self.slack), max(0.0, top - dy),
+            min(1.0, right + self.slack), min(1.0, bottom + dy),
+        )
+
+    def capture_region(self, key, default, window=None, now=None):
+        """Region to capture this scan - the learned ROI, or default for unknown
+        windows and for the periodic full-frame check
+
+        Args:
+            key: Window key (see window_key)
+            default: Region used without a learned ROI
+            window: Per-window id for the full-check cadence (default: key)
+            now: time.monotonic() timestamp (default: current time)
+        """
+        region = self.lookup(key)
+        if region is None:
+            return default
+
+        window = key if window is None else window
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            last = self._full_checks.setdefault(window, now)  # Clock starts at the first ROI scan
+            if now - last >= self.full_check_interval:
+                self._full_checks[window] = now
+                self.full_scans += 1
+                return default
+            self._boxes[key]['hits'] += 1
+            self.roi_scans += 1
+        return region
+
+    def evict_missing(self, live_windows):
+        """Drop full-check times of windows that no longer exist"""
+        live = set(live_windows)
+        with self._lock:
+            for window in [w for w in self._full_checks if w not in live]:
+                del self._full_checks[window]
+
+    def load(self):
+        """Load the table from path (missing or unreadable file = empty table)"""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('version') != self.FORMAT_VERSION:
+            return 0
+
+        with self._lock:
+            for key, entry in data.get('rois', {}).items():
+                self._boxes[key] = entry
+            self._dirty = False
+            return len(self._boxes)
+
+    def save(self, force=False):
+        """Write the table to path (atomic replace); skipped when nothing changed"""
+        if not self.path:
+            return False
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+            data = {'version': self.FORMAT_VERSION, 'rois': dict(self._boxes)}
+            self._dirty = False
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
+        return True
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def get_stats(self):
+        """Counters - roi_fraction is the share of scans that captured a learned ROI"""
+        scans = self.roi_scans + self.full_scans
+        return {
+            'rois': len(self._boxes),
+            'learned': self.learned,
+            'roi_scans': self.roi_scans,
+            'full_scans': self.full_scans,
+            'roi_fraction': self.roi_scans / scans if scans else 0.0,
+        }
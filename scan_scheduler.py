@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Scan Scheduler - per-window scan intervals from a priority score
+Windows are scored on four signals: process / title (claude, node, bash,
+python...), how recently a prompt was detected in them, how recently their
+frame changed, and whether they are in the foreground. The score (0-1) maps
+log-linearly onto an interval between hot_interval (sub-second) and
+cold_interval (tens of seconds), so an Excel sheet is looked at twice a
+minute while the terminal that just asked a question is rescanned at once.
+
+Each scan that finds the frame unchanged doubles the window's interval
+(backoff, capped at cold_interval); a changed frame or a detected prompt
+resets it. A title change or the window coming to the foreground wakes it
+at once (at most every hot_interval), and so does a changed frame: windows
+backed off past probe_interval are probed that often - the caller
+fingerprints a capture of the region of their last scan, no OCR. Due times
+live in a timing wheel (adaptive_poller.TimingWheel).
+
+Total OCR work is kept under a CPU budget: every window's measured OCR cost
+(seconds per scan) divided by its interval is its CPU demand. When the sum
+exceeds the budget, all intervals are stretched by the same factor, which
+keeps the windows' relative priority.
+
+Usage:
+    python scan_scheduler.py    # simulated latency / CPU against a fixed 10 s loop
+"""
+import math
+import random
+import sys
+import threading
+import time
+
+from adaptive_poller import LatencyStats, TimingWheel
+from keyword_matcher import KeywordMatcher
+
+# Process / title keyword -> how likely the window hosts a Claude session
+PROCESS_WEIGHTS = {
+    'claude': 1.0,
+    'node': 0.7,
+    'bash': 0.6,
+    'mingw': 0.6,
+    'python': 0.5,
+    'mintty': 0.5,
+    'windowsterminal': 0.5,
+    'powershell': 0.5,
+    'pycharm': 0.4,
+    'code': 0.4,
+    'cmd': 0.3,
+}
+
+# Share of the score each signal can contribute (sums to 1)
+SIGNAL_WEIGHTS = {
+    'process': 0.35,
+    'detection': 0.3,
+    'change': 0.2,
+    'foreground': 0.15,
+}
+
+
+class WindowSchedule:
+    """Scheduling state of one window"""
+
+    __slots__ = ('key', 'title', 'affinity', 'foreground', 'fingerprint', 'cost', 'scans', 'idle_scans',
+                 'last_scan', 'last_probe', 'last_change', 'last_detection', 'score', 'interval', 'demand')
+
+    def __init__(self, key, title=''):
+        self.key = key
+        self.title = title
+        self.affinity = 0.0  # Process/title weight (0-1)
+        self.foreground = False
+        self.fingerprint = None
+        self.cost = None  # Moving average of OCR seconds per scan
+        self.scans = 0
+        self.idle_scans = 0  # Scans in a row without a frame change
+        self.last_scan = None
+        self.last_probe = None
+        self.last_change = None
+        self.last_detection = None
+        self.score = 0.0
+        self.interval = 0.0  # Unstretched seconds until the next scan
+        self.demand = 0.0  # cost / interval
+
+
+class ScanScheduler:
+    """Decides which windows to scan when"""
+
+    def __init__(self, hot_interval=0.5, cold_interval=30.0, cpu_budget=0.5, default_cost=0.2,
+                 detection_memory=300.0, change_memory=30.0, backoff=2.0, probe_interval=1.0,
+                 process_weights=None, tick=0.05, start=None):
+        """
+        Args:
+            hot_interval: Seconds between scans of a window with score 1
+            cold_interval: Seconds between scans of a window with score 0
+                (also the longest an idle window backs off to)
+            cpu_budget: OCR CPU-seconds per second for all windows together
+            default_cost: Assumed OCR seconds per scan until a window was measured
+            detection_memory: Seconds over which a detected prompt stops counting (e-folding)
+            change_memory: Seconds over which a frame change stops counting (e-folding)
+            backoff: Interval factor per scan that found the frame unchanged
+            probe_interval: Seconds between frame probes of a window that is
+                not due within that time (None = no probes)
+            process_weights: {process/title keyword: weight} (default PROCESS_WEIGHTS)
+            tick: Timing wheel resolution in seconds
+        """
+        self.hot_interval = hot_interval
+        self.cold_interval = cold_interval
+        self.cpu_budget = cpu_budget
+        self.default_cost = default_cost
+        self.detection_memory = detection_memory
+        self.change_memory = change_memory
+        self.backoff = backoff
+        self.probe_interval = probe_interval
+        self.process_weights = dict(process_weights or PROCESS_WEIGHTS)
+        self._matcher = KeywordMatcher(list(self.process_weights))
+        self.windows = {}  # {key: WindowSchedule}
+        self.wheel = TimingWheel(tick, start=start)
+        self.wakeup = threading.Event()  # Set (from any thread) to end wait() early
+        self.latency = LatencyStats()  # Upper bound: time since the window's previous scan
+        self.stretch = 1.0  # Budget factor applied to every interval
+        self._demand = 0.0
+
+        # Counters
+        self.scans = 0
+        self.wakes = 0
+        self.probes = 0
+        self.ocr_seconds = 0.0
+
+    def affinity(self, process, title=''):
+        """Weight of the best process/title keyword (0 when none matches)"""
+        ids = self._matcher.match_ids(f"{process} {title}")
+        return max((self.process_weights[self._matcher.keywords[i]] for i in ids), default=0.0)
+
+    def sync(self, windows, foreground=None, now=None):
+        """Track exactly these windows - new ones are due at once, a changed
+        title or a window coming to the foreground wakes it
+
+        Args:
+            windows: Iterable of (key, process name, title)
+            foreground: Key of the foreground window
+        """
+        now = time.monotonic() if now is None else now
+        live = {}
+        for key, process, title in windows:
+            entry = self.windows.get(key)
+            if entry is None:
+                entry = WindowSchedule(key, title)
+                entry.affinity = self.affinity(process, title)
+                self.wheel.schedule(key, now)
+            elif title != entry.title:
+                entry.title = title
+                entry.affinity = self.affinity(process, title)  # e.g. "claude" started in a shell
+                self.wake(key, now)
+            if key == foreground and not entry.foreground:
+                entry.foreground = True
+                self.wake(key, now)
+            entry.foreground = key == foreground
+            live[key] = entry
+        for key, entry in self.windows.items():
+            if key not in live:
+                self.wheel.cancel(key)
+                self._demand -= entry.demand
+        self.windows = live
+        for key, entry in live.items():
+            if key not in self.wheel:
+                self.wheel.schedule(key, now)  # Popped by due() but never recorded
+
+    def due(self, now=None):
+        """Keys of windows to scan now, highest score first
+
+        Each must be passed to record() or postpone() afterwards (or it is
+        due again on the next sync()).
+        """
+        now = time.monotonic() if now is None else now
+        ready = [self.windows[key] for key in self.wheel.pop_due(now) if key in self.windows]
+        for entry in ready:
+            entry.score = self.score(entry, now)
+        ready.sort(key=lambda entry: entry.score, reverse=True)
+        return [entry.key for entry in ready]
+
+    def wake(self, key, now=None):
+        """Scan a window now - or hot_interval after its last scan"""
+        entry = self.windows.get(key)
+        if entry is None:
+            return
+        now = time.monotonic() if now is None else now
+        entry.idle_scans = 0
+        when = now if entry.last_scan is None else max(now, entry.last_scan + self.hot_interval)
+        current = self.wheel.deadline(key)
+        if current is not None and current <= when:
+            return  # Already due sooner
+        self.wheel.schedule(key, when)
+        self.wakes += 1
+        self.wakeup.set()
+
+    def probe_due(self, now=None):
+        """Keys of backed-off windows whose frame should be fingerprinted now (see probe)"""
+        if self.probe_interval is None:
+            return []
+        now = time.monotonic() if now is None else now
+        keys = []
+        for key, entry in self.windows.items():
+            deadline = self.wheel.deadline(key)
+            if entry.fingerprint is None or deadline is None or deadline - now < self.probe_interval:
+                continue  # Never scanned, being scanned or due soon anyway
+            if entry.last_probe is None or now - entry.last_probe >= self.probe_interval:
+                keys.append(key)
+        return keys
+
+    def probe(self, key, fingerprint, now=None):
+        """Fingerprint of a backed-off window's frame - a change wakes it
+
+        Returns:
+            True when the window was woken
+        """
+        entry = self.windows.get(key)
+        if entry is None:
+            return False
+        now = time.monotonic() if now is None else now
+        entry.last_probe = now
+        self.probes += 1
+        if fingerprint is None or fingerprint == entry.fingerprint:
+            return False
+        self.wake(key, now)
+        return True
+
+    def postpone(self, key, delay, now=None):
+        """Not scannable for delay seconds (e.g. approval cooldown)"""
+        if key in self.windows:
+            self.wheel.schedule(key, (time.monotonic() if now is None else now) + delay)
+
+    def record(self, key, fingerprint=None, cost=None, detected=False, now=None):
+        """Result of scanning a window - schedules its next scan
+
+        Args:
+            fingerprint: Frame fingerprint (a different one than last time = change)
+            cost: OCR seconds the scan took
+            detected: A prompt was found
+        """
+        entry = self.windows.get(key)
+        if entry is None:
+            return
+        now = time.monotonic() if now is None else now
+        changed = False
+        if fingerprint is not None:
+            changed = entry.fingerprint is not None and fingerprint != entry.fingerprint
+            if changed:
+                entry.last_change = now
+            entry.fingerprint = fingerprint
+        if cost is not None:
+            entry.cost = cost if entry.cost is None else 0.7 * entry.cost + 0.3 * cost
+            self.ocr_seconds += cost
+        if detected:
+            entry.last_detection = now
+            if entry.last_scan is not None:
+                self.latency.add(now - entry.last_scan)
+        entry.idle_scans = 0 if changed or detected else entry.idle_scans + 1
+        entry.last_scan = now
+        entry.scans += 1
+        self.scans += 1
+
+        entry.score = self.score(entry, now)
+        # Backoff starts with the second unchanged scan in a row
+        backoff = self.backoff ** max(0, entry.idle_scans - 1)
+        entry.interval = min(self.cold_interval, self.interval_for(entry.score) * backoff)
+        demand = (self.default_cost if entry.cost is None else entry.cost) / entry.interval
+        self._demand += demand - entry.demand
+        entry.demand = demand
+        self.stretch = max(1.0, self._demand / self.cpu_budget) if self.cpu_budget else 1.0
+        self.wheel.schedule(key, now + entry.interval * self.stretch)
+
+    def next_due(self, key):
+        """When a window is due next (None while popped by due())"""
+        return self.wheel.deadline(key)
+
+    def time_until_next(self, now=None):
+        """Seconds until the next window is due (None without windows)"""
+        deadline = self.wheel.next_deadline()
+        if deadline is None:
+            return None
+        return max(0.0, deadline - (time.monotonic() if now is None else now))
+
+    def wait(self, timeout=None):
+        """Sleep until the next window is due, a wakeup or timeout"""
+        delay = self.time_until_next()
+        if delay is None or (timeout is not None and delay > timeout):
+            delay = timeout
+        self.wakeup.wait(delay)
+        self.wakeup.clear()
+
+    def score(self, entry, now):
+        """Priority of a window (0-1)"""
+        score = SIGNAL_WEIGHTS['process'] * entry.affinity
+        if entry.last_detection is not None:
+            score += SIGNAL_WEIGHTS['detection'] * math.exp(-(now - entry.last_detection) / self.detection_memory)
+        if entry.last_change is not None:
+            score += SIGNAL_WEIGHTS['change'] * math.exp(-(now - entry.last_change) / self.change_memory)
+        if entry.foreground:
+            score += SIGNAL_WEIGHTS['foreground']
+        return min(1.0, score)
+
+    def interval_for(self, score):
+        """Interval of a score before backoff and budget (log-linear between cold and hot)"""
+        return self.cold_interval * (self.hot_interval / self.cold_interval) ** score
+
+    def get_stats(self):
+        return {
+            'windows': len(self.windows),
+            'scans': self.scans,
+            'wakes': self.wakes,
+            'probes': self.probes,
+            'ocr_seconds': self.ocr_seconds,
+            'stretch': self.stretch,
+            'hot': sum(1 for entry in self.windows.values() if entry.interval * self.stretch <= 2.0),
+            'latency_p50': self.latency.percentile(0.5),
+            'latency_p99': self.latency.percentile(0.99),
+        }
+
+
+def simulate(scheduler=None, fixed_interval=None, windows=12, duration=1800.0, prompts=40,
+             ocr_cost=0.25, seed=7):
+    """Detection latency and OCR CPU over a simulated desktop
+
+    One Claude terminal (output changes often, prompts appear at random
+    times), one node window and idle windows (Excel, Explorer...). A prompt is
+    detected by the first scan of its window after it appeared.
+
+    Returns:
+        {'latencies': [seconds], 'cpu': OCR CPU-seconds per second, 'scans': count}
+    """
+    rng = random.Random(seed)
+    keys = [('claude', 'WindowsTerminal.exe', 'claude - bash'), ('node', 'node.exe', 'node server')]
+    keys += [(f'idle{i}', 'EXCEL.EXE', f'Book{i} - Excel') for i in range(windows - len(keys))]
+    prompt_times = sorted(rng.uniform(60, duration - 60) for _ in range(prompts))
+    pending = list(prompt_times)
+    latencies = []
+    scans = 0
+    now = 0.0
+    frame = 0
+    last_scan = {key: -math.inf for key, _, _ in keys}
+    step = 0.05
+
+    while now < duration:
+        frame += 1 if rng.random() < 0.2 else 0  # Claude output scrolls now and then
+        if scheduler is not None:
+            scheduler.sync(keys, foreground='claude', now=now)
+            due = scheduler.due(now)
+        else:
+            due = [key for key, _, _ in keys if now - last_scan[key] >= fixed_interval]
+        for key in due:
+            scans += 1
+            last_scan[key] = now
+            detected = False
+            if key == 'claude' and pending and pending[0] <= now:
+                latencies.append(now - pending.pop(0))
+                detected = True
+            if scheduler is not None:
+                fingerprint = frame if key == 'claude' else 0
+                scheduler.record(key, fingerprint=fingerprint, cost=ocr_cost, detected=detected, now=now)
+        now += step
+    return {'latencies': latencies, 'cpu': scans * ocr_cost / duration, 'scans': scans}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else float('nan')
+
+
+def main():
+    runs = [
+        ('fixed 10 s loop', simulate(fixed_interval=10.0)),
+        ('ScanScheduler', simulate(scheduler=ScanScheduler(start=0.0))),
+        ('budget 0.3 cores', simulate(scheduler=ScanScheduler(cpu_budget=0.3, start=0.0))),
+    ]
+    print("Simulated 30 min, 12 windows, 40 prompts, 0.25 s OCR per scan")
+    for name, result in runs:
+        latencies = result['latencies']
+        print(f"  {name:<16} latency p50 {_percentile(latencies, 0.5):5.2f} s  "
+              f"p99 {_percentile(latencies, 0.99):5.2f} s  "
+              f"OCR CPU {result['cpu']:.2f} cores ({result['scans']} scans)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,21 +7,23 @@ import sys
 import time
 import threading
 import win32gui
-import win32ui
 import win32con
 import win32api
-from PIL import Image
-import pytesseract
 import io
 from pathlib import Path
+from window_capture import get_window_capture
+from roi_cache import ROICache, window_key
+import ocr_engine
+from keyword_matcher import KeywordMatcher
+from adaptive_poller import AdaptivePoller
+from frame_cache import frame_fingerprint
 
 # UTF-8 설정
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-# Tesseract 경로 설정 (필요시 수정)
-# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Tesseract 경로/엔진 설정: ocr_engine (TESSERACT_CMD, OCR_ENGINE 환경 변수)
 
 
 class ScreenOCRMonitor:
@@ -31,6 +33,9 @@ class ScreenOCRMonitor:
         self.running = False
         self.monitor_thread = None
         self.approval_count = 0
+
+        # ocr_auto_approver가 학습한 프롬프트 ROI (없으면 하단 30%)
+        self.roi_cache = ROICache(path=str(Path(__file__).parent / 'roi_cache.json'))
         self.current_hwnd = None
 
         # 승인 패턴
@@ -47,10 +52,18 @@ class ScreenOCRMonitor:
         # 터미널 패턴
         self.terminal_patterns = ['MINGW', 'bash', 'Claude', 'Terminal']
 
+        # 패턴 목록은 한 번만 컴파일 (터미널 패턴은 대소문자 구분)
+        self.approval_matcher = KeywordMatcher(self.approval_patterns)
+        self.terminal_matcher = KeywordMatcher(self.terminal_patterns, ignore_case=False)
+
         # 중복 방지
         self.last_input_time = 0
         self.min_input_interval = 3
 
+        # 창별 검사 간격 - 화면이 바뀌면 0.5초, 변화가 없으면 8초까지 두 배씩 늘림
+        # (창 제목이 바뀌면 바로 검사)
+        self.poller = AdaptivePoller(min_interval=0.5, max_interval=8.0)
+
         # 현재 창
         try:
             self.current_hwnd = win32console.GetConsoleWindow()
@@ -63,7 +76,7 @@ class ScreenOCRMonitor:
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
                 if title and hwnd != self.current_hwnd:
-                    if any(p in title for p in self.terminal_patterns):
+                    if self.terminal_matcher.match_ids(title):
                         windows.append({'hwnd': hwnd, 'title': title})
             return True
 
@@ -75,57 +88,19 @@ class ScreenOCRMonitor:
         return windows
 
     def capture_window(self, hwnd):
-        """창 스크린샷 캡처"""
-        try:
-            # 창 크기 가져오기
-            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
-            width = right - left
-            height = bottom - top
-
-            # 디바이스 컨텍스트
-            hwndDC = win32gui.GetWindowDC(hwnd)
-            mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-            saveDC = mfcDC.CreateCompatibleDC()
-
-            # 비트맵 생성
-            saveBitMap = win32ui.CreateBitmap()
-            saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-            saveDC.SelectObject(saveBitMap)
-
-            # 화면 복사
-            saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
-
-            # PIL Image로 변환
-            bmpinfo = saveBitMap.GetInfo()
-            bmpstr = saveBitMap.GetBitmapBits(True)
-            img = Image.frombuffer(
-                'RGB',
-                (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                bmpstr, 'raw', 'BGRX', 0, 1
-            )
-
-            # 정리
-            win32gui.DeleteObject(saveBitMap.GetHandle())
-            saveDC.DeleteDC()
-            mfcDC.DeleteDC()
-            win32gui.ReleaseDC(hwnd, hwndDC)
-
-            return img
-
-        except Exception as e:
-            print(f"   ⚠️ 캡처 실패: {e}")
-            return None
+        """창 스크린샷 캡처 (공유 캡처 풀 사용)"""
+        # 학습된 ROI 또는 하단 30% 영역만 캡처 (최근 출력 부분)
+        region = self.roi_cache.capture_region(window_key(hwnd), (0.0, 0.7, 1.0, 1.0), window=hwnd)
+        img = get_window_capture().capture(hwnd, region=region)
+        if img is None:
+            print(f"   ⚠️ 캡처 실패: {hwnd}")
+        return img
 
     def extract_text_from_image(self, img):
         """이미지에서 텍스트 추출 (OCR)"""
         try:
-            # 이미지 하단 일부만 (최근 출력 부분)
-            width, height = img.size
-            # 하단 30% 영역만 크롭
-            bottom_region = img.crop((0, int(height * 0.7), width, height))
-
-            # OCR 수행
-            text = pytesseract.image_to_string(bottom_region, lang='eng')
+            # 캡처 단계에서 이미 프롬프트 영역만 가져옴
+            text = ocr_engine.image_to_string(img, lang='eng')
             return text
 
         except Exception as e:
@@ -137,13 +112,7 @@ class ScreenOCRMonitor:
         if not text:
             return False
 
-        text_lower = text.lower()
-
-        for pattern in self.approval_patterns:
-            if pattern.lower() in text_lower:
-                return True
-
-        return False
+        return bool(self.approval_matcher.match_ids(text))
 
     def send_input_to_terminal(self, terminal):
         """터미널에 '1' 입력"""
@@ -189,25 +158,36 @@ class ScreenOCRMonitor:
         """메인 모니터링 루프"""
         print("\n🔍 화면 OCR 모니터링 시작...")
 
+        started, started_cpu = time.time(), time.process_time()
+
         while self.running:
             try:
                 # 중복 방지
-                if time.time() - self.last_input_time < self.min_input_interval:
-                    time.sleep(1)
+                remaining = self.min_input_interval - (time.time() - self.last_input_time)
+                if remaining > 0:
+                    time.sleep(remaining)
                     continue
 
                 # 대상 터미널 찾기
-                terminals = self.find_target_terminals()
-
+                terminals = {terminal['hwnd']: terminal for terminal in self.find_target_terminals()}
+                self.poller.sync(terminals)
                 if not terminals:
                     time.sleep(2)
                     continue
 
-                # 각 터미널 확인
-                for terminal in terminals:
-                    # 화면 캡처
-                    img = self.capture_window(terminal['hwnd'])
-                    if not img:
+                # 제목이 바뀐 창은 바로 검사
+                for hwnd, terminal in terminals.items():
+                    if self.poller.changed(hwnd, terminal['title'], 'title'):
+                        self.poller.wake(hwnd)
+
+                # 검사할 때가 된 터미널만 확인
+                for hwnd in self.poller.due():
+                    terminal = terminals[hwnd]
+
+                    # 화면 캡처 - 지난번과 같은 화면이면 OCR 생략
+                    img = self.capture_window(hwnd)
+                    if not img or not self.poller.changed(hwnd, frame_fingerprint(img, region=(0.0, 0.0, 1.0, 1.0))):
+                        self.poller.done(hwnd, active=False)
                         continue
 
                     # OCR로 텍스트 추출
@@ -215,17 +195,27 @@ class ScreenOCRMonitor:
 
                     # 승인 패턴 확인
                     if self.check_approval_pattern(text):
+                        self.poller.detected(hwnd)
+                        self.poller.done(hwnd, active=True)
                         print(f"\n📋 승인 요청 감지! (창: {terminal['title']})")
                         print(f"   추출된 텍스트: {text[:100]}...")
                         self.send_input_to_terminal(terminal)
                         break
+                    self.poller.done(hwnd, active=True)
 
-                time.sleep(2)  # OCR은 느리므로 2초 간격
+                # 다음 창을 검사할 때까지 (최대 2초) 대기
+                self.poller.wait(timeout=2)
 
             except Exception as e:
                 print(f"❌ 모니터링 오류: {e}")
                 time.sleep(2)
 
+        # 감지 지연 (직전 검사 이후 경과 시간 = 상한)과 CPU 사용률
+        stats = self.poller.get_stats()
+        if stats['latency_p50'] is not None:
+            cpu_load = (time.process_time() - started_cpu) / max(1e-6, time.time() - started)
+            print(f"\n📊 감지 지연 p50 {stats['latency_p50']:.2f}초, p99 {stats['latency_p99']:.2f}초 | "
+                  f"검사 {stats['polls']}회 | CPU {cpu_load:.0%}")
         print("\n🛑 모니터링 종료")
 
     def start(self):
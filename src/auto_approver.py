@@ -11,6 +11,9 @@ import win32gui
 import win32con
 from typing import List, Dict, Any, Optional, Tuple
 
+from keyword_matcher import KeywordMatcher
+from window_registry import WindowInfo, WindowRegistry, WinEventSource
+
 
 class AutoApprover:
     """Main class for automatic approval functionality"""
@@ -50,6 +53,17 @@ class AutoApprover:
 
         self.approval_count = 0
 
+        # 창 제목 패턴은 한 번만 컴파일 (제외/승인 창 패턴을 한 번에 확인)
+        self.title_matcher = KeywordMatcher({
+            'exclude': self.exclude_patterns,
+            'window': self.window_patterns,
+        })
+
+        # 창 목록 - 이벤트로 갱신, 승인 창 여부는 창 제목이 바뀔 때만 다시 판정
+        self.window_registry = WindowRegistry(
+            WinEventSource(), self._classify_window, min_size=(0, 0), skip_parked=False
+        )
+
         # PyAutoGUI 설정
         pyautogui.FAILSAFE = True
         pyautogui.PAUSE = 0.1
@@ -78,6 +92,7 @@ class AutoApprover:
         self.running = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        self.window_registry.close()
 
         self.logger.info("AutoApprover stopped")
 
@@ -113,37 +128,27 @@ class AutoApprover:
             return True
         return False
 
-    def _find_approval_window(self) -> Optional[Dict]:
-        """승인 대화상자 찾기"""
-        def enum_windows_callback(hwnd, windows):
-            if win32gui.IsWindowVisible(hwnd):
-                window_text = win32gui.GetWindowText(hwnd)
-                if window_text:
-                    # 제외 패턴 체크
-                    for exclude in self.exclude_patterns:
-                        if exclude.lower() in window_text.lower():
-                            return True
-
-                    # 승인 창 패턴 체크
-                    for pattern in self.window_patterns:
-                        if pattern.lower() in window_text.lower():
-                            try:
-                                rect = win32gui.GetWindowRect(hwnd)
-                                windows.append({
-                                    'hwnd': hwnd,
-                                    'title': window_text,
-                                    'rect': rect
-                                })
-                            except Exception as e:
-                                self.logger.debug(f"Error getting window rect: {e}")
-            return True
+    def _classify_window(self, info: WindowInfo) -> Optional[str]:
+        """승인 대화상자가 아니면 이유, 맞으면 None"""
+        matched = self.title_matcher.matches(info.title)
+
+        # 제외 패턴 체크
+        if 'exclude' in matched:
+            return f"excluded: {matched['exclude'][0]}"
 
-        windows = []
+        # 승인 창 패턴 체크
+        if 'window' in matched:
+            return None
+        return "no window pattern"
+
+    def _find_approval_window(self) -> Optional[WindowInfo]:
+        """승인 대화상자 찾기"""
         try:
-            win32gui.EnumWindows(enum_windows_callback, windows)
+            self.window_registry.refresh()
         except Exception as e:
-            self.logger.error(f"Error enumerating windows: {e}")
+            self.logger.error(f"Error updating window list: {e}")
 
+        windows = self.window_registry.targets()
         return windows[0] if windows else None
 
     def _handle_approval(self):
@@ -151,8 +156,8 @@ class AutoApprover:
         if not hasattr(self, 'current_window') or not self.current_window:
             return
 
-        hwnd = self.current_window['hwnd']
-        title = self.current_window['title']
+        hwnd = self.current_window.hwnd
+        title = self.current_window.title
 
         print(f"\n📋 승인 대화상자 감지: '{title}'")
         self.logger.info(f"Detected approval window: '{title}'")
@@ -11,6 +11,13 @@ import win32gui
 import win32con
 from typing import List, Dict, Any, Optional, Tuple
 
+# 템플릿 매칭 엔진 (저장소 루트의 prompt_prefilter.py)
+try:
+    from prompt_prefilter import PromptPrefilter
+    PREFILTER_AVAILABLE = True
+except ImportError:
+    PREFILTER_AVAILABLE = False
+
 # PyAutoGUI 안전 설정
 pyautogui.FAILSAFE = True  # 화면 왼쪽 상단으로 마우스를 이동하면 중지
 pyautogui.PAUSE = 0.1  # 각 명령 사이에 0.1초 대기
@@ -42,6 +49,19 @@ class EnhancedAutoApprover:
         self.safe_mode = config.get('safe_mode', True)
         self.click_count = 0
 
+        # 버튼 템플릿 (PNG + templates.json 디렉터리) - 없으면 버튼 감지 비활성화
+        self.button_matcher = None
+        templates_dir = config.get('button_templates')
+        if templates_dir and PREFILTER_AVAILABLE:
+            try:
+                self.button_matcher = PromptPrefilter.from_directory(
+                    templates_dir,
+                    threshold=config.get('button_threshold', 0.8),
+                    region=(0.0, 0.0, 1.0, 1.0)
+                )
+            except (OSError, ValueError) as e:
+                self.logger.error(f"버튼 템플릿 로드 실패: {e}")
+
         self.logger.info("Enhanced AutoApprover 초기화 완료")
 
     def start(self):
@@ -145,14 +165,17 @@ class EnhancedAutoApprover:
         self.logger.info(f"창 '{title}' 자동 승인됨")
 
     def _find_approval_button(self) -> Optional[Tuple[int, int]]:
-        """화면에서 승인 버튼 찾기"""
-        # 이 부분은 실제 버튼 이미지를 미리 저장해두고
-        # pyautogui.locateOnScreen()을 사용하여 찾을 수 있습니다.
-        # 예시:
-        # button_location = pyautogui.locateOnScreen('ok_button.png')
-        # if button_location:
-        #     return pyautogui.center(button_location)
-        return None
+        """화면에서 승인 버튼 찾기 (prompt_prefilter의 NCC 템플릿 매칭)"""
+        if self.button_matcher is None:
+            return None
+
+        result = self.button_matcher.check(pyautogui.screenshot())
+        if not result.maybe_prompt:
+            return None
+
+        self.logger.debug(f"버튼 감지: {result.template} (점수 {result.score:.2f}, {result.cost_us:.0f}us)")
+        left, top, right, bottom = result.box
+        return (left + right) // 2, (top + bottom) // 2
 
     def _click_button(self, location: Tuple[int, int]):
         """버튼 클릭"""
@@ -12,6 +12,8 @@ import win32api
 import win32console
 import io
 from pathlib import Path
+from keyword_matcher import KeywordMatcher, contains_all
+from console_reader import ConsoleScreen, read_console_region
 
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -46,16 +48,25 @@ class TerminalMonitor:
         # 대상 터미널 창 패턴
         self.terminal_patterns = ['MINGW', 'bash', 'Claude', 'Terminal', 'cmd', 'PowerShell']
 
+        # 패턴 목록은 한 번만 컴파일 - 복합 패턴은 모든 키워드가 있어야 일치
+        self.approval_sets = [p if isinstance(p, list) else [p] for p in self.approval_patterns]
+        self.approval_matcher = KeywordMatcher([k for keywords in self.approval_sets for k in keywords])
+        self.terminal_matcher = KeywordMatcher(self.terminal_patterns, ignore_case=False)
+
         # 중복 방지
         self.last_input_time = 0
         self.min_input_interval = 2  # 2초에 한 번만 입력
+        self.pending_prompt = False  # 감지했지만 입력하지 못한 승인 요청 (화면이 같아도 재시도)
+
+        # 콘솔 화면 읽기 버퍼 (재사용, 바뀌었을 때만 패턴 검사)
+        self.console_screen = ConsoleScreen()
 
     def find_terminal_windows(self):
         """모든 터미널 창 찾기"""
         def callback(hwnd, windows):
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
-                if title and any(p in title for p in self.terminal_patterns):
+                if title and self.terminal_matcher.match_ids(title):
                     windows.append({'hwnd': hwnd, 'title': title})
             return True
 
@@ -67,35 +78,19 @@ class TerminalMonitor:
         return windows
 
     def read_console_screen_buffer(self):
-        """현재 콘솔 화면 버퍼 읽기 (Windows)"""
+        """현재 콘솔 화면 버퍼 읽기 (Windows) - 커서까지 최근 20줄을 한 번의 호출로
+
+        지난번과 같은 화면이면 self.console_screen.changed가 False
+        """
         try:
             # 표준 출력 핸들 가져오기
             console_handle = win32console.GetStdHandle(win32console.STD_OUTPUT_HANDLE)
 
-            # 콘솔 화면 버퍼 정보 가져오기
-            csbi = console_handle.GetConsoleScreenBufferInfo()
-
-            # 현재 커서 위치
-            cursor_pos = csbi['CursorPosition']
-
-            # 마지막 몇 줄만 읽기 (최근 20줄)
-            lines_to_read = min(20, cursor_pos.Y + 1)
-            start_y = max(0, cursor_pos.Y - lines_to_read + 1)
-
-            # 화면 버퍼에서 텍스트 읽기
-            buffer_text = []
-            for y in range(start_y, cursor_pos.Y + 1):
-                try:
-                    # 한 줄씩 읽기
-                    coord = win32console.PyCOORDType(0, y)
-                    size = csbi['Size'].X
-                    text = console_handle.ReadConsoleOutputCharacter(size, coord)
-                    buffer_text.append(text.strip())
-                except:
-                    pass
-
-            return '\n'.join(buffer_text)
+            # 재사용 버퍼에 한 번에 읽기 (줄 문자열은 필요할 때만 만듦)
+            read_console_region(console_handle, self.console_screen, lines=20, to_cursor=True)
+            return self.console_screen.text()
         except Exception as e:
+            self.console_screen.changed = False
             return ""
 
     def check_approval_pattern(self, text):
@@ -103,19 +98,7 @@ class TerminalMonitor:
         if not text:
             return False
 
-        text_lower = text.lower()
-
-        for pattern in self.approval_patterns:
-            if isinstance(pattern, list):
-                # 모든 요소가 포함되어 있는지 확인
-                if all(p.lower() in text_lower for p in pattern):
-                    return True
-            else:
-                # 단일 패턴
-                if pattern.lower() in text_lower:
-                    return True
-
-        return False
+        return contains_all(self.approval_matcher, text, self.approval_sets)
 
     def send_input_to_terminal(self, terminal):
         """터미널에 '1' 입력"""
@@ -162,8 +145,10 @@ class TerminalMonitor:
                 # 현재 콘솔 화면 읽기
                 screen_text = self.read_console_screen_buffer()
 
-                # 승인 패턴 확인
-                if self.check_approval_pattern(screen_text):
+                # 승인 패턴 확인 (화면이나 커서가 바뀌었거나 이전 감지를 아직 처리하지 못했을 때)
+                if screen_text and (self.console_screen.changed or self.pending_prompt):
+                    self.pending_prompt = self.check_approval_pattern(screen_text)
+                if screen_text and self.pending_prompt:
                     print("\n📋 승인 요청 패턴 감지!")
                     print(f"   감지된 텍스트:\n{screen_text[-200:]}")  # 마지막 200자만
 
@@ -171,8 +156,8 @@ class TerminalMonitor:
                     terminals = self.find_terminal_windows()
 
                     if terminals:
-                        # 첫 번째 터미널에 입력
-                        self.send_input_to_terminal(terminals[0])
+                        # 첫 번째 터미널에 입력 - 실패하면 화면이 같아도 다음 루프에서 재시도
+                        self.pending_prompt = not self.send_input_to_terminal(terminals[0])
                     else:
                         print("   ⚠️ 대상 터미널을 찾을 수 없습니다")
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Adaptive poller tests - timing wheel, backoff, wake on change, latency stats
+"""
+import threading
+import time
+
+from adaptive_poller import AdaptivePoller, LatencyStats, TimingWheel, simulate
+
+
+def test_timing_wheel_pops_due_keys_in_deadline_order():
+    wheel = TimingWheel(tick=0.1, slots=8, start=0.0)
+    wheel.schedule('b', 0.35)
+    wheel.schedule('a', 0.3)
+    wheel.schedule('far', 5.0)  # Several revolutions ahead
+    wheel.schedule('late', -1.0)  # Already past: due on the next pop
+    assert wheel.pop_due(0.0) == ['late']
+    assert wheel.pop_due(0.32) == ['a']
+    assert wheel.pop_due(0.4) == ['b']
+    assert wheel.pop_due(4.9) == [] and 'far' in wheel
+    assert wheel.next_deadline() == 5.0
+
+    wheel.schedule('far', 1.0)  # Rescheduling moves the key (already past: next pop)
+    wheel.cancel('gone')
+    assert wheel.pop_due(4.95) == ['far'] and len(wheel) == 0
+
+
+def test_backoff_while_idle_and_reset_on_activity():
+    poller = AdaptivePoller(min_interval=0.5, max_interval=4.0, start=0.0)
+    poller.sync(['w'], now=0.0)
+    now = 0.0
+    intervals = []
+    for _ in range(5):
+        assert poller.due(now) == ['w']
+        poller.done('w', active=False, now=now)
+        intervals.append(poller.intervals['w'])
+        now = poller.wheel.deadline('w')
+    assert intervals == [1.0, 2.0, 4.0, 4.0, 4.0]
+
+    assert poller.due(now) == ['w']
+    poller.done('w', active=True, now=now)
+    assert poller.wheel.deadline('w') == now + 0.5
+
+
+def test_change_signal_wakes_idle_window_rate_limited():
+    poller = AdaptivePoller(min_interval=0.5, max_interval=8.0, start=0.0)
+    poller.sync(['w'], now=0.0)
+    assert poller.changed('w', 'title 1', 'title')  # First observation
+    assert not poller.changed('w', 'title 1', 'title')
+    poller.due(0.0)
+    for _ in range(4):
+        poller.done('w', active=False, now=0.0)
+    assert poller.wheel.deadline('w') == 8.0
+
+    # Change 0.2 s after the last poll: due min_interval after that poll, not at 8 s
+    assert poller.changed('w', 'title 2', 'title')
+    poller.wake('w', now=0.2)
+    assert poller.wheel.deadline('w') == 0.5 and poller.wakeup.is_set()
+    poller.wake('w', now=0.3)  # Already due sooner
+    assert poller.wakes == 1
+
+    # Detection latency: time since the previous poll
+    poller.detected('w', now=0.5)
+    assert list(poller.latency.samples) == [0.5]
+
+
+def test_sync_forgets_closed_and_requeues_unfinished():
+    poller = AdaptivePoller(start=0.0)
+    poller.sync(['a', 'b'], now=0.0)
+    assert sorted(poller.due(0.0)) == ['a', 'b']
+    poller.done('a', active=False, now=0.0)
+    # 'b' was returned by due() but the loop broke off before done()
+    poller.sync(['a', 'b'], now=0.1)
+    assert poller.due(0.1) == ['b']
+    poller.changed('a', 1)
+    poller.sync(['b'], now=0.1)
+    assert 'a' not in poller.intervals and 'a' not in poller.wheel and not poller._signals
+
+
+def test_wait_ends_on_wakeup_from_another_thread():
+    poller = AdaptivePoller()
+    poller.sync(['w'])
+    poller.due()
+    poller.done('w', active=False)
+    threading.Timer(0.05, poller.wakeup.set).start()
+    start = time.perf_counter()
+    poller.wait(timeout=2)
+    assert time.perf_counter() - start < 1.0 and not poller.wakeup.is_set()
+
+
+def test_latency_percentiles_and_simulation():
+    stats = LatencyStats()
+    assert stats.percentile(0.5) is None
+    for value in range(1, 101):
+        stats.add(value / 100)
+    assert stats.percentile(0.5) == 0.51 and stats.percentile(0.99) == 1.0
+
+    fixed = simulate(fixed_interval=2.0, duration=600.0, prompts=10)
+    adaptive = simulate(poller=AdaptivePoller(min_interval=0.5, max_interval=8.0, start=0.0),
+                        duration=600.0, prompts=10)
+    assert max(adaptive['latencies']) < max(fixed['latencies'])
+    assert adaptive['cpu'] < fixed['cpu']
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Layout-aware matcher tests - option blocks from OCR word boxes (fake engine TSV)
+"""
+from PIL import Image
+
+from approval_matcher import (
+    choose_option, find_option_block, layout_rules_out_prompt, match_prompt, parse_text_options, text_prompt_key,
+    text_shows_prompt,
+)
+from ocr_engine import FakeOCREngine, OCRLine, OCRWord
+from ocr_fixtures import FIXTURES
+
+QUESTION = ['do you want', 'would you like', 'would you']
+ACTION = ['proceed', 'approve', 'allow', 'create', 'select', 'choose']
+SPECIFIC = ["yes, and don't ask again", 'select an option']
+
+
+def layout(text):
+    img = Image.new('L', (8, 8), len(text) % 256)
+    engine = FakeOCREngine()
+    engine.add(img, text)
+    return engine.image_to_data(img).lines
+
+
+def line(words, top, conf=95):
+    """OCRLine from [(text, left)] with 10px per character"""
+    return OCRLine([OCRWord(text, conf, (left, top, left + 10 * len(text), top + 16)) for text, left in words])
+
+
+def test_fixture_verdicts():
+    verdicts = {
+        fixture['name']: match_prompt(layout('\n'.join(fixture['lines'])), QUESTION, ACTION, SPECIFIC)
+        for fixture in FIXTURES
+    }
+    verdict, options = verdicts['claude_proceed']
+    assert verdict is True
+    assert options['1'] == 'yes'
+    assert options['3'].startswith('no, and tell claude')
+    assert verdicts['trust_folder'] == (True, {'1': 'yes, proceed', '2': 'no, exit'})
+    assert verdicts['claude_edit'][0] is True
+    assert verdicts['shell_idle'] == (False, {})
+    assert verdicts['numbered_notes'] == (None, {})  # options but no prompt wording
+    # A numbered plan above the prompt is not the prompt's option block
+    assert verdicts['plan_then_proceed'] == (True, {'1': 'yes', '2': 'no'})
+
+
+    # Prompt in a box: OCR reads the left border as |, l or I
+    boxed = next(fixture for fixture in FIXTURES if fixture['name'] == 'boxed_proceed')
+    for border in '|lI':
+        text = '\n'.join(line.replace('|', border) for line in boxed['lines'])
+        verdict, options = match_prompt(layout(text), QUESTION, ACTION, SPECIFIC)
+        assert verdict is True and text_shows_prompt(text), border
+        assert options['1'] == 'yes' and choose_option(options)[0] == '2', (border, options)
+    # Options not parsed (border glyph not recognized): undecided, not ruled out
+    assert match_prompt(layout('[ Do you want to proceed?\n[ 1? Yes\n[ 2. No'), QUESTION, ACTION, SPECIFIC) == (None, {})
+
+
+def test_options_must_be_aligned_and_consecutive():
+    lines = [
+        line([('Do', 0), ('you', 30), ('want', 70), ('to', 120), ('proceed?', 150)], 0),
+        line([('1.', 20), ('Yes', 50)], 20),
+        line([('wrapped', 50), ('description', 130)], 40),
+        line([('2.', 22), ('No', 50)], 60),
+        line([('2.', 200), ('elsewhere', 230)], 80),
+        line([('4.', 20), ('Skipped', 50)], 100),
+    ]
+    index, options = find_option_block(lines)
+    assert index == 1
+    assert options == {'1': 'yes', '2': 'no'}
+
+    # Option 2 far to the right of option 1 is not part of the block
+    lines[3] = line([('2.', 300), ('No', 330)], 60)
+    assert find_option_block(lines)[1] == {'1': 'yes'}
+
+
+def test_low_confidence_option_is_not_trusted():
+    lines = [
+        line([('Do', 0), ('you', 30), ('want', 70), ('to', 120), ('proceed?', 150)], 0),
+        line([('1.', 20), ('Yes', 50)], 20, conf=35),
+        line([('2.', 20), ('No', 50)], 40),
+    ]
+    assert find_option_block(lines) == (None, {})
+    assert match_prompt(lines, QUESTION, ACTION, SPECIFIC) == (None, {})
+
+
+def test_layout_rules_out_prompt_only_when_read_confidently():
+    assert layout_rules_out_prompt(layout('$ git status\nOn branch main'))
+    assert not layout_rules_out_prompt([])
+    assert not layout_rules_out_prompt(layout('Do you want to proceed?\n> 1. Yes'))
+    assert not layout_rules_out_prompt([line([('$', 0), ('ls', 20)], 0, conf=40)])
+
+
+def test_flat_text_rules():
+    text = '1. run the build\n2. deploy\nDo you want to proceed?\n> 1. Yes\n  2. Yes, and don\'t ask again\n  3. No'
+    assert text_shows_prompt(text)
+    assert not text_shows_prompt('Do you want to proceed?') and not text_shows_prompt('11. Yes, proceed')
+    assert parse_text_options(text) == {'1': 'run the build', '2': 'deploy', '3': 'no'}
+    assert parse_text_options(text, last=True) == {'1': 'yes', '2': "yes, and don't ask again", '3': 'no'}
+    assert choose_option(parse_text_options(text, last=True)) == ('2', 15)
+    question, options = text_prompt_key(text)
+    assert question == 'do you want to proceed?' and options[0] == ('1', 'yes')
+    assert text_prompt_key(text.replace('> 1.', '  1.').replace('  2.', '> 2.')) == (question, options)
+    # Never the third slot, even when it scores best
+    assert choose_option({'1': 'no', '3': 'yes'})[0] == '1'
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Async OCR dispatcher tests - reuse, cancellation, timeouts, per-window ordering
+"""
+import concurrent.futures
+import threading
+import time
+
+from async_ocr import AsyncOCRDispatcher, OCRCancelled, OCRTimeout, check_cancelled
+
+
+def _slow_ocr(log, name, seconds, cancel_event=None):
+    """Fake OCR job: polls its cancel_event like ocr_window does between stages"""
+    log.append(('start', name))
+    deadline = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < deadline:
+            check_cancelled(cancel_event)
+            time.sleep(0.005)
+        return name
+    finally:
+        log.append(('end', name))
+
+
+def _dispatcher(**kwargs):
+    dispatcher = AsyncOCRDispatcher(workers=4, **kwargs)
+    dispatcher.start()
+    return dispatcher
+
+
+def test_result_and_reuse_of_same_frame():
+    dispatcher = _dispatcher()
+    try:
+        log = []
+        first = dispatcher.submit(1, 'aaa', _slow_ocr, log, 'a', 0.05)
+        assert dispatcher.submit(1, 'aaa', _slow_ocr, log, 'a2', 0.05) is first
+        assert first.result(timeout=2) == 'a'
+        assert log == [('start', 'a'), ('end', 'a')]
+        stats = dispatcher.get_stats()
+        assert stats['reused'] == 1 and stats['completed'] == 1 and stats['in_flight'] == 0
+    finally:
+        dispatcher.stop()
+
+
+def test_changed_fingerprint_cancels_and_waits_for_old_job():
+    dispatcher = _dispatcher()
+    try:
+        log = []
+        old = dispatcher.submit(1, 'aaa', _slow_ocr, log, 'old', 5.0)
+        while not log:
+            time.sleep(0.005)
+        new = dispatcher.submit(1, 'bbb', _slow_ocr, log, 'new', 0.01)
+        assert new.result(timeout=2) == 'new'
+        try:
+            old.result(timeout=0)
+            assert False, 'old job should be cancelled'
+        except concurrent.futures.CancelledError:
+            pass
+        # The replacement only started after the old job returned
+        assert log == [('start', 'old'), ('end', 'old'), ('start', 'new'), ('end', 'new')]
+        assert dispatcher.get_stats()['cancelled'] == 1
+    finally:
+        dispatcher.stop()
+
+
+def test_timeout_sets_cancel_event():
+    dispatcher = _dispatcher(timeout=0.1)
+    try:
+        seen = []
+
+        def stuck(cancel_event=None):
+            seen.append(cancel_event)
+            cancel_event.wait(2)
+            check_cancelled(cancel_event)
+
+        start = time.perf_counter()
+        future = dispatcher.submit(1, 'aaa', stuck)
+        try:
+            future.result(timeout=2)
+            assert False, 'expected OCRTimeout'
+        except OCRTimeout:
+            pass
+        assert time.perf_counter() - start < 1.0
+        assert seen[0].is_set()
+        assert dispatcher.get_stats()['timed_out'] == 1
+    finally:
+        dispatcher.stop()
+
+
+def test_closed_windows_do_not_hold_up_live_ones():
+    dispatcher = _dispatcher()
+    try:
+        log = []
+        release = threading.Event()
+
+        def hung(cancel_event=None):
+            release.wait(5)
+            check_cancelled(cancel_event)
+            return 'hung'
+
+        gone = dispatcher.submit(2, 'x', hung)
+        live = dispatcher.submit(1, 'y', _slow_ocr, log, 'live', 0.01)
+        assert dispatcher.cancel_missing([1]) == 1
+        assert live.result(timeout=2) == 'live'
+        assert gone.cancelled()
+        assert set(dispatcher.in_flight()) == set()
+
+        # The pool thread returns once the call unblocks; its cancel_event was set
+        release.set()
+        assert not dispatcher.cancel(2)
+    finally:
+        dispatcher.stop()
+
+
+def test_cooperative_cancel_raises_ocr_cancelled():
+    event = threading.Event()
+    check_cancelled(None)
+    check_cancelled(event)
+    event.set()
+    try:
+        check_cancelled(event)
+        assert False, 'expected OCRCancelled'
+    except OCRCancelled:
+        pass
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
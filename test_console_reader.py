@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Console reader tests - screen buffer hashing, row diffs, helper protocol over real pipes, pool lifecycle
+"""
+import io
+import json
+import os
+import sys
+import time
+
+from console_reader import CELL_SIZE, ConsoleReader, ConsoleReaderPool, ConsoleScreen, apply_diff, diff_rows, serve
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Helper that serves a scripted screen instead of attaching to a console:
+# the last row counts requests, so every other read changes one row
+FAKE_HELPER = [sys.executable, '-c', f"""
+import sys; sys.path.insert(0, {HERE!r})
+from console_reader import serve
+reads = []
+def read_screen(lines):
+    reads.append(lines)
+    return (2, len(reads)), ['$ claude', 'Do you want to proceed?', f'count {{len(reads) // 2}}   ']
+serve(read_screen)
+"""]
+FAILING_HELPER = [sys.executable, '-c', "print('{\"error\": \"attach failed\", \"fatal\": true}')"]
+
+
+def test_diff_round_trip():
+    previous = ['a', 'b', 'c']
+    for rows in (['a', 'x', 'c'], ['a', 'b'], ['a', 'b', 'c', 'd'], [], ['a', 'b', 'c']):
+        reply = {'height': len(rows), 'rows': diff_rows(previous, rows)}
+        assert apply_diff(previous, reply) == rows
+        previous = rows
+    assert diff_rows(['a', 'b'], ['a', 'b']) == []
+
+
+def test_screen_detects_changes_by_hash_and_cursor():
+    screen = ConsoleScreen()
+    rows = ['$ claude', 'Do you want to proceed?', '> 1. Yes']
+    assert screen.fill(rows, cursor=(8, 2), width=40)
+    view = screen._view
+    assert not screen.fill(rows, cursor=(8, 2), width=40)  # Same cells, same cursor
+    assert screen.fill(rows, cursor=(9, 2), width=40)  # Cursor moved
+    assert screen.fill(rows[:2] + ['> 2. No'], cursor=(9, 2), width=40)
+    assert screen._view is view  # Buffer reused while the size stays
+    assert screen.fill(rows, cursor=(9, 2), width=50) and screen._view is not view
+
+
+def test_screen_builds_lines_lazily():
+    screen = ConsoleScreen()
+    screen.fill(['first', 'second   ', '  third'], width=12)
+    assert screen.text(2) == 'second\nthird'
+    assert sorted(screen._lines) == [1, 2]  # Row 0 never decoded
+    assert screen.rows() == ['first', 'second', '  third']
+    screen.fill(['first', 'changed', '  third'], width=12)
+    assert not screen._lines and screen.line(1) == 'changed'
+
+
+def test_screen_drops_trailing_half_of_wide_characters():
+    screen = ConsoleScreen()
+    screen.fill(['승승인 ok'], width=8)
+    # The console repeats a double-width character in its second cell
+    screen.cells[1 * CELL_SIZE + 3] = 0x02
+    screen.update((0, 0))
+    assert screen.line(0) == '승인 ok'
+
+
+def test_serve_sends_snapshot_then_changed_rows():
+    screens = iter([['one', 'two  '], ['one', 'three'], ['one', 'three']])
+    stdin = io.BytesIO(b'{"lines": 2}\n' * 3 + b'{"lines": 2}\n')
+    stdout = io.BytesIO()
+    serve(lambda lines: ((0, lines), next(screens)), stdin, stdout)
+    replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert replies[0] == {'cursor': [0, 2], 'height': 2, 'rows': [[0, 'one'], [1, 'two']]}
+    assert replies[1]['rows'] == [[1, 'three']]
+    assert replies[2]['rows'] == []
+    assert 'error' in replies[3]  # read_screen raised (StopIteration)
+
+
+def test_reader_streams_diffs_from_helper_process():
+    reader = ConsoleReader(1234, lines=3, command=FAKE_HELPER)
+    try:
+        assert reader.read() == '$ claude\nDo you want to proceed?\ncount 0'
+        assert reader.changed and reader.cursor == (2, 1)
+        reader.read()
+        assert reader.changed and reader.rows[-1] == 'count 1'
+        reader.read()
+        assert not reader.changed and reader.cursor == (2, 3)
+
+        start = time.perf_counter()
+        for _ in range(200):
+            reader.read()
+        # A pipe round trip, not an attach/detach cycle with sleeps
+        assert (time.perf_counter() - start) / 200 < 0.01
+    finally:
+        reader.close()
+    assert reader.closed and reader.read() is None
+
+
+def test_pool_backs_off_failed_pids_and_stops_gone_ones():
+    pool = ConsoleReaderPool(retry_after=30.0, command=FAILING_HELPER)
+    assert pool.read(1, now=0.0) is None
+    assert 1 not in pool.readers
+    assert pool.get(1, now=10.0) is None  # Not retried yet
+    assert pool.get(None) is None
+
+    pool = ConsoleReaderPool(command=FAKE_HELPER)
+    try:
+        assert 'proceed' in pool.read(1) and 'proceed' in pool.read(2)
+        reader = pool.readers[1]
+        pool.sync([2])
+        assert list(pool.readers) == [2] and reader.closed
+    finally:
+        pool.close()
+    assert not pool.readers
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Dirty region detection tests
+"""
+import numpy as np
+from PIL import Image
+
+from dirty_regions import (
+    DirtyRegionTracker, changed_boxes, dirty_tile_mask, expand_to_text_lines,
+)
+from ocr_engine import OCRLine, OCRResult, OCRWord
+
+
+def _page(lines, width=320, line_height=20, rows=10):
+    """Fake terminal: each non-empty line is a dark bar with a label-specific pattern"""
+    gray = np.full((rows * line_height, width), 255, dtype=np.uint8)
+    for i, label in enumerate(lines):
+        if label:
+            y = i * line_height + 4
+            gray[y:y + 12, 8:8 + 10 * len(label)] = (37 * sum(map(ord, label))) % 200
+    return gray
+
+
+class _RecordingOCR:
+    """Returns the labels drawn in the cropped strip"""
+
+    def __init__(self, lines, line_height=20):
+        self.lines = lines
+        self.line_height = line_height
+        self.calls = []
+
+    def __call__(self, img):
+        self.calls.append(img.size)
+        labels = []
+        for i, label in enumerate(self.lines):
+            y = i * self.line_height + 4
+            if label and self._y0 <= y < self._y0 + img.height:
+                labels.append(label)
+        return '\n'.join(labels) + '\n'
+
+
+class _LayoutOCR(_RecordingOCR):
+    """Returns the labels as OCRResult lines boxed where they are drawn in the strip"""
+
+    def __call__(self, img):
+        self.calls.append(img.size)
+        lines = []
+        for i, label in enumerate(self.lines):
+            y = i * self.line_height + 4
+            if label and self._y0 <= y < self._y0 + img.height:
+                top = y - self._y0
+                lines.append(OCRLine([OCRWord(label, 95, (8, top, 8 + 10 * len(label), top + 12))]))
+        return OCRResult('\n'.join(line.text for line in lines), lines=lines)
+
+
+def _extract(state, lines, ocr_class=_RecordingOCR):
+    gray = _page(lines)
+    img = Image.fromarray(gray)
+    ocr = ocr_class(lines)
+    original_crop = img.crop
+
+    def crop(box):
+        ocr._y0 = box[1]
+        return original_crop(box)
+
+    img.crop = crop
+    ocr._y0 = 0
+    return state.extract(img, ocr), ocr.calls
+
+
+def test_mask_and_boxes_find_changed_tiles():
+    prev = np.zeros((64, 64), dtype=np.uint8)
+    cur = prev.copy()
+    cur[40:44, 20:50] = 200
+
+    mask = dirty_tile_mask(prev, cur, tile=16)
+    assert mask.shape == (4, 4)
+    assert mask.sum() == 3
+
+    boxes = changed_boxes(mask, 16, cur.shape)
+    assert boxes == [(16, 32, 64, 48)]
+
+
+def test_mask_handles_partial_tiles():
+    prev = np.zeros((20, 30), dtype=np.uint8)
+    cur = prev.copy()
+    cur[19, 29] = 255
+    mask = dirty_tile_mask(prev, cur, tile=16)
+    assert mask.shape == (2, 2)
+    assert mask[1, 1] and mask.sum() == 1
+
+
+def test_bands_expand_to_whole_text_line():
+    gray = np.full((60, 40), 255, dtype=np.uint8)
+    gray[20:35, 5:30] = 0  # one text line spanning two tiles
+    bands = expand_to_text_lines([(0, 32, 16, 48)], gray)
+    assert bands == [(20, 48)]
+
+
+def test_only_changed_lines_are_reocrd():
+    tracker = DirtyRegionTracker()
+    state = tracker.for_window(1)
+
+    lines = ['$ claude', 'working', '', '', '', '', '', '', '', '']
+    text, calls = _extract(state, lines)
+    assert text.split('\n') == ['$ claude', 'working']
+    assert len(calls) == 1  # first frame: full OCR
+
+    # Prompt appears at the bottom
+    lines2 = lines[:7] + ['Do you want to proceed?', '1. Yes', '2. No']
+    text, calls = _extract(state, lines2)
+    assert text.split('\n') == ['$ claude', 'working', 'Do you want to proceed?', '1. Yes', '2. No']
+
+    # Only the option line changes - less than the prompt block is OCR'd
+    lines3 = lines2[:8] + ['1. Yes!', '2. No']
+    text, calls = _extract(state, lines3)
+    assert text.split('\n') == ['$ claude', 'working', 'Do you want to proceed?', '1. Yes!', '2. No']
+    assert sum(h for _, h in calls) < 60
+
+    # Strips now follow text lines - the same line changing again is one small OCR call
+    lines4 = lines2[:8] + ['1. Yes?', '2. No']
+    text, calls = _extract(state, lines4)
+    assert text.split('\n') == ['$ claude', 'working', 'Do you want to proceed?', '1. Yes?', '2. No']
+    assert len(calls) == 1 and calls[0][1] < 20
+
+    # Nothing changed - no OCR at all
+    text, calls = _extract(state, lines4)
+    assert calls == []
+    assert tracker.get_stats()['unchanged'] == 1
+
+
+def test_line_layout_is_kept_in_image_coordinates():
+    state = DirtyRegionTracker().for_window(1)
+    lines = ['$ claude', 'working', '', '', '', '', '', '', '', '']
+    _extract(state, lines, _LayoutOCR)
+    lines2 = lines[:7] + ['Do you want to proceed?', '1. Yes', '2. No']
+    text, calls = _extract(state, lines2, _LayoutOCR)
+    assert calls[-1] == (320, 56)  # prompt block OCR'd as its own strip
+    assert [line.text for line in state.lines] == text.split('\n')
+    assert [line.box[1] for line in state.lines] == [4, 24, 144, 164, 184]
+
+
+def test_large_change_falls_back_to_full_ocr():
+    tracker = DirtyRegionTracker(max_dirty_fraction=0.5)
+    state = tracker.for_window(1)
+    _extract(state, ['a'] * 10)
+    _, calls = _extract(state, ['b'] * 10)
+    assert calls == [(320, 200)]
+    assert tracker.get_stats()['full'] == 2
+
+    tracker.evict_missing([])
+    assert tracker.get_stats()['windows'] == 0
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
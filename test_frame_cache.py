@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Frame fingerprint cache tests
+"""
+from PIL import Image, ImageDraw
+
+from frame_cache import FrameFingerprintCache, frame_fingerprint
+
+
+def _terminal(lines, size=(800, 600)):
+    img = Image.new('RGB', size, (12, 12, 12))
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(lines):
+        draw.text((10, 260 + i * 20), line, fill=(220, 220, 220))
+    return img
+
+
+def test_fingerprint_stable_for_identical_frames():
+    a = _terminal(["Do you want to proceed?", "1. Yes", "2. No"])
+    b = _terminal(["Do you want to proceed?", "1. Yes", "2. No"])
+    assert frame_fingerprint(a) == frame_fingerprint(b)
+
+
+def test_fingerprint_changes_when_prompt_region_changes():
+    a = _terminal(["$ ls"])
+    b = _terminal(["$ ls", "Do you want to proceed?", "1. Yes", "2. No"])
+    assert frame_fingerprint(a) != frame_fingerprint(b)
+
+
+def test_fingerprint_ignores_changes_above_prompt_region():
+    a = _terminal(["1. Yes"])
+    b = a.copy()
+    ImageDraw.Draw(b).text((10, 10), "title bar changed", fill=(255, 255, 255))
+    assert frame_fingerprint(a) == frame_fingerprint(b)
+
+
+def test_cache_hits_misses_and_eviction():
+    cache = FrameFingerprintCache()
+    img = _terminal(["1. Yes"])
+    fp = cache.fingerprint(img)
+
+    assert cache.get(1, fp) is None
+    cache.store(1, fp, "1. Yes", True)
+    entry = cache.get(1, fp)
+    assert entry.text == "1. Yes" and entry.verdict is True
+
+    # Changed frame misses
+    assert cache.get(1, "other") is None
+
+    cache.store(2, fp, "", False)
+    assert cache.evict_missing([2]) == 1
+    assert len(cache) == 1
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['evictions'] == 1
+    assert abs(stats['hit_rate'] - 1 / 3) < 1e-9
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
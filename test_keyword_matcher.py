@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Keyword matcher tests - compiled plan must agree with per-keyword substring loops
+"""
+from approval_matcher import ACTION_PATTERNS, QUESTION_PATTERNS, SPECIFIC_PATTERNS, prompt_matcher
+from keyword_matcher import KeywordMatcher, contains_all
+from ocr_fixtures import FIXTURES
+
+
+def test_overlapping_and_nested_keywords():
+    matcher = KeywordMatcher(['proceed', 'to proceed', 'proceed with', 'would you', 'would you like'])
+    assert [matcher.keywords[i] for i in matcher.match_ids('Would you like to proceed?')] == \
+        ['proceed', 'to proceed', 'would you', 'would you like']
+    # Nested keywords are skipped when the keyword they contain is absent
+    assert matcher.match_ids('would you mind') == [3]
+    assert matcher.match_ids('') == [] and matcher.match_ids('nothing here') == []
+
+
+def test_groups_in_definition_order():
+    matcher = KeywordMatcher({'exclude': ['chrome', 'excel'], 'terminal': ['bash', 'claude'], 'dup': ['bash']})
+    assert matcher.matches('claude - bash - Google Chrome') == {
+        'exclude': ['chrome'], 'terminal': ['bash', 'claude'], 'dup': ['bash'],
+    }
+    assert matcher.search('claude - Excel - chrome') == 'chrome'
+    assert matcher.search('notepad') is None
+    assert len(matcher) == 5
+
+
+def test_case_sensitive_titles():
+    matcher = KeywordMatcher(['MINGW', 'Code'], ignore_case=False)
+    assert matcher.match_ids('MINGW64:/c/work') == [0]
+    assert matcher.match_ids('mingw64 - vscode') == []
+
+
+def test_contains_all_compound_patterns():
+    sets = [['1.', 'Yes'], ['(1)', 'Yes'], ['Choose (1)']]
+    matcher = KeywordMatcher([k for keywords in sets for k in keywords])
+    assert contains_all(matcher, '> 1. yes\n  2. no', sets)
+    assert contains_all(matcher, 'choose (1) or (2)', sets)
+    assert not contains_all(matcher, '1. No', sets)
+
+
+def test_fixtures_match_substring_loops():
+    matcher = prompt_matcher()
+    groups = {'specific': SPECIFIC_PATTERNS, 'question': QUESTION_PATTERNS, 'action': ACTION_PATTERNS}
+    texts = [' '.join('\n'.join(fixture['lines']).lower().split()) for fixture in FIXTURES]
+    for text in texts + ['is this a project you created or one you trust?', 'proceed with care']:
+        expected = {group: [p for p in patterns if p in text] for group, patterns in groups.items()}
+        assert matcher.matches(text) == {group: found for group, found in expected.items() if found}, text
+    assert prompt_matcher() is matcher
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Two-stage OCR tests - anchor tokens and the detect pass
+"""
+from PIL import Image
+
+from ocr_anchors import AnchorDetector, find_anchors, DETECT_CONFIG
+from ocr_fixtures import FIXTURES
+
+
+def test_every_approval_fixture_has_anchors():
+    for fixture in FIXTURES:
+        anchors = find_anchors('\n'.join(fixture['lines']))
+        if fixture['approval']:
+            assert anchors, fixture['name']
+    assert find_anchors('\n'.join(FIXTURES[3]['lines'])) == []  # shell_idle
+
+
+def test_anchor_tokens():
+    assert find_anchors('> 1. Yes') == ['1.', 'yes']
+    assert find_anchors('Do you want to PROCEED?') == ['proceed']
+    assert find_anchors('step 11. done, 21) later') == []
+    assert find_anchors('yesterday proceeds') == []
+
+
+class _RecordingOCR:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+
+    def __call__(self, img, config=''):
+        self.calls.append((img.size, img.mode, config))
+        return self.text
+
+
+def test_detect_pass_runs_at_native_or_reduced_resolution():
+    img = Image.new('RGB', (400, 120), (10, 10, 10))
+
+    ocr = _RecordingOCR('$ ls')
+    detector = AnchorDetector()
+    anchors, text = detector.detect(img, ocr)
+    assert anchors == [] and text == '$ ls'
+    assert ocr.calls == [((400, 120), 'L', DETECT_CONFIG)]  # no 1200px upscale
+
+    ocr = _RecordingOCR('1. Yes')
+    half = AnchorDetector(scale=0.5)
+    assert half.detect(img, ocr)[0] == ['1.', 'yes']
+    assert ocr.calls[0][0] == (200, 60)
+
+
+def test_confirm_rate_counts_frames_sent_to_stage_two():
+    detector = AnchorDetector()
+    img = Image.new('L', (50, 20), 0)
+    for text in ('nothing', 'nothing', 'nothing', '2. No'):
+        detector.detect(img, _RecordingOCR(text))
+    stats = detector.get_stats()
+    assert (stats['detect_passes'], stats['confirm_passes']) == (4, 1)
+    assert stats['confirm_rate'] == 0.25
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+OCR result cache tests - content keys, LRU byte budget and persistence
+"""
+import os
+import tempfile
+
+from PIL import Image
+
+from ocr_cache import OCRResultCache, result_key
+
+
+class _CountingOCR:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, img, lang='eng', config=''):
+        self.calls += 1
+        return f"text {img.getpixel((0, 0))} {config}"
+
+
+def test_key_depends_on_pixels_and_config():
+    a = Image.new('L', (20, 10), 0)
+    b = Image.new('L', (20, 10), 0)
+    c = Image.new('L', (20, 10), 1)
+    assert result_key(a) == result_key(b)
+    assert result_key(a) != result_key(c)
+    assert result_key(a, config='--psm 6') != result_key(a, config='--psm 7')
+    assert result_key(a) != result_key(Image.new('L', (10, 20), 0))
+
+
+def test_hit_skips_ocr():
+    cache = OCRResultCache()
+    ocr = _CountingOCR()
+    img = Image.new('L', (20, 10), 5)
+
+    first = cache.image_to_string(img, ocr, config='--psm 6')
+    second = cache.image_to_string(img.copy(), ocr, config='--psm 6')
+    assert first == second and ocr.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.image_to_string(img, ocr, config='--psm 7')
+    assert ocr.calls == 2
+
+
+def test_layout_results_cached_separately_from_text():
+    cache = OCRResultCache()
+    img = Image.new('L', (20, 10), 5)
+    tsv = '5\t1\t1\t1\t1\t1\t0\t0\t20\t10\t93\t1.\n5\t1\t1\t1\t1\t2\t30\t0\t30\t10\t90\tYes'
+    calls = []
+
+    def ocr_tsv(img, lang='eng', config=''):
+        calls.append(config)
+        return tsv
+
+    assert result_key(img) != result_key(img, kind='tsv')
+    first = cache.image_to_data(img, ocr_tsv)
+    second = cache.image_to_data(img.copy(), ocr_tsv)
+    assert first.text == second.text == '1. Yes'
+    assert second.lines[0].conf == 90
+    assert len(calls) == 1
+    assert cache.get(result_key(img)) is None  # text entry untouched
+
+
+def test_lru_eviction_within_byte_budget():
+    cost = OCRResultCache._cost('k0', 'x' * 100)
+    cache = OCRResultCache(max_bytes=cost * 3)
+    for i in range(3):
+        cache.put(f'k{i}', 'x' * 100)
+    cache.get('k0')  # k1 is now least recently used
+    cache.put('k3', 'x' * 100)
+
+    assert cache.get('k1') is None
+    assert cache.get('k0') is not None and cache.get('k3') is not None
+    assert cache.evictions == 1
+    assert cache.size_bytes <= cache.max_bytes
+
+    cache.put('huge', 'x' * cost * 4)  # larger than the whole budget - not cached
+    assert cache.get('huge') is None and len(cache) == 3
+
+
+def test_persistence_keeps_entries_and_recency():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'ocr_cache.json')
+        cache = OCRResultCache(path=path)
+        cache.put('old', 'a')
+        cache.put('new', 'b')
+        cache.get('old')  # 'new' is least recently used
+        assert cache.save()
+        assert not cache.save()  # unchanged
+
+        restored = OCRResultCache(max_bytes=OCRResultCache._cost('old', 'a') * 2, path=path)
+        assert len(restored) == 2
+        restored.put('3rd', 'c')  # same cost - one entry has to go
+        assert restored.get('new') is None  # least recently used before the restart
+        assert restored.get('old') == 'a'
+
+
+def test_corrupt_file_is_ignored():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'ocr_cache.json')
+        with open(path, 'w') as f:
+            f.write('{not json')
+        assert len(OCRResultCache(path=path)) == 0
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+OCR engine tests - config parsing and the worker pipe protocol (no Tesseract needed)
+"""
+import io
+import threading
+
+from PIL import Image
+
+from ocr_engine import (
+    parse_config, write_request, read_request, write_response, read_response, parse_tesseract_tsv,
+    worker_main, create_engine, CAPIEngine, FakeOCREngine, OCRResult, TessBaseAPI,
+)
+
+
+def test_parse_config_matches_pytesseract_quoting():
+    config = r'--psm 6 --oem 3 -c tessedit_char_whitelist=0123456789ABCabc.,?!():-\' '
+    psm, oem, dpi, variables = parse_config(config)
+    assert (psm, oem, dpi) == (6, 3, 70)
+    assert variables == {'tessedit_char_whitelist': "0123456789ABCabc.,?!():-'"}
+
+    assert parse_config('') == (3, 3, 70, {})
+    assert parse_config('--psm 11 --dpi 300')[:3] == (11, 3, 300)
+
+
+def test_request_roundtrip():
+    stream = io.BytesIO()
+    pixels = bytes(range(12))
+    write_request(stream, pixels, 4, 3, 1, 'eng', '--psm 6')
+    write_request(stream, pixels, 4, 3, 1, 'eng', '', tsv=True)
+    stream.seek(0)
+    assert read_request(stream) == (pixels, 4, 3, 1, 'eng', '--psm 6', False)
+    assert read_request(stream) == (pixels, 4, 3, 1, 'eng', '', True)
+
+
+def test_response_roundtrip_and_error():
+    stream = io.BytesIO()
+    write_response(stream, 'Do you want to proceed?\n1. Yes')
+    write_response(stream, 'init failed', ok=False)
+    stream.seek(0)
+    assert read_response(stream) == 'Do you want to proceed?\n1. Yes'
+    try:
+        read_response(stream)
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert 'init failed' in str(e)
+
+
+def test_worker_reports_errors_and_stops_at_eof():
+    """A request the worker cannot serve yields an error response, not a crash"""
+    requests = io.BytesIO()
+    write_request(requests, b'\x00' * 4, 2, 2, 1, 'no-such-language', '')
+    requests.seek(0)
+    responses = io.BytesIO()
+
+    worker_main(requests, responses)
+
+    responses.seek(0)
+    try:
+        read_response(responses)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+
+
+def test_fake_engine_returns_canned_text_by_image_hash():
+    prompt = Image.new('L', (40, 10), 200)
+    idle = Image.new('L', (40, 10), 0)
+    engine = FakeOCREngine(default='?')
+    engine.add(prompt, 'Do you want to proceed?')
+
+    results = engine.recognize([idle, prompt.copy(), idle], config='--psm 6')
+    assert [r.text for r in results] == ['?', 'Do you want to proceed?', '?']
+    assert all(isinstance(r, OCRResult) and r.engine == 'fake' for r in results)
+    assert engine.image_to_string(prompt) == 'Do you want to proceed?'
+    assert engine.calls == 4
+
+
+def test_parse_tesseract_tsv_groups_words_into_lines():
+    tsv = '\n'.join([
+        'level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext',
+        '1\t1\t0\t0\t0\t0\t0\t0\t400\t100\t-1\t',
+        '5\t1\t1\t1\t2\t1\t10\t40\t20\t15\t91.5\t2.',
+        '5\t1\t1\t1\t2\t2\t40\t40\t30\t15\t88\tNo',
+        '5\t1\t1\t1\t1\t1\t10\t20\t20\t15\t96\t1.',
+        '5\t1\t1\t1\t1\t2\t40\t20\t30\t15\t42\tYes',
+        '5\t1\t1\t1\t1\t3\t80\t20\t5\t15\t95\t ',
+    ])
+    lines = parse_tesseract_tsv(tsv)
+    assert [line.text for line in lines] == ['1. Yes', '2. No']
+    assert lines[0].conf == 42
+    assert lines[0].box == (10, 20, 70, 35)
+    assert lines[1].shifted(100).box == (10, 140, 70, 155)
+
+    result = OCRResult.from_tsv(tsv, 'capi')
+    assert result.text == '1. Yes\n2. No'
+    assert [w.text for w in result.words] == ['1.', 'Yes', '2.', 'No']
+
+
+def test_fake_engine_data_mode_lays_out_lines():
+    img = Image.new('L', (40, 10), 200)
+    engine = FakeOCREngine()
+    engine.add(img, 'Do you want to proceed?\n\n  1. Yes')
+    result = engine.image_to_data(img)
+    assert result.text == 'Do you want to proceed?\n1. Yes'
+    assert [line.box[1] for line in result.lines] == [0, 40]
+    assert result.lines[1].words[0].box[0] == 20
+
+
+class RecordingAPI:
+    """Stand-in for TessBaseAPI that records end()"""
+    ended = []
+
+    def __init__(self, lang, config):
+        self.key = (lang, config)
+
+    def recognize(self, img, tsv=False):
+        img.wait()  # An Event standing in for the image: blocks until set
+        return 'text'
+
+    def end(self):
+        RecordingAPI.ended.append(self.key)
+
+
+def test_capi_engine_ends_models_of_every_thread():
+    RecordingAPI.ended = []
+    engine = CAPIEngine(max_configs=2, api_class=RecordingAPI)
+    ready = threading.Event()
+    ready.set()
+    for config in ('anchor', 'fast', 'anchor', 'normal'):
+        assert engine.image_to_string(ready, 'eng', config) == 'text'
+    assert RecordingAPI.ended == [('eng', 'fast')]  # Least recently used beyond max_configs
+    assert engine.resident() == 2
+
+    # A pool thread's model in the middle of a call is ended when the call returns
+    release = threading.Event()
+    thread = threading.Thread(target=engine.image_to_string, args=(release, 'eng', 'fast'))
+    thread.start()
+    while engine.resident() < 3:
+        release.wait(0.01)
+    engine.close()
+    assert sorted(RecordingAPI.ended) == [('eng', 'anchor'), ('eng', 'fast'), ('eng', 'normal')]
+    release.set()
+    thread.join()
+    assert RecordingAPI.ended[-1] == ('eng', 'fast') and len(RecordingAPI.ended) == 4
+
+    # Usable after close (fresh models); models of exited threads are ended on the next load
+    assert engine.resident() == 0 and engine.image_to_string(ready, 'eng', 'anchor') == 'text'
+    thread = threading.Thread(target=engine.image_to_string, args=(ready, 'eng', 'fast'))
+    thread.start()
+    thread.join()
+    RecordingAPI.ended = []
+    engine.image_to_string(ready, 'eng', 'normal')
+    assert RecordingAPI.ended == [('eng', 'fast')] and engine.resident() == 2
+
+
+def test_closed_model_raises_instead_of_crashing():
+    api = TessBaseAPI.__new__(TessBaseAPI)
+    api._handle = None  # What end() leaves behind
+    try:
+        api.recognize_raw(b'\0', 1, 1, 1)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+
+
+def test_engines_selectable_by_name():
+    assert isinstance(create_engine('fake'), FakeOCREngine)
+
+
+def test_unknown_engine_rejected():
+    try:
+        create_engine('gpu')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
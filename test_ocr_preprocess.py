@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+NumPy preprocessing tests - output must match the original PIL chain
+"""
+import numpy as np
+from PIL import Image
+
+from ocr_fixtures import synthetic_corpus
+from ocr_preprocess import PreprocessEngine, pil_preprocess
+from window_capture import frame_from_image
+
+
+def _random_image(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), 'RGB')
+
+
+def test_matches_pil_chain_on_random_frames():
+    engine = PreprocessEngine()
+    for width, height in [(640, 200), (1300, 300), (3, 3), (1, 5)]:
+        img = _random_image(width, height)
+        expected = np.asarray(pil_preprocess(img))
+        assert np.array_equal(np.asarray(engine.process(img)), expected), (width, height)
+
+
+def test_matches_pil_chain_on_fixture_frames_from_bgrx():
+    """Frame input (raw BGRX capture) gives the same pixels as the PIL chain"""
+    engine = PreprocessEngine()
+    for name, img, _ in synthetic_corpus():
+        frame = frame_from_image(img)
+        expected = np.asarray(pil_preprocess(frame.to_image()))
+        assert np.array_equal(np.asarray(engine.process(frame)), expected), name
+
+
+def test_scratch_buffers_do_not_leak_into_results():
+    engine = PreprocessEngine(target_width=0)
+    first = engine.process(_random_image(50, 20, seed=1))
+    snapshot = np.asarray(first).copy()
+    engine.process(_random_image(50, 20, seed=2))
+    assert np.array_equal(np.asarray(first), snapshot)
+
+
+def test_cheaper_resampling_keeps_output_size():
+    img = _random_image(600, 100)
+    sizes = {PreprocessEngine(resample=r).process(img).size for r in ('lanczos', 'bilinear', 'nearest')}
+    assert sizes == {(1200, 200)}
+    assert PreprocessEngine(resample='none').process(img).size == (600, 100)
+
+
+def test_unknown_resample_rejected():
+    try:
+        PreprocessEngine(resample='cubic-ish')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+OCR profile tests - glyph-height scaling, table lookup and autotune
+"""
+import itertools
+import os
+import tempfile
+
+import numpy as np
+
+from ocr_engine import FakeOCREngine
+from ocr_fixtures import synthetic_corpus
+from ocr_profiles import (
+    DEFAULT_PROFILE, OCRProfile, ProfileTable, autotune, fixture_passes, measure_glyph_height,
+)
+
+
+def _text_rows(height, glyph, gap):
+    """Dark image with bright text bands glyph rows tall, gap rows apart"""
+    pixels = np.full((height, 200), 10, dtype=np.uint8)
+    for top in range(gap, height - glyph, glyph + gap):
+        pixels[top:top + glyph, 20:180:3] = 230
+    return pixels
+
+
+def test_measure_glyph_height():
+    assert measure_glyph_height(_text_rows(300, 12, 8)) == 12.0
+    assert measure_glyph_height(np.full((50, 50), 30, dtype=np.uint8)) is None
+
+
+def test_prepare_scales_to_glyph_height_and_binarizes():
+    pixels = _text_rows(300, 12, 8)
+    img = OCRProfile('big', glyph_height=24, binarize=128).prepare(pixels)
+    assert img.size == (400, 600)
+    assert set(np.unique(np.asarray(img))) <= {0, 255}
+    assert abs(measure_glyph_height(np.asarray(img)) - 24) <= 2
+
+    # Legacy profile: narrow captures are upscaled to 1200px wide
+    assert DEFAULT_PROFILE.prepare(pixels).size == (1200, 1800)
+    assert 'tessedit_char_whitelist' in DEFAULT_PROFILE.config
+    assert OCRProfile('all', psm=4, whitelist=None).config == '--psm 4 --oem 3'
+
+
+def test_lookup_order_and_persistence():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ocr_profiles.json')
+        table = ProfileTable(path)
+        # Untuned classes keep the default settings
+        assert table.lookup('mintty.exe|mintty') is DEFAULT_PROFILE
+        assert table.lookup('notepad.exe|Notepad') is DEFAULT_PROFILE
+
+        table.set('*|SunAwtFrame', OCRProfile('jetbrains', glyph_height=20))
+
+        table.set('pycharm64.exe|*', OCRProfile('pycharm', psm=4))
+        table.set('pycharm64.exe|SunAwtFrame', OCRProfile('pycharm-terminal', glyph_height=18))
+        assert table.lookup('pycharm64.exe|SunAwtFrame').name == 'pycharm-terminal'
+        assert table.lookup('pycharm64.exe|SunAwtDialog').name == 'pycharm'
+        assert table.lookup('idea64.exe|SunAwtFrame').name == 'jetbrains'
+        assert table.save()
+
+        reloaded = ProfileTable(path)
+        profile = reloaded.lookup('pycharm64.exe|SunAwtFrame')
+        assert profile.to_dict() == table.lookup('pycharm64.exe|SunAwtFrame').to_dict()
+
+        assert reloaded.lookup('idea64.exe|SunAwtFrame').name == 'jetbrains'
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{broken')
+        assert ProfileTable(path).lookup('pycharm64.exe|SunAwtFrame') is DEFAULT_PROFILE
+
+
+def test_autotune_picks_cheapest_passing_profile():
+    corpus = synthetic_corpus(sizes=((1000, 600),), font_size=16)
+    texts = itertools.cycle(['\n'.join(fixture['lines']) for _, _, fixture in corpus])
+
+    def ocr_data(img, lang='eng', config=''):
+        # Text is only "read" when glyphs are at least 10px tall
+        text = next(texts)
+        glyph = measure_glyph_height(np.asarray(img))
+        return FakeOCREngine(default=text if glyph and glyph >= 10 else '').image_to_data(img)
+
+    candidates = [
+        OCRProfile('too-small', glyph_height=6),
+        OCRProfile('legacy'),
+        OCRProfile('just-right', glyph_height=12),
+    ]
+    best, results = autotune(corpus, ocr_data, candidates, cost='pixels')
+    assert best.name == 'just-right'
+    assert [r.passed for r in results] == [False, True, True]
+    assert results[2].pixels < results[1].pixels
+
+    # No candidate passes -> nothing is chosen
+    best, _ = autotune(corpus, ocr_data, candidates[:1], cost='pixels')
+    assert best is None
+
+
+def test_fixture_expectations():
+    _, img, fixture = synthetic_corpus(sizes=((1000, 600),))[0]
+    result = FakeOCREngine(default='\n'.join(fixture['lines'])).image_to_data(img)
+    assert fixture_passes(result, fixture)
+    assert not fixture_passes(result, dict(fixture, key='3', approval=False))
+    assert not fixture_passes(FakeOCREngine().image_to_data(img), fixture)
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Prompt prefilter tests - NCC template matching on synthetic terminal frames
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from ocr_fixtures import synthetic_corpus
+from prompt_prefilter import (
+    PromptPrefilter, PromptTemplate, load_reference_captures, ncc_map, synthetic_captures,
+)
+
+
+def test_ncc_peaks_at_template_position():
+    rng = np.random.default_rng(7)
+    image = rng.integers(0, 255, (60, 80)).astype(np.float64)
+    template = PromptTemplate('patch', image[20:32, 30:46])
+    scores = ncc_map(image, template)
+    assert scores.shape == (49, 65)
+    assert np.unravel_index(scores.argmax(), scores.shape) == (20, 30)
+    assert abs(scores.max() - 1.0) < 1e-9
+
+    # Brightness/contrast changes do not move the score
+    assert abs(ncc_map(image * 0.5 + 40, template).max() - 1.0) < 1e-9
+
+
+def test_flat_regions_never_match():
+    image = np.full((40, 40), 12.0)
+    template = PromptTemplate('patch', np.arange(64).reshape(8, 8))
+    assert not ncc_map(image, template).any()
+
+
+def test_prompts_pass_and_idle_shell_is_rejected():
+    prefilter = PromptPrefilter.from_captures(synthetic_captures())
+    corpus = synthetic_corpus(font_size=16)
+    for name, img, fixture in corpus:
+        result = prefilter.check(img)
+        if fixture['approval']:
+            assert result.maybe_prompt, (name, result)
+        if fixture['name'] == 'shell_idle':
+            assert not result.maybe_prompt, (name, result)
+        assert result.cost_us > 0
+
+    stats = prefilter.get_stats()
+    assert stats['frames'] == len(corpus)
+    assert 0 < stats['pass_rate'] < 1 and stats['mean_us'] > 0
+
+
+def test_match_box_is_in_source_coordinates():
+    img, box = synthetic_captures()[0]
+    prefilter = PromptPrefilter.from_captures([(img, box)], scales=(1.0,), region=(0.0, 0.0, 1.0, 1.0))
+    result = prefilter.check(img)
+    assert result.maybe_prompt
+    assert all(abs(a - b) <= 2 for a, b in zip(result.box, box))
+
+
+def test_reference_captures_load_from_directory():
+    img, box = synthetic_captures()[0]
+    with tempfile.TemporaryDirectory() as directory:
+        img.save(os.path.join(directory, 'marker.png'))
+        with open(os.path.join(directory, 'templates.json'), 'w', encoding='utf-8') as f:
+            json.dump({'marker.png': [list(box)]}, f)
+        captures = load_reference_captures(directory)
+        assert [c[1] for c in captures] == [box]
+        prefilter = PromptPrefilter.from_directory(directory)
+        assert len(prefilter.templates) == 12  # 3 scales x 4 sampling phases
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
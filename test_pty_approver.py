@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+PTY approver tests - prompt detection on a screen model, settle/cooldown, a real child on a pty
+"""
+import os
+import sys
+
+from pty_approver import PTY_AVAILABLE, StreamApprover, run_pty, translate_key
+
+# What the CLI writes for a permission prompt: colours, cursor moves, erase-line
+PROMPT = (
+    b'\x1b[2K\x1b[1G\x1b[1mBash command\x1b[22m\r\n'
+    b'  rm -rf build\r\n'
+    b'\x1b[2K\x1b[1GDo you want to proceed?\r\n'
+    b'\x1b[36m\xe2\x9d\xaf\x1b[39m \x1b[1C1. Yes\r\n'
+    b"  2. Yes, and don't ask again for rm commands\r\n"
+    b'  3. No, and tell Claude what to do differently (esc)\r\n'
+)
+
+
+CLEAR = b'\x1b[2J\x1b[H'
+
+
+def test_prompt_answered_after_output_settles():
+    approver = StreamApprover(settle=0.05)
+    approver.feed(b'\x1b[32mRunning tests...\x1b[0m\r\n1. first step\r\n', now=0.0)
+    assert approver.pending_since is None  # A numbered list is not a prompt
+    # Split in the middle of an escape sequence and of a UTF-8 character
+    for i, start in enumerate(range(0, len(PROMPT), 7)):
+        approver.feed(PROMPT[start:start + 7], now=1.0 + i * 0.001)
+    assert approver.pending_since is not None and '❯  1. Yes' in approver.prompt_text
+    assert approver.poll(now=approver.last_output + 0.01) is None  # Still drawing
+    assert approver.poll(now=approver.last_output + 0.05) == '2'
+    assert approver.answers == 1
+
+    # The answered prompt still on screen (cursor blink, same text) is not answered again
+    approver.feed(b'\x1b[1;1H', now=5.0)
+    approver.feed(b"\x1b[5;1HDo you want to proceed?", now=5.0)
+    assert approver.pending_since is None
+    # Once it leaves the screen, the next prompt counts
+    approver.feed(CLEAR + b'$ ', now=6.0)
+    approver.feed(PROMPT, now=7.0)
+    assert approver.poll(now=8.0) == '2' and approver.prompts == 2
+
+
+def test_prompt_redrawn_away_user_keystroke_cooldown_and_dry_run():
+    approver = StreamApprover(settle=0.0, cooldown=2.0)
+    approver.feed(PROMPT, now=0.0)
+    approver.feed(CLEAR + b'> ', now=0.01)  # Gone before it settled
+    assert approver.poll(now=1.0) is None
+
+    approver.feed(PROMPT, now=1.0)
+    approver.user_input()
+    assert approver.poll(now=1.0) is None and approver.answers == 0
+
+    approver.feed(CLEAR, now=1.0)
+    approver.feed(PROMPT, now=1.0)
+    assert approver.poll(now=1.0) == '2'
+    approver.feed(CLEAR + PROMPT.replace(b'rm', b'make'), now=1.5)
+    assert approver.poll(now=1.5) is None and approver.time_until_poll(now=1.5) == 1.5
+    assert approver.poll(now=3.0) == '2'
+
+    logged = []
+    dry = StreamApprover(settle=0.0, dry_run=True, log=logged.append)
+    dry.feed(PROMPT, now=0.0)
+    assert dry.poll(now=0.0) is None and dry.answers == 0 and 'dry run' in logged[0]
+
+
+def test_user_navigation_and_status_redraws_keep_a_prompt_handled():
+    # Marker moved down (the user pressing Down) after the user took over
+    approver = StreamApprover(settle=0.0, cooldown=0.0)
+    approver.feed(PROMPT, now=0.0)
+    approver.user_input()
+    approver.feed(b'\x1b[4;1H  \x1b[5;1H\xe2\x9d\xaf', now=0.1)
+    assert approver.pending_since is None and approver.poll(now=1.0) is None
+
+    # Answered prompt still on screen while a status line below it redraws
+    approver = StreamApprover(settle=0.0, cooldown=1.0)
+    approver.feed(PROMPT, now=0.0)
+    assert approver.poll(now=0.0) == '2'
+    for i in range(5):
+        approver.feed(f'\x1b[8;1H\x1b[2KThinking... {i}s'.encode(), now=2.0 + i)
+    assert approver.poll(now=10.0) is None and approver.prompts == 1
+
+    # A different prompt replacing it without a prompt-free screen in between counts
+    approver.feed(CLEAR + PROMPT.replace(b'proceed', b'allow this'), now=11.0)
+    assert approver.poll(now=12.0) == '2' and approver.prompts == 2
+
+
+def test_only_redrawn_rows_trigger_a_check():
+    approver = StreamApprover(rows=10, cols=40)
+    approver.feed(b'hello\r\n', now=0.0)
+    checks = approver.checks
+    approver.feed(b'\x1b[31m\x1b[1;1H\x1b[0m', now=0.1)  # Colours and cursor only
+    assert approver.checks == checks
+    approver.resize(5, 20)
+    assert approver.screen.rows == 5
+
+
+def test_windows_special_keys_become_vt_sequences():
+    assert translate_key('\xe0', lambda: 'P') == '\x1b[B'  # Down arrow
+    assert translate_key('\x00', lambda: '\x0f') == '\x1b[Z'  # Shift+Tab
+    assert translate_key('\x00', lambda: 'D') == ''  # F10: nothing to send
+    assert translate_key('1', None) == '1' and translate_key('\x03', None) == '\x03'
+
+
+def test_child_on_pty_receives_the_answer():
+    if not PTY_AVAILABLE:
+        return
+    child = [sys.executable, '-c', (
+        "import sys, tty; tty.setraw(0);"
+        "sys.stdout.write('Do you want to proceed?\\r\\n> 1. Yes\\r\\n  2. No\\r\\n'); sys.stdout.flush();"
+        "key = sys.stdin.read(1); sys.stdout.write('got ' + key + '\\r\\n'); sys.stdout.flush()"
+    )]
+    stdin_read, stdin_write = os.pipe()
+    stdout_read, stdout_write = os.pipe()
+    approver = StreamApprover(settle=0.02)
+    try:
+        assert run_pty(child, approver, stdin_fd=stdin_read, stdout_fd=stdout_write) == 0
+        os.close(stdout_write)
+        with os.fdopen(stdout_read, 'rb') as output:
+            assert b'got 1' in output.read()
+    finally:
+        os.close(stdin_read)
+        os.close(stdin_write)
+    assert approver.answers == 1 and approver.latency.percentile(0.5) < 1.0
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
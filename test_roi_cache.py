@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Learned prompt ROI tests - slack, full-frame check cadence and persistence
+"""
+import os
+import tempfile
+
+from PIL import Image
+
+from approval_matcher import option_block_box
+from ocr_engine import FakeOCREngine
+from ocr_fixtures import FIXTURES
+from roi_cache import ROICache, map_box, roi_key
+
+DEFAULT = (0.0, 0.4, 1.0, 1.0)
+
+
+def test_map_box_from_region_to_window():
+    assert map_box((0.0, 0.0, 1.0, 1.0), DEFAULT) == DEFAULT
+    assert map_box((0.5, 0.5, 1.0, 1.0), (0.0, 0.5, 1.0, 1.0)) == (0.5, 0.75, 1.0, 1.0)
+
+
+def test_option_block_box_includes_question_line():
+    img = Image.new('L', (8, 8))
+    engine = FakeOCREngine()
+    engine.add(img, '\n'.join(['$ npm test', 'passed', ''] + FIXTURES[0]['lines']))
+    lines = engine.image_to_data(img).lines
+    # FakeOCREngine: 20px per line; the two text lines above "1." are the
+    # tool line (y=60) and the question (y=100)
+    assert option_block_box(lines) == (0, 60, 620, 176)
+    assert option_block_box(lines, context_lines=1)[1] == 100
+    assert option_block_box(lines[:2]) is None
+
+    # A numbered plan above the prompt: the box is the prompt's block, not the plan
+    plan = next(fixture for fixture in FIXTURES if fixture['name'] == 'plan_then_proceed')
+    engine.add(img, '\n'.join(plan['lines']))
+    assert option_block_box(engine.image_to_data(img).lines)[1] == 40
+
+
+def test_learned_region_has_slack_and_full_checks():
+    cache = ROICache(slack=0.02, full_check_interval=10.0)
+    key = roi_key('PseudoConsoleWindow', 'WindowsTerminal.exe')
+    assert key == 'windowsterminal.exe|PseudoConsoleWindow'
+    assert cache.capture_region(key, DEFAULT, window=1, now=0.0) == DEFAULT
+
+    cache.learn(key, (0.1, 0.5, 0.6, 0.7))
+    left, top, right, bottom = cache.lookup(key)
+    assert [round(v, 4) for v in (left, top, right, bottom)] == [0.08, 0.4, 0.62, 0.8]
+
+    # Full checks by time, however often the window is scanned
+    regions = [cache.capture_region(key, DEFAULT, window=1, now=now) for now in (0, 1, 2, 10, 11, 25, 40)]
+    assert [r == DEFAULT for r in regions] == [False, False, False, True, False, True, True]
+    assert cache.get_stats()['roi_scans'] == 4
+
+    # Cadence is per window
+    assert cache.capture_region(key, DEFAULT, window=2, now=40.0) != DEFAULT
+    cache.evict_missing([2])
+    assert list(cache._full_checks) == [2]
+
+    # Degenerate boxes are ignored, relearning replaces
+    cache.learn(key, (0.3, 0.3, 0.3, 0.9))
+    assert cache.lookup(key)[0] < 0.1
+    cache.learn(key, (0.5, 0.9, 1.0, 1.0))
+    assert cache.lookup(key)[0] == 0.48
+
+
+def test_persistence_and_bounded_table():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'roi_cache.json')
+        cache = ROICache(path=path, max_entries=2)
+        for i in range(3):
+            cache.learn(roi_key(f'class{i}', 'app.exe'), (0.0, 0.5, 1.0, 0.9))
+        assert len(cache) == 2 and cache.lookup(roi_key('class0', 'app.exe')) is None
+        assert cache.save() and not cache.save()
+
+        reloaded = ROICache(path=path)
+        assert len(reloaded) == 2
+        assert reloaded.lookup(roi_key('class2', 'app.exe')) == cache.lookup(roi_key('class2', 'app.exe'))
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{broken')
+        assert len(ROICache(path=path)) == 0
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Scan scheduler tests - priority signals, per-window intervals, backoff, wakeups, CPU budget
+"""
+from scan_scheduler import ScanScheduler, simulate
+
+WINDOWS = [
+    ('claude', 'WindowsTerminal.exe', 'claude - bash'),
+    ('excel', 'EXCEL.EXE', 'Book1 - Excel'),
+]
+
+
+def _scheduler(**kwargs):
+    scheduler = ScanScheduler(start=0.0, **kwargs)
+    scheduler.sync(WINDOWS, now=0.0)
+    return scheduler
+
+
+def test_new_windows_are_due_at_once_highest_score_first():
+    scheduler = _scheduler()
+    assert scheduler.due(now=0.0) == ['claude', 'excel']
+    for key in ('claude', 'excel'):
+        scheduler.record(key, fingerprint=1, cost=0.01, now=0.0)
+    assert scheduler.due(now=0.0) == []
+
+    claude, excel = scheduler.windows['claude'], scheduler.windows['excel']
+    assert claude.interval < excel.interval
+    assert excel.interval == scheduler.cold_interval
+    assert scheduler.time_until_next(now=0.0) == claude.interval
+    assert scheduler.due(now=claude.interval) == ['claude']
+
+
+def test_detection_and_change_raise_priority():
+    scheduler = _scheduler()
+    for key in ('claude', 'excel'):
+        scheduler.record(key, fingerprint=1, cost=0.01, now=0.0)
+    idle = scheduler.windows['claude'].interval
+
+    scheduler.record('claude', fingerprint=2, cost=0.01, now=1.0)  # Frame changed
+    changed = scheduler.windows['claude'].interval
+    scheduler.record('claude', fingerprint=2, cost=0.01, detected=True, now=1.5)
+    detected = scheduler.windows['claude'].interval
+    assert idle > changed > detected >= scheduler.hot_interval
+    assert list(scheduler.latency.samples) == [0.5]
+
+    # Signals fade: long after the prompt the window cools down again
+    scheduler.record('claude', fingerprint=2, cost=0.01, now=3600.0)
+    assert scheduler.windows['claude'].interval > 0.9 * idle
+
+
+def test_idle_windows_back_off_until_a_change():
+    scheduler = _scheduler()
+    now, intervals = 0.0, []
+    for _ in range(8):
+        scheduler.record('claude', fingerprint=1, cost=0.01, now=now)
+        intervals.append(scheduler.windows['claude'].interval)
+        now += intervals[-1]
+    assert intervals[1] == 2 * intervals[0] and intervals[2] == 2 * intervals[1]
+    assert intervals[-1] == scheduler.cold_interval
+
+    scheduler.record('claude', fingerprint=2, cost=0.01, now=now)
+    assert scheduler.windows['claude'].interval < intervals[0]
+
+    # Failed scans (timeout, OCR error: no fingerprint) back off the same way
+    failing = _scheduler()
+    now = 0.0
+    for _ in range(8):
+        failing.record('claude', cost=failing.default_cost, now=now)
+        now = failing.next_due('claude')
+    assert failing.windows['claude'].interval == failing.cold_interval
+
+
+def test_title_change_and_foreground_wake_a_window():
+    scheduler = _scheduler()
+    for key in ('claude', 'excel'):
+        scheduler.record(key, fingerprint=1, cost=0.01, now=0.0)
+    assert scheduler.due(now=1.0) == []
+
+    # Claude's spinner in the title / the user switching to Excel
+    scheduler.sync([('claude', 'WindowsTerminal.exe', '* claude - bash'), WINDOWS[1]], now=1.0)
+    assert scheduler.due(now=1.0) == ['claude']
+    scheduler.record('claude', fingerprint=1, cost=0.01, now=1.0)
+    scheduler.sync([('claude', 'WindowsTerminal.exe', '* claude - bash'), WINDOWS[1]], foreground='excel', now=1.2)
+    assert scheduler.due(now=1.2) == ['excel'] and scheduler.wakeup.is_set()
+
+    # Rate limited: repeated title changes wake at most every hot_interval
+    scheduler.sync([('claude', 'WindowsTerminal.exe', '+ claude - bash'), WINDOWS[1]], now=1.2)
+    assert scheduler.next_due('claude') == 1.0 + scheduler.hot_interval
+
+
+def test_changed_frame_of_a_backed_off_window_wakes_it():
+    scheduler = _scheduler(probe_interval=1.0)
+    assert scheduler.probe_due(now=0.0) == []  # Never scanned: due anyway
+    scheduler.record('excel', fingerprint=1, cost=0.01, now=0.0)
+    scheduler.record('claude', fingerprint=1, cost=0.01, now=0.0)
+    scheduler.record('claude', fingerprint=2, cost=0.01, detected=True, now=0.0)
+    assert scheduler.probe_due(now=0.0) == ['excel']  # claude is due within a second
+
+    assert not scheduler.probe('excel', 1, now=0.0)
+    assert scheduler.probe_due(now=0.5) == []  # Probed at most every probe_interval
+    assert scheduler.probe_due(now=1.0) == ['excel']
+    assert scheduler.probe('excel', 2, now=1.0)
+    assert 'excel' in scheduler.due(now=1.0) and scheduler.probes == 2
+
+    assert _scheduler(probe_interval=None).probe_due(now=0.0) == []
+
+
+def test_cpu_budget_stretches_all_intervals():
+    scheduler = _scheduler(cpu_budget=0.1)
+    for key in ('claude', 'excel'):
+        scheduler.record(key, fingerprint=1, cost=1.0, now=0.0)
+    claude, excel = scheduler.windows['claude'], scheduler.windows['excel']
+    demand = claude.cost / claude.interval + excel.cost / excel.interval
+    assert abs(scheduler.stretch - demand / 0.1) < 1e-9
+    assert scheduler.next_due('excel') == excel.interval * scheduler.stretch
+
+    # Cheap scans: no stretch
+    cheap = _scheduler(cpu_budget=0.1)
+    cheap.record('claude', cost=0.001, now=0.0)
+    assert cheap.stretch == 1.0
+
+
+def test_closed_windows_are_forgotten():
+    scheduler = _scheduler()
+    scheduler.sync(WINDOWS[:1], now=1.0)
+    assert list(scheduler.windows) == ['claude']
+    scheduler.record('excel', cost=5.0, now=1.0)  # Late result of a closed window
+    assert scheduler.scans == 0
+
+
+def test_simulated_latency_beats_fixed_loop_within_budget():
+    fixed = simulate(fixed_interval=10.0, duration=600.0, prompts=10)
+    scheduled = simulate(scheduler=ScanScheduler(cpu_budget=fixed['cpu'], start=0.0), duration=600.0, prompts=10)
+    assert max(scheduled['latencies']) < min(10.0, max(fixed['latencies']))
+    assert scheduled['cpu'] <= fixed['cpu'] * 1.05
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+VT screen tests - text, wrapping, cursor/erase redraws, scrolling, split chunks, dirty rows
+"""
+from vt_screen import VTScreen, benchmark, sample_output
+
+
+def screen_of(data, rows=6, cols=20):
+    screen = VTScreen(rows, cols)
+    screen.feed(data)
+    return screen
+
+
+def test_text_wrap_and_scroll():
+    screen = screen_of(b'hello\r\nworld\r\n' + b'x' * 25, rows=3, cols=20)
+    assert screen.lines() == ['world', 'x' * 20, 'xxxxx']
+    screen.feed(b'\r\nlast')
+    # Wrapped and scrolled: top rows dropped, memory stays rows x cols
+    assert screen.lines() == ['x' * 20, 'xxxxx', 'last']
+    assert len(screen.grid) == 3 and all(len(row) == 20 for row in screen.grid)
+
+
+def test_prompt_redraw_with_cursor_moves_and_erase():
+    screen = screen_of(b'$ claude\r\n\xe2\xa0\x8b Working... (1s)\r\n> ', cols=40)
+    # Status redraw: one row up, erase, rewrite the prompt over it
+    screen.feed(b'\x1b[1A\r\x1b[2KDo you want to proceed?\r\n\x1b[2K\x1b[36m\xe2\x9d\xaf\x1b[0m 1. Yes\r\n'
+                b'\x1b[2K  2. No')
+    assert screen.bottom_lines(3) == ['Do you want to proceed?', '❯ 1. Yes', '  2. No']
+    # Cursor positioning, erase to end of line, delete character
+    screen.feed(b'\x1b[2;3H\x1b[K\x1b[1;1HX\x1b[3G\x1b[1P')
+    assert screen.lines()[:2] == ['X laude', 'Do']
+
+
+def test_chunks_split_anywhere_give_the_same_screen():
+    data = sample_output(20_000, cols=30)
+    whole = screen_of(data, rows=10, cols=30)
+    pieces = VTScreen(10, 30)
+    for i in range(0, len(data), 7):
+        pieces.feed(data[i:i + 7])
+    assert pieces.lines() == whole.lines() and (pieces.x, pieces.y) == (whole.x, whole.y)
+
+
+def test_wide_and_combining_characters():
+    screen = screen_of('승인e\u0301\r\n가나다'.encode(), rows=3, cols=5)
+    assert screen.line(0) == '승인e\u0301' and screen.grid[0][1] == ''
+    # A wide character that does not fit in the last column wraps whole
+    assert screen.line(1) == '가나' and screen.line(2) == '다'
+
+
+def test_scroll_region_insert_delete_and_alternate_screen():
+    screen = screen_of(b'a\r\nb\r\nc\r\nd\r\ne\r\nf', rows=6)
+    screen.feed(b'\x1b[2;4r\x1b[4;1H\n')  # Linefeed at the region bottom scrolls rows 2-4 only
+    assert screen.lines() == ['a', 'c', 'd', '', 'e', 'f']
+    screen.feed(b'\x1b[r\x1b[2;1H\x1b[L')
+    assert screen.lines() == ['a', '', 'c', 'd', '', 'e']
+    screen.feed(b'\x1b[M\x1b[M')
+    assert screen.lines() == ['a', 'd', '', 'e', '', '']
+
+    screen.feed(b'\x1b[?1049h\x1b[2J\x1b[Hfull screen')
+    assert screen.lines()[0] == 'full screen'
+    screen.feed(b'\x1b[?1049l')
+    assert screen.lines() == ['a', 'd', '', 'e', '', ''] and (screen.x, screen.y) == (0, 1)
+
+
+def test_dirty_rows_and_resize():
+    screen = screen_of(b'one\r\ntwo\r\nthree')
+    screen.take_dirty()
+    screen.feed(b'\x1b[2;1Hxx')
+    assert screen.take_dirty() == [1] and screen.take_dirty() == []
+    screen.feed(b'\x1b[1;1H')  # Cursor move only
+    assert screen.take_dirty() == []
+
+    screen.feed(b'\x1b[6;1Hbottom')
+    screen.resize(4, 4)
+    assert screen.lines() == ['thre', '', '', 'bott'] and screen.y == 3
+    assert screen.take_dirty() == [0, 1, 2, 3]
+
+
+def test_benchmark_runs():
+    mb_per_s, _, screen = benchmark(size=200_000)
+    assert mb_per_s > 0 and screen.bytes >= 200_000
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Window capture tests - surface pool and replay backend (runs without Windows)
+"""
+import os
+import tempfile
+import threading
+
+from PIL import Image
+
+from window_capture import (
+    SurfacePool, ReplayCaptureBackend, WindowCapture,
+    load_frame, frame_from_image, crop_frame, resolve_region, plan_desktop_slices,
+)
+
+
+def _make_pool(max_idle=4):
+    created = []
+    destroyed = []
+
+    def create(size):
+        surface = {'size': size, 'id': len(created)}
+        created.append(surface)
+        return surface
+
+    pool = SurfacePool(create, destroyed.append, max_idle=max_idle)
+    return pool, created, destroyed
+
+
+def test_pool_reuses_surfaces_by_size():
+    """Same size is reused, different size gets a new surface"""
+    pool, created, _ = _make_pool()
+
+    a = pool.acquire((800, 600))
+    pool.release((800, 600), a)
+    b = pool.acquire((800, 600))
+    assert a is b
+
+    c = pool.acquire((1024, 768))
+    assert c is not a
+    assert len(created) == 2
+    assert pool.get_stats()['reused'] == 1
+
+
+def test_pool_evicts_least_recently_used_size():
+    pool, _, destroyed = _make_pool(max_idle=2)
+
+    surfaces = {size: pool.acquire(size) for size in [(1, 1), (2, 2), (3, 3)]}
+    for size, surface in surfaces.items():
+        pool.release(size, surface)
+
+    assert pool.idle_count == 2
+    assert destroyed == [surfaces[(1, 1)]]
+
+    pool.clear()
+    assert pool.idle_count == 0
+    assert len(destroyed) == 3
+
+
+def test_pool_concurrent_checkout_never_shares_surface():
+    pool, _, _ = _make_pool(max_idle=8)
+    in_use = set()
+    lock = threading.Lock()
+    errors = []
+
+    def worker():
+        for _ in range(200):
+            surface = pool.acquire((640, 480))
+            with lock:
+                if surface['id'] in in_use:
+                    errors.append(surface['id'])
+                in_use.add(surface['id'])
+            with lock:
+                in_use.discard(surface['id'])
+            pool.release((640, 480), surface)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+
+
+def test_frame_roundtrip_and_crop():
+    img = Image.new('RGB', (4, 3), (10, 20, 30))
+    img.putpixel((1, 1), (255, 0, 0))
+    frame = frame_from_image(img)
+
+    assert frame.size == (4, 3)
+    assert frame.to_image().getpixel((1, 1)) == (255, 0, 0)
+
+    cropped = crop_frame(frame, (1, 1, 3, 3))
+    assert cropped.size == (2, 2)
+    assert cropped.to_image().getpixel((0, 0)) == (255, 0, 0)
+
+
+def test_replay_backend_from_directory():
+    """PNG and raw frames replay in name order and loop"""
+    with tempfile.TemporaryDirectory() as root:
+        window_dir = os.path.join(root, '1001')
+        os.makedirs(window_dir)
+        Image.new('RGB', (200, 150), (0, 0, 0)).save(os.path.join(window_dir, 'frame_0001.png'))
+        raw = frame_from_image(Image.new('RGB', (200, 150), (255, 255, 255)))
+        with open(os.path.join(window_dir, 'frame_0002_200x150.raw'), 'wb') as f:
+            f.write(raw.data)
+
+        named_dir = os.path.join(root, 'terminal')
+        os.makedirs(named_dir)
+        Image.new('RGB', (120, 120)).save(os.path.join(named_dir, 'a.png'))
+
+        backend = ReplayCaptureBackend(root)
+        assert 1001 in backend.windows()
+        assert len(backend.windows()) == 2
+
+        capture = WindowCapture(backend)
+        first = capture.capture(1001)
+        second = capture.capture(1001)
+        third = capture.capture(1001)
+        assert first.getpixel((0, 0)) == (0, 0, 0)
+        assert second.getpixel((0, 0)) == (255, 255, 255)
+        assert third.getpixel((0, 0)) == (0, 0, 0)
+
+
+def test_window_capture_min_size_and_missing_window():
+    backend = ReplayCaptureBackend()
+    backend.add_window(1, [Image.new('RGB', (80, 80))])
+    capture = WindowCapture(backend)
+
+    assert capture.capture(1, min_width=100, min_height=100) is None
+    assert capture.capture(1) is not None
+    assert capture.capture(999) is None
+
+
+def test_resolve_region_relative_absolute_and_clamped():
+    assert resolve_region(None, 800, 600) == (0, 0, 800, 600)
+    assert resolve_region((0.0, 0.4, 1.0, 1.0), 800, 600) == (0, 240, 800, 600)
+    assert resolve_region((10, 20, 5000, 300), 800, 600) == (10, 20, 800, 300)
+    assert resolve_region((0.0, 1.0, 1.0, 1.0), 800, 600) is None
+
+
+def test_capture_region_grabs_only_roi():
+    img = Image.new('RGB', (200, 100), (0, 0, 0))
+    img.paste((255, 0, 0), (0, 60, 200, 100))
+    backend = ReplayCaptureBackend()
+    backend.add_window(7, [img])
+    capture = WindowCapture(backend)
+
+    roi = capture.capture(7, region=(0.0, 0.6, 1.0, 1.0))
+    assert roi.size == (200, 40)
+    assert roi.getpixel((0, 0)) == (255, 0, 0)
+
+    # Minimum size applies to the window, not the region
+    assert capture.capture(7, min_width=300, min_height=50, region=(0, 0, 10, 10)) is None
+    assert capture.capture(7, min_width=100, min_height=50, region=(0, 0, 10, 10)).size == (10, 10)
+
+
+def test_frame_view_is_zero_copy_slice():
+    img = Image.new('RGB', (8, 6), (0, 0, 0))
+    img.putpixel((3, 2), (10, 20, 30))
+    frame = frame_from_image(img)
+    view = frame.view((2, 1, 6, 5))
+
+    assert isinstance(view.data, memoryview)
+    assert view.size == (4, 4) and view.stride == frame.stride
+    assert view.to_image().getpixel((1, 1)) == (10, 20, 30)
+    assert crop_frame(view, (1, 1, 2, 2)).to_image().getpixel((0, 0)) == (10, 20, 30)
+
+
+def test_plan_desktop_slices_falls_back_where_needed():
+    monitors = [(0, 0, 1000, 800), (1000, 0, 2000, 800)]
+    z_order = [
+        (5, (50, 50, 300, 300)),      # on top, covers part of window 2
+        (1, (400, 0, 900, 400)),
+        (2, (0, 200, 500, 700)),
+        (3, (900, 100, 1300, 500)),   # spans both monitors
+        (4, (1100, 0, 1900, 800)),
+    ]
+    targets = {
+        1: (400, 200, 900, 400),
+        2: (0, 400, 500, 700),        # ROI below the overlap - still sliceable
+        3: (900, 300, 1300, 500),
+        4: (1400, 300, 1900, 800),     # right of window 3
+        6: (0, 0, 100, 100),          # minimized
+        7: (1200, 0, 1300, 100),      # not painted (hidden/cloaked)
+    }
+    slices, fallback = plan_desktop_slices(targets, z_order, monitors, minimized=[6])
+    assert slices == {0: {1: targets[1], 2: targets[2]}, 1: {4: targets[4]}}
+    assert sorted(fallback) == [3, 6, 7]
+
+    # ROI covering the overlapped area falls back
+    slices, fallback = plan_desktop_slices({2: (0, 200, 500, 700)}, z_order, monitors)
+    assert slices == {} and fallback == [2]
+
+    # Maximized window frame (8px outside the monitor) is clipped
+    slices, _ = plan_desktop_slices({4: (992, -8, 2008, 808)}, [(4, (992, -8, 2008, 808))], monitors)
+    assert slices == {1: {4: (1000, 0, 2000, 800)}}
+
+
+def test_capture_frames_slices_desktop_and_matches_per_window():
+    backend = ReplayCaptureBackend()
+    colors = {1: (200, 0, 0), 2: (0, 200, 0), 3: (0, 0, 200), 4: (90, 90, 90)}
+    origins = {1: (0, 0), 2: (300, 0), 3: (250, 100), 4: (0, 300)}
+    for hwnd in (1, 2, 3, 4):
+        img = Image.new('RGB', (200, 150), colors[hwnd])
+        img.putpixel((10, 140), (255, 255, 255))
+        backend.add_window(hwnd, [img], origin=origins[hwnd], minimized=(hwnd == 4))
+    backend.set_desktop([(0, 0, 640, 480)])
+    capture = WindowCapture(backend)
+
+    regions = {hwnd: (0.0, 0.5, 1.0, 1.0) for hwnd in (1, 2, 3, 4)}
+    frames = capture.capture_frames(regions)
+    per_window = capture.capture_frames(regions, desktop=False)
+
+    # 1 is clear; 2 is covered by 3 (registered later = on top); 4 is minimized
+    assert capture.stats['desktop_grabs'] == 1
+    assert isinstance(frames[1].data, memoryview)
+    for hwnd in (1, 2, 3, 4):
+        assert frames[hwnd].to_image().tobytes() == per_window[hwnd].to_image().tobytes(), hwnd
+    assert capture.stats['sliced'] == 2  # windows 1 and 3
+
+
+def test_load_frame_rejects_bad_raw_name():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'frame.raw')
+        with open(path, 'wb') as f:
+            f.write(b'\x00' * 16)
+        try:
+            load_frame(path)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
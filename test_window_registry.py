@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Window registry tests - scripted window events instead of SetWinEventHook
+"""
+from window_registry import ScriptedEventSource, WindowInfo, WindowRegistry
+
+EXCLUDE = ('chrome', 'excel')
+
+
+def _classify(calls):
+    def classify(info):
+        calls.append(info.hwnd)
+        if info.class_name == 'Shell_TrayWnd':
+            return 'System window'
+        for exc in EXCLUDE:
+            if exc in info.title.lower():
+                return f"Excluded keyword '{exc}'"
+        return None
+    return classify
+
+
+def _registry():
+    source = ScriptedEventSource()
+    source.create(1, 'claude - bash')
+    source.create(2, 'Google Chrome', 'Chrome_WidgetWin_1')
+    source.create(3, '', 'Shell_TrayWnd')  # untitled: never tracked
+    source.create(4, 'Taskbar', 'Shell_TrayWnd')
+    source.create(5, 'tiny', pos=(0, 0, 50, 10))
+    calls = []
+    return source, WindowRegistry(source, _classify(calls)), calls
+
+
+def test_initial_enumeration_classifies_each_window_once():
+    source, registry, calls = _registry()
+    registry.refresh()
+    assert [info.hwnd for info in registry.targets()] == [1]
+    assert registry.windows[2].reason == "Excluded keyword 'chrome'"
+    assert registry.windows[4].reason == 'System window'
+    assert 3 not in registry.windows
+    assert sorted(calls) == [1, 2, 4, 5]
+
+    # Quiet cycles: no queries, no classification
+    queries = source.queries
+    for _ in range(5):
+        registry.refresh()
+    assert source.queries == queries and len(calls) == 4
+
+
+def test_events_update_only_affected_windows():
+    source, registry, calls = _registry()
+    registry.refresh()
+    calls.clear()
+
+    source.create(6, 'node server')
+    source.move(5, (0, 0, 400, 300))
+    source.rename(1, 'claude - Excel export')
+    source.destroy(2)
+    registry.refresh()
+
+    assert 2 not in registry.windows
+    assert [info.hwnd for info in registry.targets()] == [5, 6]
+    assert registry.windows[1].reason == "Excluded keyword 'excel'"
+    # Move does not reclassify; create and rename do
+    assert sorted(calls) == [1, 6]
+
+    # Title unchanged by a name event (e.g. cursor blink in title) -> verdict reused
+    calls.clear()
+    source.rename(6, 'node server')
+    registry.refresh()
+    assert calls == []
+
+
+def test_hidden_minimized_and_resync():
+    source, registry, calls = _registry()
+    registry.refresh()
+
+    source.set_visible(1, False)
+    registry.refresh()
+    assert registry.targets() == []
+
+    source.set_visible(1, True)
+    source.set_minimized(1, True)
+    registry.refresh()
+    assert [info.hwnd for info in registry.targets()] == [1]
+
+    # Parked at -32000,-32000 (minimized system placement) is not scanned
+    source.move(1, (-32000, -32000, -31840, -31972))
+    registry.refresh()
+    assert registry.targets() == []
+
+    # Full resync picks up windows whose events were lost
+    registry.resync_every = 1e-9
+    source.windows[7] = source.query(5)
+    source.windows[7].hwnd = 7
+    registry.refresh()
+    assert 7 in registry.windows and registry.get_stats()['resyncs'] == 2
+
+
+def test_records_are_updated_in_place_with_generation():
+    source, registry, calls = _registry()
+    registry.refresh()
+    info = registry.windows[1]
+    targets = registry.targets()
+    assert registry.targets() is targets  # No events: same list, nothing rebuilt
+
+    source.move(1, (10, 10, 900, 700))
+    source.rename(1, 'claude - bash')  # Same title: no new generation
+    registry.refresh()
+    assert registry.windows[1] is info and info.generation == 0 and info.pos == (10, 10, 900, 700)
+
+    source.rename(1, 'claude - zsh')
+    registry.refresh()
+    assert info.generation == 1 and info.verdict_generation == 1
+    assert info['title'] == 'claude - zsh' and info['class'] == 'ConsoleWindowClass'
+    assert not hasattr(info, '__dict__')
+
+
+def test_classification_is_memoized_per_generation():
+    info = WindowInfo(9, 'Excel - report', 'XLMAIN')
+    calls = []
+    verdict = lambda w: calls.append(w.title) or 'excluded'
+    assert info.classify(verdict) == ('excluded', True)
+    assert info.classify(verdict) == ('excluded', False)
+    info.update(WindowInfo(9, 'Excel - report v2', 'XLMAIN'))
+    assert info.classify(verdict) == ('excluded', True)
+    assert calls == ['Excel - report', 'Excel - report v2']
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"\n[OK] {len(tests)} tests passed")
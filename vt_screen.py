@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+VT Screen - incremental VT100/ANSI screen model for stream-based detection
+Terminal output is not text: a TUI redraws its prompt with cursor movement,
+erase-line and scroll sequences, so the bytes that went by are not what is on
+screen. VTScreen applies output chunks to a fixed rows x cols character grid
+(memory bounded by the terminal size, no scrollback) and records which rows
+changed, so a detector can look at the bottom of the screen only after it
+was redrawn.
+
+Handled: printable text with autowrap and double-width characters, CR/LF/BS/
+TAB, cursor movement (CUU/CUD/CUF/CUB/CNL/CPL/CHA/CUP/VPA), erase (ED/EL/ECH),
+insert/delete (ICH/DCH/IL/DL), scrolling (SU/SD, scroll region, IND/RI/NEL),
+save/restore cursor and the alternate screen (?47/?1047/?1049). Colours and
+other modes are parsed and ignored. Escape sequences and UTF-8 characters
+split across chunks are carried over.
+
+Usage:
+    python vt_screen.py    # throughput benchmark (MB/s of TUI-like output)
+"""
+import codecs
+import re
+import sys
+import time
+import unicodedata
+
+# Printable run | CSI | OSC / DCS / APC string | ESC sequence | single control
+_TOKEN_RE = re.compile(
+    r'([^\x00-\x1f\x7f-\x9f]+)'
+    r'|\x1b\[([0-?]*)[ -/]*([@-~])'
+    r'|\x1b[\]P_^][^\x07\x1b]*(?:\x07|\x1b\\)'
+    r'|\x1b([ -/]*)([0-OQ-Z\\`-~])'
+    r'|([\x00-\x1f\x7f-\x9f])'
+)
+# An escape sequence that does not complete within this many characters is garbage
+_MAX_ESCAPE = 256
+
+_ALT_SCREEN_MODES = ('47', '1047', '1049')
+
+# Cell widths of non-ASCII characters seen so far
+_WIDTHS = {}
+# Cells of recent non-ASCII runs (TUIs redraw the same borders and status text)
+_RUN_CELLS = {}
+_RUN_CELLS_SIZE = 4096
+
+
+def char_width(char):
+    """Terminal cells for one character: 2 wide (CJK, emoji), 0 combining, else 1"""
+    width = _WIDTHS.get(char)
+    if width is None:
+        if unicodedata.combining(char) or unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+            width = 0
+        elif unicodedata.east_asian_width(char) in ('W', 'F'):
+            width = 2
+        else:
+            width = 1
+        _WIDTHS[char] = width
+    return width
+
+
+class VTScreen:
+    """Character grid updated from terminal output chunks"""
+
+    def __init__(self, rows=24, cols=80):
+        self.rows = rows
+        self.cols = cols
+        self.grid = [[' '] * cols for _ in range(rows)]
+        self.x = 0
+        self.y = 0
+        self.top = 0  # Scroll region (inclusive)
+        self.bottom = rows - 1
+        self.dirty = set(range(rows))  # Rows changed since take_dirty()
+        self._lines = [None] * rows  # Cached row strings (None: rebuild)
+        self._wrap_pending = False  # Cursor sits past the last column
+        self._saved = (0, 0)
+        self._main_grid = None  # Main screen while the alternate screen is shown
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._partial = ''  # Escape sequence split across chunks
+
+        # Counters
+        self.bytes = 0
+
+        self._csi = {
+            '@': self._insert_chars, 'A': self._cursor_up, 'B': self._cursor_down, 'e': self._cursor_down,
+            'C': self._cursor_forward, 'a': self._cursor_forward, 'D': self._cursor_back,
+            'E': self._next_line, 'F': self._previous_line, 'G': self._column, '`': self._column,
+            'H': self._position, 'f': self._position, 'd': self._row, 'J': self._erase_display,
+            'K': self._erase_line, 'L': self._insert_lines, 'M': self._delete_lines, 'P': self._delete_chars,
+            'S': self._scroll_up, 'T': self._scroll_down, 'X': self._erase_chars, 'r': self._set_region,
+            's': self._save, 'u': self._restore, 'h': self._set_mode, 'l': self._reset_mode,
+        }
+
+    # Output
+
+    def feed(self, data):
+        """Apply an output chunk (bytes: UTF-8, or str)"""
+        self.bytes += len(data)
+        text = self._partial + (self._decoder.decode(data) if isinstance(data, bytes) else data)
+        cut = text.rfind('\x1b')
+        if cut != -1 and len(text) - cut < _MAX_ESCAPE and _TOKEN_RE.match(text, cut).group(6) is not None:
+            # Only the ESC itself matched: the rest of the sequence is in the next chunk
+            text, self._partial = text[:cut], text[cut:]
+        else:
+            self._partial = ''
+        csi = self._csi
+        for match in _TOKEN_RE.finditer(text):
+            run, params, final, intermediates, esc, control = match.groups()
+            if run is not None:
+                self._print(run)
+            elif final is not None:
+                handler = csi.get(final)
+                if handler is not None:
+                    handler(params)
+            elif esc is not None:
+                if not intermediates:  # Charset selection (ESC ( B) etc. ignored
+                    self._escape(esc)
+            elif control is not None:
+                self._control(control)
+
+    def _print(self, run):
+        cells = run if run.isascii() else self._cells(run)
+        while cells:
+            if self._wrap_pending:
+                self._wrap_pending = False
+                self.x = 0
+                self._linefeed()
+            room = self.cols - self.x
+            part = cells[:room]
+            if len(cells) > room and cells[room] == '':
+                if self.cols == 1:
+                    cells = cells[2:]  # Wide character on a one-column screen: cannot show
+                    continue
+                part = part[:-1] + [' ']  # Wide character does not fit: wrap it whole
+                cells = cells[room - 1:]
+            else:
+                cells = cells[room:]
+            row = self.grid[self.y]
+            row[self.x:self.x + len(part)] = part
+            self._touch(self.y)
+            self.x += len(part)
+            if self.x >= self.cols:
+                self.x = self.cols - 1
+                self._wrap_pending = True
+
+    def _cells(self, run):
+        """Cells of a non-ASCII run: wide characters take a second '' cell,
+        combining characters join the previous cell (the run itself when every
+        character takes one cell)"""
+        cells = _RUN_CELLS.get(run)
+        if cells is None:
+            cells = []
+            simple = True
+            for char in run:
+                width = char_width(char)
+                if width == 1:
+                    cells.append(char)
+                    continue
+                simple = False
+                if width == 2:
+                    cells.append(char)
+                    cells.append('')
+                elif cells:
+                    cells[-1] += char
+            if simple:
+                cells = run
+            if len(_RUN_CELLS) >= _RUN_CELLS_SIZE:
+                _RUN_CELLS.clear()
+            _RUN_CELLS[run] = cells
+        return cells
+
+    def _control(self, char):
+        if char == '\r':
+            self.x = 0
+            self._wrap_pending = False
+        elif char in '\n\x0b\x0c':
+            self._linefeed()
+        elif char == '\b':
+            self.x = max(0, self.x - 1)
+            self._wrap_pending = False
+        elif char == '\t':
+            self.x = min(self.cols - 1, (self.x // 8 + 1) * 8)
+
+    def _escape(self, final):
+        if final == '7':
+            self._save('')
+        elif final == '8':
+            self._restore('')
+        elif final == 'D':
+            self._linefeed()
+        elif final == 'E':
+            self.x = 0
+            self._linefeed()
+        elif final == 'M':
+            self._reverse_linefeed()
+        elif final == 'c':
+            self.reset()
+
+    def _linefeed(self):
+        self._wrap_pending = False
+        if self.y == self.bottom:
+            self._scroll(self.top, self.bottom, 1)
+        elif self.y < self.rows - 1:
+            self.y += 1
+
+    def _reverse_linefeed(self):
+        self._wrap_pending = False
+        if self.y == self.top:
+            self._scroll(self.top, self.bottom, -1)
+        elif self.y > 0:
+            self.y -= 1
+
+    def _scroll(self, top, bottom, count):
+        """Scroll rows top..bottom up by count (down when negative)"""
+        span = bottom - top + 1
+        count = max(-span, min(span, count))
+        if count > 0:
+            del self.grid[top:top + count]
+            del self._lines[top:top + count]
+            self.grid[bottom - count + 1:bottom - count + 1] = [[' '] * self.cols for _ in range(count)]
+            self._lines[bottom - count + 1:bottom - count + 1] = [None] * count
+        elif count < 0:
+            del self.grid[bottom + count + 1:bottom + 1]
+            del self._lines[bottom + count + 1:bottom + 1]
+            self.grid[top:top] = [[' '] * self.cols for _ in range(-count)]
+            self._lines[top:top] = [None] * -count
+        self.dirty.update(range(top, bottom + 1))
+
+    def _touch(self, y):
+        self.dirty.add(y)
+        self._lines[y] = None
+
+    def _clear(self, y, start=0, end=None):
+        end = self.cols if end is None else min(end, self.cols)
+        if start < end:
+            self.grid[y][start:end] = [' '] * (end - start)
+            self._touch(y)
+
+    # CSI handlers (params: the raw parameter string)
+
+    @staticmethod
+    def _args(params, default=1):
+        """Numeric parameters (missing or 0 -> default)"""
+        return [int(p) if p.isdigit() and int(p) else default for p in params.split(';')]
+
+    def _move(self, x=None, y=None):
+        self._wrap_pending = False
+        if x is not None:
+            self.x = max(0, min(self.cols - 1, x))
+        if y is not None:
+            self.y = max(0, min(self.rows - 1, y))
+
+    def _cursor_up(self, params):
+        top = self.top if self.y >= self.top else 0
+        self._move(y=max(top, self.y - self._args(params)[0]))
+
+    def _cursor_down(self, params):
+        bottom = self.bottom if self.y <= self.bottom else self.rows - 1
+        self._move(y=min(bottom, self.y + self._args(params)[0]))
+
+    def _cursor_forward(self, params):
+        self._move(x=self.x + self._args(params)[0])
+
+    def _cursor_back(self, params):
+        self._move(x=self.x - self._args(params)[0])
+
+    def _next_line(self, params):
+        self._cursor_down(params)
+        self.x = 0
+
+    def _previous_line(self, params):
+        self._cursor_up(params)
+        self.x = 0
+
+    def _column(self, params):
+        self._move(x=self._args(params)[0] - 1)
+
+    def _row(self, params):
+        self._move(y=self._args(params)[0] - 1)
+
+    def _position(self, params):
+        args = self._args(params.lstrip('?')) + [1]
+        self._move(x=args[1] - 1, y=args[0] - 1)
+
+    def _erase_display(self, params):
+        mode = self._args(params, default=0)[0]
+        if mode == 0:
+            self._clear(self.y, self.x)
+            for y in range(self.y + 1, self.rows):
+                self._clear(y)
+        elif mode == 1:
+            for y in range(self.y):
+                self._clear(y)
+            self._clear(self.y, 0, self.x + 1)
+        else:  # 2: screen, 3: screen + scrollback (there is none)
+            for y in range(self.rows):
+                self._clear(y)
+
+    def _erase_line(self, params):
+        mode = self._args(params, default=0)[0]
+        if mode == 0:
+            self._clear(self.y, self.x)
+        elif mode == 1:
+            self._clear(self.y, 0, self.x + 1)
+        else:
+            self._clear(self.y)
+
+    def _erase_chars(self, params):
+        self._clear(self.y, self.x, self.x + self._args(params)[0])
+
+    def _insert_chars(self, params):
+        count = min(self._args(params)[0], self.cols - self.x)
+        row = self.grid[self.y]
+        row[self.x:self.x] = [' '] * count
+        del row[self.cols:]
+        self._touch(self.y)
+
+    def _delete_chars(self, params):
+        count = min(self._args(params)[0], self.cols - self.x)
+        row = self.grid[self.y]
+        del row[self.x:self.x + count]
+        row.extend([' '] * count)
+        self._touch(self.y)
+
+    def _insert_lines(self, params):
+        if self.top <= self.y <= self.bottom:
+            self._scroll(self.y, self.bottom, -self._args(params)[0])
+            self.x = 0
+
+    def _delete_lines(self, params):
+        if self.top <= self.y <= self.bottom:
+            self._scroll(self.y, self.bottom, self._args(params)[0])
+            self.x = 0
+
+    def _scroll_up(self, params):
+        self._scroll(self.top, self.bottom, self._args(params)[0])
+
+    def _scroll_down(self, params):
+        self._scroll(self.top, self.bottom, -self._args(params)[0])
+
+    def _set_region(self, params):
+        if params.startswith('?'):
+            return
+        args = self._args(params, default=0) + [0]
+        top = (args[0] or 1) - 1
+        bottom = (args[1] or self.rows) - 1
+        if top < bottom < self.rows:
+            self.top, self.bottom = top, bottom
+            self._move(0, 0)
+
+    def _save(self, params):
+        self._saved = (self.x, self.y)
+
+    def _restore(self, params):
+        self._move(*self._saved)
+
+    def _set_mode(self, params):
+        if params.startswith('?') and any(mode in _ALT_SCREEN_MODES for mode in params[1:].split(';')):
+            if self._main_grid is None:
+                if '1049' in params:
+                    self._save('')
+                self._main_grid = self.grid
+                self.grid = [[' '] * self.cols for _ in range(self.rows)]
+                self._invalidate()
+
+    def _reset_mode(self, params):
+        if params.startswith('?') and any(mode in _ALT_SCREEN_MODES for mode in params[1:].split(';')):
+            if self._main_grid is not None:
+                self.grid, self._main_grid = self._main_grid, None
+                self._invalidate()
+                if '1049' in params:
+                    self._restore('')
+
+    def _invalidate(self):
+        self._lines = [None] * self.rows
+        self.dirty.update(range(self.rows))
+
+    # State
+
+    def reset(self):
+        """Blank screen, cursor home, full-screen scroll region"""
+        self.grid = [[' '] * self.cols for _ in range(self.rows)]
+        self._main_grid = None
+        self.x = self.y = 0
+        self.top, self.bottom = 0, self.rows - 1
+        self._wrap_pending = False
+        self._saved = (0, 0)
+        self._invalidate()
+
+    def resize(self, rows, cols):
+        """Terminal resized: rows are added or dropped at the bottom, except
+        that rows above the cursor go first when it would fall off the screen"""
+        if (rows, cols) == (self.rows, self.cols):
+            return
+        drop = max(0, self.y + 1 - rows)
+        for name in ('grid', '_main_grid'):
+            grid = getattr(self, name)
+            if grid is None:
+                continue
+            grid = grid[drop:drop + rows]
+            grid.extend([' '] * cols for _ in range(rows - len(grid)))
+            for row in grid:
+                del row[cols:]
+                row.extend([' '] * (cols - len(row)))
+            setattr(self, name, grid)
+        self.rows, self.cols = rows, cols
+        self.x = min(self.x, cols - 1)
+        self.y -= drop
+        self.top, self.bottom = 0, rows - 1
+        self._wrap_pending = False
+        self._lines = [None] * rows
+        self.dirty = set(range(rows))
+
+    def take_dirty(self):
+        """Rows changed since the last call, top to bottom"""
+        dirty = sorted(self.dirty)
+        self.dirty.clear()
+        return dirty
+
+    def line(self, y):
+        """Text of row y (trailing blanks stripped)"""
+        text = self._lines[y]
+        if text is None:
+            text = self._lines[y] = ''.join(self.grid[y]).rstrip()
+        return text
+
+    def lines(self):
+        return [self.line(y) for y in range(self.rows)]
+
+    def bottom_lines(self, count=20):
+        """Up to count rows ending at the last non-blank row"""
+        last = 0
+        for y in range(self.rows - 1, -1, -1):
+            if self.line(y):
+                last = y
+                break
+        return [self.line(y) for y in range(max(0, last - count + 1), last + 1)]
+
+    def bottom_text(self, count=20):
+        """bottom_lines joined with newlines"""
+        return '\n'.join(self.bottom_lines(count))
+
+
+def sample_output(size=4_000_000, cols=120, seed=0):
+    """TUI-like output: logs, colours, spinner and prompt redraws, wide text
+
+    Returns:
+        bytes of about size
+    """
+    import random
+    rng = random.Random(seed)
+    words = ['build', 'test', 'passed', 'src/app.py', 'Running', 'cargo', 'npm', '✓', '변경', '파일', 'OK']
+    spinner = '⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏'
+    parts = []
+    total = 0
+    frame = 0
+    while total < size:
+        kind = rng.random()
+        if kind < 0.5:
+            # Log line with colours
+            line = ' '.join(rng.choice(words) for _ in range(rng.randint(3, 14)))
+            chunk = f'\x1b[3{rng.randint(1, 7)}m{line}\x1b[0m\r\n'
+        elif kind < 0.9:
+            # Spinner / status redraw: up, erase, rewrite
+            frame += 1
+            chunk = (f'\x1b[2A\x1b[2K\r\x1b[1m{spinner[frame % len(spinner)]} Working… ({frame}s · esc to interrupt)'
+                     f'\x1b[22m\r\n\x1b[2K\x1b[2m> \x1b[22m\r\n')
+        else:
+            # Prompt box drawn with cursor positioning
+            box = ['╭' + '─' * 60 + '╮', '│ Bash command' + ' ' * 48 + '│', '│ Do you want to proceed?' + ' ' * 36 + '│',
+                   '│ ❯ 1. Yes' + ' ' * 51 + '│', '│   2. No, and tell Claude what to do differently' + ' ' * 11 + '│',
+                   '╰' + '─' * 60 + '╯']
+            chunk = '\x1b[6A' + ''.join(f'\x1b[2K\x1b[1G{row}\x1b[1B' for row in box) + '\r\n'
+        data = chunk.encode('utf-8')
+        parts.append(data)
+        total += len(data)
+    return b''.join(parts)
+
+
+def benchmark(size=4_000_000, chunk=4096, rows=40, cols=120):
+    """MB/s of VTScreen.feed on sample_output in pty-sized chunks"""
+    data = sample_output(size, cols)
+    screen = VTScreen(rows, cols)
+    start = time.perf_counter()
+    for offset in range(0, len(data), chunk):
+        screen.feed(data[offset:offset + chunk])
+        screen.take_dirty()
+    elapsed = time.perf_counter() - start
+    return len(data) / elapsed / 1e6, elapsed, screen
+
+
+def main():
+    mb_per_s, elapsed, screen = benchmark()
+    print(f"VTScreen {screen.rows}x{screen.cols}: {screen.bytes / 1e6:.1f} MB in {elapsed:.2f} s "
+          f"= {mb_per_s:.1f} MB/s (4 KB chunks, dirty rows taken per chunk)")
+    print("Bottom of screen:")
+    for line in screen.bottom_lines(6):
+        print(f"  |{line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+"""
+Window Capture - shared screenshot capture for all OCR monitors
+GDI capture with pooled DCs/bitmaps, plus a replay backend (frames on disk)
+so capture-dependent code can be benchmarked and tested off Windows
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+# GDI backend is Windows only - replay backend works everywhere
+try:
+    import ctypes
+    import win32api
+    import win32gui
+    import win32ui
+    import win32con
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
+
+class Frame:
+    """Raw BGRX pixels of one capture
+
+    data may be a view into a larger buffer (e.g. one window sliced out of a
+    desktop grab) - stride is the byte length of one row of that buffer.
+    """
+
+    __slots__ = ('data', 'width', 'height', 'stride')
+
+    def __init__(self, data, width, height, stride=0):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.stride = stride or width * 4
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def view(self, box):
+        """Zero-copy sub-frame for box (left, top, right, bottom)"""
+        left, top, right, bottom = box
+        offset = top * self.stride + left * 4
+        return Frame(memoryview(self.data)[offset:], right - left, bottom - top, self.stride)
+
+    def to_image(self):
+        """Convert to PIL Image (same conversion the monitors always used)"""
+        return Image.frombuffer(
+            'RGB',
+            (self.width, self.height),
+            self.data, 'raw', 'BGRX', self.stride, 1
+        )
+
+
+class SurfacePool:
+    """Thread-safe pool of reusable capture surfaces keyed by size
+
+    Surfaces are checked out with acquire() and handed back with release().
+    Idle surfaces are kept per size and the least recently used sizes are
+    destroyed once more than max_idle surfaces are idle.
+    """
+
+    def __init__(self, create, destroy, max_idle=16):
+        self._create = create
+        self._destroy = destroy
+        self.max_idle = max_idle
+        self._idle = OrderedDict()  # {size: [surface, ...]}
+        self._idle_count = 0
+        self._lock = threading.Lock()
+
+        # Counters
+        self.created = 0
+        self.reused = 0
+        self.destroyed = 0
+
+    def acquire(self, size):
+        """Get a surface for size, reusing an idle one if possible"""
+        with self._lock:
+            surfaces = self._idle.get(size)
+            if surfaces:
+                surface = surfaces.pop()
+                self._idle_count -= 1
+                if not surfaces:
+                    del self._idle[size]
+                self.reused += 1
+                return surface
+
+        surface = self._create(size)
+        with self._lock:
+            self.created += 1
+        return surface
+
+    def release(self, size, surface):
+        """Return a surface to the pool"""
+        evicted = []
+        with self._lock:
+            self._idle.setdefault(size, []).append(surface)
+            self._idle.move_to_end(size)
+            self._idle_count += 1
+
+            # Evict least recently used sizes first
+            while self._idle_count > self.max_idle:
+                old_size, old_surfaces = next(iter(self._idle.items()))
+                evicted.append(old_surfaces.pop(0))
+                self._idle_count -= 1
+                if not old_surfaces:
+                    del self._idle[old_size]
+
+        for old in evicted:
+            self._destroy_surface(old)
+
+    def clear(self):
+        """Destroy all idle surfaces"""
+        with self._lock:
+            surfaces = [s for group in self._idle.values() for s in group]
+            self._idle.clear()
+            self._idle_count = 0
+
+        for surface in surfaces:
+            self._destroy_surface(surface)
+
+    def _destroy_surface(self, surface):
+        try:
+            self._destroy(surface)
+        except Exception:
+            pass
+        with self._lock:
+            self.destroyed += 1
+
+    @property
+    def idle_count(self):
+        return self._idle_count
+
+    def get_stats(self):
+        """Pool statistics"""
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'destroyed': self.destroyed,
+            'idle': self._idle_count,
+        }
+
+
+class CaptureBackend:
+    """Interface for capture backends"""
+
+    def get_window_rect(self, hwnd):
+        """Return (left, top, right, bottom) of the window"""
+        raise NotImplementedError
+
+    def grab(self, hwnd, width, height, x=0, y=0):
+        """Return a Frame of width x height pixels at (x, y) in window coordinates"""
+        raise NotImplementedError
+
+    def get_monitors(self):
+        """Return [(left, top, right, bottom)] per monitor in desktop coordinates
+
+        An empty list means the backend cannot grab the desktop.
+        """
+        return []
+
+    def grab_screen(self, left, top, width, height):
+        """Return a Frame of width x height desktop pixels at (left, top)"""
+        raise NotImplementedError
+
+    def get_z_order(self):
+        """Return [(hwnd, rect)] of painted top-level windows, front to back"""
+        return []
+
+    def is_minimized(self, hwnd):
+        return False
+
+    def close(self):
+        """Release backend resources"""
+        pass
+
+
+class _GDISurface:
+    """Memory DC with a compatible bitmap selected into it"""
+
+    __slots__ = ('dc', 'hdc', 'bitmap')
+
+    def __init__(self, dc, bitmap):
+        self.dc = dc
+        self.hdc = dc.GetSafeHdc()
+        self.bitmap = bitmap
+
+
+class GDICaptureBackend(CaptureBackend):
+    """BitBlt capture reusing pooled memory DCs and bitmaps
+
+    Only the window DC is fetched per capture. The memory DC and bitmap are
+    taken from a pool keyed by window size, so steady-state scans allocate
+    no GDI objects.
+    """
+
+    def __init__(self, max_idle=16):
+        if not WIN32_AVAILABLE:
+            raise RuntimeError("GDI capture requires pywin32 (Windows only)")
+
+        self._screen_hdc = win32gui.GetDC(0)
+        self._screen_dc = win32ui.CreateDCFromHandle(self._screen_hdc)
+        self.pool = SurfacePool(self._create_surface, self._destroy_surface, max_idle=max_idle)
+
+    def _create_surface(self, size):
+        width, height = size
+        dc = self._screen_dc.CreateCompatibleDC()
+        bitmap = win32ui.CreateBitmap()
+        bitmap.CreateCompatibleBitmap(self._screen_dc, width, height)
+        dc.SelectObject(bitmap)
+        return _GDISurface(dc, bitmap)
+
+    def _destroy_surface(self, surface):
+        win32gui.DeleteObject(surface.bitmap.GetHandle())
+        surface.dc.DeleteDC()
+
+    def get_window_rect(self, hwnd):
+        return win32gui.GetWindowRect(hwnd)
+
+    def grab(self, hwnd, width, height, x=0, y=0):
+        size = (width, height)
+        hwnd_dc = win32gui.GetWindowDC(hwnd)
+        try:
+            surface = self.pool.acquire(size)
+            try:
+                # Only the requested region is copied out of the window DC
+                win32gui.BitBlt(surface.hdc, 0, 0, width, height,
+                                hwnd_dc, x, y, win32con.SRCCOPY)
+                data = surface.bitmap.GetBitmapBits(True)
+            finally:
+                self.pool.release(size, surface)
+        finally:
+            win32gui.ReleaseDC(hwnd, hwnd_dc)
+
+        return Frame(data, width, height)
+
+    def get_monitors(self):
+        return [tuple(rect) for _, _, rect in win32api.EnumDisplayMonitors()]
+
+    def grab_screen(self, left, top, width, height):
+        size = (width, height)
+        surface = self.pool.acquire(size)
+        try:
+            # The screen DC uses desktop coordinates (negative left of the primary monitor)
+            win32gui.BitBlt(surface.hdc, 0, 0, width, height,
+                            self._screen_hdc, left, top, win32con.SRCCOPY)
+            data = surface.bitmap.GetBitmapBits(True)
+        finally:
+            self.pool.release(size, surface)
+        return Frame(data, width, height)
+
+    def get_z_order(self):
+        windows = []
+        hwnd = win32gui.GetWindow(win32gui.GetDesktopWindow(), win32con.GW_CHILD)
+        while hwnd:
+            if (win32gui.IsWindowVisible(hwnd) and not win32gui.IsIconic(hwnd)
+                    and not _is_cloaked(hwnd)):
+                windows.append((hwnd, win32gui.GetWindowRect(hwnd)))
+            hwnd = win32gui.GetWindow(hwnd, win32con.GW_HWNDNEXT)
+        return windows
+
+    def is_minimized(self, hwnd):
+        return bool(win32gui.IsIconic(hwnd))
+
+    def close(self):
+        self.pool.clear()
+        try:
+            win32gui.ReleaseDC(0, self._screen_hdc)
+        except Exception:
+            pass
+
+
+_DWMWA_CLOAKED = 14
+
+
+def _is_cloaked(hwnd):
+    """Visible but not painted by DWM (other virtual desktop, suspended UWP app)"""
+    cloaked = ctypes.c_int(0)
+    try:
+        ctypes.windll.dwmapi.DwmGetWindowAttribute(
+            hwnd, _DWMWA_CLOAKED, ctypes.byref(cloaked), ctypes.sizeof(cloaked)
+        )
+    except Exception:
+        return False
+    return cloaked.value != 0
+
+
+# Raw frame files carry their size in the name: frame_0001_800x600.raw
+_RAW_SIZE_RE = re.compile(r'(\d+)x(\d+)\.raw$', re.IGNORECASE)
+
+
+def load_frame(path):
+    """Load a PNG/BMP/JPG or raw BGRX (.raw) file as a Frame"""
+    if path.lower().endswith('.raw'):
+        match = _RAW_SIZE_RE.search(os.path.basename(path))
+        if not match:
+            raise ValueError(f"Raw frame name must end with WIDTHxHEIGHT.raw: {path}")
+        width, height = int(match.group(1)), int(match.group(2))
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) != width * height * 4:
+            raise ValueError(f"Raw frame size mismatch: {path}")
+        return Frame(data, width, height)
+
+    with Image.open(path) as img:
+        return frame_from_image(img)
+
+
+def frame_from_image(img):
+    """Convert a PIL Image to a BGRX Frame"""
+    rgb = img.convert('RGB')
+    return Frame(rgb.tobytes('raw', 'BGRX'), rgb.width, rgb.height)
+
+
+class ReplayCaptureBackend(CaptureBackend):
+    """Replays recorded frames instead of capturing the screen
+
+    Directory layout: one sub-directory per window, frames sorted by name.
+        replay/
+            1001/frame_0001.png
+            1001/frame_0002_1280x720.raw
+            1002/frame_0001.png
+    Numeric directory names are used as hwnd values; other names get
+    sequential handles. Each grab() advances to the window's next frame.
+
+    set_desktop() lays the windows out on simulated monitors so desktop grabs
+    can be replayed too (windows stack in registration order, last on top).
+    """
+
+    FRAME_EXTENSIONS = ('.png', '.bmp', '.jpg', '.jpeg', '.raw')
+
+    def __init__(self, root=None, loop=True, latency=0.0):
+        self.loop = loop
+        self.latency = latency  # Simulated per-call GDI round trip (seconds)
+        self.names = {}  # {hwnd: directory name}
+        self._frames = {}  # {hwnd: [Frame or path, ...]}
+        self._position = {}  # {hwnd: next frame index}
+        self._origin = {}  # {hwnd: (left, top)} on the simulated desktop
+        self._minimized = set()
+        self._monitors = []
+        self._lock = threading.Lock()
+
+        if root:
+            self._load_directory(root)
+
+    def _load_directory(self, root):
+        window_dirs = {}
+        for name in sorted(os.listdir(root)):
+            window_dir = os.path.join(root, name)
+            if not os.path.isdir(window_dir):
+                continue
+
+            paths = [
+                os.path.join(window_dir, f) for f in sorted(os.listdir(window_dir))
+                if f.lower().endswith(self.FRAME_EXTENSIONS)
+            ]
+            if paths:
+                window_dirs[name] = paths
+
+        used = {int(name) for name in window_dirs if name.isdigit()}
+        next_hwnd = 1
+        for name, paths in window_dirs.items():
+            if name.isdigit():
+                hwnd = int(name)
+            else:
+                while next_hwnd in used:
+                    next_hwnd += 1
+                hwnd = next_hwnd
+                used.add(hwnd)
+
+            self.names[hwnd] = name
+            self._frames[hwnd] = paths
+            self._position[hwnd] = 0
+
+    def add_window(self, hwnd, frames, name=None, origin=(0, 0), minimized=False):
+        """Register in-memory frames (Frame or PIL Image) for a window
+
+        Args:
+            origin: (left, top) of the window on the simulated desktop
+            minimized: Window is minimized (not painted on the desktop)
+        """
+        converted = [f if isinstance(f, Frame) else frame_from_image(f) for f in frames]
+        with self._lock:
+            self.names[hwnd] = name or str(hwnd)
+            self._frames.pop(hwnd, None)  # re-registering moves the window to the top
+            self._frames[hwnd] = converted
+            self._position[hwnd] = 0
+            self._origin[hwnd] = tuple(origin)
+            if minimized:
+                self._minimized.add(hwnd)
+            else:
+                self._minimized.discard(hwnd)
+
+    def set_desktop(self, monitors):
+        """Enable desktop grabs over [(left, top, right, bottom)] monitors"""
+        self._monitors = [tuple(m) for m in monitors]
+
+    def windows(self):
+        """List of replayable window handles"""
+        return sorted(self._frames)
+
+    def _current(self, hwnd):
+        frames = self._frames.get(hwnd)
+        if not frames:
+            raise KeyError(f"No replay frames for window {hwnd}")
+
+        index = self._position[hwnd]
+        frame = frames[index]
+        if not isinstance(frame, Frame):
+            frame = load_frame(frame)
+            frames[index] = frame  # decode each file once
+        return frame
+
+    def get_window_rect(self, hwnd):
+        with self._lock:
+            frame = self._current(hwnd)
+        left, top = self._origin.get(hwnd, (0, 0))
+        return (left, top, left + frame.width, top + frame.height)
+
+    def grab(self, hwnd, width, height, x=0, y=0):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            frame = self._current(hwnd)
+            frames = self._frames[hwnd]
+            index = self._position[hwnd] + 1
+            if index >= len(frames):
+                index = 0 if self.loop else len(frames) - 1
+            self._position[hwnd] = index
+
+        if (x, y, width, height) == (0, 0, frame.width, frame.height):
+            return frame
+        return crop_frame(frame, (x, y, x + width, y + height))
+
+    def get_monitors(self):
+        return list(self._monitors)
+
+    def get_z_order(self):
+        with self._lock:
+            hwnds = [h for h in reversed(list(self._frames)) if h not in self._minimized]
+        return [(hwnd, self.get_window_rect(hwnd)) for hwnd in hwnds]
+
+    def is_minimized(self, hwnd):
+        return hwnd in self._minimized
+
+    def grab_screen(self, left, top, width, height):
+        """Composite each painted window's current frame (frames do not advance)"""
+        if self.latency:
+            time.sleep(self.latency)
+
+        stride = width * 4
+        desktop = bytearray(stride * height)
+        for hwnd, rect in reversed(self.get_z_order()):
+            with self._lock:
+                frame = self._current(hwnd)
+            # Intersect window with the grabbed area (desktop coordinates)
+            x0, y0 = max(left, rect[0]), max(top, rect[1])
+            x1, y1 = min(left + width, rect[2]), min(top + height, rect[3])
+            if x1 <= x0 or y1 <= y0:
+                continue
+
+            row_bytes = (x1 - x0) * 4
+            src = (y0 - rect[1]) * frame.stride + (x0 - rect[0]) * 4
+            dst = (y0 - top) * stride + (x0 - left) * 4
+            for _ in range(y1 - y0):
+                desktop[dst:dst + row_bytes] = frame.data[src:src + row_bytes]
+                src += frame.stride
+                dst += stride
+        return Frame(bytes(desktop), width, height)
+
+
+def crop_frame(frame, box):
+    """Crop a Frame to box (left, top, right, bottom) - copies into a compact buffer"""
+    left, top, right, bottom = box
+    stride = frame.stride
+    width = right - left
+    rows = [
+        frame.data[y * stride + left * 4:y * stride + right * 4]
+        for y in range(top, bottom)
+    ]
+    return Frame(b''.join(rows), width, bottom - top)
+
+
+def resolve_region(region, width, height):
+    """Resolve a region of interest to an absolute box inside a width x height window
+
+    Args:
+        region: None for the whole window, relative (left, top, right, bottom)
+            floats in 0.0-1.0, or absolute pixel ints in window coordinates
+
+    Returns:
+        (left, top, right, bottom) clamped to the window, or None if empty
+    """
+    if region is None:
+        return (0, 0, width, height)
+
+    left, top, right, bottom = region
+    if any(isinstance(v, float) for v in region):
+        left, right = int(width * left), int(width * right)
+        top, bottom = int(height * top), int(height * bottom)
+
+    left = max(0, min(width, int(left)))
+    right = max(0, min(width, int(right)))
+    top = max(0, min(height, int(top)))
+    bottom = max(0, min(height, int(bottom)))
+
+    if right <= left or bottom <= top:
+        return None
+    return (left, top, right, bottom)
+
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def plan_desktop_slices(targets, z_order, monitors, minimized=(), border_slack=8):
+    """Decide which capture boxes can be sliced out of one grab per monitor
+
+    A box is sliced only when its window is painted, nothing above it in the
+    z-order overlaps the box, and the box lies on one monitor (overflowing by
+    at most border_slack pixels, e.g. the invisible frame of a maximized
+    window - that part is clipped). Everything else is captured per window.
+
+    Args:
+        targets: {hwnd: (left, top, right, bottom)} capture boxes in desktop coordinates
+        z_order: [(hwnd, rect)] painted top-level windows, front to back
+        monitors: [(left, top, right, bottom)] in desktop coordinates
+        minimized: Minimized window handles
+
+    Returns:
+        (slices, fallback): slices is {monitor index: {hwnd: clipped box}},
+        fallback the list of hwnds to capture individually
+    """
+    depth = {hwnd: i for i, (hwnd, _) in enumerate(z_order)}
+    minimized = set(minimized)
+    slices = {}
+    fallback = []
+
+    for hwnd, box in targets.items():
+        if hwnd in minimized or hwnd not in depth:
+            fallback.append(hwnd)
+            continue
+
+        if any(_overlaps(box, rect) for _, rect in z_order[:depth[hwnd]]):
+            fallback.append(hwnd)  # occluded - the desktop shows the window above
+            continue
+
+        for index, monitor in enumerate(monitors):
+            if (box[0] >= monitor[0] - border_slack and box[1] >= monitor[1] - border_slack and
+                    box[2] <= monitor[2] + border_slack and box[3] <= monitor[3] + border_slack):
+                clipped = (max(box[0], monitor[0]), max(box[1], monitor[1]),
+                           min(box[2], monitor[2]), min(box[3], monitor[3]))
+                if clipped[0] < clipped[2] and clipped[1] < clipped[3]:
+                    slices.setdefault(index, {})[hwnd] = clipped
+                    break
+        else:
+            fallback.append(hwnd)  # spans monitors or off screen
+
+    return slices, fallback
+
+
+class WindowCapture:
+    """Capture front end shared by the monitors"""
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = GDICaptureBackend()
+        self.backend = backend
+        self.stats = {'desktop_grabs': 0, 'sliced': 0, 'per_window': 0}
+
+    def capture_frame(self, hwnd, min_width=1, min_height=1, region=None):
+        """Capture window as a raw Frame (None on failure or too small)
+
+        Args:
+            hwnd: Window handle
+            min_width, min_height: Minimum window size (checked on the full window)
+            region: Region of interest - only this part is copied (see resolve_region)
+        """
+        try:
+            left, top, right, bottom = self.backend.get_window_rect(hwnd)
+            width = right - left
+            height = bottom - top
+
+            # Minimum size check
+            if width < min_width or height < min_height:
+                return None
+
+            box = resolve_region(region, width, height)
+            if box is None:
+                return None
+
+            x0, y0, x1, y1 = box
+            return self.backend.grab(hwnd, x1 - x0, y1 - y0, x0, y0)
+
+        except Exception:
+            return None
+
+    def capture_frames(self, regions, min_width=1, min_height=1, desktop=True):
+        """Capture several windows - one desktop grab per monitor where possible
+
+        Windows that are visible and not overlapped are sliced out of a single
+        grab of their monitor (zero-copy Frame views); minimized, occluded or
+        multi-monitor windows fall back to capture_frame.
+
+        Args:
+            regions: {hwnd: region of interest} (see resolve_region)
+            min_width, min_height: Minimum window size (checked on the full window)
+            desktop: Set False to always capture per window
+
+        Returns:
+            {hwnd: Frame or None}
+        """
+        frames = {}
+        targets = {}
+        for hwnd, region in regions.items():
+            try:
+                left, top, right, bottom = self.backend.get_window_rect(hwnd)
+                width = right - left
+                height = bottom - top
+                if width < min_width or height < min_height:
+                    frames[hwnd] = None
+                    continue
+
+                box = resolve_region(region, width, height)
+                if box is None:
+                    frames[hwnd] = None
+                    continue
+                targets[hwnd] = (left + box[0], top + box[1], left + box[2], top + box[3])
+            except Exception:
+                frames[hwnd] = None
+
+        monitors = self.backend.get_monitors() if desktop and len(targets) > 1 else []
+        if monitors:
+            try:
+                z_order = self.backend.get_z_order()
+                minimized = [hwnd for hwnd in targets if self.backend.is_minimized(hwnd)]
+                slices, fallback = plan_desktop_slices(targets, z_order, monitors, minimized)
+            except Exception:
+                slices, fallback = {}, list(targets)
+        else:
+            slices, fallback = {}, list(targets)
+
+        for boxes in slices.values():
+            # Grab only the bounding box of the windows on this monitor
+            x0 = min(b[0] for b in boxes.values())
+            y0 = min(b[1] for b in boxes.values())
+            x1 = max(b[2] for b in boxes.values())
+            y1 = max(b[3] for b in boxes.values())
+            try:
+                screen = self.backend.grab_screen(x0, y0, x1 - x0, y1 - y0)
+            except Exception:
+                fallback.extend(boxes)
+                continue
+
+            self.stats['desktop_grabs'] += 1
+            self.stats['sliced'] += len(boxes)
+            for hwnd, (left, top, right, bottom) in boxes.items():
+                frames[hwnd] = screen.view((left - x0, top - y0, right - x0, bottom - y0))
+
+        for hwnd in fallback:
+            self.stats['per_window'] += 1
+            frames[hwnd] = self.capture_frame(hwnd, min_width, min_height, regions[hwnd])
+        return frames
+
+    def capture(self, hwnd, min_width=1, min_height=1, region=None):
+        """Capture window (or a region of it) as a PIL Image (None on failure or too small)"""
+        frame = self.capture_frame(hwnd, min_width, min_height, region)
+        if frame is None:
+            return None
+        return frame.to_image()
+
+    def close(self):
+        self.backend.close()
+
+
+_shared_capture = None
+_shared_lock = threading.Lock()
+
+
+def get_window_capture():
+    """Shared WindowCapture (GDI backend) so all monitors use one pool"""
+    global _shared_capture
+    with _shared_lock:
+        if _shared_capture is None:
+            _shared_capture = WindowCapture()
+        return _shared_capture
+
+
+def set_window_capture(capture):
+    """Replace the shared WindowCapture (e.g. with a replay backend)"""
+    global _shared_capture
+    with _shared_lock:
+        _shared_capture = capture
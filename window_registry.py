@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Window Registry - live set of top-level windows kept up to date by events
+Instead of EnumWindows + GetClassName/GetWindowLong/GetWindowRect for every
+window every scan cycle, the registry enumerates once and then applies
+create/destroy/show/hide/name-change/location-change/minimize events
+(SetWinEventHook on Windows). Each window is classified (system window,
+excluded title keyword) when it appears and again only when its title
+changes; location events just update its rectangle.
+
+ScriptedEventSource stands in for the hook in tests, the same way
+window_capture.ReplayCaptureBackend stands in for GDI.
+
+Usage:
+    python window_registry.py    # per-cycle allocation benchmark, 100 windows
+"""
+import queue
+import threading
+import time
+
+try:
+    import ctypes
+    from ctypes import wintypes
+    import win32con
+    import win32gui
+    import win32process
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
+# Event names (WinEventSource maps the EVENT_* constants onto these)
+CREATE = 'create'
+DESTROY = 'destroy'
+SHOW = 'show'
+HIDE = 'hide'
+NAME_CHANGE = 'name'
+LOCATION_CHANGE = 'location'
+MINIMIZE = 'minimize'
+RESTORE = 'restore'
+
+# Windows parked here are minimized or hidden system windows
+_OFFSCREEN = -32000
+
+
+class WindowInfo:
+    """One top-level window as last reported by the event source
+
+    Records are updated in place. generation counts title/class changes, and
+    the classification verdict stays cached until the next one.
+    """
+
+    __slots__ = ('hwnd', 'title', 'class_name', 'pos', 'visible', 'minimized', 'exstyle', 'pid',
+                 'generation', 'verdict', 'verdict_generation')
+
+    # Dict-style keys of the old per-scan window dicts
+    _KEYS = {'hwnd': 'hwnd', 'title': 'title', 'class': 'class_name', 'pos': 'pos', 'rect': 'pos', 'pid': 'pid'}
+
+    def __init__(self, hwnd, title='', class_name='', pos=(0, 0, 0, 0), visible=True,
+                 minimized=False, exstyle=0, pid=None):
+        self.hwnd = hwnd
+        self.title = title
+        self.class_name = class_name
+        self.pos = tuple(pos)
+        self.visible = visible
+        self.minimized = minimized
+        self.exstyle = exstyle
+        self.pid = pid
+        self.generation = 0
+        self.verdict = None
+        self.verdict_generation = -1  # Never classified
+
+    def update(self, other):
+        """Copy another record's state in; bumps generation if title or class changed"""
+        if other.title != self.title or other.class_name != self.class_name:
+            self.title = other.title
+            self.class_name = other.class_name
+            self.generation += 1
+        self.pos = other.pos
+        self.visible = other.visible
+        self.minimized = other.minimized
+        self.exstyle = other.exstyle
+        self.pid = other.pid
+
+    def classify(self, classify):
+        """Cached classify(self) - recomputed only after a title/class change
+
+        Returns:
+            (verdict, recomputed)
+        """
+        if self.verdict_generation != self.generation:
+            self.verdict = classify(self)
+            self.verdict_generation = self.generation
+            return self.verdict, True
+        return self.verdict, False
+
+    @property
+    def reason(self):
+        """Why the window is not scanned (cached verdict; None = scanned)"""
+        return self.verdict
+
+    @property
+    def width(self):
+        return self.pos[2] - self.pos[0]
+
+    @property
+    def height(self):
+        return self.pos[3] - self.pos[1]
+
+    def __getitem__(self, key):
+        """win['title'] etc. for callers written against the old window dicts"""
+        return getattr(self, self._KEYS[key])
+
+    def __repr__(self):
+        return f"WindowInfo({self.hwnd}, {self.title[:30]!r}, {self.class_name!r}, reason={self.verdict!r})"
+
+
+class WindowEventSource:
+    """Interface: initial enumeration, per-window queries and queued events"""
+
+    def enumerate(self):
+        """Handles of all current top-level windows (z-order, topmost first)"""
+        raise NotImplementedError
+
+    def query(self, hwnd):
+        """Current WindowInfo of a window, or None if it no longer exists"""
+        raise NotImplementedError
+
+    def poll(self):
+        """[(event, hwnd)] received since the last poll"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+if WIN32_AVAILABLE:
+    _WINEVENTPROC = ctypes.WINFUNCTYPE(
+        None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+        wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+    )
+
+_EVENT_SYSTEM_MINIMIZESTART = 0x0016
+_EVENT_SYSTEM_MINIMIZEEND = 0x0017
+_EVENT_OBJECT_CREATE = 0x8000
+_EVENT_OBJECT_DESTROY = 0x8001
+_EVENT_OBJECT_SHOW = 0x8002
+_EVENT_OBJECT_HIDE = 0x8003
+_EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+_EVENT_OBJECT_NAMECHANGE = 0x800C
+_WINEVENT_OUTOFCONTEXT = 0x0000
+_WINEVENT_SKIPOWNPROCESS = 0x0002
+_OBJID_WINDOW = 0
+_CHILDID_SELF = 0
+_GA_ROOT = 2
+_WM_QUIT = 0x0012
+
+_EVENT_NAMES = {
+    _EVENT_OBJECT_CREATE: CREATE,
+    _EVENT_OBJECT_DESTROY: DESTROY,
+    _EVENT_OBJECT_SHOW: SHOW,
+    _EVENT_OBJECT_HIDE: HIDE,
+    _EVENT_OBJECT_NAMECHANGE: NAME_CHANGE,
+    _EVENT_OBJECT_LOCATIONCHANGE: LOCATION_CHANGE,
+    _EVENT_SYSTEM_MINIMIZESTART: MINIMIZE,
+    _EVENT_SYSTEM_MINIMIZEEND: RESTORE,
+}
+
+
+# Events after which a window may show new content
+_WAKE_EVENTS = (CREATE, SHOW, NAME_CHANGE, RESTORE)
+
+
+class WinEventSource(WindowEventSource):
+    """SetWinEventHook on a background thread with its own message loop"""
+
+    def __init__(self, wakeup=None):
+        """
+        Args:
+            wakeup: threading.Event set when a window is created, shown,
+                restored or renamed (ends a monitor's sleep early)
+        """
+        self.wakeup = wakeup
+        self._events = queue.SimpleQueue()
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+        self._callback = _WINEVENTPROC(self._on_event)  # keep a reference for the hook's lifetime
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='win-events', daemon=True)
+            self._thread.start()
+            self._ready.wait(timeout=2)
+
+    def _run(self):
+        user32 = ctypes.windll.user32
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        flags = _WINEVENT_OUTOFCONTEXT | _WINEVENT_SKIPOWNPROCESS
+        # Two ranges: minimize start/end and the object events
+        hooks = [
+            user32.SetWinEventHook(_EVENT_SYSTEM_MINIMIZESTART, _EVENT_SYSTEM_MINIMIZEEND,
+                                   0, self._callback, 0, 0, flags),
+            user32.SetWinEventHook(_EVENT_OBJECT_CREATE, _EVENT_OBJECT_NAMECHANGE,
+                                   0, self._callback, 0, 0, flags),
+        ]
+        self._ready.set()
+        msg = wintypes.MSG()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            for hook in hooks:
+                if hook:
+                    user32.UnhookWinEvent(hook)
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread, time_ms):
+        name = _EVENT_NAMES.get(event)
+        if name is None or not hwnd or id_object != _OBJID_WINDOW or id_child != _CHILDID_SELF:
+            return
+        # Top-level windows only (destroyed windows can no longer be checked)
+        if name != DESTROY and ctypes.windll.user32.GetAncestor(hwnd, _GA_ROOT) != hwnd:
+            return
+        self._events.put((name, hwnd))
+        if self.wakeup is not None and name in _WAKE_EVENTS:
+            self.wakeup.set()
+
+    def enumerate(self):
+        self.start()
+        hwnds = []
+        win32gui.EnumWindows(lambda hwnd, acc: acc.append(hwnd) or True, hwnds)
+        return hwnds
+
+    def query(self, hwnd):
+        try:
+            if not win32gui.IsWindow(hwnd):
+                return None
+            return WindowInfo(
+                hwnd,
+                title=win32gui.GetWindowText(hwnd),
+                class_name=win32gui.GetClassName(hwnd),
+                pos=win32gui.GetWindowRect(hwnd),
+                visible=bool(win32gui.IsWindowVisible(hwnd)),
+                minimized=bool(win32gui.IsIconic(hwnd)),
+                exstyle=win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE),
+                pid=win32process.GetWindowThreadProcessId(hwnd)[1],
+            )
+        except Exception:
+            return None
+
+    def poll(self):
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self):
+        if self._thread is not None and self._thread_id:
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, _WM_QUIT, 0, 0)
+            self._thread.join(timeout=2)
+            self._thread = None
+
+
+class ScriptedEventSource(WindowEventSource):
+    """In-memory windows driven by test code; every change queues its event"""
+
+    def __init__(self):
+        self.windows = {}  # {hwnd: WindowInfo}, insertion order = z-order
+        self.queries = 0
+        self._events = []
+
+    def create(self, hwnd, title, class_name='ConsoleWindowClass', pos=(0, 0, 800, 600), **kwargs):
+        self.windows[hwnd] = WindowInfo(hwnd, title, class_name, pos, **kwargs)
+        self._events.append((CREATE, hwnd))
+
+    def destroy(self, hwnd):
+        del self.windows[hwnd]
+        self._events.append((DESTROY, hwnd))
+
+    def rename(self, hwnd, title):
+        self.windows[hwnd].title = title
+        self._events.append((NAME_CHANGE, hwnd))
+
+    def move(self, hwnd, pos):
+        self.windows[hwnd].pos = tuple(pos)
+        self._events.append((LOCATION_CHANGE, hwnd))
+
+    def set_visible(self, hwnd, visible):
+        self.windows[hwnd].visible = visible
+        self._events.append((SHOW if visible else HIDE, hwnd))
+
+    def set_minimized(self, hwnd, minimized):
+        self.windows[hwnd].minimized = minimized
+        self._events.append((MINIMIZE if minimized else RESTORE, hwnd))
+
+    def enumerate(self):
+        return list(self.windows)
+
+    def query(self, hwnd):
+        self.queries += 1
+        window = self.windows.get(hwnd)
+        if window is None:
+            return None
+        return WindowInfo(window.hwnd, window.title, window.class_name, window.pos,
+                          window.visible, window.minimized, window.exstyle, window.pid)
+
+    def poll(self):
+        events, self._events = self._events, []
+        return events
+
+
+class WindowRegistry:
+    """{hwnd: WindowInfo} for every titled top-level window, updated from events"""
+
+    def __init__(self, source, classify, min_size=(100, 20), skip_parked=True, resync_every=300.0):
+        """
+        Args:
+            source: WindowEventSource
+            classify: Callable(WindowInfo) -> reason string if the window is
+                never scanned (system window, excluded keyword, not a
+                terminal), else None. Cached per window until its title or
+                class changes.
+            min_size: (width, height) below which a window is not scanned
+            skip_parked: Do not scan windows parked at -32000,-32000
+            resync_every: Seconds between full re-enumerations (covers events
+                lost while the hook was not running; 0 = never)
+        """
+        self.source = source
+        self.classify = classify
+        self.min_size = min_size
+        self.skip_parked = skip_parked
+        self.resync_every = resync_every
+        self.windows = {}  # {hwnd: WindowInfo}
+        self._targets = None  # Cached targets() list, dropped on any change
+        self._synced_at = None
+
+        # Counters
+        self.events = 0
+        self.classifications = 0
+        self.resyncs = 0
+
+    def refresh(self):
+        """Apply queued events (first call and resync interval: full enumeration)"""
+        now = time.monotonic()
+        if self._synced_at is None or (self.resync_every and now - self._synced_at >= self.resync_every):
+            self.source.poll()  # Everything queued so far is covered by the enumeration
+            self._resync()
+            self._synced_at = now
+            return
+
+        events = self.source.poll()
+        if not events:
+            return
+        self._targets = None
+        for event, hwnd in events:
+            self.events += 1
+            if event == DESTROY:
+                self.windows.pop(hwnd, None)
+            elif event == LOCATION_CHANGE:
+                info = self.windows.get(hwnd)
+                if info is not None:
+                    moved = self.source.query(hwnd)
+                    if moved is None:
+                        del self.windows[hwnd]
+                    else:
+                        info.pos, info.minimized = moved.pos, moved.minimized
+            else:
+                # create/show/hide/name/minimize: state and maybe title changed
+                self._update(hwnd)
+
+    def _resync(self):
+        self.resyncs += 1
+        self._targets = None
+        previous = self.windows
+        self.windows = {}
+        for hwnd in self.source.enumerate():
+            known = previous.get(hwnd)
+            if known is not None:
+                self.windows[hwnd] = known  # Keeps its cached verdict unless the title changed
+            self._update(hwnd)
+
+    def _update(self, hwnd):
+        fresh = self.source.query(hwnd)
+        if fresh is None or not fresh.title:
+            self.windows.pop(hwnd, None)
+            return
+
+        info = self.windows.get(hwnd)
+        if info is None:
+            info = self.windows[hwnd] = fresh
+        else:
+            info.update(fresh)
+        _, recomputed = info.classify(self.classify)
+        if recomputed:
+            self.classifications += 1
+
+    def is_target(self, info):
+        """Scanned this cycle: classified as scannable, shown, not parked off-screen, big enough"""
+        if info.verdict is not None or not (info.visible or info.minimized):
+            return False
+        left, top, right, bottom = info.pos
+        if self.skip_parked and left == _OFFSCREEN and top == _OFFSCREEN:
+            return False
+        return right - left >= self.min_size[0] and bottom - top >= self.min_size[1]
+
+    def targets(self):
+        """[WindowInfo] of windows to scan - the same list object until something changes"""
+        if self._targets is None:
+            self._targets = [info for info in self.windows.values() if self.is_target(info)]
+        return self._targets
+
+    def close(self):
+        self.source.close()
+
+    def get_stats(self):
+        return {
+            'windows': len(self.windows),
+            'targets': len(self.targets()),
+            'events': self.events,
+            'classifications': self.classifications,
+            'resyncs': self.resyncs,
+        }
+
+
+def benchmark(windows=100, cycles=200, renames=2):
+    """Per-cycle garbage and time: per-scan enumeration + dicts vs the registry
+
+    Both sides run on a ScriptedEventSource with the approver's keyword list;
+    the registry side also gets `renames` title changes per cycle.
+    """
+    import sys
+    import tracemalloc
+
+    keywords = ['chrome', 'powerpoint', 'excel', 'settings', 'hwp', 'hancom', '.xlsx', '.xls', 'ppt',
+                'program manager', 'nvidia geforce', 'microsoft text input', 'auto approval complete']
+
+    def classify(info):
+        title_lower = info.title.lower()
+        for exc in keywords:
+            if exc in title_lower:
+                return exc
+        return None
+
+    source = ScriptedEventSource()
+    for hwnd in range(1, windows + 1):
+        source.create(hwnd, f"window {hwnd} - {'Excel' if hwnd % 5 == 0 else 'bash'}",
+                      pos=(0, 0, 800 + hwnd, 600))
+
+    def per_scan():
+        # The old find_target_windows: query + classify + dict for every window every cycle
+        found = []
+        for hwnd in source.enumerate():
+            info = source.query(hwnd)
+            if info.title and classify(info) is None and info.width >= 100 and info.height >= 20:
+                found.append({'hwnd': hwnd, 'title': info.title, 'class': info.class_name, 'pos': info.pos})
+        return found
+
+    registry = WindowRegistry(source, classify)
+    registry.refresh()
+
+    def event_driven(cycle):
+        for i in range(renames):
+            hwnd = (cycle * renames + i) % windows + 1
+            source.rename(hwnd, f"{source.windows[hwnd].title.split(' #')[0]} #{cycle}")
+        registry.refresh()
+        return registry.targets()
+
+    def measure(run):
+        # Records = WindowInfo from query() + window dicts built per cycle;
+        # peak = transient memory high-water above the start of the cycle
+        queries = source.queries
+        records = 0
+        peak = 0
+        tracemalloc.start()
+        start = time.perf_counter()
+        for cycle in range(cycles):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            found = run(cycle)
+            peak += tracemalloc.get_traced_memory()[1] - baseline
+            records += sum(1 for win in found if isinstance(win, dict))
+            del found
+        elapsed = time.perf_counter() - start
+        tracemalloc.stop()
+        records += source.queries - queries
+        return records / cycles, peak / cycles, elapsed / cycles * 1e6
+
+    before = measure(lambda cycle: per_scan())
+    after = measure(event_driven)
+
+    record = {'hwnd': 1, 'title': 't', 'class': 'c', 'pos': (0, 0, 1, 1)}
+    print(f"{windows} windows, {cycles} cycles ({renames} title changes per cycle on the registry)")
+    print(f"  record size: dict {sys.getsizeof(record)} B, WindowInfo {sys.getsizeof(WindowInfo(1))} B")
+    for name, (records, peak, us) in (('per-scan dicts', before), ('registry', after)):
+        print(f"  {name:<15} {records:6.1f} records/cycle {peak / 1024:7.1f} KiB peak/cycle {us:7.0f} us/cycle")
+    print(f"  classifications: {registry.classifications} (registry) vs {windows * cycles} (per scan)")
+    return before, after
+
+if __name__ == "__main__":
+    benchmark()